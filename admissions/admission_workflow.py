@@ -8,9 +8,15 @@ from typing import List, Dict, Optional, Any
 from enum import Enum
 from datetime import datetime, timedelta
 import json
+import threading
 import uuid
 import random
 
+from admissions.dashboard_metrics import DashboardMetrics
+from admissions.indexed_store import IndexedStore
+
+METRICS_SCOPE = "workflow"
+
 class WorkflowStage(Enum):
     APPLICATION_SUBMITTED = "application_submitted"
     INITIAL_REVIEW = "initial_review"
@@ -59,11 +65,11 @@ class AdmissionWorkflow:
     applicant_email: str
     current_stage: WorkflowStage
     workflow_steps: List[WorkflowStep]
+    created_at: datetime
+    updated_at: datetime
     decision: Optional[DecisionType] = None
     decision_reason: str = ""
     decision_date: Optional[datetime] = None
-    created_at: datetime
-    updated_at: datetime
     estimated_completion_date: Optional[datetime] = None
     priority: str = "normal"  # low, normal, high, urgent
     notifications_sent: List[Dict[str, Any]] = field(default_factory=list)
@@ -86,19 +92,32 @@ class AdmissionWorkflowManager:
     """Manages complete admission workflow from application to enrollment"""
     
     def __init__(self, admissions_system=None, evaluation_system=None, 
-                 application_portal=None, user_manager=None):
+                 application_portal=None, user_manager=None, workflow_engine=None,
+                 metrics: Optional[DashboardMetrics] = None):
         self.admissions_system = admissions_system
         self.evaluation_system = evaluation_system
         self.application_portal = application_portal
         self.user_manager = user_manager
+        # Optional admissions.workflow_engine.WorkflowEngine; steps then run from its
+        # persistent queue instead of inline
+        self.workflow_engine = workflow_engine
         
         # Workflow data
-        self.admission_workflows: Dict[str, AdmissionWorkflow] = {}
-        self.enrollment_data: Dict[str, EnrollmentData] = {}
+        self.admission_workflows: IndexedStore = IndexedStore(
+            hash_fields=("application_id", "applicant_email", "current_stage"))
+        self.enrollment_data: IndexedStore = IndexedStore(hash_fields=("application_id",))
+        
+        # Analytics aggregates; each workflow's last counted summary lets a change be counted once
+        self.metrics = metrics or DashboardMetrics()
+        self._workflow_summaries: Dict[str, tuple] = {}
+        self._summaries_lock = threading.Lock()
         
         # Workflow templates
         self.workflow_templates = self._initialize_workflow_templates()
         
+        if workflow_engine is not None:
+            workflow_engine.attach(self)
+        
     def _initialize_workflow_templates(self) -> Dict[str, List[Dict[str, Any]]]:
         """Initialize workflow templates for different application types"""
         return {
@@ -260,13 +279,13 @@ class AdmissionWorkflowManager:
         """Initiate admission workflow for submitted application"""
         
         # Check if workflow already exists
-        existing_workflows = [wf for wf in self.admission_workflows.values() if wf.application_id == application_id]
-        if existing_workflows:
-            return {
-                "success": False,
-                "error": "Workflow already exists for this application",
-                "workflow_id": existing_workflows[0].workflow_id
-            }
+        if self.workflow_engine:
+            existing_workflow_id = self.workflow_engine.find_workflow(application_id)
+        else:
+            existing_workflow = self.admission_workflows.first("application_id", application_id)
+            existing_workflow_id = existing_workflow.workflow_id if existing_workflow else None
+        if existing_workflow_id:
+            return self._workflow_exists(existing_workflow_id)
         
         # Create workflow
         workflow_id = f"WF_{uuid.uuid4().hex[:8]}"
@@ -302,10 +321,16 @@ class AdmissionWorkflowManager:
             estimated_completion_date=datetime.now() + timedelta(days=12)  # 12 days for standard workflow
         )
         
-        self.admission_workflows[workflow_id] = workflow
-        
-        # Start first step
-        self._execute_workflow_step(workflow_id, WorkflowStage.APPLICATION_SUBMITTED)
+        if self.workflow_engine:
+            # Queue the first step and return; the engine's workers run the rest
+            owner_workflow_id = self.workflow_engine.create(workflow)
+            if owner_workflow_id != workflow_id:
+                return self._workflow_exists(owner_workflow_id)
+        else:
+            self._store_workflow(workflow)
+            
+            # Start first step
+            self._execute_workflow_step(workflow_id, WorkflowStage.APPLICATION_SUBMITTED)
         
         return {
             "success": True,
@@ -317,13 +342,55 @@ class AdmissionWorkflowManager:
             "message": "Admission workflow initiated successfully"
         }
     
+    def _workflow_exists(self, workflow_id: str) -> Dict[str, Any]:
+        return {
+            "success": False,
+            "error": "Workflow already exists for this application",
+            "workflow_id": workflow_id
+        }
+    
+    def _get_workflow(self, workflow_id: str) -> Optional[AdmissionWorkflow]:
+        """Current workflow state; with an engine it is read from the store, which other workers update"""
+        
+        if self.workflow_engine:
+            return self.workflow_engine.get_workflow(workflow_id)
+        return self.admission_workflows.get(workflow_id)
+    
+    def advance_workflow(self, workflow_id: str, stage: Optional[WorkflowStage] = None) -> Dict[str, Any]:
+        """Run a step that is not auto-triggered (e.g. after human review); defaults to the next step"""
+        
+        workflow = self._get_workflow(workflow_id)
+        if not workflow:
+            return {"success": False, "error": "Workflow not found"}
+        
+        if stage is None:
+            next_step = self._next_workflow_step(workflow, workflow.current_stage)
+            if not next_step:
+                return {"success": False, "error": "Workflow has no further steps"}
+            stage = next_step.stage
+        
+        if self.workflow_engine:
+            return self.workflow_engine.enqueue(workflow_id, stage)
+        return self._execute_workflow_step(workflow_id, stage)
+    
     def _execute_workflow_step(self, workflow_id: str, stage: WorkflowStage) -> Dict[str, Any]:
-        """Execute specific workflow step"""
+        """Execute specific workflow step, then any auto-triggered steps that follow it"""
         
         workflow = self.admission_workflows.get(workflow_id)
         if not workflow:
             return {"success": False, "error": "Workflow not found"}
         
+        result = self._run_workflow_step(workflow, stage)
+        if result["success"]:
+            # Trigger next step if auto-triggered
+            self._trigger_next_step(workflow_id, stage)
+        self._store_workflow(workflow)
+        
+        return result
+    
+    def _run_workflow_step(self, workflow: AdmissionWorkflow, stage: WorkflowStage) -> Dict[str, Any]:
+        """Execute one step and record its outcome on the step; does not trigger the next one"""
+        
         # Find step
         step = next((s for s in workflow.workflow_steps if s.stage == stage), None)
         if not step:
@@ -360,9 +427,6 @@ class AdmissionWorkflowManager:
             step.status = "completed"
             step.completed_at = datetime.now()
             workflow.current_stage = stage
-            
-            # Trigger next step if auto-triggered
-            self._trigger_next_step(workflow_id, stage)
         else:
             step.status = "failed"
             step.notes = result.get("error", "Step execution failed")
@@ -566,24 +630,27 @@ class AdmissionWorkflowManager:
                 "error": "Only accepted students can be enrolled"
             }
         
-        # Create enrollment data
-        enrollment_id = f"ENROLL_{uuid.uuid4().hex[:8]}"
-        student_id = f"STUDENT_{uuid.uuid4().hex[:8]}"
-        
-        enrollment = EnrollmentData(
-            enrollment_id=enrollment_id,
-            application_id=workflow.application_id,
-            student_id=student_id,
-            program="MS AI",
-            start_term="Fall 2024",
-            enrollment_date=datetime.now(),
-            status="enrolled"
-        )
-        
-        self.enrollment_data[enrollment_id] = enrollment
+        # A retried step reuses the enrollment (and account) it already created. IDs are keyed
+        # on the application, so an attempt whose commit was lost re-creates the same enrollment
+        enrollment = self._find_enrollment(workflow.application_id)
+        
+        if enrollment is None:
+            key = uuid.uuid5(uuid.NAMESPACE_URL, workflow.application_id).hex
+            # Create enrollment data
+            enrollment = EnrollmentData(
+                enrollment_id=f"ENROLL_{key[:8]}",
+                application_id=workflow.application_id,
+                student_id=f"STUDENT_{key[8:16]}",
+                program="MS AI",
+                start_term="Fall 2024",
+                enrollment_date=datetime.now(),
+                status="enrolled"
+            )
+            
+            self._store_enrollment(enrollment)
         
         # Create user account
-        if self.user_manager:
+        if self.user_manager and not self.user_manager.find_user_by_email(workflow.applicant_email):
             user_result = self.user_manager.create_user(
                 email=workflow.applicant_email,
                 password="temp_password_123",  # Would be generated securely
@@ -595,8 +662,8 @@ class AdmissionWorkflowManager:
         return {
             "success": True,
             "message": "Enrollment processing completed",
-            "enrollment_id": enrollment_id,
-            "student_id": student_id,
+            "enrollment_id": enrollment.enrollment_id,
+            "student_id": enrollment.student_id,
             "program": enrollment.program,
             "start_term": enrollment.start_term
         }
@@ -605,7 +672,7 @@ class AdmissionWorkflowManager:
         """Execute enrollment completion step"""
         
         # Find enrollment data
-        enrollment = next((e for e in self.enrollment_data.values() if e.application_id == workflow.application_id), None)
+        enrollment = self._find_enrollment(workflow.application_id)
         
         if not enrollment:
             return {
@@ -631,25 +698,96 @@ class AdmissionWorkflowManager:
             "welcome_notification_sent": True
         }
     
+    def _store_workflow(self, workflow: AdmissionWorkflow):
+        """Keep the current state of a workflow and count what changed since it was last stored"""
+        self.admission_workflows[workflow.workflow_id] = workflow
+        self._record_workflow(workflow)
+    
+    def _store_enrollment(self, enrollment: EnrollmentData):
+        self.enrollment_data[enrollment.enrollment_id] = enrollment
+        self.metrics.publish("counted", scope=METRICS_SCOPE, name="enrollments", key=enrollment.status)
+    
+    def _workflow_summary(self, workflow: AdmissionWorkflow) -> tuple:
+        """(stage, decision, hours to decision, completed stages): the fields the analytics count"""
+        decision = workflow.decision.value if workflow.decision else None
+        hours = None
+        if decision and workflow.decision_date:
+            hours = (workflow.decision_date - workflow.created_at).total_seconds() / 3600
+        completed = frozenset(step.stage.value for step in workflow.workflow_steps if step.status == "completed")
+        return workflow.current_stage.value, decision, hours, completed
+    
+    def _record_workflow(self, workflow: AdmissionWorkflow):
+        """Publish metrics events for the difference between workflow and its last recorded summary"""
+        summary = self._workflow_summary(workflow)
+        # Engine workers and readers may store the same workflow concurrently
+        with self._summaries_lock:
+            previous = self._workflow_summaries.get(workflow.workflow_id)
+            if summary == previous:
+                return
+            self._workflow_summaries[workflow.workflow_id] = summary
+            self._publish_workflow_changes(workflow, previous, summary)
+    
+    def _publish_workflow_changes(self, workflow: AdmissionWorkflow, previous: Optional[tuple], summary: tuple):
+        key = workflow.workflow_id
+        stage, decision, hours, completed = summary
+        old_stage, old_decision, old_hours, old_completed = previous or (None, None, None, frozenset())
+        if previous is None:
+            auto_steps = sum(1 for step in workflow.workflow_steps if step.auto_triggered)
+            self.metrics.publish("counted", scope=METRICS_SCOPE, name="steps", key="auto", amount=auto_steps)
+            self.metrics.publish("counted", scope=METRICS_SCOPE, name="steps", key="manual",
+                                 amount=len(workflow.workflow_steps) - auto_steps)
+        if stage != old_stage:
+            self.metrics.publish("status_changed", scope=METRICS_SCOPE, key=key, old=old_stage, new=stage,
+                                 field="stage")
+        if (decision, hours) != (old_decision, old_hours):
+            self.metrics.publish("decision_made", scope=METRICS_SCOPE, key=key, old=old_decision, new=decision,
+                                 old_hours=old_hours, hours=hours)
+        for step in completed - old_completed:
+            self.metrics.publish("step_completed", scope=METRICS_SCOPE, key=key, step=step)
+        for step in old_completed - completed:
+            self.metrics.publish("step_completed", scope=METRICS_SCOPE, key=key, step=step, amount=-1)
+    
+    def rebuild_metrics(self):
+        """Recount the analytics aggregates from the workflows and enrollments"""
+        self.metrics.reset(METRICS_SCOPE)
+        self._workflow_summaries.clear()
+        for workflow in list(self.admission_workflows.values()):
+            self._record_workflow(workflow)
+        for enrollment in list(self.enrollment_data.values()):
+            self.metrics.publish("counted", scope=METRICS_SCOPE, name="enrollments", key=enrollment.status)
+    
+    def _find_enrollment(self, application_id: str) -> Optional[EnrollmentData]:
+        # With an engine, the step that created the enrollment may have run on another manager's engine;
+        # one created by a step of this manager that is still finishing is only held here
+        if self.workflow_engine:
+            enrollment = self.workflow_engine.find_enrollment(application_id)
+            if enrollment is not None:
+                return enrollment
+        return self.enrollment_data.first("application_id", application_id)
+    
+    def _next_workflow_step(self, workflow: AdmissionWorkflow, current_stage: WorkflowStage) -> Optional[WorkflowStep]:
+        """Step following current_stage, if any"""
+        
+        stages = [step.stage for step in workflow.workflow_steps]
+        if current_stage not in stages:
+            return None
+        current_index = stages.index(current_stage)
+        if current_index < len(workflow.workflow_steps) - 1:
+            return workflow.workflow_steps[current_index + 1]
+        return None
+    
     def _trigger_next_step(self, workflow_id: str, current_stage: WorkflowStage):
-        """Trigger next step in workflow"""
+        """Run the auto-triggered steps after current_stage, one after another, until one fails or waits"""
         
         workflow = self.admission_workflows.get(workflow_id)
         if not workflow:
             return
         
-        # Find next step
-        current_index = None
-        for i, step in enumerate(workflow.workflow_steps):
-            if step.stage == current_stage:
-                current_index = i
+        next_step = self._next_workflow_step(workflow, current_stage)
+        while next_step and next_step.auto_triggered:
+            if not self._run_workflow_step(workflow, next_step.stage)["success"]:
                 break
-        
-        if current_index is not None and current_index < len(workflow.workflow_steps) - 1:
-            next_step = workflow.workflow_steps[current_index + 1]
-            if next_step.auto_triggered:
-                # Schedule next step execution
-                self._execute_workflow_step(workflow_id, next_step.stage)
+            next_step = self._next_workflow_step(workflow, next_step.stage)
     
     def _get_application_data(self, application_id: str) -> Dict[str, Any]:
         """Get application data for processing"""
@@ -685,7 +823,7 @@ class AdmissionWorkflowManager:
     def get_workflow_status(self, workflow_id: str) -> Dict[str, Any]:
         """Get workflow status and progress"""
         
-        workflow = self.admission_workflows.get(workflow_id)
+        workflow = self._get_workflow(workflow_id)
         if not workflow:
             return {"error": "Workflow not found"}
         
@@ -720,7 +858,11 @@ class AdmissionWorkflowManager:
             "updated_at": workflow.updated_at.isoformat(),
             "notifications_sent": len(workflow.notifications_sent)
         }
-    
+
+    def get_workflows_at_stage(self, stage: WorkflowStage) -> List[AdmissionWorkflow]:
+        """Workflows whose last completed step is stage, e.g. those waiting for human review"""
+        return self.admission_workflows.lookup("current_stage", stage)
+
     def get_workflow_analytics(self) -> Dict[str, Any]:
         """Get workflow analytics and statistics"""
         
@@ -729,39 +871,28 @@ class AdmissionWorkflowManager:
         if total_workflows == 0:
             return {"message": "No workflows completed yet"}
         
-        # Stage distribution
-        stage_counts = {}
-        for stage in WorkflowStage:
-            stage_counts[stage.value] = len([wf for wf in self.admission_workflows.values() if wf.current_stage == stage])
-        
-        # Decision distribution
-        decision_counts = {}
-        for decision in DecisionType:
-            decision_counts[decision.value] = len([wf for wf in self.admission_workflows.values() if wf.decision == decision])
-        
-        # Completion times
-        completed_workflows = [wf for wf in self.admission_workflows.values() if wf.decision is not None]
-        completion_times = []
-        for wf in completed_workflows:
-            if wf.decision_date:
-                completion_time = (wf.decision_date - wf.created_at).total_seconds() / 3600  # hours
-                completion_times.append(completion_time)
+        # Stage and decision distribution, maintained by _record_workflow
+        stage_counts = self.metrics.counts(METRICS_SCOPE, "stage", [stage.value for stage in WorkflowStage])
+        decision_counts = self.metrics.counts(METRICS_SCOPE, "decision", [decision.value for decision in DecisionType])
         
-        avg_completion_time = sum(completion_times) / len(completion_times) if completion_times else 0
+        # Completion times (hours)
+        completion_times = self.metrics.distribution(METRICS_SCOPE, "decision_hours")
+        has_times = completion_times["count"] > 0
         
         # Enrollment statistics
         total_enrollments = len(self.enrollment_data)
-        successful_enrollments = len([e for e in self.enrollment_data.values() if e.status == "enrolled"])
+        successful_enrollments = self.metrics.counts(METRICS_SCOPE, "enrollments", ["enrolled"])["enrolled"]
+        step_counts = self.metrics.counts(METRICS_SCOPE, "steps", ["auto", "manual"])
         
         return {
             "total_workflows": total_workflows,
             "stage_distribution": stage_counts,
             "decision_distribution": decision_counts,
             "completion_statistics": {
-                "completed_workflows": len(completed_workflows),
-                "average_completion_time_hours": avg_completion_time,
-                "fastest_completion_hours": min(completion_times) if completion_times else 0,
-                "slowest_completion_hours": max(completion_times) if completion_times else 0
+                "completed_workflows": sum(decision_counts.values()),
+                "average_completion_time_hours": completion_times["mean"] if has_times else 0,
+                "fastest_completion_hours": completion_times["min"] if has_times else 0,
+                "slowest_completion_hours": completion_times["max"] if has_times else 0
             },
             "enrollment_statistics": {
                 "total_enrollments": total_enrollments,
@@ -769,9 +900,9 @@ class AdmissionWorkflowManager:
                 "enrollment_rate": (successful_enrollments / total_workflows * 100) if total_workflows > 0 else 0
             },
             "workflow_efficiency": {
-                "average_steps_completed": sum(len([s for s in wf.workflow_steps if s.status == "completed"]) for wf in self.admission_workflows.values()) / total_workflows,
-                "auto_triggered_steps": sum(len([s for s in wf.workflow_steps if s.auto_triggered]) for wf in self.admission_workflows.values()),
-                "manual_steps": sum(len([s for s in wf.workflow_steps if not s.auto_triggered]) for wf in self.admission_workflows.values())
+                "average_steps_completed": self.metrics.total(METRICS_SCOPE, "steps_completed") / total_workflows,
+                "auto_triggered_steps": step_counts["auto"],
+                "manual_steps": step_counts["manual"]
             }
         }
     
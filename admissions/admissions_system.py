@@ -4,12 +4,20 @@ Comprehensive application, evaluation, and decision workflow
 """
 
 from dataclasses import dataclass, field
+from functools import partial
 from typing import List, Dict, Optional, Any
 from enum import Enum
 from datetime import datetime, timedelta
 import json
+import threading
 import uuid
 
+from admissions.agent_dispatcher import AgentDispatcher
+from admissions.dashboard_metrics import DashboardMetrics
+from storage_backend import MemoryBackend, StorageBackend, transactional
+
+METRICS_SCOPE = "admissions"
+
 class ApplicationStatus(Enum):
     DRAFT = "draft"
     SUBMITTED = "submitted"
@@ -83,16 +91,48 @@ class AdmissionsAgent:
     status: str = "active"
     last_activity: Optional[datetime] = None
     evaluations_completed: int = 0
+    timeout_seconds: Optional[float] = None  # None: the dispatcher's agent_timeout
+
+@dataclass
+class EvaluationRun:
+    """Progress of the agents' concurrent evaluation of one application"""
+    application_id: str
+    agent_status: Dict[str, str]  # agent_id -> pending, completed, failed or timed_out
+    started_at: datetime
+    completed_at: Optional[datetime] = None
+    errors: Dict[str, str] = field(default_factory=dict)
+    done: threading.Event = field(default_factory=threading.Event, repr=False, compare=False)
+    
+    @property
+    def status(self) -> str:
+        if not self.done.is_set():
+            return "in_progress"
+        # Every agent that did not complete has an entry in errors
+        return "incomplete" if self.errors else "completed"
 
 class AdmissionsSystem:
     """Comprehensive admissions management system"""
     
-    def __init__(self, user_manager):
+    def __init__(self, user_manager, metrics: Optional[DashboardMetrics] = None,
+                 dispatcher: Optional[AgentDispatcher] = None, storage: Optional[StorageBackend] = None):
         self.user_manager = user_manager
-        self.applications: Dict[str, Application] = {}
-        self.evaluations: Dict[str, Evaluation] = {}
+        # Applications and evaluations live in the storage backend; share a SQLiteBackend between workers
+        self.storage = storage or MemoryBackend()
+        self.applications = self.storage.collection("admissions.applications", Application,
+                                                    hash_fields=("applicant_email", "status"),
+                                                    sorted_fields=("submitted_at",))
+        self.evaluations = self.storage.collection("admissions.evaluations", Evaluation,
+                                                   hash_fields=("application_id",))
         self.admissions_agents = self._initialize_admissions_agents()
         self.admission_criteria = self._initialize_admission_criteria()
+        # Dashboard aggregates, kept current by the events below; may be shared with the portal and workflows
+        self.metrics = metrics or DashboardMetrics()
+        # Agents evaluate submitted applications concurrently, in the background
+        self.dispatcher = dispatcher or AgentDispatcher()
+        self.evaluation_runs: Dict[str, EvaluationRun] = {}
+        self._evaluation_lock = threading.Lock()
+        if self.applications:
+            self.rebuild_metrics()
         
     def _initialize_admissions_agents(self) -> List[AdmissionsAgent]:
         """Initialize AI agents for admissions tasks"""
@@ -167,6 +207,7 @@ class AdmissionsSystem:
             }
         }
     
+    @transactional
     def create_application(self, applicant_email: str, application_data: Dict[str, Any]) -> Dict[str, Any]:
         """Create new application"""
         application_id = f"APP_{uuid.uuid4().hex[:8].upper()}"
@@ -188,6 +229,8 @@ class AdmissionsSystem:
         )
         
         self.applications[application_id] = application
+        self.metrics.publish("status_changed", scope=METRICS_SCOPE, key=application_id,
+                             old=None, new=application.status.value)
         
         return {
             "success": True,
@@ -195,6 +238,7 @@ class AdmissionsSystem:
             "message": "Application created successfully"
         }
     
+    @transactional
     def submit_application(self, application_id: str) -> Dict[str, Any]:
         """Submit application for review"""
         application = self.applications.get(application_id)
@@ -211,8 +255,11 @@ class AdmissionsSystem:
             }
         
         # Update application status
-        application.status = ApplicationStatus.SUBMITTED
+        self._set_status(application, ApplicationStatus.SUBMITTED)
         application.submitted_at = datetime.now()
+        self.applications.reindex(application_id)
+        self.metrics.publish("submitted", scope=METRICS_SCOPE, key=application_id,
+                             submitted_at=application.submitted_at)
         
         # Start automated evaluation
         self._initiate_automated_evaluation(application_id)
@@ -220,9 +267,37 @@ class AdmissionsSystem:
         return {
             "success": True,
             "message": "Application submitted successfully",
+            "evaluation_status": self.evaluation_runs[application_id].status,
             "next_steps": "Your application is now under review. You will be notified of the decision within 2-3 weeks."
         }
     
+    def _set_status(self, application: Application, status: ApplicationStatus):
+        """Change an application's status and count the transition"""
+        old = application.status
+        application.status = status
+        self.applications.reindex(application.application_id)
+        self.metrics.publish("status_changed", scope=METRICS_SCOPE, key=application.application_id,
+                             old=old.value, new=status.value)
+    
+    def _set_decision(self, application: Application, decision: Dict[str, Any]):
+        old = application.decision["decision"] if application.decision else None
+        application.decision = decision
+        self.metrics.publish("decision_made", scope=METRICS_SCOPE, key=application.application_id,
+                             old=old, new=decision["decision"] if decision else None)
+    
+    def rebuild_metrics(self):
+        """Recount the dashboard aggregates from the applications, e.g. after loading them from storage"""
+        self.metrics.reset(METRICS_SCOPE)
+        for application in self.applications.values():
+            self.metrics.publish("status_changed", scope=METRICS_SCOPE, key=application.application_id,
+                                 old=None, new=application.status.value)
+            if application.submitted_at:
+                self.metrics.publish("submitted", scope=METRICS_SCOPE, key=application.application_id,
+                                     submitted_at=application.submitted_at)
+            if application.decision:
+                self.metrics.publish("decision_made", scope=METRICS_SCOPE, key=application.application_id,
+                                     old=None, new=application.decision["decision"])
+    
     def _validate_application(self, application: Application) -> Dict[str, Any]:
         """Validate application completeness"""
         missing_fields = []
@@ -258,43 +333,111 @@ class AdmissionsSystem:
             "missing_fields": missing_fields
         }
     
-    def _initiate_automated_evaluation(self, application_id: str):
-        """Initiate automated evaluation using AI agents"""
+    def _initiate_automated_evaluation(self, application_id: str) -> EvaluationRun:
+        """Dispatch the agents that have not evaluated the application yet; returns without waiting for them"""
         application = self.applications[application_id]
         
         # Update status
-        application.status = ApplicationStatus.UNDER_REVIEW
-        
-        # Create evaluations for each agent
-        for agent in self.admissions_agents:
-            evaluation_id = f"EVAL_{uuid.uuid4().hex[:8].upper()}"
-            
-            # Generate evaluation based on agent specialization
-            if agent.specialization == "application_screening":
-                scores, recommendation, comments = self._evaluate_application_screening(application)
-            elif agent.specialization == "academic_assessment":
-                scores, recommendation, comments = self._evaluate_academic_record(application)
-            elif agent.specialization == "experience_evaluation":
-                scores, recommendation, comments = self._evaluate_experience(application)
-            elif agent.specialization == "diversity_assessment":
-                scores, recommendation, comments = self._evaluate_diversity_factors(application)
+        self._set_status(application, ApplicationStatus.UNDER_REVIEW)
+        
+        run = self.evaluation_runs.get(application_id)
+        if run and not run.done.is_set():
+            return run
+        
+        evaluated = {evaluation.evaluator_id for evaluation in self.evaluations.lookup("application_id", application_id)}
+        agents = {agent.agent_id: agent for agent in self.admissions_agents if agent.agent_id not in evaluated}
+        run = EvaluationRun(
+            application_id=application_id,
+            agent_status={agent_id: "pending" for agent_id in agents},
+            started_at=datetime.now()
+        )
+        self.evaluation_runs[application_id] = run
+        
+        self.dispatcher.dispatch(
+            {agent_id: partial(self._evaluate_with_agent, agent, application) for agent_id, agent in agents.items()},
+            on_result=partial(self._record_agent_result, run, agents),
+            timeouts={agent_id: agent.timeout_seconds for agent_id, agent in agents.items()},
+            on_done=partial(self._finish_evaluation, run)
+        )
+        return run
+    
+    def _evaluate_with_agent(self, agent: AdmissionsAgent, application: Application) -> Evaluation:
+        """One agent's evaluation of an application"""
+        evaluation_id = f"EVAL_{uuid.uuid4().hex[:8].upper()}"
+        
+        # Generate evaluation based on agent specialization
+        if agent.specialization == "application_screening":
+            scores, recommendation, comments = self._evaluate_application_screening(application)
+        elif agent.specialization == "academic_assessment":
+            scores, recommendation, comments = self._evaluate_academic_record(application)
+        elif agent.specialization == "experience_evaluation":
+            scores, recommendation, comments = self._evaluate_experience(application)
+        elif agent.specialization == "diversity_assessment":
+            scores, recommendation, comments = self._evaluate_diversity_factors(application)
+        else:
+            scores, recommendation, comments = self._evaluate_general(application)
+        
+        return Evaluation(
+            evaluation_id=evaluation_id,
+            application_id=application.application_id,
+            evaluator_id=agent.agent_id,
+            criteria_scores=scores,
+            overall_score=sum(scores.values()) / len(scores),
+            recommendation=recommendation,
+            comments=comments,
+            evaluated_at=datetime.now()
+        )
+    
+    def _record_agent_result(self, run: EvaluationRun, agents: Dict[str, AdmissionsAgent], agent_id: str,
+                             evaluation: Optional[Evaluation], error: Optional[BaseException]):
+        """Called by the dispatcher as each agent finishes, fails or times out"""
+        with self._evaluation_lock:
+            if error is None:
+                self.evaluations[evaluation.evaluation_id] = evaluation
+                agent = agents[agent_id]
+                agent.evaluations_completed += 1
+                agent.last_activity = datetime.now()
+                run.agent_status[agent_id] = "completed"
+            elif isinstance(error, TimeoutError):
+                run.agent_status[agent_id] = "timed_out"
+                run.errors[agent_id] = "Evaluation timed out"
             else:
-                scores, recommendation, comments = self._evaluate_general(application)
-            
-            evaluation = Evaluation(
-                evaluation_id=evaluation_id,
-                application_id=application_id,
-                evaluator_id=agent.agent_id,
-                criteria_scores=scores,
-                overall_score=sum(scores.values()) / len(scores),
-                recommendation=recommendation,
-                comments=comments,
-                evaluated_at=datetime.now()
-            )
-            
-            self.evaluations[evaluation_id] = evaluation
-            agent.evaluations_completed += 1
-            agent.last_activity = datetime.now()
+                run.agent_status[agent_id] = "failed"
+                run.errors[agent_id] = f"{type(error).__name__}: {error}"
+    
+    def _finish_evaluation(self, run: EvaluationRun, error: Optional[BaseException]):
+        """Mark the application evaluated once every agent has reported; incomplete runs stay under review"""
+        if error is not None:
+            run.errors["dispatcher"] = f"{type(error).__name__}: {error}"
+        run.completed_at = datetime.now()
+        with self.storage.unit_of_work():
+            application = self.applications.get(run.application_id)
+            if application and not run.errors and application.status == ApplicationStatus.UNDER_REVIEW:
+                self._set_status(application, ApplicationStatus.EVALUATION_COMPLETE)
+        run.done.set()
+    
+    def get_evaluation_status(self, application_id: str) -> Dict[str, Any]:
+        """Progress of the agents' evaluation of an application"""
+        run = self.evaluation_runs.get(application_id)
+        if not run:
+            return {"error": "No evaluation started for this application"}
+        
+        with self._evaluation_lock:
+            return {
+                "application_id": application_id,
+                "status": run.status,
+                "agents": dict(run.agent_status),
+                "errors": dict(run.errors),
+                "started_at": run.started_at.isoformat(),
+                "completed_at": run.completed_at.isoformat() if run.completed_at else None
+            }
+    
+    def wait_for_evaluation(self, application_id: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Block until the application's evaluation finishes (or timeout seconds pass); returns its status"""
+        run = self.evaluation_runs.get(application_id)
+        if run:
+            run.done.wait(timeout)
+        return self.get_evaluation_status(application_id)
     
     def _evaluate_application_screening(self, application: Application) -> tuple:
         """Evaluate application completeness and quality"""
@@ -458,10 +601,8 @@ class AdmissionsSystem:
             return {"error": "Application not found"}
         
         # Get evaluations for this application
-        app_evaluations = [
-            eval for eval in self.evaluations.values() 
-            if eval.application_id == application_id
-        ]
+        app_evaluations = self.evaluations.lookup("application_id", application_id)
+        run = self.evaluation_runs.get(application_id)
         
         return {
             "application_id": application_id,
@@ -469,11 +610,25 @@ class AdmissionsSystem:
             "created_at": application.created_at.isoformat(),
             "submitted_at": application.submitted_at.isoformat() if application.submitted_at else None,
             "evaluations_completed": len(app_evaluations),
+            "evaluation_status": run.status if run else None,
             "total_evaluators": len(self.admissions_agents),
             "decision": application.decision,
             "next_steps": self._get_next_steps(application.status)
         }
-    
+
+    def get_applications_by_email(self, applicant_email: str) -> List[Application]:
+        """Applications submitted under an email address"""
+        return self.applications.lookup("applicant_email", applicant_email)
+
+    def get_applications_by_status(self, status: ApplicationStatus) -> List[Application]:
+        """Applications currently in a status"""
+        return self.applications.lookup("status", status)
+
+    def get_submitted_applications(self, since: Optional[datetime] = None, until: Optional[datetime] = None,
+                                   limit: Optional[int] = None) -> List[Application]:
+        """Applications submitted in [since, until), newest first"""
+        return self.applications.range("submitted_at", since, until, reverse=True, limit=limit)
+
     def _get_next_steps(self, status: ApplicationStatus) -> str:
         """Get next steps based on application status"""
         next_steps_map = {
@@ -489,6 +644,7 @@ class AdmissionsSystem:
         }
         return next_steps_map.get(status, "Status update pending")
     
+    @transactional
     def make_admission_decision(self, application_id: str, decision_data: Dict[str, Any]) -> Dict[str, Any]:
         """Make final admission decision"""
         application = self.applications.get(application_id)
@@ -496,10 +652,7 @@ class AdmissionsSystem:
             return {"success": False, "error": "Application not found"}
         
         # Get all evaluations for this application
-        app_evaluations = [
-            eval for eval in self.evaluations.values() 
-            if eval.application_id == application_id
-        ]
+        app_evaluations = self.evaluations.lookup("application_id", application_id)
         
         if len(app_evaluations) < len(self.admissions_agents):
             return {"success": False, "error": "Not all evaluations completed"}
@@ -512,16 +665,16 @@ class AdmissionsSystem:
         # Make decision based on majority
         if accept_count > reject_count:
             final_decision = DecisionType.ACCEPT
-            application.status = ApplicationStatus.ACCEPTED
+            self._set_status(application, ApplicationStatus.ACCEPTED)
         elif reject_count > accept_count:
             final_decision = DecisionType.REJECT
-            application.status = ApplicationStatus.REJECTED
+            self._set_status(application, ApplicationStatus.REJECTED)
         else:
             final_decision = DecisionType.WAITLIST
-            application.status = ApplicationStatus.WAITLISTED
+            self._set_status(application, ApplicationStatus.WAITLISTED)
         
         # Store decision
-        application.decision = {
+        self._set_decision(application, {
             "decision": final_decision.value,
             "decision_date": datetime.now().isoformat(),
             "decision_maker": decision_data.get("decision_maker", "Admissions Committee"),
@@ -532,7 +685,7 @@ class AdmissionsSystem:
                 "reject_recommendations": reject_count,
                 "average_score": sum(eval.overall_score for eval in app_evaluations) / len(app_evaluations)
             }
-        }
+        })
         
         return {
             "success": True,
@@ -543,18 +696,18 @@ class AdmissionsSystem:
     
     def get_admissions_dashboard(self) -> Dict[str, Any]:
         """Get admissions dashboard data"""
+        # Aggregates come from metrics events, or from the indexes when other workers share the storage;
+        # nothing here scans the applications
         total_applications = len(self.applications)
-        submitted_applications = len([app for app in self.applications.values() if app.status != ApplicationStatus.DRAFT])
-        
-        status_counts = {}
-        for status in ApplicationStatus:
-            status_counts[status.value] = len([app for app in self.applications.values() if app.status == status])
+        status_counts = self._status_counts()
+        submitted_applications = total_applications - status_counts[ApplicationStatus.DRAFT.value]
         
-        recent_applications = sorted(
-            [app for app in self.applications.values() if app.submitted_at],
-            key=lambda x: x.submitted_at,
-            reverse=True
-        )[:10]
+        if self.storage.shared:
+            recent_applications = self.applications.range("submitted_at", reverse=True,
+                                                          limit=self.metrics.recent_limit)
+        else:
+            recent_applications = [self.applications[application_id]
+                                   for application_id in self.metrics.recent(METRICS_SCOPE)]
         
         return {
             "total_applications": total_applications,
@@ -575,29 +728,37 @@ class AdmissionsSystem:
                 "total_evaluations": sum(a.evaluations_completed for a in self.admissions_agents)
             },
             "admission_statistics": {
-                "acceptance_rate": self._calculate_acceptance_rate(),
+                "acceptance_rate": self._calculate_acceptance_rate(status_counts),
                 "average_evaluation_time": self._calculate_average_evaluation_time(),
-                "pending_decisions": len([app for app in self.applications.values() if app.status == ApplicationStatus.EVALUATION_COMPLETE])
+                "pending_decisions": status_counts[ApplicationStatus.EVALUATION_COMPLETE.value]
             }
         }
     
-    def _calculate_acceptance_rate(self) -> float:
+    def _status_counts(self) -> Dict[str, int]:
+        """Applications per status; counted in storage when other workers may have changed them"""
+        if self.storage.shared:
+            return {status.value: self.applications.count("status", status) for status in ApplicationStatus}
+        return self.metrics.counts(METRICS_SCOPE, "status", [status.value for status in ApplicationStatus])
+    
+    def _calculate_acceptance_rate(self, status_counts: Dict[str, int]) -> float:
         """Calculate acceptance rate"""
-        decided_applications = [app for app in self.applications.values() if app.decision]
-        if not decided_applications:
+        if self.storage.shared:
+            # Every decision sets its status (accept -> accepted, ...), so the status counts stand in for it
+            decided_statuses = (ApplicationStatus.ACCEPTED, ApplicationStatus.REJECTED, ApplicationStatus.WAITLISTED)
+            decided_count = sum(status_counts[status.value] for status in decided_statuses)
+            accepted_count = status_counts[ApplicationStatus.ACCEPTED.value]
+        else:
+            decided_count = self.metrics.total(METRICS_SCOPE, "decision")
+            accepted_count = self.metrics.counts(METRICS_SCOPE, "decision", ["accept"])["accept"]
+        if not decided_count:
             return 0.0
         
-        accepted_count = len([app for app in decided_applications if app.decision["decision"] == "accept"])
-        return (accepted_count / len(decided_applications)) * 100
+        return (accepted_count / decided_count) * 100
     
     def _calculate_average_evaluation_time(self) -> float:
         """Calculate average evaluation time"""
-        evaluations_with_time = [
-            eval for eval in self.evaluations.values() 
-            if eval.evaluated_at
-        ]
-        
-        if not evaluations_with_time:
+        # Every evaluation is created with evaluated_at set
+        if not self.evaluations:
             return 0.0
         
         # This would need application submission time to calculate properly
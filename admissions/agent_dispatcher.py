@@ -0,0 +1,121 @@
+"""
+MS AI Curriculum System - Agent Dispatcher
+Runs the admissions agents' evaluations of an application concurrently on a
+background event loop, each under its own timeout, so submitting an
+application does not wait for them
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+# on_result(name, result, error): error is None on success, TimeoutError when the evaluator ran out of time
+ResultCallback = Callable[[str, Any, Optional[BaseException]], None]
+# on_done(error): error is None unless the dispatch itself failed
+DoneCallback = Callable[[Optional[BaseException]], None]
+
+
+class AgentDispatcher:
+    """Concurrent fan-out of agent evaluators.
+
+    Plain functions run on a thread pool; coroutine functions (e.g. agents
+    calling an LLM) are awaited on the loop itself, so their latencies
+    overlap instead of adding up. A plain function's timeout starts when a
+    pool thread picks it up, not while it waits for one. An evaluator still
+    running at its timeout is reported as timed out and its result
+    discarded; a thread cannot be interrupted, so it finishes in the
+    background and keeps its thread until then. Callbacks run on worker
+    threads, never on the loop, so blocking storage work in them does not
+    stall other evaluators or their timers. The loop thread and the pool
+    start with the first dispatch.
+    """
+
+    def __init__(self, max_workers: int = 8, agent_timeout: float = 30.0):
+        self.max_workers = max_workers
+        self.agent_timeout = agent_timeout
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        # Free pool threads; a plain evaluator takes one before its timeout starts
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._lock = threading.Lock()
+
+    def _start(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix="admissions-agent")
+                self._loop = asyncio.new_event_loop()
+                self._slots = asyncio.Semaphore(self.max_workers)
+                self._thread = threading.Thread(target=self._loop.run_forever, name="admissions-dispatcher",
+                                                daemon=True)
+                self._thread.start()
+            return self._loop
+
+    def dispatch(self, evaluators: Dict[str, Callable[[], Any]], on_result: ResultCallback,
+                 timeouts: Optional[Dict[str, Optional[float]]] = None,
+                 on_done: Optional[DoneCallback] = None) -> Future:
+        """Start every evaluator and return immediately.
+
+        on_result is called as each evaluator finishes, fails or times out, and
+        on_done once all are reported; the returned future resolves after that.
+        timeouts overrides agent_timeout per evaluator name.
+        """
+        loop = self._start()
+        timeouts = timeouts or {}
+        return asyncio.run_coroutine_threadsafe(self._run_all([
+            self._run_one(name, evaluator, on_result, timeouts.get(name) or self.agent_timeout)
+            for name, evaluator in evaluators.items()
+        ], on_done), loop)
+
+    async def _run_all(self, runs, on_done: Optional[DoneCallback]):
+        error = None
+        try:
+            await asyncio.gather(*runs)
+        except Exception as e:
+            error = e
+        if on_done is not None:
+            await asyncio.to_thread(on_done, error)
+        if error is not None:
+            raise error
+
+    async def _run_one(self, name: str, evaluator: Callable[[], Any], on_result: ResultCallback, timeout: float):
+        if asyncio.iscoroutinefunction(evaluator):
+            pending = evaluator()
+        else:
+            await self._slots.acquire()
+            running = asyncio.get_running_loop().run_in_executor(self._executor, evaluator)
+            running.add_done_callback(self._release_slot)
+            # Shielded: a timeout must not mark the thread free while it is still running
+            pending = asyncio.shield(running)
+        try:
+            result = await asyncio.wait_for(pending, timeout)
+        except Exception as error:
+            await asyncio.to_thread(on_result, name, None, error)
+        else:
+            await asyncio.to_thread(on_result, name, result, None)
+
+    def _release_slot(self, running: asyncio.Future):
+        self._slots.release()
+        if not running.cancelled():
+            # Retrieve the error of an evaluator that failed after timing out, so it is not logged as unhandled
+            running.exception()
+
+    @staticmethod
+    async def _drain():
+        current = asyncio.current_task()
+        await asyncio.gather(*(task for task in asyncio.all_tasks() if task is not current), return_exceptions=True)
+
+    def close(self):
+        """Stop the loop thread and the pool, waiting for running evaluators"""
+        with self._lock:
+            loop, thread, executor = self._loop, self._thread, self._executor
+            self._loop = self._thread = self._executor = self._slots = None
+        if loop is None:
+            return
+        # Let dispatches finish reporting (each is bounded by its timeouts) before the loop stops
+        asyncio.run_coroutine_threadsafe(self._drain(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+        executor.shutdown(wait=True)
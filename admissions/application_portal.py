@@ -11,6 +11,11 @@ import json
 import uuid
 import random
 
+from admissions.dashboard_metrics import DashboardMetrics
+from storage_backend import MemoryBackend, StorageBackend, transactional
+
+METRICS_SCOPE = "portal"
+
 class ApplicationStatus(Enum):
     DRAFT = "draft"
     SUBMITTED = "submitted"
@@ -88,18 +93,26 @@ class ApplicationProgress:
 class ApplicationPortal:
     """Comprehensive application portal for MS AI program"""
     
-    def __init__(self, admissions_system=None, assistant_system=None):
+    def __init__(self, admissions_system=None, assistant_system=None, metrics: Optional[DashboardMetrics] = None,
+                 storage: Optional[StorageBackend] = None):
         self.admissions_system = admissions_system
         self.assistant_system = assistant_system
+        # Statistics aggregates, kept current by the events below
+        self.metrics = metrics or DashboardMetrics()
         
-        # Application data
-        self.application_forms: Dict[str, ApplicationForm] = {}
-        self.application_documents: Dict[str, List[ApplicationDocument]] = {}
-        self.application_progress: Dict[str, ApplicationProgress] = {}
+        # Application data, keyed by form ID, in the storage backend
+        self.storage = storage or MemoryBackend()
+        self.application_forms = self.storage.collection("portal.application_forms", ApplicationForm,
+                                                         hash_fields=("applicant_email", "status"))
+        self.application_documents = self.storage.collection("portal.application_documents",
+                                                             List[ApplicationDocument])
+        self.application_progress = self.storage.collection("portal.application_progress", ApplicationProgress)
         
         # Form templates and validation rules
         self.form_templates = self._initialize_form_templates()
         self.validation_rules = self._initialize_validation_rules()
+        if self.application_forms:
+            self.rebuild_metrics()
         
     def _initialize_form_templates(self) -> Dict[str, Dict[str, Any]]:
         """Initialize application form templates"""
@@ -215,16 +228,17 @@ class ApplicationPortal:
             }
         }
     
+    @transactional
     def start_application(self, applicant_email: str) -> Dict[str, Any]:
         """Start new application process"""
         
         # Check if application already exists
-        existing_applications = [app for app in self.application_forms.values() if app.applicant_email == applicant_email]
-        if existing_applications:
+        existing_application = self.application_forms.first("applicant_email", applicant_email)
+        if existing_application:
             return {
                 "success": False,
                 "error": "Application already exists for this email address",
-                "existing_application_id": existing_applications[0].form_id
+                "existing_application_id": existing_application.form_id
             }
         
         # Create new application form
@@ -256,6 +270,10 @@ class ApplicationPortal:
         )
         
         self.application_progress[form_id] = progress
+        self.metrics.publish("status_changed", scope=METRICS_SCOPE, key=form_id,
+                             old=None, new=application_form.status.value)
+        self.metrics.publish("observed", scope=METRICS_SCOPE, name="estimated_completion_time",
+                             value=progress.estimated_completion_time)
         
         return {
             "success": True,
@@ -293,6 +311,7 @@ class ApplicationPortal:
             "progress_percentage": application_form.progress_percentage
         }
     
+    @transactional
     def save_application_step(self, application_id: str, step: ApplicationStep, 
                             form_data: Dict[str, Any]) -> Dict[str, Any]:
         """Save application step data"""
@@ -404,6 +423,8 @@ class ApplicationPortal:
         # Add step to completed steps if not already there
         if completed_step not in application_form.completed_steps:
             application_form.completed_steps.append(completed_step)
+            self.metrics.publish("step_completed", scope=METRICS_SCOPE, key=application_id,
+                                 step=completed_step.value)
         
         # Calculate progress percentage
         total_steps = len(ApplicationStep)
@@ -444,6 +465,7 @@ class ApplicationPortal:
         
         return None
     
+    @transactional
     def upload_document(self, application_id: str, document_type: DocumentType, 
                       file_info: Dict[str, Any]) -> Dict[str, Any]:
         """Upload document to application"""
@@ -469,6 +491,8 @@ class ApplicationPortal:
         if application_id not in self.application_documents:
             self.application_documents[application_id] = []
         self.application_documents[application_id].append(document)
+        self.metrics.publish("document_uploaded", scope=METRICS_SCOPE, key=application_id,
+                             document_type=document_type.value)
         
         # Update application form
         application_form.last_updated = datetime.now()
@@ -551,6 +575,7 @@ class ApplicationPortal:
         
         return guidance
     
+    @transactional
     def submit_application(self, application_id: str) -> Dict[str, Any]:
         """Submit completed application"""
         
@@ -586,7 +611,10 @@ class ApplicationPortal:
             }
         
         # Update application status
+        self.metrics.publish("status_changed", scope=METRICS_SCOPE, key=application_id,
+                             old=application_form.status.value, new=ApplicationStatus.SUBMITTED.value)
         application_form.status = ApplicationStatus.SUBMITTED
+        self.application_forms.reindex(application_id)
         application_form.last_updated = datetime.now()
         
         # Submit to admissions system
@@ -636,7 +664,7 @@ class ApplicationPortal:
         """Get application dashboard for applicant"""
         
         # Find applications for this email
-        applications = [app for app in self.application_forms.values() if app.applicant_email == applicant_email]
+        applications = self.application_forms.lookup("applicant_email", applicant_email)
         
         if not applications:
             return {
@@ -669,6 +697,7 @@ class ApplicationPortal:
             "active_applications": len([app for app in applications if app.status == ApplicationStatus.DRAFT])
         }
     
+    @transactional
     def request_help(self, application_id: str, help_type: str, description: str) -> Dict[str, Any]:
         """Request help during application process"""
         
@@ -681,6 +710,7 @@ class ApplicationPortal:
         if progress:
             progress.help_requests += 1
             progress.last_activity = datetime.now()
+            self.metrics.publish("counted", scope=METRICS_SCOPE, name="help_requests")
         
         # Create help request
         help_request_id = f"HELP_{uuid.uuid4().hex[:8]}"
@@ -716,42 +746,56 @@ class ApplicationPortal:
     def get_application_statistics(self) -> Dict[str, Any]:
         """Get application portal statistics"""
         
+        if self.storage.shared:
+            # Other workers change the forms too: recount under the write lock so no update lands mid-count
+            with self.storage.unit_of_work():
+                self.rebuild_metrics()
+        
         total_applications = len(self.application_forms)
         
         # Status distribution
-        status_counts = {}
-        for status in ApplicationStatus:
-            status_counts[status.value] = len([app for app in self.application_forms.values() if app.status == status])
+        status_counts = self.metrics.counts(METRICS_SCOPE, "status", [status.value for status in ApplicationStatus])
         
         # Step completion statistics
+        step_counts = self.metrics.counts(METRICS_SCOPE, "steps_completed", [step.value for step in ApplicationStep])
         step_completion = {}
-        for step in ApplicationStep:
-            completed_count = len([app for app in self.application_forms.values() if step in app.completed_steps])
-            step_completion[step.value] = {
+        for step, completed_count in step_counts.items():
+            step_completion[step] = {
                 "completed": completed_count,
                 "completion_rate": (completed_count / total_applications * 100) if total_applications > 0 else 0
             }
         
         # Document upload statistics
-        total_documents = sum(len(docs) for docs in self.application_documents.values())
-        document_types = {}
-        for docs in self.application_documents.values():
-            for doc in docs:
-                doc_type = doc.document_type.value
-                document_types[doc_type] = document_types.get(doc_type, 0) + 1
+        document_types = self.metrics.counts(METRICS_SCOPE, "documents")
+        completion_time = self.metrics.distribution(METRICS_SCOPE, "estimated_completion_time")
         
         return {
             "total_applications": total_applications,
             "status_distribution": status_counts,
             "step_completion": step_completion,
             "document_statistics": {
-                "total_documents": total_documents,
+                "total_documents": sum(document_types.values()),
                 "document_types": document_types
             },
-            "average_completion_time": sum(
-                progress.estimated_completion_time for progress in self.application_progress.values()
-            ) / len(self.application_progress) if self.application_progress else 0,
-            "help_requests": sum(
-                progress.help_requests for progress in self.application_progress.values()
-            )
-        }
\ No newline at end of file
+            "average_completion_time": completion_time["mean"] if completion_time["count"] else 0,
+            "help_requests": self.metrics.total(METRICS_SCOPE, "help_requests")
+        }
+    
+    def rebuild_metrics(self):
+        """Recount the statistics aggregates from the forms, e.g. after loading them from storage"""
+        self.metrics.reset(METRICS_SCOPE)
+        for form_id, application_form in self.application_forms.items():
+            self.metrics.publish("status_changed", scope=METRICS_SCOPE, key=form_id,
+                                 old=None, new=application_form.status.value)
+            for step in application_form.completed_steps:
+                self.metrics.publish("step_completed", scope=METRICS_SCOPE, key=form_id, step=step.value)
+        for application_id, documents in self.application_documents.items():
+            for document in documents:
+                self.metrics.publish("document_uploaded", scope=METRICS_SCOPE, key=application_id,
+                                     document_type=document.document_type.value)
+        for progress in self.application_progress.values():
+            self.metrics.publish("observed", scope=METRICS_SCOPE, name="estimated_completion_time",
+                                 value=progress.estimated_completion_time)
+            if progress.help_requests:
+                self.metrics.publish("counted", scope=METRICS_SCOPE, name="help_requests",
+                                     amount=progress.help_requests)
\ No newline at end of file
@@ -0,0 +1,194 @@
+"""
+MS AI Curriculum System - Dashboard Metrics
+Event-driven counters, running distributions and a bounded recent-items
+heap behind the admissions, portal and workflow dashboards, so a dashboard
+refresh reads aggregates instead of rescanning every application
+"""
+
+import heapq
+import threading
+from collections import Counter, defaultdict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+EventSubscriber = Callable[[str, Dict[str, Any]], None]
+
+
+class Distribution:
+    """Count, sum, min and max of a multiset of values that supports removal.
+
+    Min and max come from two heaps with lazy deletion, so add, remove and
+    reads are O(log n) amortised.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self._live: Counter = Counter()
+        self._low: List[float] = []
+        self._high: List[float] = []
+
+    def add(self, value: float):
+        self.count += 1
+        self.total += value
+        self._live[value] += 1
+        heapq.heappush(self._low, value)
+        heapq.heappush(self._high, -value)
+
+    def remove(self, value: float):
+        if self._live[value] <= 0:
+            raise ValueError(f"{value!r} is not in the distribution")
+        self._live[value] -= 1
+        if not self._live[value]:
+            del self._live[value]
+        self.count -= 1
+        self.total -= value
+        if len(self._low) > 2 * len(self._live) + 32:
+            # Drop removed values once they make up most of the heaps
+            values = list(self._live.elements())
+            self._low = values
+            self._high = [-value for value in values]
+            heapq.heapify(self._low)
+            heapq.heapify(self._high)
+
+    def min(self) -> Optional[float]:
+        while self._low and self._low[0] not in self._live:
+            heapq.heappop(self._low)
+        return self._low[0] if self._low else None
+
+    def max(self) -> Optional[float]:
+        while self._high and -self._high[0] not in self._live:
+            heapq.heappop(self._high)
+        return -self._high[0] if self._high else None
+
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+
+class RecentItems:
+    """The `limit` keys with the newest timestamps; pushing a key again moves it"""
+
+    def __init__(self, limit: int = 10):
+        self.limit = limit
+        # Min-heap of (timestamp, key): the oldest kept item is evicted first
+        self._heap: List[Tuple[Any, str]] = []
+
+    def push(self, key: str, timestamp: Any):
+        for index, (_, existing) in enumerate(self._heap):
+            if existing == key:
+                self._heap[index] = self._heap[-1]
+                self._heap.pop()
+                heapq.heapify(self._heap)
+                break
+        if len(self._heap) < self.limit:
+            heapq.heappush(self._heap, (timestamp, key))
+        elif self._heap and timestamp > self._heap[0][0]:
+            heapq.heapreplace(self._heap, (timestamp, key))
+
+    def keys(self) -> List[str]:
+        """Keys, newest first"""
+        return [key for _, key in sorted(self._heap, reverse=True)]
+
+
+class DashboardMetrics:
+    """Aggregates for the admissions dashboards, updated by published events.
+
+    One instance can be shared by AdmissionsSystem, ApplicationPortal and
+    AdmissionWorkflowManager; each publishes under its own scope. Every
+    event is O(1) (O(log n) for distributions), and the readers return
+    copies, so dashboards never iterate over applications. Subscribers
+    receive each event after it is applied, e.g. to persist or stream it.
+    """
+
+    def __init__(self, recent_limit: int = 10):
+        self.recent_limit = recent_limit
+        self._lock = threading.Lock()
+        self._counters: Dict[Tuple[str, str], Counter] = defaultdict(Counter)
+        self._distributions: Dict[Tuple[str, str], Distribution] = defaultdict(Distribution)
+        self._recent: Dict[Tuple[str, str], RecentItems] = {}
+        self._subscribers: List[EventSubscriber] = []
+
+    def subscribe(self, subscriber: EventSubscriber):
+        self._subscribers.append(subscriber)
+
+    def publish(self, event: str, **data: Any):
+        """Apply an event (status_changed, step_completed, document_uploaded, decision_made, submitted, counted, observed)"""
+        handler = getattr(self, f"_on_{event}", None)
+        if handler is None:
+            raise ValueError(f"Unknown metrics event '{event}'")
+        with self._lock:
+            handler(**data)
+        for subscriber in self._subscribers:
+            subscriber(event, data)
+
+    def reset(self, scope: str):
+        """Forget everything published under scope, before rebuilding it"""
+        with self._lock:
+            for registry in (self._counters, self._distributions, self._recent):
+                for key in [key for key in registry if key[0] == scope]:
+                    del registry[key]
+
+    # Event handlers
+
+    def _on_status_changed(self, scope: str, key: str, old: Optional[str], new: Optional[str],
+                           field: str = "status"):
+        counter = self._counters[scope, field]
+        if old is not None:
+            counter[old] -= 1
+        if new is not None:
+            counter[new] += 1
+
+    def _on_step_completed(self, scope: str, key: str, step: str, amount: int = 1):
+        self._counters[scope, "steps_completed"][step] += amount
+
+    def _on_document_uploaded(self, scope: str, key: str, document_type: str):
+        self._counters[scope, "documents"][document_type] += 1
+
+    def _on_decision_made(self, scope: str, key: str, old: Optional[str], new: Optional[str],
+                          old_hours: Optional[float] = None, hours: Optional[float] = None):
+        self._on_status_changed(scope, key, old, new, field="decision")
+        distribution = self._distributions[scope, "decision_hours"]
+        if old_hours is not None:
+            distribution.remove(old_hours)
+        if hours is not None:
+            distribution.add(hours)
+
+    def _on_submitted(self, scope: str, key: str, submitted_at: Any):
+        recent = self._recent.get((scope, "submitted"))
+        if recent is None:
+            recent = self._recent[scope, "submitted"] = RecentItems(self.recent_limit)
+        recent.push(key, submitted_at)
+
+    def _on_counted(self, scope: str, name: str, key: str = "", amount: int = 1):
+        self._counters[scope, name][key] += amount
+
+    def _on_observed(self, scope: str, name: str, value: Optional[float] = None, previous: Optional[float] = None):
+        distribution = self._distributions[scope, name]
+        if previous is not None:
+            distribution.remove(previous)
+        if value is not None:
+            distribution.add(value)
+
+    # Snapshots
+
+    def counts(self, scope: str, name: str, keys: Optional[Iterable[str]] = None) -> Dict[str, int]:
+        """Counter values; with keys, exactly those keys (zero when never counted)"""
+        with self._lock:
+            counter = self._counters.get((scope, name), Counter())
+            if keys is None:
+                return {key: value for key, value in counter.items() if value}
+            return {key: counter.get(key, 0) for key in keys}
+
+    def total(self, scope: str, name: str) -> int:
+        with self._lock:
+            return sum(self._counters.get((scope, name), Counter()).values())
+
+    def distribution(self, scope: str, name: str) -> Dict[str, Any]:
+        with self._lock:
+            distribution = self._distributions.get((scope, name), Distribution())
+            return {"count": distribution.count, "total": distribution.total, "mean": distribution.mean(),
+                    "min": distribution.min(), "max": distribution.max()}
+
+    def recent(self, scope: str, name: str = "submitted") -> List[str]:
+        with self._lock:
+            recent = self._recent.get((scope, name))
+            return recent.keys() if recent else []
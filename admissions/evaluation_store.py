@@ -0,0 +1,441 @@
+"""
+MS AI Curriculum System - Evaluation Store
+Persistent, indexed evaluation results keyed by application and model
+version, with running aggregates, and a job runner that re-evaluates
+applications across a process pool and resumes after a crash
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from admissions.evaluation_system import AutomatedEvaluationSystem, EvaluationCriteria
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS evaluations (
+    application_id TEXT NOT NULL,
+    model_version TEXT NOT NULL,
+    evaluation_id TEXT NOT NULL,
+    overall_score REAL NOT NULL,
+    recommendation TEXT NOT NULL,
+    confidence_score REAL NOT NULL,
+    evaluation_time_minutes REAL NOT NULL,
+    evaluated_at TEXT NOT NULL,
+    stored_at TEXT NOT NULL,
+    report TEXT NOT NULL,
+    PRIMARY KEY (application_id, model_version)
+);
+CREATE INDEX IF NOT EXISTS idx_evaluations_evaluation_id ON evaluations(evaluation_id);
+CREATE INDEX IF NOT EXISTS idx_evaluations_version_stored_at ON evaluations(model_version, stored_at);
+CREATE INDEX IF NOT EXISTS idx_evaluations_version_score ON evaluations(model_version, overall_score);
+CREATE INDEX IF NOT EXISTS idx_evaluations_version_confidence ON evaluations(model_version, confidence_score);
+
+CREATE TABLE IF NOT EXISTS evaluation_aggregates (
+    model_version TEXT PRIMARY KEY,
+    total INTEGER NOT NULL DEFAULT 0,
+    score_sum REAL NOT NULL DEFAULT 0,
+    confidence_sum REAL NOT NULL DEFAULT 0,
+    time_sum REAL NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS recommendation_counts (
+    model_version TEXT NOT NULL,
+    recommendation TEXT NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (model_version, recommendation)
+);
+CREATE TABLE IF NOT EXISTS evaluation_jobs (
+    job_id TEXT PRIMARY KEY,
+    model_version TEXT NOT NULL,
+    status TEXT NOT NULL,
+    total INTEGER NOT NULL,
+    completed INTEGER NOT NULL DEFAULT 0,
+    failed INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS evaluation_job_failures (
+    job_id TEXT NOT NULL,
+    application_id TEXT NOT NULL,
+    error TEXT NOT NULL,
+    PRIMARY KEY (job_id, application_id)
+);
+
+-- Aggregates follow every write to evaluations, inside the same transaction. Rows are created with
+-- INSERT ... WHERE NOT EXISTS because OR IGNORE in a trigger yields to the outer upsert's conflict policy
+CREATE TRIGGER IF NOT EXISTS evaluations_after_insert AFTER INSERT ON evaluations BEGIN
+    INSERT INTO evaluation_aggregates (model_version) SELECT NEW.model_version
+        WHERE NOT EXISTS (SELECT 1 FROM evaluation_aggregates WHERE model_version = NEW.model_version);
+    UPDATE evaluation_aggregates
+        SET total = total + 1, score_sum = score_sum + NEW.overall_score,
+            confidence_sum = confidence_sum + NEW.confidence_score,
+            time_sum = time_sum + NEW.evaluation_time_minutes
+        WHERE model_version = NEW.model_version;
+    INSERT INTO recommendation_counts (model_version, recommendation) SELECT NEW.model_version, NEW.recommendation
+        WHERE NOT EXISTS (SELECT 1 FROM recommendation_counts
+                          WHERE model_version = NEW.model_version AND recommendation = NEW.recommendation);
+    UPDATE recommendation_counts SET count = count + 1
+        WHERE model_version = NEW.model_version AND recommendation = NEW.recommendation;
+END;
+CREATE TRIGGER IF NOT EXISTS evaluations_after_update AFTER UPDATE ON evaluations BEGIN
+    UPDATE evaluation_aggregates
+        SET score_sum = score_sum - OLD.overall_score + NEW.overall_score,
+            confidence_sum = confidence_sum - OLD.confidence_score + NEW.confidence_score,
+            time_sum = time_sum - OLD.evaluation_time_minutes + NEW.evaluation_time_minutes
+        WHERE model_version = NEW.model_version;
+    UPDATE recommendation_counts SET count = count - 1
+        WHERE model_version = OLD.model_version AND recommendation = OLD.recommendation;
+    INSERT INTO recommendation_counts (model_version, recommendation) SELECT NEW.model_version, NEW.recommendation
+        WHERE NOT EXISTS (SELECT 1 FROM recommendation_counts
+                          WHERE model_version = NEW.model_version AND recommendation = NEW.recommendation);
+    UPDATE recommendation_counts SET count = count + 1
+        WHERE model_version = NEW.model_version AND recommendation = NEW.recommendation;
+END;
+CREATE TRIGGER IF NOT EXISTS evaluations_after_delete AFTER DELETE ON evaluations BEGIN
+    UPDATE evaluation_aggregates
+        SET total = total - 1, score_sum = score_sum - OLD.overall_score,
+            confidence_sum = confidence_sum - OLD.confidence_score,
+            time_sum = time_sum - OLD.evaluation_time_minutes
+        WHERE model_version = OLD.model_version;
+    UPDATE recommendation_counts SET count = count - 1
+        WHERE model_version = OLD.model_version AND recommendation = OLD.recommendation;
+END;
+"""
+
+JOB_FIELDS = ("job_id", "model_version", "status", "total", "completed", "failed", "error", "created_at", "updated_at")
+
+ProgressCallback = Callable[[Dict[str, Any]], None]
+
+# (application_id, "ErrorType: message") for an application that could not be evaluated
+Failure = Tuple[str, str]
+
+
+class EvaluationStore:
+    """Thread-safe SQLite store of evaluation reports keyed by (application_id, model_version).
+
+    Reports are the dicts AutomatedEvaluationSystem.get_evaluation_report()
+    returns. Per-version totals and sums are kept up to date by triggers, so
+    statistics never scan the stored results.
+    """
+
+    def __init__(self, db_path: str = 'evaluations.db'):
+        self.db_path = db_path
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            if db_path != ':memory:':
+                self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            self._conn.executescript(SCHEMA)
+
+    # Evaluations
+
+    def save_many(self, model_version: str, reports: Iterable[Dict[str, Any]], job_id: Optional[str] = None) -> int:
+        """Insert or replace reports for model_version; with job_id, count them toward that job in the same transaction"""
+        stored_at = datetime.now().isoformat()
+        rows = [
+            (report["application_id"], model_version, report["evaluation_id"], report["overall_score"],
+             report["recommendation"], report["confidence_score"], report["evaluation_time_minutes"],
+             report["evaluated_at"], stored_at, json.dumps(report, default=str))
+            for report in reports
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO evaluations (application_id, model_version, evaluation_id, overall_score, recommendation, "
+                "confidence_score, evaluation_time_minutes, evaluated_at, stored_at, report) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(application_id, model_version) DO UPDATE SET "
+                "evaluation_id = excluded.evaluation_id, overall_score = excluded.overall_score, "
+                "recommendation = excluded.recommendation, confidence_score = excluded.confidence_score, "
+                "evaluation_time_minutes = excluded.evaluation_time_minutes, evaluated_at = excluded.evaluated_at, "
+                "stored_at = excluded.stored_at, report = excluded.report",
+                rows
+            )
+            if job_id is not None:
+                self._conn.execute(
+                    "UPDATE evaluation_jobs SET completed = completed + ?, updated_at = ? WHERE job_id = ?",
+                    (len(rows), stored_at, job_id)
+                )
+        return len(rows)
+
+    def save(self, model_version: str, report: Dict[str, Any]):
+        """Insert or replace a single report"""
+        self.save_many(model_version, [report])
+
+    def get(self, application_id: str, model_version: str) -> Optional[Dict[str, Any]]:
+        """Stored report for an application under a model version"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT report FROM evaluations WHERE application_id = ? AND model_version = ?",
+                (application_id, model_version)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def get_by_evaluation_id(self, evaluation_id: str) -> Optional[Dict[str, Any]]:
+        """Most recently stored report with this evaluation ID"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT report FROM evaluations WHERE evaluation_id = ? ORDER BY stored_at DESC LIMIT 1",
+                (evaluation_id,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def evaluated_ids(self, model_version: str, since: Optional[str] = None) -> Set[str]:
+        """Applications with a stored result for model_version, optionally only those stored at or after since"""
+        sql = "SELECT application_id FROM evaluations WHERE model_version = ?"
+        params: List[Any] = [model_version]
+        if since is not None:
+            sql += " AND stored_at >= ?"
+            params.append(since)
+        with self._lock:
+            return {row[0] for row in self._conn.execute(sql, params)}
+
+    def count(self, model_version: str) -> int:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT total FROM evaluation_aggregates WHERE model_version = ?", (model_version,)
+            ).fetchone()
+        return row[0] if row else 0
+
+    def get_statistics(self, model_version: str) -> Dict[str, Any]:
+        """get_evaluation_statistics() figures for model_version, from the aggregates and the score indexes"""
+        with self._lock:
+            aggregates = self._conn.execute(
+                "SELECT total, score_sum, confidence_sum, time_sum FROM evaluation_aggregates WHERE model_version = ?",
+                (model_version,)
+            ).fetchone()
+            if not aggregates or not aggregates[0]:
+                return {"total_evaluations": 0}
+            recommendations = self._conn.execute(
+                "SELECT recommendation, count FROM recommendation_counts WHERE model_version = ? AND count > 0",
+                (model_version,)
+            ).fetchall()
+            # A lone MIN or MAX over a (model_version, column) index is a single index lookup; SQLite
+            # only applies that optimization when the aggregate is the only one in its query
+            min_score, max_score, min_confidence, max_confidence = [
+                self._conn.execute(f"SELECT {aggregate}({column}) FROM evaluations WHERE model_version = ?",
+                                   (model_version,)).fetchone()[0]
+                for column in ("overall_score", "confidence_score") for aggregate in ("MIN", "MAX")
+            ]
+
+        total, score_sum, confidence_sum, time_sum = aggregates
+        return {
+            "total_evaluations": total,
+            "recommendation_distribution": dict(recommendations),
+            "score_statistics": {
+                "average_score": score_sum / total,
+                "min_score": min_score,
+                "max_score": max_score
+            },
+            "confidence_statistics": {
+                "average_confidence": confidence_sum / total,
+                "min_confidence": min_confidence,
+                "max_confidence": max_confidence
+            },
+            "performance_metrics": {
+                "average_evaluation_time_minutes": time_sum / total,
+                "total_evaluation_time_hours": time_sum / 60
+            }
+        }
+
+    # Jobs
+
+    def start_job(self, job_id: str, model_version: str, total: int) -> Dict[str, Any]:
+        """Create a job, or reopen an existing one with the same ID to resume it; its recorded failures are cleared"""
+        now = datetime.now().isoformat()
+        with self._lock, self._conn:
+            existing = self._conn.execute(
+                "SELECT model_version FROM evaluation_jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+            if existing and existing[0] != model_version:
+                raise ValueError(f"Job {job_id} was started for model version {existing[0]}, not {model_version}")
+            self._conn.execute(
+                "INSERT INTO evaluation_jobs (job_id, model_version, status, total, created_at, updated_at) "
+                "VALUES (?, ?, 'running', ?, ?, ?) "
+                "ON CONFLICT(job_id) DO UPDATE SET status = 'running', total = excluded.total, "
+                "updated_at = excluded.updated_at",
+                (job_id, model_version, total, now, now)
+            )
+            self._conn.execute("DELETE FROM evaluation_job_failures WHERE job_id = ?", (job_id,))
+        return self.get_job(job_id)
+
+    def update_job(self, job_id: str, **fields: Any) -> Dict[str, Any]:
+        """Set job fields (status, completed, failed, error) and return the job"""
+        unknown = set(fields) - {"status", "completed", "failed", "error"}
+        if unknown:
+            raise ValueError(f"Cannot update job fields {sorted(unknown)}")
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"UPDATE evaluation_jobs SET {assignments}, updated_at = ? WHERE job_id = ?",
+                (*fields.values(), datetime.now().isoformat(), job_id)
+            )
+        return self.get_job(job_id)
+
+    def record_failures(self, job_id: str, failures: List[Failure]) -> Dict[str, Any]:
+        """Record applications that could not be evaluated, with their errors; the job keeps the first error"""
+        now = datetime.now().isoformat()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO evaluation_job_failures (job_id, application_id, error) VALUES (?, ?, ?) "
+                "ON CONFLICT(job_id, application_id) DO UPDATE SET error = excluded.error",
+                [(job_id, application_id, error) for application_id, error in failures]
+            )
+            self._conn.execute(
+                "UPDATE evaluation_jobs SET failed = failed + ?, error = COALESCE(error, ?), updated_at = ? "
+                "WHERE job_id = ?",
+                (len(failures), failures[0][1] if failures else None, now, job_id)
+            )
+        return self.get_job(job_id)
+
+    def get_job_failures(self, job_id: str) -> Dict[str, str]:
+        """application_id -> error for the applications the job could not evaluate"""
+        with self._lock:
+            return dict(self._conn.execute(
+                "SELECT application_id, error FROM evaluation_job_failures WHERE job_id = ? ORDER BY application_id",
+                (job_id,)
+            ))
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Job progress; readable from another process while the job runs"""
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(JOB_FIELDS)} FROM evaluation_jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        return dict(zip(JOB_FIELDS, row)) if row else None
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def _build_system(criteria: List[EvaluationCriteria], weights: Dict[str, float]) -> AutomatedEvaluationSystem:
+    system = AutomatedEvaluationSystem()
+    system.evaluation_criteria = criteria
+    system.criteria_weights = weights
+    return system
+
+
+def _evaluate_with(system: AutomatedEvaluationSystem,
+                   shard: List[Tuple[str, Dict[str, Any]]]) -> Tuple[List[Dict[str, Any]], List[Failure]]:
+    """Reports for one shard and the applications that failed; the system's in-memory results are dropped afterwards.
+
+    If the batch raises, the shard is evaluated one application at a time so
+    that only the applications that cannot be evaluated fail.
+    """
+    failures: List[Failure] = []
+    try:
+        results = system.evaluate_batch(shard)
+    except Exception:
+        results = []
+        for application_id, application_data in shard:
+            try:
+                results.append(system.evaluate_application(application_id, application_data))
+            except Exception as e:
+                failures.append((application_id, f"{type(e).__name__}: {e}"))
+    reports = [system.get_evaluation_report(result["evaluation_id"]) for result in results]
+    system.evaluation_results.clear()
+    return reports, failures
+
+
+_worker_system: Optional[AutomatedEvaluationSystem] = None
+
+
+def _init_worker(criteria: List[EvaluationCriteria], weights: Dict[str, float]):
+    global _worker_system
+    _worker_system = _build_system(criteria, weights)
+
+
+def _evaluate_in_worker(shard: List[Tuple[str, Dict[str, Any]]]) -> Tuple[List[Dict[str, Any]], List[Failure]]:
+    return _evaluate_with(_worker_system, shard)
+
+
+class EvaluationJobRunner:
+    """Re-evaluates applications in shards across a process pool, streaming results into an EvaluationStore.
+
+    Each shard's reports are committed together with the job's progress, so a
+    job that is interrupted resumes, when run again with the same job_id, by
+    skipping applications already stored for the model version. Progress is
+    passed to the callback after every shard and can be polled from another
+    process with EvaluationStore.get_job(). Applications that cannot be
+    evaluated are recorded with their errors (EvaluationStore.get_job_failures())
+    without failing the rest of their shard, and are retried by the next run.
+    """
+
+    def __init__(self, store: EvaluationStore, system: Optional[AutomatedEvaluationSystem] = None,
+                 max_workers: Optional[int] = None, shard_size: int = 500,
+                 progress: Optional[ProgressCallback] = None):
+        self.store = store
+        self.system = system or AutomatedEvaluationSystem()
+        self.max_workers = max_workers if max_workers is not None else (os.cpu_count() or 1)
+        self.shard_size = shard_size
+        self.progress = progress
+
+    def run(self, applications, job_id: Optional[str] = None, force: bool = False) -> Dict[str, Any]:
+        """Evaluate every application not yet stored for the current model version; returns the finished job.
+
+        applications maps application_id to application data (or is an iterable
+        of pairs). With force, results stored before this job started are
+        re-evaluated too.
+        """
+        items = list(applications.items() if isinstance(applications, dict) else applications)
+        model_version = self.system.get_model_version()
+        job_id = job_id or f"JOB_{uuid.uuid4().hex[:8]}"
+        job = self.store.start_job(job_id, model_version, len(items))
+
+        done = self.store.evaluated_ids(model_version, since=job["created_at"] if force else None)
+        pending = [item for item in items if item[0] not in done]
+        job = self.store.update_job(job_id, completed=len(items) - len(pending), failed=0, error=None)
+        self._report(job)
+
+        shards = [pending[i:i + self.shard_size] for i in range(0, len(pending), self.shard_size)]
+        config = (self.system.evaluation_criteria, dict(self.system.criteria_weights))
+        if self.max_workers <= 1 or len(shards) <= 1:
+            system = _build_system(*config)
+            for shard in shards:
+                self._collect(job_id, model_version, shard, lambda: _evaluate_with(system, shard))
+        else:
+            self._run_pool(job_id, model_version, shards, config)
+
+        job = self.store.get_job(job_id)
+        return self.store.update_job(job_id, status="failed" if job["failed"] else "completed")
+
+    def _run_pool(self, job_id: str, model_version: str, shards: List[List[Tuple[str, Dict[str, Any]]]], config: tuple):
+        workers = min(self.max_workers, len(shards))
+        remaining = iter(shards)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=config) as pool:
+            # Keep a couple of shards per worker in flight so results stream instead of piling up
+            in_flight = {}
+            for shard in remaining:
+                in_flight[pool.submit(_evaluate_in_worker, shard)] = shard
+                if len(in_flight) >= 2 * workers:
+                    break
+            while in_flight:
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    shard = in_flight.pop(future)
+                    self._collect(job_id, model_version, shard, future.result)
+                    next_shard = next(remaining, None)
+                    if next_shard is not None:
+                        in_flight[pool.submit(_evaluate_in_worker, next_shard)] = next_shard
+
+    def _collect(self, job_id: str, model_version: str, shard: List[Tuple[str, Dict[str, Any]]],
+                 evaluate: Callable[[], Tuple[List[Dict[str, Any]], List[Failure]]]):
+        # Failed applications stay unstored, so running the job again retries them
+        try:
+            reports, failures = evaluate()
+        except Exception as e:
+            # The worker itself failed (e.g. the process died), so no application of the shard was evaluated
+            reports, failures = [], [(application_id, f"{type(e).__name__}: {e}") for application_id, _ in shard]
+        self.store.save_many(model_version, reports, job_id=job_id)
+        job = self.store.record_failures(job_id, failures) if failures else self.store.get_job(job_id)
+        self._report(job)
+
+    def _report(self, job: Dict[str, Any]):
+        if self.progress is not None:
+            self.progress(job)
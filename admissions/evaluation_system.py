@@ -8,10 +8,73 @@ from typing import List, Dict, Optional, Any, Tuple
 from enum import Enum
 from datetime import datetime, timedelta
 import json
+import os
 import uuid
 import random
 import re
+import sys
 from collections import Counter
+import hashlib
+import numbers
+
+import numpy as np
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    PYARROW_AVAILABLE = True
+except ImportError:
+    pa = None
+    pc = None
+    PYARROW_AVAILABLE = False
+
+# Keyword sets the criteria look for in lowercased application text (substring matches)
+KEYWORD_SETS = {
+    "institution": ["university", "college", "institute"],
+    "relevant_major": ["computer science", "engineering", "mathematics", "statistics", "physics"],
+    "python": ["python"],
+    "java": ["java", "javascript"],
+    "c_family": ["c++", "c#"],
+    "r_language": ["r"],
+    "ml_methods": ["machine learning", "deep learning", "neural network"],
+    "ml_frameworks": ["tensorflow", "pytorch", "scikit-learn"],
+    "data_science": ["data science", "analytics", "statistics"],
+    "cs_fundamentals": ["algorithm", "data structure", "software development"],
+    "databases": ["database", "sql", "nosql"],
+    "publications": ["publication", "paper", "journal", "conference"],
+    "research": ["research", "study", "investigation"],
+    "thesis": ["thesis", "dissertation", "capstone"],
+    "ai_relevance": ["machine learning", "ai", "artificial intelligence"],
+    "data_relevance": ["data", "analytics", "algorithm"],
+    "technical_role": ["engineer", "developer", "scientist", "analyst"],
+    "motivation": ["passion", "interest", "excited", "motivated"],
+    "motivation_ai": ["ai", "artificial intelligence", "machine learning"],
+    "career": ["career", "future", "goal", "aspire"],
+    "career_path": ["research", "industry", "academia", "leadership"],
+    "research_intent": ["research", "study", "investigate", "explore"],
+    "contribution": ["contribute", "bring", "offer", "add"]
+}
+
+# Each diversity keyword found adds a point
+DIVERSITY_KEYWORDS = [
+    "international", "immigrant", "first generation", "underrepresented",
+    "diverse", "multicultural", "global", "different perspective"
+]
+DIVERSITY_CONTRIBUTION_KEYWORDS = [
+    "bring unique perspective", "diverse experience", "different background",
+    "cultural", "international experience", "multilingual"
+]
+
+CRITERIA_WEIGHTS = {
+    "CRIT_001": 0.25,  # Academic Excellence
+    "CRIT_002": 0.25,  # Technical Competency
+    "CRIT_003": 0.20,  # Research Potential
+    "CRIT_004": 0.15,  # Professional Experience
+    "CRIT_005": 0.10,  # Personal Statement Quality
+    "CRIT_006": 0.05   # Diversity Contribution
+}
+
+REQUIRED_SECTIONS = ["personal_info", "academic_background", "work_experience", "technical_skills", "personal_statement"]
 
 class EvaluationCriteria(Enum):
     ACADEMIC_EXCELLENCE = "academic_excellence"
@@ -77,20 +140,156 @@ class EvaluationModel:
     evaluation_criteria: List[str]
     performance_metrics: Dict[str, float]
 
+# Lowercased text columns evaluate_batch extracts, and the keyword sets matched against each
+DIVERSITY_SETS = {f"diversity:{keyword}": [keyword] for keyword in DIVERSITY_KEYWORDS + DIVERSITY_CONTRIBUTION_KEYWORDS}
+BATCH_TEXT_SETS = {
+    "institution": ["institution"],
+    "major": ["relevant_major"],
+    "programming_languages": ["python", "java", "c_family", "r_language"],
+    "technical_skills": ["cs_fundamentals", "databases"],
+    "ai_ml_experience": ["ml_methods", "ml_frameworks", "data_science", "ai_relevance", "data_relevance"],
+    "current_position": ["technical_role"],
+    "research_experience": ["publications", "research", "thesis"],
+    "motivation": ["motivation", "motivation_ai"],
+    "career_goals": ["career", "career_path"],
+    "research_interests": ["research_intent"],
+    "contribution": ["contribution"],
+    "diversity_text": list(DIVERSITY_SETS)
+}
+
+class KeywordMatcher:
+    """Keyword sets compiled once and matched against whole columns of text.
+    
+    With pyarrow, each set is one alternation that RE2 runs as a DFA (the
+    Aho-Corasick automaton for those keywords), so a text is scanned once
+    per set instead of once per keyword. Repeated texts are matched once.
+    """
+    
+    def __init__(self, keyword_sets: Dict[str, List[str]]):
+        self.keyword_sets = {name: list(keywords) for name, keywords in keyword_sets.items()}
+        self.patterns = {name: "|".join(re.escape(keyword) for keyword in keywords)
+                         for name, keywords in self.keyword_sets.items()}
+    
+    def match(self, texts: List[str], names: List[str]) -> Dict[str, np.ndarray]:
+        """For each named set, whether texts[i] contains any of its keywords"""
+        if PYARROW_AVAILABLE and texts:
+            encoded = pa.array(texts, type=pa.large_string()).dictionary_encode()
+            index = encoded.indices.to_numpy(zero_copy_only=False)
+            column = encoded.dictionary
+            unique = None
+        else:
+            positions: Dict[str, int] = {}
+            index = np.fromiter((positions.setdefault(text, len(positions)) for text in texts),
+                                dtype=np.int64, count=len(texts))
+            column = None
+            unique = list(positions)
+        
+        matches = {}
+        for name in names:
+            keywords = self.keyword_sets[name]
+            if column is not None:
+                hits = (pc.match_substring_regex(column, self.patterns[name]).to_numpy(zero_copy_only=False)
+                        if keywords else np.zeros(len(column), dtype=bool))
+            else:
+                hits = np.fromiter((any(keyword in text for keyword in keywords) for text in unique),
+                                   dtype=bool, count=len(unique))
+            matches[name] = hits[index]
+        return matches
+
+def _branch(*conditions: np.ndarray) -> np.ndarray:
+    """Index of the first true condition per element (len(conditions) when none is), like an if/elif/else"""
+    return np.select(conditions, range(len(conditions)), len(conditions))
+
+def _numeric_column(values: List[Any], name: str) -> np.ndarray:
+    """Float array of a numeric field; anything but a number raises TypeError, as the scalar comparisons do"""
+    for value in values:
+        if not isinstance(value, numbers.Real):
+            raise TypeError(f"{name} must be a number, not {type(value).__name__} ({value!r})")
+    return np.array(values, dtype=float)
+
+def _builtin_sum(columns: List[np.ndarray]) -> np.ndarray:
+    """Element-wise sum() of the columns, rounded the way the builtin rounds floats"""
+    total = np.zeros(len(columns[0]))
+    if sys.version_info < (3, 12):
+        for column in columns:
+            total = total + column
+        return total
+    
+    # Python 3.12+ sums floats with Neumaier compensation
+    compensation = np.zeros_like(total)
+    for column in columns:
+        running = total + column
+        compensation += np.where(np.abs(total) >= np.abs(column), (total - running) + column, (column - running) + total)
+        total = running
+    return np.where((compensation != 0) & np.isfinite(compensation), total + compensation, total)
+
+def _python_squares(values: np.ndarray) -> np.ndarray:
+    """values ** 2 as Python floats compute it (libm pow), evaluated once per distinct value"""
+    distinct, inverse = np.unique(values.ravel(), return_inverse=True)
+    squares = np.array([value ** 2 for value in distinct.tolist()], dtype=float)
+    return squares[inverse.ravel()].reshape(values.shape)
+
+def _format_rows(template: str, *columns: np.ndarray) -> List[str]:
+    """template.format(*row) for each row of the columns, formatted once per distinct row"""
+    key = np.zeros(len(columns[0]), dtype=np.int64)
+    for column in columns:
+        distinct, inverse = np.unique(column, return_inverse=True)
+        key = np.unique(key * len(distinct) + inverse.ravel(), return_inverse=True)[1].ravel()
+    rows = np.stack(columns, axis=1).tolist()
+    first = {}
+    for i, row_key in enumerate(key.tolist()):
+        first.setdefault(row_key, i)
+    formatted = {row_key: template.format(*rows[i]) for row_key, i in first.items()}
+    return [formatted[row_key] for row_key in key.tolist()]
+
+def _assemble_feedback(rules: List[Tuple[np.ndarray, List[Tuple[Optional[str], Optional[str], Optional[str]]]]],
+                       count: int) -> Tuple[List[List[str]], List[List[str]], List[List[str]]]:
+    """Per-application strengths, weaknesses and suggestions from each rule's chosen branch.
+    
+    Each rule is (branch index per application, [(strength, weakness, suggestion) per branch]);
+    the lists are built once per distinct combination of branches.
+    """
+    if not rules:
+        return [[] for _ in range(count)], [[] for _ in range(count)], [[] for _ in range(count)]
+    
+    # One key per combination of branches: mixed-radix over the rules
+    key = np.zeros(count, dtype=np.int64)
+    for branch, branches in rules:
+        key = key * len(branches) + branch
+    combinations, inverse = np.unique(key, return_inverse=True)
+    assembled = []
+    for combination in combinations.tolist():
+        chosen = []
+        for _, branches in reversed(rules):
+            combination, branch = divmod(combination, len(branches))
+            chosen.append(branch)
+        lists = ([], [], [])
+        for branch, (_, branches) in zip(reversed(chosen), rules):
+            for items, text in zip(lists, branches[branch]):
+                if text:
+                    items.append(text)
+        assembled.append(lists)
+    
+    rows = [assembled[i] for i in inverse.ravel().tolist()]
+    return ([list(row[0]) for row in rows], [list(row[1]) for row in rows], [list(row[2]) for row in rows])
+
 class AutomatedEvaluationSystem:
     """Advanced AI-powered application evaluation system"""
     
-    def __init__(self, admissions_system=None, professor_system=None):
+    def __init__(self, admissions_system=None, professor_system=None, evaluation_store=None):
         self.admissions_system = admissions_system
         self.professor_system = professor_system
         
-        # Evaluation data
+        # Evaluation data; with an EvaluationStore, results also persist across restarts
         self.evaluation_results: Dict[str, EvaluationResult] = {}
+        self.evaluation_store = evaluation_store
         self.evaluation_criteria = self._initialize_evaluation_criteria()
         self.evaluation_models = self._initialize_evaluation_models()
         
         # Scoring algorithms
         self.scoring_algorithms = self._initialize_scoring_algorithms()
+        self.criteria_weights = dict(CRITERIA_WEIGHTS)
+        self.keyword_matcher = KeywordMatcher({**KEYWORD_SETS, **DIVERSITY_SETS})
         
     def _initialize_evaluation_criteria(self) -> List[EvaluationCriteria]:
         """Initialize evaluation criteria for MS AI program"""
@@ -373,6 +572,8 @@ class AutomatedEvaluationSystem:
         
         # Store evaluation result
         self.evaluation_results[evaluation_id] = evaluation_result
+        if self.evaluation_store is not None:
+            self.evaluation_store.save(self.get_model_version(), self._evaluation_report(evaluation_result))
         
         return {
             "success": True,
@@ -442,13 +643,12 @@ class AutomatedEvaluationSystem:
         
         # Institution bonus
         institution_bonus = 0.0
-        if any(keyword in institution.lower() for keyword in ["university", "college", "institute"]):
+        if any(keyword in institution.lower() for keyword in KEYWORD_SETS["institution"]):
             institution_bonus = 2.0
         
         # Major relevance bonus
         major_bonus = 0.0
-        relevant_majors = ["computer science", "engineering", "mathematics", "statistics", "physics"]
-        if any(keyword in major.lower() for keyword in relevant_majors):
+        if any(keyword in major.lower() for keyword in KEYWORD_SETS["relevant_major"]):
             major_bonus = 3.0
         
         total_score = min(25.0, gpa_score + institution_bonus + major_bonus)
@@ -494,33 +694,33 @@ class AutomatedEvaluationSystem:
         prog_score = 0.0
         if programming_languages:
             languages = programming_languages.lower()
-            if "python" in languages:
+            if any(keyword in languages for keyword in KEYWORD_SETS["python"]):
                 prog_score += 8.0
-            if "java" in languages or "javascript" in languages:
+            if any(keyword in languages for keyword in KEYWORD_SETS["java"]):
                 prog_score += 4.0
-            if "c++" in languages or "c#" in languages:
+            if any(keyword in languages for keyword in KEYWORD_SETS["c_family"]):
                 prog_score += 3.0
-            if "r" in languages:
+            if any(keyword in languages for keyword in KEYWORD_SETS["r_language"]):
                 prog_score += 2.0
         
         # AI/ML experience score
         ai_score = 0.0
         if ai_ml_experience:
             experience = ai_ml_experience.lower()
-            if any(keyword in experience for keyword in ["machine learning", "deep learning", "neural network"]):
+            if any(keyword in experience for keyword in KEYWORD_SETS["ml_methods"]):
                 ai_score += 10.0
-            if any(keyword in experience for keyword in ["tensorflow", "pytorch", "scikit-learn"]):
+            if any(keyword in experience for keyword in KEYWORD_SETS["ml_frameworks"]):
                 ai_score += 5.0
-            if any(keyword in experience for keyword in ["data science", "analytics", "statistics"]):
+            if any(keyword in experience for keyword in KEYWORD_SETS["data_science"]):
                 ai_score += 3.0
         
         # Technical skills score
         tech_score = 0.0
         if technical_skills:
             skills = technical_skills.lower()
-            if any(keyword in skills for keyword in ["algorithm", "data structure", "software development"]):
+            if any(keyword in skills for keyword in KEYWORD_SETS["cs_fundamentals"]):
                 tech_score += 5.0
-            if any(keyword in skills for keyword in ["database", "sql", "nosql"]):
+            if any(keyword in skills for keyword in KEYWORD_SETS["databases"]):
                 tech_score += 2.0
         
         # Projects score
@@ -579,11 +779,11 @@ class AutomatedEvaluationSystem:
         research_score = 0.0
         if research_experience:
             experience = research_experience.lower()
-            if any(keyword in experience for keyword in ["publication", "paper", "journal", "conference"]):
+            if any(keyword in experience for keyword in KEYWORD_SETS["publications"]):
                 research_score += 15.0
-            if any(keyword in experience for keyword in ["research", "study", "investigation"]):
+            if any(keyword in experience for keyword in KEYWORD_SETS["research"]):
                 research_score += 10.0
-            if any(keyword in experience for keyword in ["thesis", "dissertation", "capstone"]):
+            if any(keyword in experience for keyword in KEYWORD_SETS["thesis"]):
                 research_score += 8.0
         
         # Academic honors score
@@ -655,16 +855,16 @@ class AutomatedEvaluationSystem:
         relevance_score = 0.0
         if ai_ml_experience:
             experience = ai_ml_experience.lower()
-            if any(keyword in experience for keyword in ["machine learning", "ai", "artificial intelligence"]):
+            if any(keyword in experience for keyword in KEYWORD_SETS["ai_relevance"]):
                 relevance_score += 5.0
-            if any(keyword in experience for keyword in ["data", "analytics", "algorithm"]):
+            if any(keyword in experience for keyword in KEYWORD_SETS["data_relevance"]):
                 relevance_score += 3.0
         
         # Position relevance score
         position_score = 0.0
         if current_position:
             position = current_position.lower()
-            if any(keyword in position for keyword in ["engineer", "developer", "scientist", "analyst"]):
+            if any(keyword in position for keyword in KEYWORD_SETS["technical_role"]):
                 position_score += 2.0
         
         # Projects score
@@ -718,32 +918,32 @@ class AutomatedEvaluationSystem:
         motivation_score = 0.0
         if len(motivation) >= 200:
             motivation_score += 1.0
-        if any(keyword in motivation.lower() for keyword in ["passion", "interest", "excited", "motivated"]):
+        if any(keyword in motivation.lower() for keyword in KEYWORD_SETS["motivation"]):
             motivation_score += 1.0
-        if any(keyword in motivation.lower() for keyword in ["ai", "artificial intelligence", "machine learning"]):
+        if any(keyword in motivation.lower() for keyword in KEYWORD_SETS["motivation_ai"]):
             motivation_score += 1.0
         
         # Career goals score (0-3 points)
         goals_score = 0.0
         if len(career_goals) >= 150:
             goals_score += 1.0
-        if any(keyword in career_goals.lower() for keyword in ["career", "future", "goal", "aspire"]):
+        if any(keyword in career_goals.lower() for keyword in KEYWORD_SETS["career"]):
             goals_score += 1.0
-        if any(keyword in career_goals.lower() for keyword in ["research", "industry", "academia", "leadership"]):
+        if any(keyword in career_goals.lower() for keyword in KEYWORD_SETS["career_path"]):
             goals_score += 1.0
         
         # Research interests score (0-2 points)
         interests_score = 0.0
         if len(research_interests) >= 100:
             interests_score += 1.0
-        if any(keyword in research_interests.lower() for keyword in ["research", "study", "investigate", "explore"]):
+        if any(keyword in research_interests.lower() for keyword in KEYWORD_SETS["research_intent"]):
             interests_score += 1.0
         
         # Contribution score (0-2 points)
         contribution_score = 0.0
         if len(contribution) >= 150:
             contribution_score += 1.0
-        if any(keyword in contribution.lower() for keyword in ["contribute", "bring", "offer", "add"]):
+        if any(keyword in contribution.lower() for keyword in KEYWORD_SETS["contribution"]):
             contribution_score += 1.0
         
         total_score = min(10.0, motivation_score + goals_score + interests_score + contribution_score)
@@ -796,23 +996,8 @@ class AutomatedEvaluationSystem:
         full_text = str(personal_data) + str(personal_statement)
         text_lower = full_text.lower()
         
-        # Diversity indicators
-        diversity_keywords = [
-            "international", "immigrant", "first generation", "underrepresented",
-            "diverse", "multicultural", "global", "different perspective"
-        ]
-        
-        for keyword in diversity_keywords:
-            if keyword in text_lower:
-                diversity_score += 1.0
-        
-        # Contribution to diversity
-        contribution_keywords = [
-            "bring unique perspective", "diverse experience", "different background",
-            "cultural", "international experience", "multilingual"
-        ]
-        
-        for keyword in contribution_keywords:
+        # Diversity indicators and contribution to diversity
+        for keyword in DIVERSITY_KEYWORDS + DIVERSITY_CONTRIBUTION_KEYWORDS:
             if keyword in text_lower:
                 diversity_score += 1.0
         
@@ -841,21 +1026,11 @@ class AutomatedEvaluationSystem:
     def _calculate_overall_score(self, criteria_scores: Dict[str, float]) -> float:
         """Calculate weighted overall score"""
         
-        # Define weights for each criteria
-        weights = {
-            "CRIT_001": 0.25,  # Academic Excellence
-            "CRIT_002": 0.25,  # Technical Competency
-            "CRIT_003": 0.20,  # Research Potential
-            "CRIT_004": 0.15,  # Professional Experience
-            "CRIT_005": 0.10,  # Personal Statement Quality
-            "CRIT_006": 0.05   # Diversity Contribution
-        }
-        
         weighted_sum = 0.0
         total_weight = 0.0
         
         for criteria_id, score in criteria_scores.items():
-            weight = weights.get(criteria_id, 0.0)
+            weight = self.criteria_weights.get(criteria_id, 0.0)
             weighted_sum += score * weight
             total_weight += weight
         
@@ -884,8 +1059,7 @@ class AutomatedEvaluationSystem:
         completeness_score = 0.0
         
         # Check data completeness
-        required_sections = ["personal_info", "academic_background", "work_experience", "technical_skills", "personal_statement"]
-        for section in required_sections:
+        for section in REQUIRED_SECTIONS:
             if section in application_data and application_data[section]:
                 completeness_score += 0.2
         
@@ -912,15 +1086,414 @@ class AutomatedEvaluationSystem:
             "evaluation_time": f"{evaluation_result.evaluation_time_minutes:.1f} minutes"
         }
     
+    def evaluate_batch(self, applications) -> List[Dict[str, Any]]:
+        """Evaluate many applications at once.
+        
+        applications maps application_id to application data (or is an iterable of
+        (application_id, application_data) pairs). Features are extracted into arrays
+        in one pass and the criteria, overall score and confidence are computed
+        column-wise. Each result matches evaluate_application() for the same data
+        apart from evaluation_id and timing: evaluation_time_minutes is the batch
+        time shared evenly across its applications.
+        """
+        
+        start_time = datetime.now()
+        items = list(applications.items() if isinstance(applications, dict) else applications)
+        if not items:
+            return []
+        
+        count = len(items)
+        features = self._extract_batch_features([application_data for _, application_data in items])
+        
+        # Evaluate each criteria over the whole batch
+        criteria_scores = {}
+        criteria_notes = []
+        feedback_rules = []
+        for criteria in self.evaluation_criteria:
+            score, notes, rules = self._evaluate_criteria_batch(criteria, features)
+            criteria_scores[criteria.criteria_id] = score
+            criteria_notes.append([f"{criteria.name}: {note}" for note in notes])
+            feedback_rules.extend(rules)
+        
+        overall_scores = self._calculate_overall_score_batch(criteria_scores, count).tolist()
+        recommendations = self._determine_recommendation_batch(np.array(overall_scores), criteria_scores, count)
+        confidence_scores = self._calculate_confidence_score_batch(criteria_scores, features["completeness"]).tolist()
+        strengths, weaknesses, suggestions = _assemble_feedback(feedback_rules, count)
+        scores_by_criteria = {criteria_id: scores.tolist() for criteria_id, scores in criteria_scores.items()}
+        notes_by_application = list(zip(*criteria_notes)) if criteria_notes else [()] * count
+        
+        evaluated_at = datetime.now()
+        evaluation_time_minutes = (evaluated_at - start_time).total_seconds() / 60 / count
+        
+        # Same format as uuid4().hex[:8], from one draw of random bytes for the whole batch
+        id_tokens = os.urandom(4 * count).hex()
+        
+        results = []
+        for i, (application_id, _) in enumerate(items):
+            evaluation_id = f"EVAL_{id_tokens[8 * i:8 * i + 8]}"
+            criteria_result = {criteria_id: scores[i] for criteria_id, scores in scores_by_criteria.items()}
+            evaluation_result = EvaluationResult(
+                evaluation_id=evaluation_id,
+                application_id=application_id,
+                evaluator_id="AI_EVALUATOR_SYSTEM",
+                criteria_scores=criteria_result,
+                overall_score=overall_scores[i],
+                recommendation=recommendations[i],
+                confidence_score=confidence_scores[i],
+                evaluation_notes="; ".join(notes_by_application[i]),
+                strengths=strengths[i],
+                weaknesses=weaknesses[i],
+                improvement_suggestions=suggestions[i],
+                evaluated_at=evaluated_at,
+                evaluation_time_minutes=evaluation_time_minutes,
+                status=EvaluationStatus.COMPLETED
+            )
+            self.evaluation_results[evaluation_id] = evaluation_result
+            
+            results.append({
+                "success": True,
+                "evaluation_id": evaluation_id,
+                "application_id": application_id,
+                "overall_score": evaluation_result.overall_score,
+                "recommendation": evaluation_result.recommendation,
+                "confidence_score": evaluation_result.confidence_score,
+                "criteria_scores": criteria_result,
+                "strengths": evaluation_result.strengths,
+                "weaknesses": evaluation_result.weaknesses,
+                "improvement_suggestions": evaluation_result.improvement_suggestions,
+                "evaluation_time_minutes": evaluation_time_minutes,
+                "evaluation_summary": self._generate_evaluation_summary(evaluation_result)
+            })
+        
+        if self.evaluation_store is not None:
+            self.evaluation_store.save_many(self.get_model_version(), [
+                self._evaluation_report(self.evaluation_results[result["evaluation_id"]]) for result in results
+            ])
+        return results
+    
+    def _extract_batch_features(self, applications_data: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Pull every field the criteria read into columns, in one pass over the applications"""
+        
+        names = ("gpa", "institution_raw", "major_raw", "years_experience", "has_projects", "has_honors",
+                 "research_interests_length", "motivation_length", "career_goals_length", "contribution_length",
+                 "completeness", *BATCH_TEXT_SETS)
+        rows = []
+        for application_data in applications_data:
+            academic_data = application_data.get("academic_background", {})
+            work_data = application_data.get("work_experience", {})
+            personal_data = application_data.get("personal_statement", {})
+            
+            institution = academic_data.get("undergraduate_institution", "")
+            major = academic_data.get("major", "")
+            programming_languages = work_data.get("programming_languages", "")
+            technical_skills = work_data.get("technical_skills", "")
+            ai_ml_experience = work_data.get("ai_ml_experience", "")
+            current_position = work_data.get("current_position", "")
+            research_experience = academic_data.get("research_experience", "")
+            research_interests = personal_data.get("research_interests", "")
+            motivation = personal_data.get("motivation", "")
+            career_goals = personal_data.get("career_goals", "")
+            contribution = personal_data.get("contribution", "")
+            completeness = 0
+            for section in REQUIRED_SECTIONS:
+                if section in application_data and application_data[section]:
+                    completeness += 1
+            
+            # Text is lowercased once; falsy values are skipped by the per-applicant checks, so match nothing here
+            rows.append((
+                academic_data.get("gpa", 0.0), institution, major, work_data.get("years_experience", 0),
+                bool(work_data.get("projects", "")), bool(academic_data.get("academic_honors", "")),
+                len(research_interests), len(motivation), len(career_goals), len(contribution), completeness,
+                institution.lower(),
+                major.lower(),
+                programming_languages.lower() if programming_languages else "",
+                technical_skills.lower() if technical_skills else "",
+                ai_ml_experience.lower() if ai_ml_experience else "",
+                current_position.lower() if current_position else "",
+                research_experience.lower() if research_experience else "",
+                motivation.lower(),
+                career_goals.lower(),
+                research_interests.lower() if research_interests else "",
+                contribution.lower(),
+                (str(application_data.get("personal_info", {})) + str(personal_data)).lower()
+            ))
+        columns = dict(zip(names, map(list, zip(*rows))))
+        
+        features = {
+            "gpa": _numeric_column(columns["gpa"], "gpa"),
+            "gpa_raw": columns["gpa"],
+            "institution_raw": columns["institution_raw"],
+            "major_raw": columns["major_raw"],
+            "years_experience": _numeric_column(columns["years_experience"], "years_experience"),
+            "has_projects": np.array(columns["has_projects"], dtype=bool),
+            "has_honors": np.array(columns["has_honors"], dtype=bool),
+            "completeness": np.array(columns["completeness"], dtype=np.int64),
+            # Research potential measures the interests after lowercasing
+            "interests_length": np.array([len(text) for text in columns["research_interests"]], dtype=np.int64)
+        }
+        for name in ("research_interests_length", "motivation_length", "career_goals_length", "contribution_length"):
+            features[name] = np.array(columns[name], dtype=np.int64)
+        
+        matches = {}
+        for text_field, set_names in BATCH_TEXT_SETS.items():
+            for name, hits in self.keyword_matcher.match(columns[text_field], set_names).items():
+                matches[(text_field, name)] = hits
+        features["matches"] = matches
+        return features
+    
+    def _evaluate_criteria_batch(self, criteria: EvaluationCriteria, features: Dict[str, Any]):
+        """Batch counterpart of _evaluate_criteria: (scores, notes, feedback rules) for every application"""
+        
+        batch_evaluators = {
+            "CRIT_001": self._evaluate_academic_excellence_batch,
+            "CRIT_002": self._evaluate_technical_competency_batch,
+            "CRIT_003": self._evaluate_research_potential_batch,
+            "CRIT_004": self._evaluate_professional_experience_batch,
+            "CRIT_005": self._evaluate_personal_statement_batch,
+            "CRIT_006": self._evaluate_diversity_contribution_batch
+        }
+        evaluator = batch_evaluators.get(criteria.criteria_id)
+        if evaluator is None:
+            count = len(features["gpa"])
+            return np.zeros(count), ["Unknown criteria"] * count, []
+        return evaluator(features)
+    
+    def _evaluate_academic_excellence_batch(self, features: Dict[str, Any]):
+        matches = features["matches"]
+        gpa = features["gpa"]
+        
+        gpa_score = np.select([gpa >= 4.0, gpa >= 3.8, gpa >= 3.5, gpa >= 3.0, gpa >= 2.5],
+                              [25.0, 22.0, 18.0, 12.0, 6.0], 0.0)
+        institution_bonus = np.where(matches[("institution", "institution")], 2.0, 0.0)
+        major_bonus = np.where(matches[("major", "relevant_major")], 3.0, 0.0)
+        total_score = np.minimum(25.0, gpa_score + institution_bonus + major_bonus)
+        
+        notes = [f"GPA: {gpa_value}, Institution: {institution}, Major: {major}"
+                 for gpa_value, institution, major in zip(features["gpa_raw"], features["institution_raw"], features["major_raw"])]
+        rules = [
+            (_branch(gpa >= 3.5), [
+                ("Strong academic performance", None, None),
+                (None, "GPA below program average", "Consider highlighting relevant coursework and projects")
+            ]),
+            (_branch(major_bonus > 0), [
+                ("Relevant academic background", None, None),
+                (None, None, "Emphasize transferable skills from your field")
+            ])
+        ]
+        return total_score, notes, rules
+    
+    def _evaluate_technical_competency_batch(self, features: Dict[str, Any]):
+        matches = features["matches"]
+        
+        def points(text_field, name, value):
+            return np.where(matches[(text_field, name)], value, 0.0)
+        
+        prog_score = (0.0 + points("programming_languages", "python", 8.0) + points("programming_languages", "java", 4.0)
+                      + points("programming_languages", "c_family", 3.0) + points("programming_languages", "r_language", 2.0))
+        ai_score = (0.0 + points("ai_ml_experience", "ml_methods", 10.0) + points("ai_ml_experience", "ml_frameworks", 5.0)
+                    + points("ai_ml_experience", "data_science", 3.0))
+        tech_score = 0.0 + points("technical_skills", "cs_fundamentals", 5.0) + points("technical_skills", "databases", 2.0)
+        project_score = np.where(features["has_projects"], 3.0, 0.0)
+        total_score = np.minimum(25.0, prog_score + ai_score + tech_score + project_score)
+        
+        notes = _format_rows("Programming: {:.1f}, AI/ML: {:.1f}, Technical: {:.1f}, Projects: {:.1f}",
+                             prog_score, ai_score, tech_score, project_score)
+        rules = [
+            (_branch(prog_score >= 8.0), [
+                ("Strong programming background", None, None),
+                (None, "Limited programming experience", "Consider taking programming courses or working on coding projects")
+            ]),
+            (_branch(ai_score >= 8.0), [
+                ("Relevant AI/ML experience", None, None),
+                (None, "Limited AI/ML experience", "Gain hands-on experience with machine learning tools and projects")
+            ]),
+            (_branch(total_score >= 20.0, total_score >= 15.0), [
+                ("Excellent technical competency", None, None),
+                ("Good technical foundation", None, None),
+                (None, "Technical skills need development", "Focus on building technical skills through courses and projects")
+            ])
+        ]
+        return total_score, notes, rules
+    
+    def _evaluate_research_potential_batch(self, features: Dict[str, Any]):
+        matches = features["matches"]
+        
+        research_score = (0.0 + np.where(matches[("research_experience", "publications")], 15.0, 0.0)
+                          + np.where(matches[("research_experience", "research")], 10.0, 0.0)
+                          + np.where(matches[("research_experience", "thesis")], 8.0, 0.0))
+        honors_score = np.where(features["has_honors"], 5.0, 0.0)
+        interests_score = np.select([features["interests_length"] > 100, features["research_interests_length"] > 0],
+                                    [5.0, 2.0], 0.0)
+        total_score = np.minimum(20.0, research_score + honors_score + interests_score)
+        
+        notes = _format_rows("Research: {:.1f}, Honors: {:.1f}, Interests: {:.1f}",
+                             research_score, honors_score, interests_score)
+        rules = [
+            (_branch(research_score >= 10.0), [
+                ("Strong research background", None, None),
+                (None, "Limited research experience", "Consider gaining research experience through internships or projects")
+            ]),
+            (_branch(interests_score >= 3.0), [
+                ("Clear research interests", None, None),
+                (None, "Unclear research direction", "Develop and articulate specific research interests")
+            ])
+        ]
+        return total_score, notes, rules
+    
+    def _evaluate_professional_experience_batch(self, features: Dict[str, Any]):
+        matches = features["matches"]
+        years_experience = features["years_experience"]
+        
+        experience_score = np.select([years_experience >= 5, years_experience >= 3, years_experience >= 1],
+                                     [8.0, 6.0, 4.0], 1.0)
+        relevance_score = (0.0 + np.where(matches[("ai_ml_experience", "ai_relevance")], 5.0, 0.0)
+                           + np.where(matches[("ai_ml_experience", "data_relevance")], 3.0, 0.0))
+        position_score = 0.0 + np.where(matches[("current_position", "technical_role")], 2.0, 0.0)
+        project_score = np.where(features["has_projects"], 2.0, 0.0)
+        total_score = np.minimum(15.0, experience_score + relevance_score + position_score + project_score)
+        
+        notes = _format_rows("Experience: {:.1f}, Relevance: {:.1f}, Position: {:.1f}, Projects: {:.1f}",
+                             experience_score, relevance_score, position_score, project_score)
+        rules = [
+            (_branch(experience_score >= 6.0), [
+                ("Significant work experience", None, None),
+                (None, "Limited work experience", "Gain relevant work experience through internships or projects")
+            ]),
+            (_branch(relevance_score >= 5.0), [
+                ("Relevant AI/ML work experience", None, None),
+                (None, "Limited AI/ML work experience", "Seek opportunities to work with AI/ML technologies")
+            ])
+        ]
+        return total_score, notes, rules
+    
+    def _evaluate_personal_statement_batch(self, features: Dict[str, Any]):
+        matches = features["matches"]
+        
+        def point(condition):
+            return np.where(condition, 1.0, 0.0)
+        
+        motivation_score = (0.0 + point(features["motivation_length"] >= 200)
+                            + point(matches[("motivation", "motivation")]) + point(matches[("motivation", "motivation_ai")]))
+        goals_score = (0.0 + point(features["career_goals_length"] >= 150)
+                       + point(matches[("career_goals", "career")]) + point(matches[("career_goals", "career_path")]))
+        interests_score = (0.0 + point(features["research_interests_length"] >= 100)
+                           + point(matches[("research_interests", "research_intent")]))
+        contribution_score = (0.0 + point(features["contribution_length"] >= 150)
+                              + point(matches[("contribution", "contribution")]))
+        total_score = np.minimum(10.0, motivation_score + goals_score + interests_score + contribution_score)
+        
+        notes = _format_rows("Motivation: {:.1f}, Goals: {:.1f}, Interests: {:.1f}, Contribution: {:.1f}",
+                             motivation_score, goals_score, interests_score, contribution_score)
+        rules = [
+            (_branch(motivation_score >= 2.0), [
+                ("Clear motivation for pursuing AI", None, None),
+                (None, "Unclear motivation", "Articulate your specific reasons for pursuing AI")
+            ]),
+            (_branch(goals_score >= 2.0), [
+                ("Well-defined career goals", None, None),
+                (None, "Vague career goals", "Develop specific career objectives")
+            ]),
+            (_branch(total_score >= 8.0, total_score >= 6.0), [
+                ("Excellent personal statement", None, None),
+                ("Good personal statement", None, None),
+                (None, "Personal statement needs improvement", "Revise personal statement for clarity and specificity")
+            ])
+        ]
+        return total_score, notes, rules
+    
+    def _evaluate_diversity_contribution_batch(self, features: Dict[str, Any]):
+        matches = features["matches"]
+        
+        diversity_score = np.zeros(len(features["gpa"]))
+        for keyword in DIVERSITY_KEYWORDS + DIVERSITY_CONTRIBUTION_KEYWORDS:
+            diversity_score = diversity_score + np.where(matches[("diversity_text", f"diversity:{keyword}")], 1.0, 0.0)
+        total_score = np.minimum(5.0, diversity_score)
+        
+        notes = _format_rows("Diversity indicators: {:.1f}", total_score)
+        rules = [
+            (_branch(total_score >= 3.0), [
+                ("Diverse background and perspective", None, None),
+                (None, None, "Consider highlighting unique experiences and perspectives")
+            ])
+        ]
+        return total_score, notes, rules
+    
+    def _calculate_overall_score_batch(self, criteria_scores: Dict[str, np.ndarray], count: int) -> np.ndarray:
+        """Weighted overall scores, accumulated in the same order as _calculate_overall_score"""
+        
+        weighted_sum = np.zeros(count)
+        total_weight = 0.0
+        
+        for criteria_id, scores in criteria_scores.items():
+            weight = self.criteria_weights.get(criteria_id, 0.0)
+            weighted_sum = weighted_sum + scores * weight
+            total_weight += weight
+        
+        return weighted_sum / total_weight if total_weight > 0 else np.zeros(count)
+    
+    def _determine_recommendation_batch(self, overall_scores: np.ndarray, criteria_scores: Dict[str, np.ndarray],
+                                        count: int) -> List[str]:
+        """Recommendations for every application, by the rules in _determine_recommendation"""
+        
+        academic_scores = criteria_scores.get("CRIT_001", np.zeros(count))
+        technical_scores = criteria_scores.get("CRIT_002", np.zeros(count))
+        
+        outcomes = ("reject", "accept", "waitlist", "reject")
+        branch = _branch((academic_scores < 12.0) | (technical_scores < 12.0), overall_scores >= 18.0, overall_scores >= 15.0)
+        return [outcomes[i] for i in branch.tolist()]
+    
+    def _calculate_confidence_score_batch(self, criteria_scores: Dict[str, np.ndarray], completeness: np.ndarray) -> np.ndarray:
+        """Confidence for every application, rounded exactly as _calculate_confidence_score rounds"""
+        
+        # Completeness adds 0.2 per section present
+        completeness_scores = [0.0]
+        for _ in REQUIRED_SECTIONS:
+            completeness_scores.append(completeness_scores[-1] + 0.2)
+        completeness_score = np.array(completeness_scores)[completeness]
+        
+        # Score consistency
+        scores = list(criteria_scores.values())
+        if scores:
+            mean = _builtin_sum(scores) / len(scores)
+            squares = _python_squares(np.stack([score - mean for score in scores]))
+            score_variance = _builtin_sum(list(squares)) / len(scores)
+            consistency_score = np.maximum(0.0, 1.0 - score_variance / 100.0)
+        else:
+            consistency_score = np.zeros(len(completeness))
+        
+        confidence = (completeness_score + consistency_score) / 2.0
+        return np.minimum(1.0, np.maximum(0.0, confidence))
+    
+    def get_model_version(self) -> str:
+        """Fingerprint of everything that affects scores: criteria, weights, keyword sets and model versions.
+        
+        Stored evaluations are keyed by application and this version, so changing
+        the weights starts a fresh set of results instead of overwriting the old ones.
+        """
+        
+        fingerprint = {
+            "criteria": [(criteria.criteria_id, criteria.evaluation_method, criteria.max_score)
+                         for criteria in self.evaluation_criteria],
+            "weights": self.criteria_weights,
+            "keywords": [KEYWORD_SETS, DIVERSITY_KEYWORDS, DIVERSITY_CONTRIBUTION_KEYWORDS],
+            "models": [(model.model_id, model.version) for model in self.evaluation_models]
+        }
+        digest = hashlib.sha256(json.dumps(fingerprint, sort_keys=True).encode("utf-8")).hexdigest()
+        return f"v{digest[:12]}"
+    
     def get_evaluation_report(self, evaluation_id: str) -> Dict[str, Any]:
         """Get detailed evaluation report"""
         
         evaluation_result = self.evaluation_results.get(evaluation_id)
         if not evaluation_result:
-            return {"error": "Evaluation not found"}
+            stored = self.evaluation_store.get_by_evaluation_id(evaluation_id) if self.evaluation_store else None
+            return stored or {"error": "Evaluation not found"}
         
+        return self._evaluation_report(evaluation_result)
+    
+    def _evaluation_report(self, evaluation_result: EvaluationResult) -> Dict[str, Any]:
         return {
-            "evaluation_id": evaluation_id,
+            "evaluation_id": evaluation_result.evaluation_id,
             "application_id": evaluation_result.application_id,
             "overall_score": evaluation_result.overall_score,
             "recommendation": evaluation_result.recommendation,
@@ -938,6 +1511,14 @@ class AutomatedEvaluationSystem:
     def get_evaluation_statistics(self) -> Dict[str, Any]:
         """Get evaluation system statistics"""
         
+        if self.evaluation_store is not None:
+            # Aggregates are maintained by the store as results are written
+            statistics = self.evaluation_store.get_statistics(self.get_model_version())
+            if statistics["total_evaluations"] == 0:
+                return {"message": "No evaluations completed yet"}
+            statistics["model_performance"] = self._model_performance()
+            return statistics
+        
         total_evaluations = len(self.evaluation_results)
         
         if total_evaluations == 0:
@@ -976,12 +1557,15 @@ class AutomatedEvaluationSystem:
                 "average_evaluation_time_minutes": avg_time,
                 "total_evaluation_time_hours": sum(times) / 60
             },
-            "model_performance": [
-                {
-                    "model_name": model.name,
-                    "accuracy_score": model.accuracy_score,
-                    "last_trained": model.last_trained.isoformat()
-                }
-                for model in self.evaluation_models
-            ]
-        }
\ No newline at end of file
+            "model_performance": self._model_performance()
+        }
+    
+    def _model_performance(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                "model_name": model.name,
+                "accuracy_score": model.accuracy_score,
+                "last_trained": model.last_trained.isoformat()
+            }
+            for model in self.evaluation_models
+        ]
\ No newline at end of file
@@ -0,0 +1,142 @@
+"""
+MS AI Curriculum System - Indexed Store
+Dict of records with maintained secondary indexes, so admissions lookups by
+email, application, status or stage and ranges by submission time do not
+scan every record
+"""
+
+import bisect
+import threading
+from collections import defaultdict
+from collections.abc import MutableMapping
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+class IndexedStore(MutableMapping):
+    """Mapping of key -> record (a dataclass) with secondary indexes on record attributes.
+
+    Hash indexes map an attribute value to the keys holding it (O(1) lookup);
+    sorted indexes keep (value, key) pairs in a bisect-maintained list for
+    O(log n) range queries. Records with a None value are left out of sorted
+    indexes. Indexes follow assignment; a record changed in place must be
+    stored again (or passed to reindex) for its new values to be found.
+    """
+
+    def __init__(self, hash_fields: Iterable[str] = (), sorted_fields: Iterable[str] = ()):
+        self._records: Dict[str, Any] = {}
+        # field -> value -> keys; the inner dict is an insertion-ordered set
+        self._hash: Dict[str, Dict[Any, Dict[str, None]]] = {field: defaultdict(dict) for field in hash_fields}
+        self._sorted: Dict[str, List[Tuple[Any, str]]] = {field: [] for field in sorted_fields}
+        # Indexed values per key, so a changed field can be removed from its old position
+        self._indexed: Dict[str, Dict[str, Any]] = {}
+        # Engine workers store workflows concurrently
+        self._lock = threading.RLock()
+
+    # Mapping interface
+
+    def __getitem__(self, key: str) -> Any:
+        return self._records[key]
+
+    def __setitem__(self, key: str, record: Any):
+        with self._lock:
+            self._records[key] = record
+            self._index(key, record)
+
+    def __delitem__(self, key: str):
+        with self._lock:
+            del self._records[key]
+            for field, value in self._indexed.pop(key).items():
+                self._remove(field, key, value)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._records)
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._records
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self._records!r})"
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self._records.get(key, default)
+
+    def keys(self):
+        return self._records.keys()
+
+    def values(self):
+        return self._records.values()
+
+    def items(self):
+        return self._records.items()
+
+    def clear(self):
+        with self._lock:
+            self._records.clear()
+            self._indexed.clear()
+            for index in self._hash.values():
+                index.clear()
+            for entries in self._sorted.values():
+                entries.clear()
+
+    # Index maintenance
+
+    def reindex(self, key: str):
+        """Bring the indexes up to date after the record under key was changed in place"""
+        with self._lock:
+            self._index(key, self._records[key])
+
+    def _index(self, key: str, record: Any):
+        old = self._indexed.get(key, {})
+        new = {field: getattr(record, field) for field in (*self._hash, *self._sorted)}
+        for field, value in new.items():
+            if field in old:
+                if old[field] == value:
+                    continue
+                self._remove(field, key, old[field])
+            if field in self._hash:
+                self._hash[field][value][key] = None
+            elif value is not None:
+                bisect.insort(self._sorted[field], (value, key))
+        self._indexed[key] = new
+
+    def _remove(self, field: str, key: str, value: Any):
+        if field in self._hash:
+            keys = self._hash[field][value]
+            del keys[key]
+            if not keys:
+                del self._hash[field][value]
+        elif value is not None:
+            entries = self._sorted[field]
+            del entries[bisect.bisect_left(entries, (value, key))]
+
+    # Queries
+
+    def lookup(self, field: str, value: Any) -> List[Any]:
+        """Records whose field equals value, in the order they were indexed under it"""
+        with self._lock:
+            return [self._records[key] for key in self._hash[field].get(value, ())]
+
+    def first(self, field: str, value: Any) -> Optional[Any]:
+        with self._lock:
+            keys = self._hash[field].get(value)
+            return self._records[next(iter(keys))] if keys else None
+
+    def count(self, field: str, value: Any) -> int:
+        with self._lock:
+            return len(self._hash[field].get(value, ()))
+
+    def range(self, field: str, start: Any = None, end: Any = None, reverse: bool = False,
+              limit: Optional[int] = None) -> List[Any]:
+        """Records with start <= field < end (either bound optional), ordered by field"""
+        with self._lock:
+            entries = self._sorted[field]
+            low = 0 if start is None else bisect.bisect_left(entries, (start,))
+            high = len(entries) if end is None else bisect.bisect_left(entries, (end,))
+            if reverse:
+                positions = range(high - 1, max(low, high - limit) - 1 if limit is not None else low - 1, -1)
+            else:
+                positions = range(low, min(high, low + limit) if limit is not None else high)
+            return [self._records[entries[position][1]] for position in positions]
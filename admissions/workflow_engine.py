@@ -0,0 +1,438 @@
+"""
+MS AI Curriculum System - Workflow Engine
+Durable execution of admission workflows: workflow state and a queue of
+step tasks live in SQLite, a pool of workers runs steps across workflows
+concurrently, and due dates are enforced with timer tasks. Steps run at
+least once: a step retried after a failure or a crash may repeat its side
+effects, but only the attempt holding the task's current claim commits
+"""
+
+import random
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from admissions.admission_workflow import AdmissionWorkflow, EnrollmentData, NotificationType, WorkflowStage, WorkflowStep
+from storage_backend import from_row, to_row
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS workflows (
+    workflow_id TEXT PRIMARY KEY,
+    application_id TEXT NOT NULL UNIQUE,
+    current_stage TEXT NOT NULL,
+    state TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS enrollments (
+    enrollment_id TEXT PRIMARY KEY,
+    application_id TEXT NOT NULL UNIQUE,
+    state TEXT NOT NULL
+);
+
+-- One row per (workflow, stage, kind). A running task's run_at is its lease
+-- expiry, so tasks abandoned by a crashed worker become due again. attempts
+-- restarts when a step is queued again; claims never does and fences workers.
+CREATE TABLE IF NOT EXISTS workflow_tasks (
+    task_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    workflow_id TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    status TEXT NOT NULL,
+    run_at REAL NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    claims INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    updated_at REAL NOT NULL,
+    UNIQUE (workflow_id, stage, kind)
+);
+CREATE INDEX IF NOT EXISTS idx_workflow_tasks_due ON workflow_tasks(run_at) WHERE status IN ('queued', 'running');
+CREATE INDEX IF NOT EXISTS idx_workflow_tasks_workflow ON workflow_tasks(workflow_id, status);
+"""
+
+EXECUTE = "execute"
+DEADLINE = "deadline"
+
+TASK_FIELDS = ("task_id", "workflow_id", "stage", "kind", "status", "run_at", "attempts", "last_error")
+
+# A task claimed by a worker: (task_id, workflow_id, stage, kind, attempts, claims)
+Task = Tuple[int, str, str, str, int, int]
+
+# (stage, kind, run_at) rows to schedule
+Schedule = List[Tuple[str, str, float]]
+
+
+class WorkflowStore:
+    """Thread-safe SQLite store of workflows, enrollments and the step task queue.
+
+    Completing a task saves the workflow, marks the task done and schedules
+    the follow-up tasks in one transaction, guarded by the claim number the
+    task was leased with. A worker whose lease expired and whose task was
+    claimed again therefore cannot overwrite the newer attempt.
+    """
+
+    def __init__(self, db_path: str = 'workflows.db'):
+        self.db_path = db_path
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            if db_path != ':memory:':
+                self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            self._conn.executescript(SCHEMA)
+
+    # Workflows
+
+    def create_workflow(self, workflow: AdmissionWorkflow, schedule: Schedule, now: float) -> str:
+        """Insert workflow with its first tasks; returns the ID of the workflow that owns the application"""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO workflows (workflow_id, application_id, current_stage, state, updated_at) "
+                "VALUES (?, ?, ?, ?, ?) ON CONFLICT(application_id) DO NOTHING",
+                (workflow.workflow_id, workflow.application_id, workflow.current_stage.value, to_row(workflow), now)
+            )
+            if cursor.rowcount == 0:
+                return self._conn.execute(
+                    "SELECT workflow_id FROM workflows WHERE application_id = ?", (workflow.application_id,)
+                ).fetchone()[0]
+            self._schedule(workflow.workflow_id, schedule, now)
+        return workflow.workflow_id
+
+    def workflow_for_application(self, application_id: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT workflow_id FROM workflows WHERE application_id = ?", (application_id,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def load_workflow(self, workflow_id: str) -> Optional[AdmissionWorkflow]:
+        with self._lock:
+            row = self._conn.execute("SELECT state FROM workflows WHERE workflow_id = ?", (workflow_id,)).fetchone()
+        return from_row(AdmissionWorkflow, row[0]) if row else None
+
+    def load_enrollment(self, application_id: str) -> Optional[EnrollmentData]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT state FROM enrollments WHERE application_id = ?", (application_id,)
+            ).fetchone()
+        return from_row(EnrollmentData, row[0]) if row else None
+
+    def load_all(self) -> Tuple[Dict[str, AdmissionWorkflow], Dict[str, EnrollmentData]]:
+        """Every stored workflow and enrollment, keyed by ID"""
+        with self._lock:
+            workflow_rows = self._conn.execute("SELECT workflow_id, state FROM workflows").fetchall()
+            enrollment_rows = self._conn.execute("SELECT enrollment_id, state FROM enrollments").fetchall()
+        return ({workflow_id: from_row(AdmissionWorkflow, state) for workflow_id, state in workflow_rows},
+                {enrollment_id: from_row(EnrollmentData, state) for enrollment_id, state in enrollment_rows})
+
+    # Tasks
+
+    def schedule(self, workflow_id: str, schedule: Schedule, now: float):
+        with self._lock, self._conn:
+            self._schedule(workflow_id, schedule, now)
+
+    def _schedule(self, workflow_id: str, schedule: Schedule, now: float):
+        for stage, kind, run_at in schedule:
+            if kind == EXECUTE:
+                # Re-queue a step that already finished (e.g. a failed step run again); never one in flight
+                conflict = ("DO UPDATE SET status = 'queued', run_at = excluded.run_at, attempts = 0, "
+                            "last_error = NULL, updated_at = excluded.updated_at "
+                            "WHERE workflow_tasks.status IN ('done', 'failed')")
+            else:
+                # A step's due date is enforced once
+                conflict = "DO NOTHING"
+            self._conn.execute(
+                "INSERT INTO workflow_tasks (workflow_id, stage, kind, status, run_at, updated_at) "
+                f"VALUES (?, ?, ?, 'queued', ?, ?) ON CONFLICT(workflow_id, stage, kind) {conflict}",
+                (workflow_id, stage, kind, run_at, now)
+            )
+
+    def claim(self, now: float, lease_seconds: float) -> Optional[Task]:
+        """Lease the next due task, skipping workflows that already have a task in flight"""
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "UPDATE workflow_tasks SET status = 'running', attempts = attempts + 1, claims = claims + 1, "
+                "run_at = ?, updated_at = ? "
+                "WHERE task_id = ("
+                "  SELECT t.task_id FROM workflow_tasks AS t"
+                "  WHERE t.status IN ('queued', 'running') AND t.run_at <= ?"
+                "    AND NOT EXISTS (SELECT 1 FROM workflow_tasks AS r WHERE r.workflow_id = t.workflow_id"
+                "                    AND r.status = 'running' AND r.run_at > ?)"
+                "  ORDER BY t.run_at, t.kind = 'deadline', t.task_id LIMIT 1"
+                ") RETURNING task_id, workflow_id, stage, kind, attempts, claims",
+                (now + lease_seconds, now, now, now)
+            ).fetchone()
+        return tuple(row) if row else None
+
+    def complete(self, task: Task, workflow: Optional[AdmissionWorkflow], schedule: Schedule,
+                 enrollment: Optional[EnrollmentData], now: float) -> bool:
+        """Commit a finished task; False if the task's lease was lost to another attempt"""
+        return self._finish(task, "done", None, workflow, schedule, enrollment, now)
+
+    def fail(self, task: Task, workflow: Optional[AdmissionWorkflow], error: str, now: float) -> bool:
+        """Give up on a task after its last attempt"""
+        return self._finish(task, "failed", error, workflow, [], None, now)
+
+    def retry(self, task: Task, error: str, run_at: float, now: float) -> bool:
+        """Put a task back in the queue until run_at"""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "UPDATE workflow_tasks SET status = 'queued', run_at = ?, last_error = ?, updated_at = ? "
+                "WHERE task_id = ? AND status = 'running' AND claims = ?",
+                (run_at, error, now, task[0], task[5])
+            )
+        return cursor.rowcount == 1
+
+    def _finish(self, task: Task, status: str, error: Optional[str], workflow: Optional[AdmissionWorkflow],
+                schedule: Schedule, enrollment: Optional[EnrollmentData], now: float) -> bool:
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "UPDATE workflow_tasks SET status = ?, last_error = ?, updated_at = ? "
+                "WHERE task_id = ? AND status = 'running' AND claims = ?",
+                (status, error, now, task[0], task[5])
+            )
+            if cursor.rowcount != 1:
+                return False
+            if workflow is not None:
+                self._conn.execute(
+                    "UPDATE workflows SET current_stage = ?, state = ?, updated_at = ? WHERE workflow_id = ?",
+                    (workflow.current_stage.value, to_row(workflow), now, workflow.workflow_id)
+                )
+            if enrollment is not None:
+                self._conn.execute(
+                    "INSERT INTO enrollments (enrollment_id, application_id, state) VALUES (?, ?, ?) "
+                    "ON CONFLICT(enrollment_id) DO UPDATE SET state = excluded.state",
+                    (enrollment.enrollment_id, enrollment.application_id, to_row(enrollment))
+                )
+            self._schedule(task[1], schedule, now)
+        return True
+
+    def has_due(self, now: float) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM workflow_tasks WHERE status IN ('queued', 'running') AND run_at <= ? LIMIT 1", (now,)
+            ).fetchone()
+        return row is not None
+
+    def get_tasks(self, workflow_id: str) -> List[Dict[str, Any]]:
+        """Every task of a workflow, oldest first"""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(TASK_FIELDS)} FROM workflow_tasks WHERE workflow_id = ? ORDER BY task_id",
+                (workflow_id,)
+            ).fetchall()
+        return [dict(zip(TASK_FIELDS, row)) for row in rows]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class WorkflowEngine:
+    """Runs AdmissionWorkflowManager steps from a WorkflowStore queue with a pool of worker threads.
+
+    When a step completes, the next step is queued if it is auto-triggered;
+    otherwise it waits for advance_workflow(). Every step that becomes
+    current also gets a deadline task at its due date; if the step has not
+    completed by then, the workflow is escalated to urgent and the assignee
+    notified. A step that raises is retried with jittered exponential
+    backoff, up to max_attempts. A step found already completed when its
+    task runs again is not re-executed; a step whose attempt crashed or lost
+    its lease before committing is, so steps keep their side effects
+    idempotent.
+    """
+
+    def __init__(self, store: WorkflowStore, max_workers: int = 4, lease_seconds: float = 300.0,
+                 max_attempts: int = 5, backoff_base: float = 1.0, backoff_max: float = 300.0,
+                 poll_interval: float = 1.0, clock: Callable[[], datetime] = datetime.now):
+        self.store = store
+        self.max_workers = max_workers
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.poll_interval = poll_interval
+        self.clock = clock
+        self.manager = None
+
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def attach(self, manager):
+        """Bind to a manager and load the persisted workflows and enrollments into it"""
+        self.manager = manager
+        workflows, enrollments = self.store.load_all()
+        for workflow in workflows.values():
+            manager._store_workflow(workflow)
+        for enrollment in enrollments.values():
+            manager._store_enrollment(enrollment)
+
+    def _now(self) -> float:
+        return self.clock().timestamp()
+
+    def _activate(self, step: WorkflowStep, now: float, execute: bool) -> Schedule:
+        """Tasks for a step becoming current: its deadline, and its execution if it runs now"""
+        schedule = [(step.stage.value, DEADLINE, max(step.due_date.timestamp(), now))]
+        if execute:
+            schedule.append((step.stage.value, EXECUTE, now))
+        return schedule
+
+    # Manager entry points
+
+    def create(self, workflow: AdmissionWorkflow) -> str:
+        """Persist a new workflow and queue its first step; returns the ID of the application's workflow"""
+        now = self._now()
+        first_step = workflow.workflow_steps[0]
+        workflow_id = self.store.create_workflow(workflow, self._activate(first_step, now, execute=True), now)
+        if workflow_id == workflow.workflow_id:
+            self.manager._store_workflow(workflow)
+        return workflow_id
+
+    def find_workflow(self, application_id: str) -> Optional[str]:
+        return self.store.workflow_for_application(application_id)
+
+    def get_workflow(self, workflow_id: str) -> Optional[AdmissionWorkflow]:
+        workflow = self.store.load_workflow(workflow_id)
+        if workflow is not None:
+            self.manager._store_workflow(workflow)
+        return workflow
+
+    def find_enrollment(self, application_id: str) -> Optional[EnrollmentData]:
+        """The application's stored enrollment, which a step on another engine may have created"""
+        enrollment = self.store.load_enrollment(application_id)
+        if enrollment is not None and enrollment.enrollment_id not in self.manager.enrollment_data:
+            self.manager._store_enrollment(enrollment)
+        return enrollment
+
+    def enqueue(self, workflow_id: str, stage: WorkflowStage) -> Dict[str, Any]:
+        """Queue a step to run now, e.g. one that is not auto-triggered"""
+        workflow = self.store.load_workflow(workflow_id)
+        step = next((s for s in workflow.workflow_steps if s.stage == stage), None) if workflow else None
+        if not step:
+            return {"success": False, "error": "Step not found"}
+        now = self._now()
+        self.store.schedule(workflow_id, self._activate(step, now, execute=True), now)
+        return {"success": True, "queued": True, "workflow_id": workflow_id, "stage": stage.value}
+
+    # Workers
+
+    def run_once(self) -> bool:
+        """Claim and process one due task; False when none is due"""
+        task = self.store.claim(self._now(), self.lease_seconds)
+        if task is None:
+            return False
+        self._process(task)
+        return True
+
+    def _drain(self) -> int:
+        processed = 0
+        while self.run_once():
+            processed += 1
+        return processed
+
+    def run_until_idle(self) -> int:
+        """Process due tasks with max_workers threads until none is left; returns how many ran"""
+        processed = 0
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while True:
+                ran = sum(pool.map(lambda _: self._drain(), range(self.max_workers)))
+                processed += ran
+                if not ran:
+                    return processed
+
+    def _work(self):
+        while not self._stop.is_set():
+            try:
+                if self.run_once():
+                    continue
+            except sqlite3.Error:
+                # A busy or briefly unavailable database; the task's lease brings it back
+                pass
+            self._stop.wait(self.poll_interval)
+
+    def start(self):
+        """Run max_workers background worker threads until stop()"""
+        if self._threads:
+            return
+        self._stop.clear()
+        self._threads = [threading.Thread(target=self._work, name=f"workflow-worker-{i}", daemon=True)
+                         for i in range(self.max_workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    # Task processing
+
+    def _process(self, task: Task):
+        workflow_id, stage, kind = task[1], WorkflowStage(task[2]), task[3]
+        workflow = self.store.load_workflow(workflow_id)
+        step = next((s for s in workflow.workflow_steps if s.stage == stage), None) if workflow else None
+        if step is None:
+            self.store.fail(task, None, "Step not found", self._now())
+            return
+
+        if kind == DEADLINE:
+            self._enforce_deadline(task, workflow, step)
+            return
+
+        if step.status == "completed":
+            # Already applied by an earlier attempt whose task update was lost; only re-schedule what follows
+            result = {"success": True}
+        else:
+            try:
+                result = self.manager._run_workflow_step(workflow, stage)
+            except Exception as e:
+                self._retry_or_fail(task, f"{type(e).__name__}: {e}")
+                return
+
+        now = self._now()
+        schedule: Schedule = []
+        if result["success"]:
+            next_step = self.manager._next_workflow_step(workflow, stage)
+            if next_step and next_step.status != "completed":
+                schedule = self._activate(next_step, now, execute=next_step.auto_triggered)
+        enrollment = self.manager._find_enrollment(workflow.application_id)
+        if self.store.complete(task, workflow, schedule, enrollment, now):
+            self.manager._store_workflow(workflow)
+
+    def _retry_or_fail(self, task: Task, error: str):
+        attempts = task[4]
+        now = self._now()
+        if attempts < self.max_attempts:
+            delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempts - 1)))
+            self.store.retry(task, error, now + delay, now)
+            return
+
+        # Record the failure on the step the way a step that reports failure is recorded
+        workflow = self.store.load_workflow(task[1])
+        step = next(s for s in workflow.workflow_steps if s.stage.value == task[2])
+        step.status = "failed"
+        step.notes = error
+        workflow.updated_at = self.clock()
+        if self.store.fail(task, workflow, error, now):
+            self.manager._store_workflow(workflow)
+
+    def _enforce_deadline(self, task: Task, workflow: AdmissionWorkflow, step: WorkflowStep):
+        now = self._now()
+        if step.status == "completed":
+            self.store.complete(task, None, [], None, now)
+            return
+
+        workflow.priority = "urgent"
+        workflow.updated_at = self.clock()
+        workflow.notifications_sent.append({
+            "type": NotificationType.PORTAL_NOTIFICATION.value,
+            "recipient": step.assigned_to,
+            "subject": f"Overdue: {step.description}",
+            "message": f"Step '{step.stage.value}' for application {workflow.application_id} "
+                       f"was due {step.due_date.isoformat()}",
+            "sent_at": self.clock().isoformat()
+        })
+        if self.store.complete(task, workflow, [], None, now):
+            self.manager._store_workflow(workflow)
@@ -448,11 +448,13 @@ async def get_metrics():
 if __name__ == "__main__":
     port = int(os.getenv("PORT", 8000))
     host = os.getenv("HOST", "0.0.0.0")
+    # More than one worker needs the systems on a shared SQLiteBackend (storage_backend.py)
+    workers = int(os.getenv("WORKERS", 1))
     
     uvicorn.run(
         "app:app",
         host=host,
         port=port,
         reload=False,
-        workers=1
+        workers=workers
     )
\ No newline at end of file
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Streaming Export of MSAI Applications
+Encodes application records as CSV, NDJSON or Parquet in bounded-memory
+chunks, so exports can be streamed straight into an HTTP response
+"""
+
+import csv
+import io
+import json
+from typing import Any, Dict, Iterable, Iterator, List
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    pa = None
+    pq = None
+    PYARROW_AVAILABLE = False
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet')
+}
+
+
+def _cell(value: Any) -> Any:
+    return '' if value is None else value
+
+
+def iter_csv(records: Iterable[Dict[str, Any]], columns: List[str], rows_per_chunk: int = 500) -> Iterator[bytes]:
+    """CSV with a header row, yielded every rows_per_chunk records"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    pending = 0
+    for record in records:
+        writer.writerow([_cell(record.get(column)) for column in columns])
+        pending += 1
+        if pending >= rows_per_chunk:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+def iter_ndjson(records: Iterable[Dict[str, Any]], columns: List[str], rows_per_chunk: int = 500) -> Iterator[bytes]:
+    """One JSON object per line, yielded every rows_per_chunk records"""
+    lines = []
+    for record in records:
+        lines.append(json.dumps({column: record.get(column) for column in columns}, default=str))
+        if len(lines) >= rows_per_chunk:
+            yield ('\n'.join(lines) + '\n').encode('utf-8')
+            lines = []
+    if lines:
+        yield ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object that hands written bytes back to the caller between row groups"""
+
+    def __init__(self):
+        self._parts: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._parts.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def take(self) -> bytes:
+        data = b''.join(self._parts)
+        self._parts = []
+        return data
+
+
+def iter_parquet(records: Iterable[Dict[str, Any]], columns: List[str], rows_per_chunk: int = 10000) -> Iterator[bytes]:
+    """Parquet with one row group (and one yielded chunk) per rows_per_chunk records; values are strings"""
+    if not PYARROW_AVAILABLE:
+        raise RuntimeError("Parquet export requires pyarrow")
+
+    schema = pa.schema([(column, pa.string()) for column in columns])
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression='snappy')
+    batch: Dict[str, List[Any]] = {column: [] for column in columns}
+    size = 0
+
+    def write_batch():
+        writer.write_table(pa.Table.from_pydict(batch, schema=schema))
+        for values in batch.values():
+            values.clear()
+
+    for record in records:
+        for column in columns:
+            value = record.get(column)
+            batch[column].append(None if value is None else str(value))
+        size += 1
+        if size >= rows_per_chunk:
+            write_batch()
+            size = 0
+            yield sink.take()
+    if size:
+        write_batch()
+    writer.close()
+    yield sink.take()
+
+
+def export_stream(records: Iterable[Dict[str, Any]], columns: List[str], export_format: str = 'csv') -> Iterator[bytes]:
+    """Encoded chunks of records in the given format ('csv', 'ndjson' or 'parquet')"""
+    if export_format == 'csv':
+        return iter_csv(records, columns)
+    if export_format == 'ndjson':
+        return iter_ndjson(records, columns)
+    if export_format == 'parquet':
+        return iter_parquet(records, columns)
+    raise ValueError(f"Unknown export format '{export_format}', expected one of {tuple(EXPORT_FORMATS)}")
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Local Read Replica of the MSAI Applications Sheet
+SQLite copy of every application record with secondary indexes, kept in
+sync from our own write path so reads never touch the Sheets API
+"""
+
+import json
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Indexed columns and the sheet header each one mirrors
+INDEXED_FIELDS = {
+    'application_id': 'Application ID',
+    'email': 'Email',
+    'status': 'Status',
+    'specialization': 'Specialization',
+    'start_term': 'Start Term',
+    'program_format': 'Program Format',
+    'submitted_at': 'Timestamp'
+}
+
+# Stats groupings returned by get_stats(), as in MSAIApplicationSheets.get_application_stats
+STATS_GROUPS = {
+    'by_specialization': 'specialization',
+    'by_status': 'status',
+    'by_term': 'start_term',
+    'by_format': 'program_format'
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS applications (
+    row_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    record_key TEXT NOT NULL UNIQUE,
+    application_id TEXT,
+    email TEXT,
+    status TEXT,
+    specialization TEXT,
+    start_term TEXT,
+    program_format TEXT,
+    submitted_at TEXT,
+    sheet_row INTEGER,
+    record TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_applications_application_id ON applications(application_id);
+CREATE INDEX IF NOT EXISTS idx_applications_email ON applications(email);
+CREATE INDEX IF NOT EXISTS idx_applications_status ON applications(status);
+CREATE INDEX IF NOT EXISTS idx_applications_specialization ON applications(specialization);
+CREATE INDEX IF NOT EXISTS idx_applications_start_term ON applications(start_term);
+CREATE INDEX IF NOT EXISTS idx_applications_program_format ON applications(program_format);
+CREATE INDEX IF NOT EXISTS idx_applications_submitted_at ON applications(submitted_at);
+"""
+
+UPSERT_COLUMNS = ('record_key',) + tuple(INDEXED_FIELDS) + ('record', 'sheet_row')
+# A record upserted without its sheet row keeps the one already known
+UPSERT_SQL = (f"INSERT INTO applications ({', '.join(UPSERT_COLUMNS)}) "
+              f"VALUES ({', '.join('?' * len(UPSERT_COLUMNS))}) ON CONFLICT(record_key) DO UPDATE SET "
+              + ', '.join(f"{column} = excluded.{column}" for column in UPSERT_COLUMNS[1:-1])
+              + ", sheet_row = COALESCE(excluded.sheet_row, sheet_row)")
+
+
+def record_key(record: Dict[str, Any], sheet_row: Optional[int] = None) -> str:
+    """Identity of a record: its application ID, or the sheet row for rows that predate IDs.
+
+    Emails are not identities (an applicant may have applied more than once);
+    they are only a secondary index.
+    """
+    application_id = record.get('Application ID')
+    if application_id:
+        return f"id:{application_id}"
+    if sheet_row is None:
+        raise ValueError("An application without an ID can only be stored with its sheet row")
+    return f"row:{sheet_row}"
+
+
+class ApplicationReplica:
+    """Thread-safe SQLite replica of application records keyed like get_all_records() rows"""
+
+    def __init__(self, db_path: str = 'applications.db'):
+        self.db_path = db_path
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            if db_path != ':memory:':
+                self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            self._conn.executescript(SCHEMA)
+            columns = {row[1] for row in self._conn.execute('PRAGMA table_info(applications)')}
+            if 'sheet_row' not in columns:
+                # Replicas created before row tracking; rows are filled in by the next sync
+                self._conn.execute('ALTER TABLE applications ADD COLUMN sheet_row INTEGER')
+            # Replicas that keyed ID-less rows by email; rows without a known position return on the next sync
+            with self._conn:
+                self._conn.execute("UPDATE OR REPLACE applications SET record_key = 'row:' || sheet_row "
+                                   "WHERE record_key LIKE 'email:%' AND sheet_row IS NOT NULL")
+                self._conn.execute("DELETE FROM applications WHERE record_key LIKE 'email:%'")
+
+    def _row_values(self, record: Dict[str, Any], sheet_row: Optional[int]) -> tuple:
+        indexed = {
+            field: None if record.get(header) in (None, '') else str(record[header]).strip()
+            for field, header in INDEXED_FIELDS.items()
+        }
+        if indexed['email']:
+            # Emails are looked up case-insensitively
+            indexed['email'] = indexed['email'].lower()
+        return (record_key(record, sheet_row), *indexed.values(), json.dumps(record, default=str), sheet_row)
+
+    def upsert_many(self, records: Iterable[Dict[str, Any]], first_sheet_row: Optional[int] = None,
+                    sheet_rows: Optional[Iterable[Optional[int]]] = None) -> int:
+        """Insert or replace records by application ID (sheet row for legacy rows).
+
+        With first_sheet_row, records are consecutive sheet rows starting there
+        (e.g. 2 for get_all_records() output); sheet_rows instead gives each
+        record's row, None where unknown. Rows not given keep the one known.
+        """
+        records = list(records)
+        if first_sheet_row is not None:
+            sheet_rows = range(first_sheet_row, first_sheet_row + len(records))
+        elif sheet_rows is None:
+            sheet_rows = [None] * len(records)
+        values = [self._row_values(record, sheet_row) for record, sheet_row in zip(records, sheet_rows)]
+        with self._lock, self._conn:
+            self._conn.executemany(UPSERT_SQL, values)
+        return len(values)
+
+    def load_snapshot(self, records: Iterable[Dict[str, Any]], first_sheet_row: int = 2) -> int:
+        """Upsert every row of the sheet, consecutive from first_sheet_row, as the one source of row numbers.
+
+        Records no longer in the sheet lose their row, and legacy rows past its
+        end are dropped, so no stale row number survives a snapshot.
+        """
+        values = [self._row_values(record, first_sheet_row + i) for i, record in enumerate(records)]
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE applications SET sheet_row = NULL")
+            self._conn.executemany(UPSERT_SQL, values)
+            self._conn.execute("DELETE FROM applications WHERE record_key LIKE 'row:%' AND sheet_row IS NULL")
+        return len(values)
+
+    def upsert(self, record: Dict[str, Any]):
+        """Insert or replace a single record"""
+        self.upsert_many([record])
+
+    def _where(self, filters: Dict[str, Optional[str]]) -> tuple:
+        clauses, params = [], []
+        for field, value in filters.items():
+            if value is None:
+                continue
+            if field not in INDEXED_FIELDS:
+                raise ValueError(f"Cannot filter applications on '{field}'")
+            clauses.append(f"{field} = ?")
+            params.append(value.strip().lower() if field == 'email' else value)
+        return (' WHERE ' + ' AND '.join(clauses) if clauses else ''), params
+
+    def query(self, **filters: Optional[str]) -> List[Dict[str, Any]]:
+        """Records matching every given indexed field (None means any), in submission order"""
+        return list(self.iter_records(**filters))
+
+    def iter_records(self, batch_size: int = 500, **filters: Optional[str]) -> Iterator[Dict[str, Any]]:
+        """Stream matching records in submission order, batch_size rows per fetch"""
+        where, params = self._where(filters)
+        return self._iter_records(where, params, batch_size)
+
+    def _iter_records(self, where: str, params: List[Any], batch_size: int) -> Iterator[Dict[str, Any]]:
+        last_row_id = 0
+        while True:
+            # Keyset pagination keeps each fetch short and the lock free between batches
+            sql = (f"SELECT row_id, record FROM applications{where}{' AND' if where else ' WHERE'} "
+                   f"row_id > ? ORDER BY row_id LIMIT ?")
+            with self._lock:
+                rows = self._conn.execute(sql, params + [last_row_id, batch_size]).fetchall()
+            if not rows:
+                return
+            for row_id, record in rows:
+                yield json.loads(record)
+            last_row_id = rows[-1][0]
+
+    def get(self, application_id: Optional[str] = None, email: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Most recent record for an application ID or applicant email"""
+        found = self.locate(application_id=application_id, email=email)
+        return found[0] if found else None
+
+    def locate(self, application_id: Optional[str] = None,
+               email: Optional[str] = None) -> Optional[Tuple[Dict[str, Any], Optional[int]]]:
+        """(record, sheet row) of the most recent match; the row is None until the record is flushed"""
+        where, params = self._where({'application_id': application_id, 'email': email})
+        if not params:
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT record, sheet_row FROM applications{where} ORDER BY row_id DESC LIMIT 1", params
+            ).fetchone()
+        return (json.loads(row[0]), row[1]) if row else None
+
+    def set_sheet_rows(self, rows_by_application_id: Dict[str, int]):
+        """Record where queued applications landed in the sheet"""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "UPDATE applications SET sheet_row = ? WHERE record_key = ?",
+                [(row, f"id:{application_id}") for application_id, row in rows_by_application_id.items()]
+            )
+
+    def count(self, **filters: Optional[str]) -> int:
+        where, params = self._where(filters)
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM applications{where}", params).fetchone()[0]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Totals grouped by specialization, status, term and format, computed from the indexes"""
+        stats: Dict[str, Any] = {'total_applications': self.count()}
+        with self._lock:
+            for name, column in STATS_GROUPS.items():
+                rows = self._conn.execute(
+                    f"SELECT COALESCE({column}, 'Unknown'), COUNT(*) FROM applications GROUP BY {column}"
+                ).fetchall()
+                stats[name] = {value: count for value, count in rows}
+        return stats
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
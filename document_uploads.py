@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+Streaming Document Uploads for MSAI Applications
+Copies uploaded files to disk in fixed-size chunks while hashing them,
+enforces per-file and per-application size caps, dedupes identical
+re-uploads of a document and hands new files to a background Google Drive sync worker
+"""
+
+import asyncio
+import hashlib
+import itertools
+import json
+import os
+import queue
+import random
+import re
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+CHUNK_SIZE = 1 << 20
+APPLICATION_ID_PATTERN = re.compile(r"[A-Za-z0-9_-]{1,64}")
+UNSAFE_FILENAME_CHARS = re.compile(r"[^A-Za-z0-9._-]+")
+MANIFEST_NAME = 'manifest.json'
+
+
+class UploadTooLarge(ValueError):
+    """A file, or an application's documents in total, exceed the configured cap"""
+
+
+def safe_filename(filename: Optional[str]) -> str:
+    """Client filename reduced to a plain basename that cannot escape the upload directory"""
+    name = UNSAFE_FILENAME_CHARS.sub('_', Path(filename or '').name).strip('._')
+    return name or 'document'
+
+
+class DocumentStore:
+    """Per-application document directories, each with a manifest of what it holds.
+
+    uploads/{application_id}/manifest.json lists every stored document with
+    its SHA-256, size and Drive sync state; the manifest is the source of
+    truth for dedupe, the per-application cap and pending Drive syncs.
+    """
+
+    def __init__(self, root: str = 'uploads', max_file_bytes: int = 25 << 20,
+                 max_application_bytes: int = 100 << 20, chunk_size: int = CHUNK_SIZE):
+        self.root = Path(root)
+        self.incoming = self.root / '.incoming'
+        self.max_file_bytes = max_file_bytes
+        self.max_application_bytes = max_application_bytes
+        self.chunk_size = chunk_size
+        self._manifest_lock = threading.Lock()
+
+    # Manifests
+
+    def application_dir(self, application_id: str) -> Path:
+        if not APPLICATION_ID_PATTERN.fullmatch(application_id or ''):
+            raise ValueError(f"Invalid application ID '{application_id}'")
+        return self.root / application_id
+
+    def load_manifest(self, application_id: str) -> Dict[str, Any]:
+        path = self.application_dir(application_id) / MANIFEST_NAME
+        if not path.exists():
+            return {'application_id': application_id, 'documents': []}
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _write_manifest(self, application_id: str, manifest: Dict[str, Any]):
+        path = self.application_dir(application_id) / MANIFEST_NAME
+        tmp_path = path.with_name(path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def used_bytes(self, application_id: str) -> int:
+        return sum(doc['size'] for doc in self.load_manifest(application_id)['documents'])
+
+    # Uploads
+
+    async def save(self, application_id: str, kind: str, upload: Any) -> Dict[str, Any]:
+        """Stream an UploadFile-like object (async read(n)) into the application's directory.
+
+        Returns the document's manifest entry plus 'duplicate', which is True
+        when the application already holds identical content of the same
+        kind. Raises UploadTooLarge as soon as a cap is exceeded and
+        ValueError for a bad ID.
+        """
+        return (await self.save_all(application_id, [(kind, upload)]))[0]
+
+    async def save_all(self, application_id: str, uploads: List[Tuple[str, Any]]) -> List[Dict[str, Any]]:
+        """Save several (kind, upload) pairs as one unit: either all are stored or none is.
+
+        Every file is streamed to a temp file first and the manifest is
+        updated once they have all arrived, so a file rejected part-way
+        through leaves none of the request's files behind.
+        """
+        upload_dir = self.application_dir(application_id)
+        remaining = self.max_application_bytes - await asyncio.to_thread(self.used_bytes, application_id)
+        staged = []
+        try:
+            for kind, upload in uploads:
+                limit = min(self.max_file_bytes, remaining)
+                # Reject on the declared size before reading anything when the client sent one
+                declared = getattr(upload, 'size', None)
+                if declared is not None and declared > limit:
+                    raise self._too_large(kind, declared, remaining)
+
+                digest, size, tmp_path = await self._stream_to_temp(upload, kind, limit, remaining)
+                document = {
+                    'kind': kind,
+                    'filename': safe_filename(getattr(upload, 'filename', None)),
+                    'sha256': digest,
+                    'size': size,
+                    'uploaded_at': datetime.now().isoformat(),
+                    'drive_file_id': None
+                }
+                document['path'] = str(upload_dir / f"{kind}_{digest[:12]}_{document['filename']}")
+                staged.append((tmp_path, document))
+                remaining -= size
+        except BaseException:
+            self._discard(staged)
+            raise
+        return await asyncio.to_thread(self._commit, application_id, staged)
+
+    def _too_large(self, kind: str, size: int, remaining: int) -> UploadTooLarge:
+        if size > self.max_file_bytes:
+            return UploadTooLarge(f"{kind} exceeds the {self.max_file_bytes // (1 << 20)} MB per-file limit")
+        return UploadTooLarge(f"{kind} would exceed the {self.max_application_bytes // (1 << 20)} MB "
+                              f"per-application limit ({max(remaining, 0)} bytes left)")
+
+    async def _stream_to_temp(self, upload: Any, kind: str, limit: int, remaining: int) -> Tuple[str, int, Path]:
+        """Copy chunk by chunk into a temp file, hashing as we go; memory use is one chunk"""
+        self.incoming.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=self.incoming)
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                while True:
+                    chunk = await upload.read(self.chunk_size)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    if size > limit:
+                        raise self._too_large(kind, size, remaining)
+                    # Hashing and the disk write happen off the event loop
+                    await asyncio.to_thread(self._write_chunk, f, digest, chunk)
+        except BaseException:
+            os.remove(tmp_name)
+            raise
+        return digest.hexdigest(), size, Path(tmp_name)
+
+    @staticmethod
+    def _write_chunk(f, digest, chunk: bytes):
+        digest.update(chunk)
+        f.write(chunk)
+
+    @staticmethod
+    def _discard(staged: List[Tuple[Path, Dict[str, Any]]]):
+        for tmp_path, _ in staged:
+            os.remove(tmp_path)
+
+    def _commit(self, application_id: str,
+                staged: List[Tuple[Path, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """Move finished uploads into place, dropping any the application already has"""
+        with self._manifest_lock:
+            manifest = self.load_manifest(application_id)
+            # Identical content uploaded as another kind (a resume sent as the transcript) is kept apart
+            existing = {(doc['kind'], doc['sha256']): doc for doc in manifest['documents']}
+            added = []
+            for _, document in staged:
+                key = (document['kind'], document['sha256'])
+                if key not in existing:
+                    existing[key] = document
+                    added.append(document)
+
+            # Concurrent uploads for one application are only reconciled here
+            used = sum(doc['size'] for doc in manifest['documents'])
+            size = sum(document['size'] for document in added)
+            if used + size > self.max_application_bytes:
+                self._discard(staged)
+                raise self._too_large(added[-1]['kind'], size, self.max_application_bytes - used)
+
+            results = []
+            for tmp_path, document in staged:
+                stored = existing[(document['kind'], document['sha256'])]
+                if stored is not document:
+                    os.remove(tmp_path)
+                    results.append({**stored, 'duplicate': True})
+                    continue
+                Path(document['path']).parent.mkdir(parents=True, exist_ok=True)
+                os.replace(tmp_path, document['path'])
+                results.append({**document, 'duplicate': False})
+            if added:
+                manifest['documents'].extend(added)
+                self._write_manifest(application_id, manifest)
+        return results
+
+    # Drive sync state
+
+    def pending_sync(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """(application_id, document) for every stored document not yet on Drive"""
+        if not self.root.exists():
+            return
+        for manifest_path in sorted(self.root.glob(f"*/{MANIFEST_NAME}")):
+            application_id = manifest_path.parent.name
+            for document in self.load_manifest(application_id)['documents']:
+                if not document.get('drive_file_id'):
+                    yield application_id, document
+
+    def mark_synced(self, application_id: str, path: str, drive_file_id: str):
+        with self._manifest_lock:
+            manifest = self.load_manifest(application_id)
+            for document in manifest['documents']:
+                if document['path'] == path:
+                    document['drive_file_id'] = drive_file_id
+            self._write_manifest(application_id, manifest)
+
+
+class SyncUnavailable(RuntimeError):
+    """The sync target cannot take any document right now (e.g. Drive is not authenticated)"""
+
+
+class DocumentSyncWorker:
+    """Background thread that pushes stored documents to Drive, retrying with backoff.
+
+    sync(path, application_id, document) uploads one file and returns its
+    Drive file ID. A document whose sync fails goes to the back of the queue
+    with a backoff delay and is given up after max_attempts; SyncUnavailable
+    instead pauses the worker without counting against the document. Sync
+    state lives in the store's manifests, so documents still pending at
+    shutdown, or given up, are picked up again by the next start().
+    """
+
+    def __init__(self, store: DocumentStore, sync: Callable[[str, str, Dict[str, Any]], str],
+                 backoff_base: float = 1.0, backoff_max: float = 60.0, max_attempts: int = 5):
+        self.store = store
+        self.sync = sync
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_attempts = max_attempts
+        # (due, sequence, application_id, document, failed attempts): due retries wait behind new documents
+        self._queue: "queue.PriorityQueue[Tuple[float, int, str, Dict[str, Any], int]]" = queue.PriorityQueue()
+        self._sequence = itertools.count()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.stats = {'submitted': 0, 'synced': 0, 'failures': 0, 'given_up': 0, 'paused': False,
+                      'last_error': None}
+
+    def submit(self, application_id: str, document: Dict[str, Any]):
+        """Queue a document; while the worker is not running it waits in the manifest for the next start()"""
+        if self._thread is None:
+            return
+        self._put(application_id, document, attempts=0, delay=0.0)
+        self.stats['submitted'] += 1
+
+    def _put(self, application_id: str, document: Dict[str, Any], attempts: int, delay: float):
+        self._queue.put((time.monotonic() + delay, next(self._sequence), application_id, document, attempts))
+
+    def _backoff(self, failures: int) -> float:
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (failures - 1)))
+
+    def _sync_one(self, application_id: str, document: Dict[str, Any], attempts: int):
+        try:
+            drive_file_id = self.sync(document['path'], application_id, document)
+        except SyncUnavailable:
+            raise
+        except Exception as e:
+            attempts += 1
+            self.stats['failures'] += 1
+            self.stats['last_error'] = str(e)
+            if attempts >= self.max_attempts:
+                self.stats['given_up'] += 1
+                print(f"⚠️  Drive sync of {document['path']} failed {attempts} times ({e}); "
+                      f"leaving it for the next start")
+                return
+            delay = self._backoff(attempts)
+            print(f"⚠️  Drive sync of {document['path']} failed ({e}); retrying in {delay:.1f}s")
+            self._put(application_id, document, attempts, delay)
+            return
+        self.store.mark_synced(application_id, document['path'], drive_file_id)
+        self.stats['synced'] += 1
+
+    def _run(self):
+        pauses = 0
+        while not self._stop.is_set():
+            try:
+                due, sequence, application_id, document, attempts = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            if self._stop.is_set():
+                break
+            wait = due - time.monotonic()
+            if wait > 0:
+                self._queue.put((due, sequence, application_id, document, attempts))
+                self._stop.wait(min(wait, 0.5))
+                continue
+            try:
+                self._sync_one(application_id, document, attempts)
+            except SyncUnavailable as e:
+                # Nothing can sync until the target is back: keep the document at the front and wait
+                pauses += 1
+                if not self.stats['paused']:
+                    print(f"⚠️  Drive sync paused: {e}")
+                self.stats['paused'] = True
+                self.stats['last_error'] = str(e)
+                self._queue.put((due, sequence, application_id, document, attempts))
+                self._stop.wait(self._backoff(pauses))
+            else:
+                pauses = 0
+                self.stats['paused'] = False
+
+    def start(self) -> threading.Thread:
+        """Queue everything the manifests still list as unsynced, then start the worker"""
+        if self._thread is not None and self._thread.is_alive():
+            return self._thread
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="drive-document-sync", daemon=True)
+        for application_id, document in self.store.pending_sync():
+            self.submit(application_id, document)
+        self._thread.start()
+        return self._thread
+
+    def stop(self):
+        self._stop.set()
+        # Wake the worker if it is waiting on an empty queue
+        self._queue.put((float('-inf'), -1, '', {}, 0))
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        # Anything still queued is re-read from the manifests on the next start
+        self._queue = queue.PriorityQueue()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, 'pending': self._queue.qsize()}
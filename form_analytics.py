@@ -8,10 +8,49 @@ import json
 import pandas as pd
 from typing import Dict, List, Any, Optional
 from datetime import datetime, timedelta
-import matplotlib.pyplot as plt
-import seaborn as sns
 from collections import Counter
 import numpy as np
+from form_analytics_charts import ChartRenderer, chart_specs
+
+# Fields counted towards completion rates
+REQUIRED_FIELDS = [
+    "Full Name", "Email Address", "Phone Number", "Date of Birth", "Gender",
+    "Mailing Address", "Undergraduate Degree", "Institution", "GPA", "Graduation Year"
+]
+
+ESSAY_FIELDS = [
+    "Statement of Purpose (750-1000 words)",
+    "Personal Statement (500-750 words)",
+    "Research Interests and Potential Thesis Topics (300-500 words)",
+    "Career Goals and Professional Development (300-500 words)"
+]
+
+# Form field -> key in analyze_test_scores()
+TEST_SCORE_FIELDS = {
+    "GRE Verbal Score": "gre_verbal",
+    "GRE Quantitative Score": "gre_quantitative", 
+    "GRE Writing Score": "gre_writing",
+    "TOEFL Total Score": "toefl",
+    "IELTS Overall Score": "ielts"
+}
+
+PREREQUISITES_FIELD = "Prerequisite Coursework Completed"
+PREREQUISITES = [
+    "Calculus (I, II, III)", "Linear Algebra", "Statistics and Probability",
+    "Programming (Python, Java, C++)", "Data Structures and Algorithms",
+    "Machine Learning or AI", "Database Systems", "Computer Science Fundamentals"
+]
+
+def flatten_response(response: Dict[str, Any]) -> Dict[str, Any]:
+    """Flatten one level of nested sections into "section_field" keys"""
+    flattened = {}
+    for key, value in response.items():
+        if isinstance(value, dict):
+            for sub_key, sub_value in value.items():
+                flattened[f"{key}_{sub_key}"] = sub_value
+        else:
+            flattened[key] = value
+    return flattened
 
 class FormAnalytics:
     """Analytics engine for Google Form responses"""
@@ -39,18 +78,7 @@ class FormAnalytics:
             return pd.DataFrame()
         
         # Flatten nested responses
-        flattened_responses = []
-        for response in self.responses:
-            flattened = {}
-            for key, value in response.items():
-                if isinstance(value, dict):
-                    for sub_key, sub_value in value.items():
-                        flattened[f"{key}_{sub_key}"] = sub_value
-                else:
-                    flattened[key] = value
-            flattened_responses.append(flattened)
-        
-        return pd.DataFrame(flattened_responses)
+        return pd.DataFrame([flatten_response(response) for response in self.responses])
     
     def get_summary_stats(self) -> Dict[str, Any]:
         """Get summary statistics"""
@@ -60,15 +88,7 @@ class FormAnalytics:
         total_responses = len(self.df)
         
         # Calculate completion rates
-        required_fields = [
-            "Full Name", "Email Address", "Phone Number", "Date of Birth", "Gender",
-            "Mailing Address", "Undergraduate Degree", "Institution", "GPA", "Graduation Year"
-        ]
-        
-        completion_rates = {}
-        for field in required_fields:
-            if field in self.df.columns:
-                completion_rates[field] = (self.df[field].notna().sum() / total_responses) * 100
+        completion_rates = self._completion_rates()
         
         # Calculate average GPA
         avg_gpa = None
@@ -101,6 +121,15 @@ class FormAnalytics:
             "date_range": self._get_date_range()
         }
     
+    def _completion_rates(self) -> Dict[str, float]:
+        """Percentage of responses answering each required field"""
+        total_responses = len(self.df)
+        completion_rates = {}
+        for field in REQUIRED_FIELDS:
+            if field in self.df.columns:
+                completion_rates[field] = (self.df[field].notna().sum() / total_responses) * 100
+        return completion_rates
+    
     def _get_date_range(self) -> Dict[str, str]:
         """Get date range of responses"""
         if "Timestamp" in self.df.columns:
@@ -113,16 +142,9 @@ class FormAnalytics:
     
     def analyze_essays(self) -> Dict[str, Any]:
         """Analyze essay responses"""
-        essay_fields = [
-            "Statement of Purpose (750-1000 words)",
-            "Personal Statement (500-750 words)",
-            "Research Interests and Potential Thesis Topics (300-500 words)",
-            "Career Goals and Professional Development (300-500 words)"
-        ]
-        
         essay_analysis = {}
         
-        for field in essay_fields:
+        for field in ESSAY_FIELDS:
             if field in self.df.columns:
                 essays = self.df[field].dropna()
                 if len(essays) > 0:
@@ -191,17 +213,9 @@ class FormAnalytics:
     
     def analyze_test_scores(self) -> Dict[str, Any]:
         """Analyze standardized test scores"""
-        test_fields = {
-            "GRE Verbal Score": "gre_verbal",
-            "GRE Quantitative Score": "gre_quantitative", 
-            "GRE Writing Score": "gre_writing",
-            "TOEFL Total Score": "toefl",
-            "IELTS Overall Score": "ielts"
-        }
-        
         analysis = {}
         
-        for field, key in test_fields.items():
+        for field, key in TEST_SCORE_FIELDS.items():
             if field in self.df.columns:
                 scores = pd.to_numeric(self.df[field], errors='coerce').dropna()
                 if len(scores) > 0:
@@ -218,25 +232,19 @@ class FormAnalytics:
     
     def analyze_prerequisites(self) -> Dict[str, Any]:
         """Analyze prerequisite coursework completion"""
-        if "Prerequisite Coursework Completed" not in self.df.columns:
+        if PREREQUISITES_FIELD not in self.df.columns:
             return {}
         
-        prerequisites = [
-            "Calculus (I, II, III)", "Linear Algebra", "Statistics and Probability",
-            "Programming (Python, Java, C++)", "Data Structures and Algorithms",
-            "Machine Learning or AI", "Database Systems", "Computer Science Fundamentals"
-        ]
-        
         completion_counts = {}
-        for prereq in prerequisites:
+        for prereq in PREREQUISITES:
             # Check if prerequisite is mentioned in responses
             count = 0
-            for response in self.df["Prerequisite Coursework Completed"].dropna():
+            for response in self.df[PREREQUISITES_FIELD].dropna():
                 if prereq in str(response):
                     count += 1
             completion_counts[prereq] = count
         
-        total_responses = len(self.df["Prerequisite Coursework Completed"].dropna())
+        total_responses = len(self.df[PREREQUISITES_FIELD].dropna())
         
         return {
             "total_responses": total_responses,
@@ -247,11 +255,11 @@ class FormAnalytics:
             }
         }
     
-    def generate_insights(self) -> List[str]:
-        """Generate actionable insights from the data"""
+    def generate_insights(self, stats: Optional[Dict[str, Any]] = None) -> List[str]:
+        """Generate actionable insights from the data (or from already computed summary stats)"""
         insights = []
         
-        stats = self.get_summary_stats()
+        stats = stats if stats is not None else self.get_summary_stats()
         
         # Response volume insights
         if stats["total_responses"] > 0:
@@ -290,60 +298,37 @@ class FormAnalytics:
         
         return insights
     
-    def create_visualizations(self, output_dir: str = "analytics_plots"):
-        """Create visualization plots"""
-        import os
-        os.makedirs(output_dir, exist_ok=True)
-        
+    def _chart_data(self) -> Optional[Dict[str, Any]]:
+        """Inputs of each chart (None where the field was never answered); None without responses"""
         if self.df.empty:
-            print("No data to visualize")
-            return
+            return None
         
-        # Set style
-        plt.style.use('seaborn-v0_8')
+        def counts(field):
+            return self.df[field].value_counts() if field in self.df.columns else None
         
-        # GPA distribution
-        if "GPA" in self.df.columns:
-            gpa_values = pd.to_numeric(self.df["GPA"], errors='coerce').dropna()
-            if len(gpa_values) > 0:
-                plt.figure(figsize=(10, 6))
-                plt.hist(gpa_values, bins=20, alpha=0.7, color='skyblue', edgecolor='black')
-                plt.xlabel('GPA')
-                plt.ylabel('Frequency')
-                plt.title('GPA Distribution of Applicants')
-                plt.axvline(gpa_values.mean(), color='red', linestyle='--', label=f'Mean: {gpa_values.mean():.2f}')
-                plt.legend()
-                plt.tight_layout()
-                plt.savefig(f"{output_dir}/gpa_distribution.png", dpi=300, bbox_inches='tight')
-                plt.close()
-        
-        # Gender distribution
-        if "Gender" in self.df.columns:
-            gender_counts = self.df["Gender"].value_counts()
-            if len(gender_counts) > 0:
-                plt.figure(figsize=(8, 6))
-                gender_counts.plot(kind='bar', color=['lightblue', 'lightpink', 'lightgreen', 'lightgray'])
-                plt.xlabel('Gender')
-                plt.ylabel('Count')
-                plt.title('Gender Distribution of Applicants')
-                plt.xticks(rotation=45)
-                plt.tight_layout()
-                plt.savefig(f"{output_dir}/gender_distribution.png", dpi=300, bbox_inches='tight')
-                plt.close()
-        
-        # Employment status distribution
-        if "Current Employment Status" in self.df.columns:
-            emp_counts = self.df["Current Employment Status"].value_counts()
-            if len(emp_counts) > 0:
-                plt.figure(figsize=(10, 6))
-                emp_counts.plot(kind='pie', autopct='%1.1f%%', startangle=90)
-                plt.title('Current Employment Status of Applicants')
-                plt.ylabel('')
-                plt.tight_layout()
-                plt.savefig(f"{output_dir}/employment_status.png", dpi=300, bbox_inches='tight')
-                plt.close()
+        return {
+            "gpa_values": pd.to_numeric(self.df["GPA"], errors='coerce').dropna() if "GPA" in self.df.columns else None,
+            "gender_counts": counts("Gender"),
+            "employment_counts": counts("Current Employment Status")
+        }
+    
+    def chart_specs(self) -> List[Dict[str, Any]]:
+        """Lightweight JSON chart specs (aggregates only) for the dashboard"""
+        return chart_specs(self._chart_data())
+    
+    def create_visualizations(self, output_dir: str = "analytics_plots", png: bool = True,
+                              max_workers: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+        """Write chart specs to output_dir/charts.json and render PNGs in parallel.
+        Charts whose inputs are unchanged since the last call are not redrawn."""
+        specs = self.chart_specs()
+        if not specs:
+            print("No data to visualize")
+            return {}
         
-        print(f"Visualizations saved to {output_dir}/")
+        results = ChartRenderer(output_dir, max_workers=max_workers).render(specs, png=png)
+        rendered = sum(result["rendered"] for result in results.values())
+        print(f"Visualizations saved to {output_dir}/ ({rendered} rendered, {len(results) - rendered} unchanged)")
+        return results
 
 def main():
     """Test the analytics with sample data"""
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Batch Google Form Analytics
+Loads responses once into typed columns (numeric fields coerced a single
+time, categoricals, Arrow strings) and computes every report section with
+vectorized column operations
+"""
+
+import json
+from typing import Any, Dict
+
+import numpy as np
+import pandas as pd
+
+from form_analytics import (
+    ESSAY_FIELDS, PREREQUISITES, PREREQUISITES_FIELD, REQUIRED_FIELDS, TEST_SCORE_FIELDS,
+    FormAnalytics, flatten_response
+)
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.json as pajson
+    PYARROW_AVAILABLE = True
+except ImportError:
+    pa = None
+    pc = None
+    pajson = None
+    PYARROW_AVAILABLE = False
+
+NUMERIC_FIELDS = ["GPA", "Graduation Year", *TEST_SCORE_FIELDS]
+CATEGORICAL_FIELDS = ["Gender", "Current Employment Status", "English Proficiency", "Institution"]
+TEXT_FIELDS = [*ESSAY_FIELDS, PREREQUISITES_FIELD]
+NDJSON_SUFFIXES = ('.ndjson', '.jsonl')
+# Byte -> is whitespace, for the ASCII characters str.isspace() accepts: \t \n \v \f \r, \x1c-\x1f and space
+IS_SPACE_BYTE = np.zeros(256, dtype=bool)
+IS_SPACE_BYTE[[9, 10, 11, 12, 13, 28, 29, 30, 31, 32]] = True
+# The non-ASCII characters str.isspace() accepts (NBSP, em space, ... as pasted from word processors), as RE2
+UNICODE_SPACE_PATTERN = r"[\x{85}\x{a0}\x{1680}\x{2000}-\x{200a}\x{2028}\x{2029}\x{202f}\x{205f}\x{3000}]"
+
+
+def _flatten_table(table: "pa.Table") -> "pa.Table":
+    """One level of struct columns flattened to "section_field", like flatten_response()"""
+    names = []
+    for field in table.schema:
+        if pa.types.is_struct(field.type):
+            names.extend(f"{field.name}_{child.name}" for child in field.type)
+        else:
+            names.append(field.name)
+    return table.flatten().rename_columns(names)
+
+
+def read_ndjson(path: str) -> pd.DataFrame:
+    """NDJSON responses as a flat DataFrame, parsed by Arrow's reader when the columns have one type each"""
+    if PYARROW_AVAILABLE:
+        try:
+            return _flatten_table(pajson.read_json(path)).to_pandas()
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            # Mixed types within a field (e.g. GPA as text and as a number); parse row by row
+            pass
+    with open(path, 'r', encoding='utf-8') as f:
+        return pd.DataFrame([flatten_response(json.loads(line)) for line in f if line.strip()])
+
+
+def typed_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Coerce each known field to its analysis dtype once"""
+    columns = {}
+    for field in df.columns:
+        column = df[field]
+        if field in NUMERIC_FIELDS:
+            column = pd.to_numeric(column, errors='coerce').astype('float64')
+        elif field in CATEGORICAL_FIELDS:
+            column = column.astype('category')
+        elif field in TEXT_FIELDS:
+            column = column.astype('string[pyarrow]' if PYARROW_AVAILABLE else 'string')
+        elif field == "Timestamp":
+            column = pd.to_datetime(column, errors='coerce')
+        columns[field] = column
+    return pd.DataFrame(columns, index=df.index)
+
+
+def word_counts(text: pd.Series) -> pd.Series:
+    """Whitespace-separated word count of each non-null value, as len(str.split()) counts them.
+
+    With pyarrow the count runs over the UTF-8 buffer: a word starts at every
+    non-space byte that follows a space or begins a value. Values holding
+    non-ASCII text first have their Unicode spaces replaced by ' '.
+    """
+    text = text.dropna()
+    if not PYARROW_AVAILABLE:
+        return text.str.split().str.len().astype('int64')
+
+    array = pa.array(text, type=pa.large_string())
+    if isinstance(array, pa.ChunkedArray):
+        array = array.combine_chunks()
+    if not pc.all(pc.string_is_ascii(array)).as_py():
+        array = pc.replace_substring_regex(array, UNICODE_SPACE_PATTERN, ' ')
+    _, offsets_buffer, data_buffer = array.buffers()
+    offsets = np.frombuffer(offsets_buffer, dtype=np.int64)[array.offset:array.offset + len(array) + 1]
+    start = offsets[0]
+    offsets = offsets - start
+    chars = (np.frombuffer(data_buffer, dtype=np.uint8)[start:start + offsets[-1]]
+             if data_buffer is not None else np.empty(0, dtype=np.uint8))
+
+    space = IS_SPACE_BYTE[chars]
+    starts = ~space
+    starts[1:] &= space[:-1]
+    firsts = offsets[:-1][offsets[1:] > offsets[:-1]]
+    starts[firsts] = ~space[firsts]
+    # Word starts per value: how many start positions fall inside its byte range
+    positions = np.flatnonzero(starts)
+    counts = np.searchsorted(positions, offsets[1:]) - np.searchsorted(positions, offsets[:-1])
+    return pd.Series(counts, index=text.index, dtype='int64')
+
+
+def contains_count(text: pd.Series, pattern: str) -> int:
+    """Number of non-null values containing pattern"""
+    text = text.dropna()
+    if PYARROW_AVAILABLE:
+        return int(pc.sum(pc.match_substring(pa.array(text), pattern)).as_py() or 0)
+    return int(text.str.contains(pattern, regex=False).sum())
+
+
+class BatchFormAnalytics(FormAnalytics):
+    """FormAnalytics over columns typed at load time.
+
+    .ndjson/.jsonl files are parsed straight into Arrow columns; a JSON
+    array file is flattened once as before. The inherited reports then run
+    on pre-coerced columns, and essays and prerequisites use Arrow string
+    kernels instead of per-response Python loops.
+    """
+
+    def __init__(self, responses_file: str = "form_responses.json"):
+        self.responses_file = responses_file
+        frame = self._load_frame()
+        # Answered counts come from the raw values: "n/a" in GPA is an answer, just not a number
+        self.answered = frame.notna().sum()
+        self.df = typed_columns(frame)
+
+    def _load_frame(self) -> pd.DataFrame:
+        if not self.responses_file.endswith(NDJSON_SUFFIXES):
+            responses = self._load_responses()
+            return pd.DataFrame([flatten_response(response) for response in responses])
+        try:
+            return read_ndjson(self.responses_file)
+        except FileNotFoundError:
+            print(f"Responses file {self.responses_file} not found. Using empty dataset.")
+            return pd.DataFrame()
+
+    def _completion_rates(self) -> Dict[str, float]:
+        total_responses = len(self.df)
+        return {field: self.answered[field] / total_responses * 100
+                for field in REQUIRED_FIELDS if field in self.answered.index}
+
+    def analyze_essays(self) -> Dict[str, Any]:
+        """Analyze essay responses"""
+        essay_analysis = {}
+        for field in ESSAY_FIELDS:
+            if field in self.df.columns:
+                counts = word_counts(self.df[field])
+                if len(counts) > 0:
+                    essay_analysis[field] = {
+                        "count": len(counts),
+                        "average_words": counts.mean(),
+                        "min_words": counts.min(),
+                        "max_words": counts.max(),
+                        "median_words": counts.median()
+                    }
+        return essay_analysis
+
+    def analyze_prerequisites(self) -> Dict[str, Any]:
+        """Analyze prerequisite coursework completion"""
+        if PREREQUISITES_FIELD not in self.df.columns:
+            return {}
+
+        coursework = self.df[PREREQUISITES_FIELD]
+        completion_counts = {prereq: contains_count(coursework, prereq) for prereq in PREREQUISITES}
+        total_responses = int(coursework.notna().sum())
+        return {
+            "total_responses": total_responses,
+            "completion_counts": completion_counts,
+            "completion_percentages": {
+                prereq: (count / total_responses * 100) if total_responses > 0 else 0
+                for prereq, count in completion_counts.items()
+            }
+        }
+
+    def full_report(self) -> Dict[str, Any]:
+        """Every analytics section from a single load of the columns"""
+        summary = self.get_summary_stats()
+        return {
+            "summary": summary,
+            "essays": self.analyze_essays(),
+            "academics": self.analyze_academic_qualifications(),
+            "test_scores": self.analyze_test_scores(),
+            "prerequisites": self.analyze_prerequisites(),
+            "insights": self.generate_insights(summary)
+        }
+
+
+def main():
+    """Print the full report for form_responses.json (or a path given on the command line)"""
+    import sys
+    analytics = BatchFormAnalytics(sys.argv[1] if len(sys.argv) > 1 else "form_responses.json")
+    print(json.dumps(analytics.full_report(), indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
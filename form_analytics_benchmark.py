@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmark for Google Form Analytics
+Times the full report (summary, essays, academics, test scores,
+prerequisites, insights) for FormAnalytics against BatchFormAnalytics on
+synthetic response sets of increasing size
+"""
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+from typing import Any, Dict, Iterator, List
+
+from form_analytics import ESSAY_FIELDS, PREREQUISITES, FormAnalytics
+from form_analytics_batch import BatchFormAnalytics
+
+VOCABULARY = ("machine learning research data model neural network systems problem "
+              "team project experience graduate program industry impact develop").split()
+
+
+def synthetic_responses(count: int, seed: int = 42) -> Iterator[Dict[str, Any]]:
+    """Form responses with realistic field coverage, invalid values and short essays"""
+    rng = random.Random(seed)
+    for i in range(count):
+        yield {
+            "Timestamp": f"2024-{1 + i % 12:02d}-{1 + i % 28:02d} {i % 24:02d}:{i % 60:02d}:00",
+            "Full Name": f"Applicant {i}",
+            "Email Address": f"applicant{i}@example.com",
+            "Phone Number": None if i % 9 == 0 else "555-0100",
+            "Gender": rng.choice(["Female", "Male", "Non-binary", "Prefer not to say"]),
+            "Institution": rng.choice(["MIT", "Stanford", "Ohio State", "IIT Delhi", "Tsinghua"]),
+            "GPA": rng.choice([f"{rng.uniform(2.0, 4.0):.2f}", "n/a"] if i % 20 == 0 else [f"{rng.uniform(2.0, 4.0):.2f}"]),
+            "Graduation Year": rng.randint(2005, 2025),
+            "Current Employment Status": rng.choice(["Student", "Full-time employed", "Part-time employed"]),
+            "English Proficiency": rng.choice(["Native Speaker", "Fluent", "Intermediate"]),
+            "GRE Quantitative Score": rng.randint(140, 170),
+            "TOEFL Total Score": rng.randint(80, 120),
+            ESSAY_FIELDS[0]: " ".join(rng.choices(VOCABULARY, k=rng.randint(20, 120))),
+            "Prerequisite Coursework Completed": ", ".join(rng.sample(PREREQUISITES, rng.randint(0, 6)))
+        }
+
+
+def full_report(analytics: FormAnalytics) -> Dict[str, Any]:
+    """Every section, computed the way FormAnalytics callers do"""
+    return {
+        "summary": analytics.get_summary_stats(),
+        "essays": analytics.analyze_essays(),
+        "academics": analytics.analyze_academic_qualifications(),
+        "test_scores": analytics.analyze_test_scores(),
+        "prerequisites": analytics.analyze_prerequisites(),
+        "insights": analytics.generate_insights()
+    }
+
+
+def timed(fn) -> float:
+    started = time.perf_counter()
+    fn()
+    return time.perf_counter() - started
+
+
+def run_size(count: int, workdir: str, baseline_max: int) -> Dict[str, Any]:
+    """Write count responses as JSON and NDJSON, then time both engines end to end"""
+    json_file = os.path.join(workdir, f"responses_{count}.json")
+    ndjson_file = os.path.join(workdir, f"responses_{count}.ndjson")
+    with open(ndjson_file, 'w', encoding='utf-8') as f:
+        for response in synthetic_responses(count):
+            f.write(json.dumps(response) + '\n')
+
+    result: Dict[str, Any] = {"responses": count, "baseline_s": None, "speedup": None}
+    result["batch_s"] = timed(lambda: BatchFormAnalytics(ndjson_file).full_report())
+
+    if count <= baseline_max:
+        with open(json_file, 'w', encoding='utf-8') as f:
+            json.dump(list(synthetic_responses(count)), f)
+        result["baseline_s"] = timed(lambda: full_report(FormAnalytics(json_file)))
+        result["speedup"] = result["baseline_s"] / result["batch_s"]
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark FormAnalytics against BatchFormAnalytics")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 100000, 1000000],
+                        help="number of synthetic responses per run")
+    parser.add_argument('--baseline-max', type=int, default=100000,
+                        help="skip the row-by-row baseline above this many responses (it holds every response in memory)")
+    parser.add_argument('--json', action='store_true', help="print results as JSON")
+    args = parser.parse_args()
+
+    results: List[Dict[str, Any]] = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for count in args.sizes:
+            results.append(run_size(count, workdir, args.baseline_max))
+            if not args.json:
+                row = results[-1]
+                baseline = f"{row['baseline_s']:.2f}s" if row['baseline_s'] is not None else "skipped"
+                speedup = f"{row['speedup']:.1f}x" if row['speedup'] is not None else "-"
+                print(f"{count:>9,} responses  baseline {baseline:>9}  batch {row['batch_s']:.2f}s  speedup {speedup}")
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Form Analytics Charts
+Turns chart inputs into small JSON specs for the dashboard and renders
+PNGs from those specs in a process pool, skipping charts whose spec has
+not changed since the last render
+"""
+
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+# Bump when the rendering code changes so cached PNGs are redrawn
+RENDER_VERSION = 2
+SPECS_FILE = "charts.json"
+CACHE_FILE = ".chart_cache.json"
+GPA_BINS = 20
+
+
+def chart_specs(chart_data: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """JSON-serializable specs holding only the aggregates each chart plots"""
+    if chart_data is None:
+        return []
+
+    specs = []
+    gpa_values = chart_data.get("gpa_values")
+    if gpa_values is not None and len(gpa_values) > 0:
+        counts, edges = np.histogram(np.asarray(gpa_values, dtype=float), bins=GPA_BINS)
+        specs.append({
+            "name": "gpa_distribution",
+            "type": "histogram",
+            "title": "GPA Distribution of Applicants",
+            "x_label": "GPA",
+            "y_label": "Frequency",
+            "bin_edges": edges.round(6).tolist(),
+            "counts": counts.tolist(),
+            "mean": round(float(np.mean(gpa_values)), 6)
+        })
+
+    gender_counts = chart_data.get("gender_counts")
+    if gender_counts is not None and len(gender_counts) > 0:
+        specs.append({
+            "name": "gender_distribution",
+            "type": "bar",
+            "title": "Gender Distribution of Applicants",
+            "x_label": "Gender",
+            "y_label": "Count",
+            "values": {str(label): int(count) for label, count in gender_counts.items()}
+        })
+
+    employment_counts = chart_data.get("employment_counts")
+    if employment_counts is not None and len(employment_counts) > 0:
+        specs.append({
+            "name": "employment_status",
+            "type": "pie",
+            "title": "Current Employment Status of Applicants",
+            "values": {str(label): int(count) for label, count in employment_counts.items()}
+        })
+    return specs
+
+
+def spec_key(spec: Dict[str, Any]) -> str:
+    """Content hash of a spec; equal keys render identical images"""
+    payload = json.dumps({"version": RENDER_VERSION, "spec": spec}, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def render_chart(spec: Dict[str, Any], path: str) -> str:
+    """Draw one spec to a PNG, in a worker process or the caller's.
+
+    Uses an Agg canvas rather than pyplot and applies the style inside an
+    rc_context, so the caller's backend and rcParams are left untouched.
+    """
+    import matplotlib
+    import matplotlib.style
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    with matplotlib.rc_context():
+        matplotlib.style.use('seaborn-v0_8')
+        if spec["type"] == "histogram":
+            figure = Figure(figsize=(10, 6))
+            ax = figure.add_subplot()
+            edges = spec["bin_edges"]
+            ax.hist(edges[:-1], bins=edges, weights=spec["counts"], alpha=0.7, color='skyblue', edgecolor='black')
+            ax.axvline(spec["mean"], color='red', linestyle='--', label=f"Mean: {spec['mean']:.2f}")
+            ax.legend()
+        elif spec["type"] == "bar":
+            figure = Figure(figsize=(8, 6))
+            ax = figure.add_subplot()
+            ax.bar(list(spec["values"]), list(spec["values"].values()),
+                   color=['lightblue', 'lightpink', 'lightgreen', 'lightgray'])
+            ax.tick_params(axis='x', labelrotation=45)
+        elif spec["type"] == "pie":
+            figure = Figure(figsize=(10, 6))
+            ax = figure.add_subplot()
+            ax.pie(list(spec["values"].values()), labels=list(spec["values"]), autopct='%1.1f%%', startangle=90)
+        else:
+            raise ValueError(f"Unknown chart type '{spec['type']}'")
+
+        ax.set_title(spec["title"])
+        if "x_label" in spec:
+            ax.set_xlabel(spec["x_label"])
+            ax.set_ylabel(spec["y_label"])
+        figure.tight_layout()
+
+        tmp_path = f"{path}.tmp.png"
+        FigureCanvasAgg(figure).print_figure(tmp_path, dpi=300, bbox_inches='tight')
+    os.replace(tmp_path, path)
+    return path
+
+
+class ChartRenderer:
+    """Writes chart specs for the dashboard and (re)renders only the PNGs whose spec changed"""
+
+    def __init__(self, output_dir: str = "analytics_plots", max_workers: Optional[int] = None):
+        self.output_dir = output_dir
+        self.max_workers = max_workers
+        self.cache_path = os.path.join(output_dir, CACHE_FILE)
+
+    def _load_cache(self) -> Dict[str, str]:
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _write_json(self, path: str, data: Any):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, path)
+
+    def render(self, specs: List[Dict[str, Any]], png: bool = True) -> Dict[str, Dict[str, Any]]:
+        """Write charts.json and, with png, each chart's PNG; returns {name: {key, path, rendered}}"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        self._write_json(os.path.join(self.output_dir, SPECS_FILE),
+                         [{**spec, "key": spec_key(spec)} for spec in specs])
+
+        results = {spec["name"]: {"key": spec_key(spec), "path": None, "rendered": False} for spec in specs}
+        if not png:
+            return results
+
+        cache = self._load_cache()
+        stale = []
+        for spec in specs:
+            result = results[spec["name"]]
+            result["path"] = os.path.join(self.output_dir, f"{spec['name']}.png")
+            if cache.get(spec["name"]) != result["key"] or not os.path.exists(result["path"]):
+                stale.append(spec)
+
+        try:
+            if len(stale) == 1:
+                # A pool is not worth its start-up cost for a single chart
+                render_chart(stale[0], results[stale[0]["name"]]["path"])
+                self._mark_rendered(stale[0], results, cache)
+            elif stale:
+                workers = min(len(stale), self.max_workers or os.cpu_count() or 1)
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    futures = [(spec, pool.submit(render_chart, spec, results[spec["name"]]["path"]))
+                               for spec in stale]
+                    for spec, future in futures:
+                        future.result()
+                        self._mark_rendered(spec, results, cache)
+        finally:
+            # Charts that did render stay cached even if another one failed
+            self._write_json(self.cache_path, cache)
+        return results
+
+    @staticmethod
+    def _mark_rendered(spec: Dict[str, Any], results: Dict[str, Dict[str, Any]], cache: Dict[str, str]):
+        results[spec["name"]]["rendered"] = True
+        cache[spec["name"]] = results[spec["name"]]["key"]
@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+Incremental Google Form Analytics
+Tails an append-only NDJSON log of form responses and keeps running
+aggregates, so reports cost O(new responses) instead of a full rescan
+"""
+
+import json
+import math
+import os
+import threading
+from collections import Counter, defaultdict
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from form_analytics import (
+    ESSAY_FIELDS, PREREQUISITES, PREREQUISITES_FIELD, REQUIRED_FIELDS, TEST_SCORE_FIELDS,
+    FormAnalytics, flatten_response
+)
+
+# Bucket labels match FormAnalytics.analyze_academic_qualifications()
+GPA_BUCKETS = [(3.5, "3.5+"), (3.0, "3.0-3.5"), (2.5, "2.5-3.0"), (float('-inf'), "<2.5")]
+
+
+def to_number(value: Any) -> Optional[float]:
+    """Numeric value as pd.to_numeric(errors='coerce') would read it; None when missing or invalid"""
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(number) else number
+
+
+def parse_timestamp(value: Any) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        return pd.Timestamp(value).to_pydatetime()
+    except (TypeError, ValueError):
+        return None
+
+
+def append_response(log_file: str, response: Dict[str, Any]):
+    """Append one form response to the NDJSON log"""
+    with open(log_file, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(response, default=str) + '\n')
+
+
+class RunningStats:
+    """Count, mean, variance (Welford), min and max in O(1) per value.
+
+    Values are also tallied by value, which keeps the median exact; fields
+    like GPA, test scores and word counts only take a small set of distinct values.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = None
+        self.max = None
+        self.values = Counter()
+
+    def add(self, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        self.values[value] += 1
+
+    @property
+    def std(self) -> Optional[float]:
+        """Sample standard deviation, as pandas computes it"""
+        return math.sqrt(self._m2 / (self.count - 1)) if self.count > 1 else None
+
+    @property
+    def median(self) -> Optional[float]:
+        if not self.count:
+            return None
+        lower, upper = (self.count - 1) // 2, self.count // 2
+        seen, low_value = 0, None
+        for value in sorted(self.values):
+            seen += self.values[value]
+            if low_value is None and seen > lower:
+                low_value = value
+            if seen > upper:
+                return (low_value + value) / 2
+
+    def count_where(self, predicate) -> int:
+        return sum(count for value, count in self.values.items() if predicate(value))
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"count": self.count, "mean": self.mean, "median": self.median, "std": self.std,
+                "min": self.min, "max": self.max}
+
+
+class IncrementalFormAnalytics(FormAnalytics):
+    """FormAnalytics backed by running aggregates over an append-only NDJSON log.
+
+    Reports call refresh() first, which reads only lines appended since the
+    last call; a partially written last line is left for the next refresh.
+    Missing-field and coercion rules follow the DataFrame implementation.
+    """
+
+    def __init__(self, log_file: str = "form_responses.ndjson", auto_refresh: bool = True):
+        self.log_file = log_file
+        self.auto_refresh = auto_refresh
+        self._lock = threading.RLock()
+        self._reset()
+        self.refresh()
+
+    def _reset(self):
+        self._offset = 0
+        self._inode = None
+        self.total_responses = 0
+        self.seen_fields = set()
+        self.answered = Counter()
+        self.categories: Dict[str, Counter] = defaultdict(Counter)
+        self.gpa = RunningStats()
+        self.graduation_years = RunningStats()
+        self.essays: Dict[str, RunningStats] = defaultdict(RunningStats)
+        self.test_scores: Dict[str, RunningStats] = defaultdict(RunningStats)
+        self.prerequisite_responses = 0
+        self.prerequisite_counts = Counter()
+        self.earliest: Optional[datetime] = None
+        self.latest: Optional[datetime] = None
+
+    # Ingestion
+
+    def refresh(self) -> int:
+        """Ingest responses appended to the log since the last refresh; returns how many"""
+        with self._lock:
+            if not os.path.exists(self.log_file):
+                return 0
+            stat = os.stat(self.log_file)
+            if stat.st_size < self._offset or stat.st_ino != self._inode:
+                # The log was truncated or replaced; rebuild from the start
+                self._reset()
+                self._inode = stat.st_ino
+
+            with open(self.log_file, 'rb') as f:
+                f.seek(self._offset)
+                data = f.read()
+            complete = data.rfind(b'\n') + 1
+
+            ingested = 0
+            for line in data[:complete].splitlines():
+                if not line.strip():
+                    continue
+                try:
+                    self.ingest(json.loads(line))
+                except json.JSONDecodeError as e:
+                    print(f"Skipping malformed response in {self.log_file}: {e}")
+                    continue
+                ingested += 1
+            self._offset += complete
+            return ingested
+
+    def ingest(self, response: Dict[str, Any]):
+        """Fold a single response into the aggregates"""
+        response = flatten_response(response)
+        with self._lock:
+            self.total_responses += 1
+            self.seen_fields.update(response)
+            for field, value in response.items():
+                if value is not None:
+                    self.answered[field] += 1
+
+            for field in ("Gender", "Current Employment Status", "English Proficiency", "Institution"):
+                if response.get(field) is not None:
+                    self.categories[field][response[field]] += 1
+
+            gpa = to_number(response.get("GPA"))
+            if gpa is not None:
+                self.gpa.add(gpa)
+            year = to_number(response.get("Graduation Year"))
+            if year is not None:
+                self.graduation_years.add(year)
+
+            for field in ESSAY_FIELDS:
+                essay = response.get(field)
+                if essay is not None:
+                    self.essays[field].add(len(str(essay).split()) if essay else 0)
+
+            for field in TEST_SCORE_FIELDS:
+                score = to_number(response.get(field))
+                if score is not None:
+                    self.test_scores[field].add(score)
+
+            coursework = response.get(PREREQUISITES_FIELD)
+            if coursework is not None:
+                self.prerequisite_responses += 1
+                for prereq in PREREQUISITES:
+                    if prereq in str(coursework):
+                        self.prerequisite_counts[prereq] += 1
+
+            timestamp = parse_timestamp(response.get("Timestamp"))
+            if timestamp is not None:
+                self.earliest = timestamp if self.earliest is None else min(self.earliest, timestamp)
+                self.latest = timestamp if self.latest is None else max(self.latest, timestamp)
+
+    def _refresh(self):
+        if self.auto_refresh:
+            self.refresh()
+
+    # Reports
+
+    def _distribution(self, field: str) -> Dict[Any, int]:
+        return dict(self.categories[field].most_common()) if field in self.seen_fields else {}
+
+    def get_summary_stats(self) -> Dict[str, Any]:
+        """Get summary statistics"""
+        self._refresh()
+        with self._lock:
+            if not self.total_responses:
+                return {"total_responses": 0, "message": "No responses found"}
+
+            return {
+                "total_responses": self.total_responses,
+                "completion_rates": {
+                    field: self.answered[field] / self.total_responses * 100
+                    for field in REQUIRED_FIELDS if field in self.seen_fields
+                },
+                "average_gpa": self.gpa.mean if self.gpa.count else None,
+                "gender_distribution": self._distribution("Gender"),
+                "employment_distribution": self._distribution("Current Employment Status"),
+                "english_proficiency_distribution": self._distribution("English Proficiency"),
+                "date_range": self._get_date_range()
+            }
+
+    def _get_date_range(self) -> Dict[str, str]:
+        """Get date range of responses"""
+        if self.earliest is None:
+            return {"earliest": "N/A", "latest": "N/A"}
+        return {"earliest": self.earliest.strftime("%Y-%m-%d %H:%M:%S"),
+                "latest": self.latest.strftime("%Y-%m-%d %H:%M:%S")}
+
+    def analyze_essays(self) -> Dict[str, Any]:
+        """Analyze essay responses"""
+        self._refresh()
+        with self._lock:
+            return {
+                field: {
+                    "count": stats.count,
+                    "average_words": stats.mean,
+                    "min_words": stats.min,
+                    "max_words": stats.max,
+                    "median_words": stats.median
+                }
+                for field in ESSAY_FIELDS
+                for stats in [self.essays.get(field)] if stats is not None and stats.count
+            }
+
+    def analyze_academic_qualifications(self) -> Dict[str, Any]:
+        """Analyze academic qualifications"""
+        self._refresh()
+        analysis = {}
+        with self._lock:
+            if self.gpa.count:
+                distribution = {label: 0 for _, label in GPA_BUCKETS}
+                for value, count in self.gpa.values.items():
+                    label = next(label for floor, label in GPA_BUCKETS if value >= floor)
+                    distribution[label] += count
+                analysis["gpa"] = {**self.gpa.as_dict(), "distribution": distribution}
+
+            years = self.graduation_years
+            if years.count:
+                current_year = datetime.now().year
+                analysis["graduation_year"] = {
+                    "count": years.count,
+                    "mean_year": years.mean,
+                    "years_since_graduation": {
+                        "mean": current_year - years.mean,
+                        "median": current_year - years.median,
+                        "recent_graduates": years.count_where(lambda year: current_year - year <= 2),
+                        "experienced": years.count_where(lambda year: current_year - year > 5)
+                    }
+                }
+
+            if "Institution" in self.seen_fields:
+                institutions = self.categories["Institution"]
+                analysis["institutions"] = {
+                    "total_unique": len(institutions),
+                    "top_10": dict(institutions.most_common(10))
+                }
+        return analysis
+
+    def analyze_test_scores(self) -> Dict[str, Any]:
+        """Analyze standardized test scores"""
+        self._refresh()
+        with self._lock:
+            return {
+                key: self.test_scores[field].as_dict()
+                for field, key in TEST_SCORE_FIELDS.items()
+                if field in self.test_scores and self.test_scores[field].count
+            }
+
+    def analyze_prerequisites(self) -> Dict[str, Any]:
+        """Analyze prerequisite coursework completion"""
+        self._refresh()
+        with self._lock:
+            if PREREQUISITES_FIELD not in self.seen_fields:
+                return {}
+            total = self.prerequisite_responses
+            counts = {prereq: self.prerequisite_counts[prereq] for prereq in PREREQUISITES}
+            return {
+                "total_responses": total,
+                "completion_counts": counts,
+                "completion_percentages": {
+                    prereq: (count / total * 100) if total > 0 else 0 for prereq, count in counts.items()
+                }
+            }
+
+    def _chart_data(self) -> Optional[Dict[str, Any]]:
+        self._refresh()
+        with self._lock:
+            if not self.total_responses:
+                return None
+
+            def counts(field):
+                return pd.Series(self._distribution(field)) if field in self.seen_fields else None
+
+            gpa_values = None
+            if "GPA" in self.seen_fields:
+                gpa_values = pd.Series(np.repeat(list(self.gpa.values), list(self.gpa.values.values())),
+                                       dtype=float)
+            return {
+                "gpa_values": gpa_values,
+                "gender_counts": counts("Gender"),
+                "employment_counts": counts("Current Employment Status")
+            }
+
+
+def main():
+    """Tail form_responses.ndjson and print the current summary"""
+    analytics = IncrementalFormAnalytics()
+    print(f"Ingested {analytics.total_responses} responses from {analytics.log_file}")
+    print(json.dumps(analytics.get_summary_stats(), indent=2, default=str))
+
+    print("\nInsights:")
+    for insight in analytics.generate_insights():
+        print(f"- {insight}")
+
+
+if __name__ == "__main__":
+    main()
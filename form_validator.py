@@ -10,6 +10,50 @@ from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass
 from datetime import datetime, date
 
+REQUIRED_FIELDS = [
+    "Full Name", "Email Address", "Phone Number", "Date of Birth", "Gender",
+    "Mailing Address", "Undergraduate Degree", "Institution", "GPA", "Graduation Year",
+    "Relevant Coursework", "Research Experience and Publications",
+    "Prerequisite Coursework Completed", "Programming Languages Proficiency",
+    "Technical Skills and Tools", "English Proficiency",
+    "Statement of Purpose (750-1000 words)", "Personal Statement (500-750 words)",
+    "Research Interests and Potential Thesis Topics (300-500 words)",
+    "Career Goals and Professional Development (300-500 words)",
+    "Current Employment Status", "Work Experience",
+    "Reference 1 - Name", "Reference 1 - Title/Position", "Reference 1 - Institution/Organization",
+    "Reference 1 - Email", "Reference 1 - Relationship",
+    "Reference 2 - Name", "Reference 2 - Title/Position", "Reference 2 - Institution/Organization",
+    "Reference 2 - Email", "Reference 2 - Relationship"
+]
+
+OPTIONAL_FIELDS = [
+    "Class Rank", "Academic Honors and Awards", "Reference 3 - Name",
+    "Reference 3 - Title/Position", "Reference 3 - Institution/Organization",
+    "Reference 3 - Email", "Reference 3 - Phone", "Reference 3 - Relationship",
+    "Notable Projects", "Diversity and Inclusion Statement (Optional, 200-400 words)",
+    "Honors, Awards, and Recognition", "Extracurricular Activities and Leadership",
+    "Additional Information"
+]
+
+REFERENCE_FIELDS = [
+    "Reference 1 - Name", "Reference 1 - Title/Position", "Reference 1 - Institution/Organization",
+    "Reference 1 - Email", "Reference 1 - Relationship",
+    "Reference 2 - Name", "Reference 2 - Title/Position", "Reference 2 - Institution/Organization", 
+    "Reference 2 - Email", "Reference 2 - Relationship"
+]
+
+TEST_SCORE_FIELDS = ["GRE Verbal Score", "GRE Quantitative Score", "GRE Writing Score", 
+                     "TOEFL Total Score", "IELTS Overall Score"]
+
+ESSAY_FIELDS = ["Statement of Purpose (750-1000 words)", "Personal Statement (500-750 words)",
+                "Research Interests and Potential Thesis Topics (300-500 words)",
+                "Career Goals and Professional Development (300-500 words)"]
+
+DIVERSITY_FIELD = "Diversity and Inclusion Statement (Optional, 200-400 words)"
+
+DEFAULT_EMAIL_PATTERN = r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$"
+DEFAULT_PHONE_PATTERN = r"^[\+]?[1-9][\d]{0,15}$"
+
 @dataclass
 class ValidationResult:
     """Result of form validation"""
@@ -83,9 +127,7 @@ class FormValidator:
                 score -= 3
         
         # Validate test scores
-        test_scores = ["GRE Verbal Score", "GRE Quantitative Score", "GRE Writing Score", 
-                      "TOEFL Total Score", "IELTS Overall Score"]
-        for score_field in test_scores:
+        for score_field in TEST_SCORE_FIELDS:
             if score_field in response_data and response_data[score_field]:
                 score_result = self._validate_test_score(score_field, response_data[score_field])
                 if not score_result["valid"]:
@@ -93,11 +135,7 @@ class FormValidator:
                     score -= 2
         
         # Validate essays
-        essay_fields = ["Statement of Purpose (750-1000 words)", "Personal Statement (500-750 words)",
-                       "Research Interests and Potential Thesis Topics (300-500 words)",
-                       "Career Goals and Professional Development (300-500 words)"]
-        
-        for essay_field in essay_fields:
+        for essay_field in ESSAY_FIELDS:
             if essay_field in response_data and response_data[essay_field]:
                 essay_result = self._validate_essay(essay_field, response_data[essay_field])
                 if not essay_result["valid"]:
@@ -108,8 +146,8 @@ class FormValidator:
                     score -= 3
         
         # Validate diversity statement (optional)
-        if "Diversity and Inclusion Statement (Optional, 200-400 words)" in response_data:
-            diversity_result = self._validate_diversity_statement(response_data["Diversity and Inclusion Statement (Optional, 200-400 words)"])
+        if DIVERSITY_FIELD in response_data:
+            diversity_result = self._validate_diversity_statement(response_data[DIVERSITY_FIELD])
             if not diversity_result["valid"]:
                 warnings.append(f"Diversity statement validation: {diversity_result['message']}")
                 score -= 1
@@ -136,30 +174,25 @@ class FormValidator:
             score=score
         )
     
+    def compile(self):
+        """Rule plan for this config with precompiled regexes, for repeated and bulk validation"""
+        from form_validator_compiled import CompiledValidator
+        return CompiledValidator(self.config)
+    
+    def validate_batch(self, responses: List[Dict[str, Any]], max_workers: Optional[int] = None):
+        """Validate many responses into a columnar ValidationReport (see form_validator_compiled)"""
+        return self.compile().validate_batch(responses, max_workers=max_workers)
+    
     def _get_required_fields(self) -> List[str]:
         """Get list of required fields"""
-        return [
-            "Full Name", "Email Address", "Phone Number", "Date of Birth", "Gender",
-            "Mailing Address", "Undergraduate Degree", "Institution", "GPA", "Graduation Year",
-            "Relevant Coursework", "Research Experience and Publications",
-            "Prerequisite Coursework Completed", "Programming Languages Proficiency",
-            "Technical Skills and Tools", "English Proficiency",
-            "Statement of Purpose (750-1000 words)", "Personal Statement (500-750 words)",
-            "Research Interests and Potential Thesis Topics (300-500 words)",
-            "Career Goals and Professional Development (300-500 words)",
-            "Current Employment Status", "Work Experience",
-            "Reference 1 - Name", "Reference 1 - Title/Position", "Reference 1 - Institution/Organization",
-            "Reference 1 - Email", "Reference 1 - Relationship",
-            "Reference 2 - Name", "Reference 2 - Title/Position", "Reference 2 - Institution/Organization",
-            "Reference 2 - Email", "Reference 2 - Relationship"
-        ]
+        return list(REQUIRED_FIELDS)
     
     def _validate_email(self, email: str) -> Dict[str, Any]:
         """Validate email address"""
         if not email:
             return {"valid": False, "message": "Email is required"}
         
-        pattern = self.validation_rules.get("email", {}).get("pattern", r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$")
+        pattern = self.validation_rules.get("email", {}).get("pattern", DEFAULT_EMAIL_PATTERN)
         
         if re.match(pattern, email):
             return {"valid": True}
@@ -171,7 +204,7 @@ class FormValidator:
         if not phone:
             return {"valid": False, "message": "Phone number is required"}
         
-        pattern = self.validation_rules.get("phone", {}).get("pattern", r"^[\+]?[1-9][\d]{0,15}$")
+        pattern = self.validation_rules.get("phone", {}).get("pattern", DEFAULT_PHONE_PATTERN)
         
         if re.match(pattern, phone):
             return {"valid": True}
@@ -223,6 +256,20 @@ class FormValidator:
         except ValueError:
             return {"valid": False, "message": "Graduation year must be a valid number"}
     
+    def _test_score_rules(self, field_name: str) -> Optional[Dict[str, Any]]:
+        """Range rules configured for a test score field"""
+        if "GRE Verbal" in field_name:
+            return self.validation_rules.get("gre_verbal", {})
+        elif "GRE Quantitative" in field_name:
+            return self.validation_rules.get("gre_quantitative", {})
+        elif "GRE Writing" in field_name:
+            return self.validation_rules.get("gre_writing", {})
+        elif "TOEFL" in field_name:
+            return self.validation_rules.get("toefl", {})
+        elif "IELTS" in field_name:
+            return self.validation_rules.get("ielts", {})
+        return None
+    
     def _validate_test_score(self, field_name: str, score_str: str) -> Dict[str, Any]:
         """Validate standardized test scores"""
         if not score_str:
@@ -232,17 +279,7 @@ class FormValidator:
             score = float(score_str)
             
             # Get validation rules for this field
-            field_rules = None
-            if "GRE Verbal" in field_name:
-                field_rules = self.validation_rules.get("gre_verbal", {})
-            elif "GRE Quantitative" in field_name:
-                field_rules = self.validation_rules.get("gre_quantitative", {})
-            elif "GRE Writing" in field_name:
-                field_rules = self.validation_rules.get("gre_writing", {})
-            elif "TOEFL" in field_name:
-                field_rules = self.validation_rules.get("toefl", {})
-            elif "IELTS" in field_name:
-                field_rules = self.validation_rules.get("ielts", {})
+            field_rules = self._test_score_rules(field_name)
             
             if field_rules:
                 min_score = field_rules.get("min", 0)
@@ -256,6 +293,18 @@ class FormValidator:
         except ValueError:
             return {"valid": False, "message": "Score must be a valid number"}
     
+    def _essay_key(self, field_name: str) -> Optional[str]:
+        """essay_requirements key for an essay field"""
+        if "Statement of Purpose" in field_name:
+            return "statement_of_purpose"
+        elif "Personal Statement" in field_name:
+            return "personal_statement"
+        elif "Research Interests" in field_name:
+            return "research_interests"
+        elif "Career Goals" in field_name:
+            return "career_goals"
+        return None
+    
     def _validate_essay(self, field_name: str, essay_text: str) -> Dict[str, Any]:
         """Validate essay length and content"""
         if not essay_text:
@@ -264,15 +313,7 @@ class FormValidator:
         word_count = len(essay_text.split())
         
         # Get essay requirements
-        essay_key = None
-        if "Statement of Purpose" in field_name:
-            essay_key = "statement_of_purpose"
-        elif "Personal Statement" in field_name:
-            essay_key = "personal_statement"
-        elif "Research Interests" in field_name:
-            essay_key = "research_interests"
-        elif "Career Goals" in field_name:
-            essay_key = "career_goals"
+        essay_key = self._essay_key(field_name)
         
         if essay_key and essay_key in self.essay_requirements:
             requirements = self.essay_requirements[essay_key]
@@ -307,15 +348,8 @@ class FormValidator:
     
     def _validate_references(self, response_data: Dict[str, Any]) -> Dict[str, Any]:
         """Validate reference information"""
-        required_ref_fields = [
-            "Reference 1 - Name", "Reference 1 - Title/Position", "Reference 1 - Institution/Organization",
-            "Reference 1 - Email", "Reference 1 - Relationship",
-            "Reference 2 - Name", "Reference 2 - Title/Position", "Reference 2 - Institution/Organization", 
-            "Reference 2 - Email", "Reference 2 - Relationship"
-        ]
-        
         missing_fields = []
-        for field in required_ref_fields:
+        for field in REFERENCE_FIELDS:
             if field not in response_data or not response_data[field]:
                 missing_fields.append(field)
         
@@ -337,14 +371,7 @@ class FormValidator:
     def _check_completeness(self, response_data: Dict[str, Any]) -> Dict[str, Any]:
         """Check overall form completeness"""
         all_fields = self._get_required_fields()
-        optional_fields = [
-            "Class Rank", "Academic Honors and Awards", "Reference 3 - Name",
-            "Reference 3 - Title/Position", "Reference 3 - Institution/Organization",
-            "Reference 3 - Email", "Reference 3 - Phone", "Reference 3 - Relationship",
-            "Notable Projects", "Diversity and Inclusion Statement (Optional, 200-400 words)",
-            "Honors, Awards, and Recognition", "Extracurricular Activities and Leadership",
-            "Additional Information"
-        ]
+        optional_fields = OPTIONAL_FIELDS
         
         total_fields = len(all_fields) + len(optional_fields)
         completed_fields = 0
@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+Compiled Form Validator
+Compiles form_config.json into a rule plan once (compiled regexes,
+per-field rule lookups, precomputed messages) and validates batches of
+responses into a columnar report, optionally across a process pool
+"""
+
+import re
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from form_validator import (
+    DEFAULT_EMAIL_PATTERN, DEFAULT_PHONE_PATTERN, DIVERSITY_FIELD, ESSAY_FIELDS, OPTIONAL_FIELDS,
+    REFERENCE_FIELDS, REQUIRED_FIELDS, TEST_SCORE_FIELDS, FormValidator, ValidationResult
+)
+
+
+@dataclass
+class ValidationReport:
+    """Columnar validation results.
+
+    Per-response columns are indexed by position in the batch; issue columns
+    hold one row per error or warning, in the order validate_response reports them.
+    """
+    is_valid: List[bool] = field(default_factory=list)
+    score: List[float] = field(default_factory=list)
+    error_count: List[int] = field(default_factory=list)
+    warning_count: List[int] = field(default_factory=list)
+    issue_response: List[int] = field(default_factory=list)
+    issue_severity: List[str] = field(default_factory=list)
+    issue_rule: List[str] = field(default_factory=list)
+    issue_message: List[str] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.score)
+
+    def extend(self, other: "ValidationReport"):
+        """Append another report's rows, shifting its response indexes"""
+        offset = len(self)
+        for name in ("is_valid", "score", "error_count", "warning_count",
+                     "issue_severity", "issue_rule", "issue_message"):
+            getattr(self, name).extend(getattr(other, name))
+        self.issue_response.extend(index + offset for index in other.issue_response)
+
+    def result(self, index: int) -> ValidationResult:
+        """The ValidationResult validate_response returns for one response"""
+        errors, warnings = [], []
+        for response, severity, message in zip(self.issue_response, self.issue_severity, self.issue_message):
+            if response == index:
+                (errors if severity == "error" else warnings).append(message)
+        return ValidationResult(is_valid=self.is_valid[index], errors=errors, warnings=warnings,
+                                score=self.score[index])
+
+    def columns(self) -> Dict[str, Dict[str, list]]:
+        """Plain dict of columns, e.g. for pd.DataFrame(report.columns()['issues'])"""
+        return {
+            "responses": {"is_valid": self.is_valid, "score": self.score,
+                          "error_count": self.error_count, "warning_count": self.warning_count},
+            "issues": {"response": self.issue_response, "severity": self.issue_severity,
+                       "rule": self.issue_rule, "message": self.issue_message}
+        }
+
+
+class CompiledValidator:
+    """FormValidator rules compiled once; validate() matches FormValidator.validate_response exactly"""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        self.config = config or {}
+        rules = self.config.get("validation_rules", {})
+        essays = self.config.get("essay_requirements", {})
+        # Reuse FormValidator's field -> rule mapping rather than restating it
+        source = FormValidator.__new__(FormValidator)
+        source.validation_rules, source.essay_requirements = rules, essays
+
+        self.email_pattern = re.compile(rules.get("email", {}).get("pattern", DEFAULT_EMAIL_PATTERN))
+        self.email_message = rules.get("email", {}).get("message", "Invalid email format")
+        self.phone_pattern = re.compile(rules.get("phone", {}).get("pattern", DEFAULT_PHONE_PATTERN))
+        self.phone_message = rules.get("phone", {}).get("message", "Invalid phone number format")
+
+        gpa = rules.get("gpa", {})
+        self.gpa_range = (gpa.get("min", 0.0), gpa.get("max", 4.0))
+        self.gpa_message = gpa.get("message", "GPA must be between 0.0 and 4.0")
+        year = rules.get("graduation_year", {})
+        self.year_range = (year.get("min", 1950), year.get("max", 2030))
+        self.year_message = year.get("message", "Invalid graduation year")
+
+        # (field, (min, max, message) or None when the field has no range rule)
+        self.test_scores: List[Tuple[str, Optional[Tuple[Any, Any, str]]]] = []
+        for score_field in TEST_SCORE_FIELDS:
+            field_rules = source._test_score_rules(score_field)
+            limits = None
+            if field_rules:
+                low, high = field_rules.get("min", 0), field_rules.get("max", 100)
+                limits = (low, high, field_rules.get("message", f"Score must be between {low} and {high}"))
+            self.test_scores.append((score_field, limits))
+
+        # (field, (min_words, max_words) or None)
+        self.essays: List[Tuple[str, Optional[Tuple[Any, Any]]]] = []
+        for essay_field in ESSAY_FIELDS:
+            essay_key = source._essay_key(essay_field)
+            limits = None
+            if essay_key and essay_key in essays:
+                limits = (essays[essay_key].get("min_words", 0), essays[essay_key].get("max_words", 1000))
+            self.essays.append((essay_field, limits))
+
+        diversity = essays.get("diversity_statement", {})
+        self.diversity_range = (diversity.get("min_words", 200), diversity.get("max_words", 400))
+
+        self.required_messages = tuple((name, f"Required field '{name}' is missing") for name in REQUIRED_FIELDS)
+        self.required_set = frozenset(REQUIRED_FIELDS)
+        self.reference_fields = tuple(REFERENCE_FIELDS)
+        self.reference_set = frozenset(REFERENCE_FIELDS)
+        # Completeness counts list entries, so keep the length of the list rather than the set
+        self.completeness_fields = tuple(REQUIRED_FIELDS) + tuple(OPTIONAL_FIELDS)
+        self.completeness_set = frozenset(self.completeness_fields)
+
+    def _email_ok(self, email: Any) -> bool:
+        return bool(email) and self.email_pattern.match(email) is not None
+
+    def _check(self, response: Dict[str, Any]) -> Tuple[float, List[Tuple[str, str, str]]]:
+        """Run every rule in validate_response's order; returns (score, [(severity, rule, message)])"""
+        score = 100.0
+        issues = []
+        get = response.get
+        # Answered fields, found in one pass; presence checks below are set operations
+        answered = {name for name, value in response.items() if value}
+
+        if not self.required_set <= answered:
+            for name, message in self.required_messages:
+                if name not in answered:
+                    issues.append(("error", "required", message))
+                    score -= 10
+
+        if "Email Address" in response:
+            email = response["Email Address"]
+            if not email:
+                issues.append(("error", "email", "Email validation failed: Email is required"))
+                score -= 5
+            elif not self.email_pattern.match(email):
+                issues.append(("error", "email", f"Email validation failed: {self.email_message}"))
+                score -= 5
+
+        if "Phone Number" in response:
+            phone = response["Phone Number"]
+            if not phone:
+                issues.append(("error", "phone", "Phone validation failed: Phone number is required"))
+                score -= 3
+            elif not self.phone_pattern.match(phone):
+                issues.append(("error", "phone", f"Phone validation failed: {self.phone_message}"))
+                score -= 3
+
+        if "GPA" in response:
+            message = None
+            value = response["GPA"]
+            if not value:
+                message = "GPA is required"
+            else:
+                try:
+                    gpa = float(value)
+                except ValueError:
+                    message = "GPA must be a valid number"
+                else:
+                    if gpa < self.gpa_range[0] or gpa > self.gpa_range[1]:
+                        message = self.gpa_message
+                    elif gpa < 2.5:
+                        issues.append(("warning", "gpa", f"GPA of {gpa} is below typical admission standards"))
+                        score -= 2
+            if message:
+                issues.append(("error", "gpa", f"GPA validation failed: {message}"))
+                score -= 5
+
+        if "Graduation Year" in response:
+            message = None
+            value = response["Graduation Year"]
+            if not value:
+                message = "Graduation year is required"
+            else:
+                try:
+                    year = int(value)
+                except ValueError:
+                    message = "Graduation year must be a valid number"
+                else:
+                    if year < self.year_range[0] or year > self.year_range[1]:
+                        message = self.year_message
+            if message:
+                issues.append(("error", "graduation_year", f"Graduation year validation failed: {message}"))
+                score -= 3
+
+        for score_field, limits in self.test_scores:
+            value = get(score_field)
+            if not value:
+                continue
+            try:
+                test_score = float(value)
+            except ValueError:
+                message = "Score must be a valid number"
+            else:
+                if limits is None or limits[0] <= test_score <= limits[1]:
+                    continue
+                message = limits[2]
+            issues.append(("error", "test_score", f"{score_field} validation failed: {message}"))
+            score -= 2
+
+        for essay_field, limits in self.essays:
+            text = get(essay_field)
+            if not text:
+                continue
+            word_count = len(text.split())
+            if limits is None:
+                continue
+            min_words, max_words = limits
+            if word_count < min_words:
+                message = f"Essay must be at least {min_words} words (current: {word_count})"
+            elif word_count > max_words:
+                message = f"Essay must be no more than {max_words} words (current: {word_count})"
+            elif word_count < min_words * 0.8:
+                issues.append(("warning", "essay", f"Essay is quite short ({word_count} words). Consider adding more detail."))
+                score -= 3
+                continue
+            else:
+                continue
+            issues.append(("error", "essay", f"{essay_field} validation failed: {message}"))
+            score -= 8
+
+        if DIVERSITY_FIELD in response and response[DIVERSITY_FIELD]:
+            word_count = len(response[DIVERSITY_FIELD].split())
+            min_words, max_words = self.diversity_range
+            message = None
+            if word_count < min_words:
+                message = f"Diversity statement should be at least {min_words} words (current: {word_count})"
+            elif word_count > max_words:
+                message = f"Diversity statement should be no more than {max_words} words (current: {word_count})"
+            if message:
+                issues.append(("warning", "diversity_statement", f"Diversity statement validation: {message}"))
+                score -= 1
+
+        message = None
+        if not self.reference_set <= answered:
+            missing = [name for name in self.reference_fields if name not in answered]
+            message = f"Missing required reference fields: {', '.join(missing)}"
+        elif not self._email_ok(get("Reference 1 - Email", "")):
+            message = "Reference 1 email is invalid"
+        elif not self._email_ok(get("Reference 2 - Email", "")):
+            message = "Reference 2 email is invalid"
+        if message:
+            issues.append(("error", "references", f"References validation failed: {message}"))
+            score -= 10
+
+        completeness = len(answered & self.completeness_set) / len(self.completeness_fields) * 100
+        if completeness < 50:
+            issues.append(("warning", "completeness", "Form completeness: Form is very incomplete"))
+            score -= 20
+        elif completeness < 80:
+            issues.append(("warning", "completeness", "Form completeness: Form could be more complete"))
+            score -= 10
+
+        return max(0, score), issues
+
+    def validate(self, response: Dict[str, Any]) -> ValidationResult:
+        """Validate one response"""
+        score, issues = self._check(response)
+        errors = [message for severity, _, message in issues if severity == "error"]
+        warnings = [message for severity, _, message in issues if severity == "warning"]
+        return ValidationResult(is_valid=not errors, errors=errors, warnings=warnings, score=score)
+
+    def validate_batch(self, responses: Iterable[Dict[str, Any]], max_workers: Optional[int] = None,
+                       chunk_size: int = 5000) -> ValidationReport:
+        """Validate many responses into a columnar report.
+
+        With max_workers > 1 and more than one chunk, chunks are validated in a
+        process pool; each worker compiles the rules once.
+        """
+        responses = list(responses)
+        if not max_workers or max_workers <= 1 or len(responses) <= chunk_size:
+            return self._validate_chunk(responses)
+
+        report = ValidationReport()
+        chunks = [responses[i:i + chunk_size] for i in range(0, len(responses), chunk_size)]
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                 initargs=(self.config,)) as pool:
+            for chunk_report in pool.map(_validate_in_worker, chunks):
+                report.extend(chunk_report)
+        return report
+
+    def _validate_chunk(self, responses: List[Dict[str, Any]]) -> ValidationReport:
+        report = ValidationReport()
+        for index, response in enumerate(responses):
+            score, issues = self._check(response)
+            errors = sum(1 for severity, _, _ in issues if severity == "error")
+            report.score.append(score)
+            report.is_valid.append(errors == 0)
+            report.error_count.append(errors)
+            report.warning_count.append(len(issues) - errors)
+            if issues:
+                severities, rules, messages = zip(*issues)
+                report.issue_response.extend([index] * len(issues))
+                report.issue_severity.extend(severities)
+                report.issue_rule.extend(rules)
+                report.issue_message.extend(messages)
+        return report
+
+
+_worker_validator: Optional[CompiledValidator] = None
+
+
+def _init_worker(config: Dict[str, Any]):
+    global _worker_validator
+    _worker_validator = CompiledValidator(config)
+
+
+def _validate_in_worker(responses: List[Dict[str, Any]]) -> ValidationReport:
+    return _worker_validator._validate_chunk(responses)
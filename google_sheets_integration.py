@@ -6,25 +6,108 @@ Handles form submissions and stores data in Google Sheets
 
 import json
 import os
+import re
 from datetime import datetime
-from typing import Dict, List, Any
+from typing import Dict, Iterator, List, Any, Optional
 import gspread
 from google.oauth2.service_account import Credentials
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
+from googleapiclient.http import MediaFileUpload
+from gspread.utils import rowcol_to_a1
+from applications_export import export_stream
+from applications_replica import ApplicationReplica
+from document_uploads import SyncUnavailable
+from sheets_write_queue import WriteBehindQueue
+
+# Sheet columns in order, each with the form field it is filled from
+# (None for values the integration sets itself)
+SHEET_COLUMNS = [
+    ('Timestamp', None),
+    ('First Name', 'firstName'),
+    ('Last Name', 'lastName'),
+    ('Email', 'email'),
+    ('Phone', 'phone'),
+    ('Date of Birth', 'dateOfBirth'),
+    ('Gender', 'gender'),
+    ('Address', 'address'),
+    ('Undergraduate Degree', 'undergraduateDegree'),
+    ('Undergraduate GPA', 'undergraduateGPA'),
+    ('Undergraduate Institution', 'undergraduateInstitution'),
+    ('Graduation Year', 'graduationYear'),
+    ('Graduate Degree', 'graduateDegree'),
+    ('GRE Score', 'greScore'),
+    ('TOEFL Score', 'toeflScore'),
+    ('Specialization', 'specialization'),
+    ('Start Term', 'startTerm'),
+    ('Program Format', 'programFormat'),
+    ('Areas of Interest', 'interests'),
+    ('Statement of Purpose', 'statementOfPurpose'),
+    ('Personal Statement', 'personalStatement'),
+    ('Diversity Statement', 'diversityStatement'),
+    ('Research Experience', 'researchExperience'),
+    ('Career Goals', 'careerGoals'),
+    ('Additional Info', 'additionalInfo'),
+    ('Current Employer', 'currentEmployer'),
+    ('Current Position', 'currentPosition'),
+    ('Work Experience', 'workExperience'),
+    ('Relevant Experience', 'relevantExperience'),
+    # References 1-3, e.g. 'Reference 1 Years Known' <- reference1YearsKnown
+    *[
+        (f'Reference {n} {label}', f"reference{n}{label.replace(' ', '')}")
+        for n in (1, 2, 3)
+        for label in ('Name', 'Title', 'Email', 'Phone', 'Institution', 'Relationship', 'Years Known')
+    ],
+    ('How Did You Hear', 'howDidYouHear'),
+    ('Additional Comments', 'additionalComments'),
+    ('Agree Terms', None),
+    ('Agree Marketing', None),
+    ('Status', None),
+    ('Notes', None),
+    ('Application ID', 'application_id')
+]
+SHEET_HEADERS = [header for header, _ in SHEET_COLUMNS]
+
+# First row number in an append response's updatedRange, e.g. "Applications!A5:BE7" -> 5
+UPDATED_RANGE_PATTERN = re.compile(r"![A-Z]+(\d+)")
+
+def appended_first_row(response: Any) -> Optional[int]:
+    """Sheet row of the first appended row, or None if the response does not say"""
+    try:
+        match = UPDATED_RANGE_PATTERN.search(response['updates']['updatedRange'])
+    except (TypeError, KeyError):
+        return None
+    return int(match.group(1)) if match else None
 
 class MSAIApplicationSheets:
     """Handle MSAI application form submissions to Google Sheets"""
     
-    def __init__(self, credentials_file: str = 'msai-service-account-key.json'):
+    def __init__(self, credentials_file: str = 'msai-service-account-key.json',
+                 queue_log: str = None, replica_db: str = None):
         self.credentials_file = credentials_file
         self.scopes = [
             'https://www.googleapis.com/auth/spreadsheets',
             'https://www.googleapis.com/auth/drive'
         ]
         self.service = None
+        self.drive_service = None
+        self.drive_folder_id = os.getenv('APPLICATION_DRIVE_FOLDER_ID')
         self.sheet_id = None
         self.worksheet = None
+        # Header -> 1-based column, refreshed from the sheet's own header row on sync
+        self.columns = {header: i + 1 for i, header in enumerate(SHEET_HEADERS)}
+        
+        # Submissions are acknowledged once logged locally and reach the sheet in batches
+        self.write_queue = WriteBehindQueue(
+            queue_log or os.getenv('APPLICATION_QUEUE_LOG', 'application_submissions.log'),
+            batch_size=int(os.getenv('SHEETS_BATCH_SIZE', '100')),
+            flush_interval=float(os.getenv('SHEETS_FLUSH_INTERVAL', '1.0')),
+            max_calls_per_minute=float(os.getenv('SHEETS_MAX_CALLS_PER_MINUTE', '50')),
+            on_flush=self._on_rows_flushed
+        )
+        
+        # Indexed local copy of the sheet; every read below is served from it
+        self.replica = ApplicationReplica(replica_db or os.getenv('APPLICATION_REPLICA_DB', 'applications.db'))
         
     def authenticate(self):
         """Authenticate with Google Sheets API"""
@@ -35,6 +118,7 @@ class MSAIApplicationSheets:
             )
             
             self.service = gspread.authorize(creds)
+            self.drive_service = build('drive', 'v3', credentials=creds, cache_discovery=False)
             print("✅ Google Sheets authentication successful")
             return True
             
@@ -69,74 +153,13 @@ class MSAIApplicationSheets:
             spreadsheet = self.service.open_by_key(self.sheet_id)
             worksheet = spreadsheet.worksheet(sheet_name)
             
-            # Define headers
-            headers = [
-                'Timestamp',
-                'First Name',
-                'Last Name',
-                'Email',
-                'Phone',
-                'Date of Birth',
-                'Gender',
-                'Address',
-                'Undergraduate Degree',
-                'Undergraduate GPA',
-                'Undergraduate Institution',
-                'Graduation Year',
-                'Graduate Degree',
-                'GRE Score',
-                'TOEFL Score',
-                'Specialization',
-                'Start Term',
-                'Program Format',
-                'Areas of Interest',
-                'Statement of Purpose',
-                'Personal Statement',
-                'Diversity Statement',
-                'Research Experience',
-                'Career Goals',
-                'Additional Info',
-                'Current Employer',
-                'Current Position',
-                'Work Experience',
-                'Relevant Experience',
-                # Reference 1
-                'Reference 1 Name',
-                'Reference 1 Title',
-                'Reference 1 Email',
-                'Reference 1 Phone',
-                'Reference 1 Institution',
-                'Reference 1 Relationship',
-                'Reference 1 Years Known',
-                # Reference 2
-                'Reference 2 Name',
-                'Reference 2 Title',
-                'Reference 2 Email',
-                'Reference 2 Phone',
-                'Reference 2 Institution',
-                'Reference 2 Relationship',
-                'Reference 2 Years Known',
-                # Reference 3
-                'Reference 3 Name',
-                'Reference 3 Title',
-                'Reference 3 Email',
-                'Reference 3 Phone',
-                'Reference 3 Institution',
-                'Reference 3 Relationship',
-                'Reference 3 Years Known',
-                'How Did You Hear',
-                'Additional Comments',
-                'Agree Terms',
-                'Agree Marketing',
-                'Status',
-                'Notes'
-            ]
-            
             # Set headers
-            worksheet.update('A1:AK1', [headers])
+            headers = SHEET_HEADERS
+            header_range = f"A1:{rowcol_to_a1(1, len(headers))}"
+            worksheet.update(header_range, [headers])
             
             # Format headers
-            worksheet.format('A1:AK1', {
+            worksheet.format(header_range, {
                 'backgroundColor': {'red': 0.2, 'green': 0.4, 'blue': 0.8},
                 'textFormat': {'bold': True, 'foregroundColor': {'red': 1, 'green': 1, 'blue': 1}}
             })
@@ -148,6 +171,8 @@ class MSAIApplicationSheets:
             worksheet.columns_auto_resize(0, len(headers))
             
             self.worksheet = worksheet
+            self.write_queue.worksheet = worksheet
+            self.sync_replica()
             print(f"✅ Worksheet '{sheet_name}' setup complete")
             return True
             
@@ -156,144 +181,207 @@ class MSAIApplicationSheets:
             return False
     
     def submit_application(self, form_data: Dict[str, Any]) -> bool:
-        """Submit application data to Google Sheets"""
+        """Queue application data for Google Sheets (durable once this returns True)"""
         try:
-            if not self.worksheet:
-                print("❌ Worksheet not initialized")
-                return False
-            
-            # Prepare data row
-            row_data = [
-                datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                form_data.get('firstName', ''),
-                form_data.get('lastName', ''),
-                form_data.get('email', ''),
-                form_data.get('phone', ''),
-                form_data.get('dateOfBirth', ''),
-                form_data.get('gender', ''),
-                form_data.get('address', ''),
-                form_data.get('undergraduateDegree', ''),
-                form_data.get('undergraduateGPA', ''),
-                form_data.get('undergraduateInstitution', ''),
-                form_data.get('graduationYear', ''),
-                form_data.get('graduateDegree', ''),
-                form_data.get('greScore', ''),
-                form_data.get('toeflScore', ''),
-                form_data.get('specialization', ''),
-                form_data.get('startTerm', ''),
-                form_data.get('programFormat', ''),
-                form_data.get('interests', ''),
-                form_data.get('statementOfPurpose', ''),
-                form_data.get('diversityStatement', ''),
-                form_data.get('researchExperience', ''),
-                form_data.get('currentEmployer', ''),
-                form_data.get('currentPosition', ''),
-                form_data.get('workExperience', ''),
-                form_data.get('relevantExperience', ''),
-                form_data.get('reference1Name', ''),
-                form_data.get('reference1Email', ''),
-                form_data.get('reference1Relationship', ''),
-                form_data.get('reference2Name', ''),
-                form_data.get('reference2Email', ''),
-                form_data.get('reference2Relationship', ''),
-                form_data.get('howDidYouHear', ''),
-                form_data.get('additionalComments', ''),
-                'Yes' if form_data.get('agreeTerms') else 'No',
-                'Yes' if form_data.get('agreeMarketing') else 'No',
-                'New',  # Status
-                ''  # Notes
-            ]
-            
-            # Append row to worksheet
-            self.worksheet.append_row(row_data)
-            
-            print(f"✅ Application submitted for {form_data.get('firstName')} {form_data.get('lastName')}")
-            return True
+            # Appended to the local log now, written to the sheet by the write-behind queue
+            row = self.build_row(form_data)
+            self.write_queue.enqueue(row, key=form_data.get('application_id'))
             
         except Exception as e:
             print(f"❌ Error submitting application: {e}")
             return False
+        
+        # Queued durably now; reporting a failure here would have the caller submit it a second time
+        try:
+            self.replica.upsert(dict(zip(SHEET_HEADERS, row)))
+        except Exception as e:
+            print(f"⚠️  Application queued but not added to the local replica ({e}); the next sync adds it")
+        
+        print(f"✅ Application submitted for {form_data.get('firstName')} {form_data.get('lastName')}")
+        return True
+    
+    def build_row(self, form_data: Dict[str, Any]) -> List[Any]:
+        """Worksheet row for an application, one value per SHEET_HEADERS column"""
+        values = {
+            'Timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'Agree Terms': 'Yes' if form_data.get('agreeTerms') else 'No',
+            'Agree Marketing': 'Yes' if form_data.get('agreeMarketing') else 'No',
+            'Status': 'New',
+            'Notes': ''
+        }
+        row = []
+        for header, field in SHEET_COLUMNS:
+            value = values.get(header, '') if field is None else form_data.get(field)
+            if isinstance(value, list):
+                value = ', '.join(str(item) for item in value)
+            row.append('' if value is None else value)
+        return row
     
-    def get_applications(self, status: str = None) -> List[Dict[str, Any]]:
-        """Retrieve applications from Google Sheets"""
+    def sync_replica(self) -> int:
+        """Load every sheet row, with its row number, into the local replica (one read, e.g. at startup)"""
         try:
             if not self.worksheet:
                 print("❌ Worksheet not initialized")
-                return []
+                return 0
             
-            # Get all records
-            records = self.worksheet.get_all_records()
+            values = self.worksheet.get_all_values()
+            if not values:
+                return 0
             
-            if status:
-                records = [record for record in records if record.get('Status') == status]
+            headers = values[0]
+            self.columns = {header: i + 1 for i, header in enumerate(headers) if header}
+            records = (dict(zip(headers, row + [''] * (len(headers) - len(row)))) for row in values[1:])
+            count = self.replica.load_snapshot(records, first_sheet_row=2)
+            print(f"✅ Synced {count} applications into the local replica")
+            return count
             
-            return records
+        except Exception as e:
+            print(f"❌ Error syncing application replica: {e}")
+            return 0
+    
+    def get_applications(self, status: str = None, **filters: str) -> List[Dict[str, Any]]:
+        """Retrieve applications from the local replica, filtered on any indexed field
+        (status, email, specialization, start_term, program_format, application_id)"""
+        try:
+            return self.replica.query(status=status, **filters)
             
         except Exception as e:
             print(f"❌ Error retrieving applications: {e}")
             return []
     
-    def update_application_status(self, email: str, status: str, notes: str = '') -> bool:
-        """Update application status"""
+    def _on_rows_flushed(self, application_ids: List[Optional[str]], response: Any):
+        """Index where queued applications landed and apply status changes made meanwhile"""
+        first_row = appended_first_row(response)
+        if first_row is None:
+            return
+        
+        rows = {application_id: first_row + i for i, application_id in enumerate(application_ids) if application_id}
+        self.replica.set_sheet_rows(rows)
+        
+        # The queued row still said 'New'; replay any decision recorded before it reached the sheet
+        changed = []
+        for application_id in rows:
+            record = self.replica.get(application_id=application_id)
+            if record and (record.get('Status') != 'New' or record.get('Notes')):
+                changed.append({'application_id': application_id,
+                                'status': record.get('Status'), 'notes': record.get('Notes')})
+        if changed:
+            self.update_application_statuses(changed)
+    
+    def update_application_statuses(self, updates: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Update many applications' status/notes in one batch_update call.
+        
+        Each update names the application by 'application_id' or 'email' and
+        carries 'status' and optional 'notes'. Rows are found through the
+        replica's row index instead of searching the sheet, then read back in
+        one batch_get; if the sheet was reordered since the last sync, the
+        replica is re-synced and the rows located again before anything is written.
+        """
         try:
-            if not self.worksheet:
-                print("❌ Worksheet not initialized")
-                return False
-            
-            # Find the row with the email
-            cell = self.worksheet.find(email)
-            if not cell:
-                print(f"❌ Application not found for email: {email}")
-                return False
-            
-            # Update status and notes
-            row = cell.row
-            self.worksheet.update_cell(row, 36, status)  # Status column
-            self.worksheet.update_cell(row, 37, notes)   # Notes column
-            
-            print(f"✅ Updated application status for {email} to {status}")
-            return True
+            located, not_found = self._locate_rows(updates)
+            if any(sheet_row for _, _, sheet_row in located):
+                if not self.worksheet:
+                    raise RuntimeError("Worksheet not initialized")
+                if not self._rows_still_match(located):
+                    self.sync_replica()
+                    located, not_found = self._locate_rows(updates)
+                    if not self._rows_still_match(located):
+                        raise RuntimeError("Sheet rows moved while updating statuses")
+            
+            data = []
+            changed = []
+            changed_rows = []
+            for update, record, sheet_row in located:
+                values = {'Status': update['status'], 'Notes': update.get('notes') or ''}
+                # Still queued: the write-behind flush hook applies it once the row exists
+                if sheet_row:
+                    data.extend(
+                        {'range': rowcol_to_a1(sheet_row, self.columns[header]), 'values': [[value]]}
+                        for header, value in values.items()
+                    )
+                changed.append({**record, **values})
+                changed_rows.append(sheet_row)
+            
+            if data:
+                self.worksheet.batch_update(data)
+            self.replica.upsert_many(changed, sheet_rows=changed_rows)
+            
+            print(f"✅ Updated status of {len(changed)} applications")
+            return {'success': True, 'updated': len(changed), 'not_found': not_found}
             
         except Exception as e:
-            print(f"❌ Error updating application status: {e}")
-            return False
+            print(f"❌ Error updating application statuses: {e}")
+            return {'success': False, 'updated': 0, 'not_found': [], 'error': str(e)}
+    
+    def _locate_rows(self, updates: List[Dict[str, Any]]):
+        """([(update, replica record, sheet row or None)], identifiers not in the replica)"""
+        located = []
+        not_found = []
+        for update in updates:
+            found = self.replica.locate(application_id=update.get('application_id'), email=update.get('email'))
+            if found is None:
+                not_found.append(update.get('application_id') or update.get('email'))
+            else:
+                located.append((update, *found))
+        return located, not_found
+    
+    def _rows_still_match(self, located: List[tuple]) -> bool:
+        """Whether each cached sheet row still holds its application, checked on its ID and Email cells"""
+        targets = [(record, sheet_row) for _, record, sheet_row in located if sheet_row]
+        id_col, email_col = self.columns['Application ID'], self.columns['Email']
+        first_col, last_col = min(id_col, email_col), max(id_col, email_col)
+        ranges = [f"{rowcol_to_a1(sheet_row, first_col)}:{rowcol_to_a1(sheet_row, last_col)}"
+                  for _, sheet_row in targets]
+        for (record, _), cells in zip(targets, self.worksheet.batch_get(ranges)):
+            # Trailing empty cells and empty rows are left out of the response
+            row = (list(cells[0]) if cells else []) + [''] * (last_col - first_col + 1)
+            sheet_id = str(row[id_col - first_col]).strip()
+            sheet_email = str(row[email_col - first_col]).strip().lower()
+            if sheet_id != str(record.get('Application ID') or '').strip():
+                return False
+            if not sheet_id and sheet_email != str(record.get('Email') or '').strip().lower():
+                return False
+        return True
+    
+    def update_application_status(self, email: str, status: str, notes: str = '') -> bool:
+        """Update application status"""
+        result = self.update_application_statuses([{'email': email, 'status': status, 'notes': notes}])
+        if result['success'] and not result['updated']:
+            print(f"❌ Application not found for email: {email}")
+        return result['updated'] == 1
     
     def get_application_stats(self) -> Dict[str, Any]:
         """Get application statistics"""
         try:
-            records = self.get_applications()
-            
-            stats = {
-                'total_applications': len(records),
-                'by_specialization': {},
-                'by_status': {},
-                'by_term': {},
-                'by_format': {}
-            }
-            
-            for record in records:
-                # Count by specialization
-                spec = record.get('Specialization', 'Unknown')
-                stats['by_specialization'][spec] = stats['by_specialization'].get(spec, 0) + 1
-                
-                # Count by status
-                status = record.get('Status', 'Unknown')
-                stats['by_status'][status] = stats['by_status'].get(status, 0) + 1
-                
-                # Count by term
-                term = record.get('Start Term', 'Unknown')
-                stats['by_term'][term] = stats['by_term'].get(term, 0) + 1
-                
-                # Count by format
-                format_type = record.get('Program Format', 'Unknown')
-                stats['by_format'][format_type] = stats['by_format'].get(format_type, 0) + 1
-            
-            return stats
+            # Grouped counts straight from the replica's indexes
+            return self.replica.get_stats()
             
         except Exception as e:
             print(f"❌ Error getting application stats: {e}")
             return {}
     
+    def upload_document(self, path: str, application_id: str, document: Dict[str, Any] = None) -> str:
+        """Upload a stored application document to Drive in resumable chunks; returns the Drive file ID"""
+        if self.drive_service is None:
+            raise SyncUnavailable("Google Drive is not authenticated")
+        
+        metadata = {'name': f"{application_id}_{os.path.basename(path)}"}
+        if self.drive_folder_id:
+            metadata['parents'] = [self.drive_folder_id]
+        media = MediaFileUpload(path, resumable=True, chunksize=8 * 1024 * 1024)
+        created = self.drive_service.files().create(body=metadata, media_body=media, fields='id').execute()
+        return created['id']
+    
+    def export_applications(self, export_format: str = 'csv', columns: Optional[List[str]] = None,
+                            **filters: Optional[str]) -> Iterator[bytes]:
+        """Encoded export chunks straight from the replica; memory stays bounded by the chunk size.
+        Raises ValueError for unknown columns or filters."""
+        columns = columns or SHEET_HEADERS
+        unknown = [column for column in columns if column not in SHEET_HEADERS]
+        if unknown:
+            raise ValueError(f"Unknown columns: {', '.join(unknown)}")
+        return export_stream(self.replica.iter_records(**filters), columns, export_format)
+    
     def export_to_csv(self, filename: str = None) -> str:
         """Export applications to CSV file"""
         try:
@@ -301,21 +389,16 @@ class MSAIApplicationSheets:
                 timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
                 filename = f'msai_applications_{timestamp}.csv'
             
-            records = self.get_applications()
-            
-            if not records:
+            if not self.replica.count():
                 print("❌ No applications to export")
                 return None
             
-            # Write to CSV
-            import csv
-            with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-                fieldnames = records[0].keys()
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                writer.writeheader()
-                writer.writerows(records)
+            # Write to CSV, streaming records from the replica
+            with open(filename, 'wb') as csvfile:
+                for chunk in self.export_applications('csv'):
+                    csvfile.write(chunk)
             
-            print(f"✅ Exported {len(records)} applications to {filename}")
+            print(f"✅ Exported {self.replica.count()} applications to {filename}")
             return filename
             
         except Exception as e:
@@ -4,12 +4,13 @@ MSAI Application API - Backend for handling application form submissions
 Integrates with Google Sheets and Google Drive
 """
 
-from fastapi import FastAPI, HTTPException, UploadFile, File, Form
+from fastapi import FastAPI, HTTPException, UploadFile, File, Form, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel, EmailStr
 from typing import List, Optional, Dict, Any
+import asyncio
 import json
 import os
 from datetime import datetime
@@ -18,6 +19,8 @@ from pathlib import Path
 
 # Import our Google Sheets integration
 from google_sheets_integration import MSAIApplicationSheets
+from applications_export import EXPORT_FORMATS, PYARROW_AVAILABLE
+from document_uploads import DocumentStore, DocumentSyncWorker, UploadTooLarge
 
 # Create FastAPI app
 app = FastAPI(
@@ -38,6 +41,14 @@ app.add_middleware(
 # Initialize Google Sheets integration
 sheets_integration = MSAIApplicationSheets()
 
+# Uploaded documents are streamed to disk and synced to Drive in the background
+document_store = DocumentStore(
+    os.getenv('UPLOAD_DIR', 'uploads'),
+    max_file_bytes=int(os.getenv('UPLOAD_MAX_FILE_MB', '25')) << 20,
+    max_application_bytes=int(os.getenv('UPLOAD_MAX_APPLICATION_MB', '100')) << 20
+)
+document_sync = DocumentSyncWorker(document_store, sheets_integration.upload_document)
+
 # Pydantic models for form validation
 class ApplicationData(BaseModel):
     firstName: str
@@ -103,6 +114,15 @@ class ApplicationResponse(BaseModel):
     application_id: Optional[str] = None
     timestamp: str
 
+class StatusUpdate(BaseModel):
+    email: Optional[str] = None
+    application_id: Optional[str] = None
+    status: str
+    notes: Optional[str] = None
+
+class BulkStatusUpdate(BaseModel):
+    updates: List[StatusUpdate]
+
 class ApplicationStats(BaseModel):
     total_applications: int
     by_specialization: Dict[str, int]
@@ -129,8 +149,20 @@ async def startup_event():
                 print("✅ Google Sheets setup complete")
         except Exception as e:
             print(f"⚠️  Google Sheets setup issue: {e}")
+        
+        # Documents stay pending in their manifests until Drive is authenticated
+        document_sync.start()
     else:
-        print("❌ Google Sheets authentication failed")
+        print("❌ Google Sheets authentication failed; Drive document sync not started")
+    
+    # Flush queued submissions in the background (replayed entries go out first)
+    sheets_integration.write_queue.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Flush what we can; anything left stays in the local log for the next start"""
+    await asyncio.to_thread(sheets_integration.write_queue.stop)
+    await asyncio.to_thread(document_sync.stop)
 
 @app.get("/", response_class=HTMLResponse)
 async def get_application_form():
@@ -152,8 +184,8 @@ async def submit_application(application: ApplicationData):
         application_id = str(uuid.uuid4())
         form_data['application_id'] = application_id
         
-        # Submit to Google Sheets
-        success = sheets_integration.submit_application(form_data)
+        # Log durably (fsync) off the event loop; the sheet is written in batches later
+        success = await asyncio.to_thread(sheets_integration.submit_application, form_data)
         
         if success:
             # TODO: Send confirmation email
@@ -180,59 +212,54 @@ async def upload_documents(
     resume: UploadFile = File(...),
     additional_docs: List[UploadFile] = File([])
 ):
-    """Upload application documents"""
+    """Upload application documents as one unit, streamed to disk in chunks and deduplicated by SHA-256"""
+    uploads = [('transcript', transcript), ('resume', resume)]
+    uploads += [(f"additional_{i}", doc) for i, doc in enumerate(additional_docs)]
+    
     try:
-        # Create upload directory for this application
-        upload_dir = Path(f"uploads/{application_id}")
-        upload_dir.mkdir(parents=True, exist_ok=True)
-        
-        uploaded_files = {}
-        
-        # Save transcript
-        if transcript:
-            transcript_path = upload_dir / f"transcript_{transcript.filename}"
-            with open(transcript_path, "wb") as f:
-                content = await transcript.read()
-                f.write(content)
-            uploaded_files['transcript'] = str(transcript_path)
-        
-        # Save resume
-        if resume:
-            resume_path = upload_dir / f"resume_{resume.filename}"
-            with open(resume_path, "wb") as f:
-                content = await resume.read()
-                f.write(content)
-            uploaded_files['resume'] = str(resume_path)
-        
-        # Save additional documents
-        additional_paths = []
-        for i, doc in enumerate(additional_docs):
-            doc_path = upload_dir / f"additional_{i}_{doc.filename}"
-            with open(doc_path, "wb") as f:
-                content = await doc.read()
-                f.write(content)
-            additional_paths.append(str(doc_path))
-        
-        uploaded_files['additional_docs'] = additional_paths
-        
-        # TODO: Upload to Google Drive
-        # TODO: Update application record with file paths
-        
-        return {
-            "success": True,
-            "message": "Documents uploaded successfully",
-            "files": uploaded_files
-        }
-        
+        documents = await document_store.save_all(application_id, uploads)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         print(f"❌ Error uploading documents: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+    
+    for document in documents:
+        if not document['duplicate']:
+            document_sync.submit(application_id, document)
+    
+    paths = [document['path'] for document in documents]
+    return {
+        "success": True,
+        "message": "Documents uploaded successfully",
+        "files": {
+            'transcript': paths[0],
+            'resume': paths[1],
+            'additional_docs': paths[2:]
+        },
+        "documents": documents
+    }
 
 @app.get("/api/applications", response_model=List[Dict[str, Any]])
-async def get_applications(status: Optional[str] = None):
-    """Get all applications or filter by status"""
+async def get_applications(
+    status: Optional[str] = None,
+    email: Optional[str] = None,
+    specialization: Optional[str] = None,
+    start_term: Optional[str] = None,
+    program_format: Optional[str] = None
+):
+    """Get all applications or filter by status, email, specialization, start term or format"""
     try:
-        applications = sheets_integration.get_applications(status)
+        # Served from the local replica's indexes, not the Sheets API
+        applications = sheets_integration.get_applications(
+            status,
+            email=email,
+            specialization=specialization,
+            start_term=start_term,
+            program_format=program_format
+        )
         return applications
     except Exception as e:
         print(f"❌ Error retrieving applications: {e}")
@@ -256,35 +283,64 @@ async def update_application_status(
 ):
     """Update application status"""
     try:
-        success = sheets_integration.update_application_status(email, status, notes or "")
-        
-        if success:
-            return {"success": True, "message": f"Application status updated to {status}"}
-        else:
-            raise HTTPException(status_code=404, detail="Application not found")
-            
+        success = await asyncio.to_thread(sheets_integration.update_application_status, email, status, notes or "")
     except Exception as e:
         print(f"❌ Error updating application status: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+    
+    if success:
+        return {"success": True, "message": f"Application status updated to {status}"}
+    raise HTTPException(status_code=404, detail="Application not found")
+
+@app.post("/api/applications/status")
+async def bulk_update_application_status(request: BulkStatusUpdate):
+    """Update many applications' statuses in one Sheets round-trip (e.g. on decision days)"""
+    if any(not (update.email or update.application_id) for update in request.updates):
+        raise HTTPException(status_code=422, detail="Each update needs an email or application_id")
+    
+    result = await asyncio.to_thread(
+        sheets_integration.update_application_statuses,
+        [update.dict() for update in request.updates]
+    )
+    if not result['success']:
+        raise HTTPException(status_code=500, detail=result['error'])
+    return result
 
 @app.get("/api/applications/export")
-async def export_applications():
-    """Export applications to CSV"""
+async def export_applications(
+    export_format: str = Query("csv", alias="format"),
+    columns: Optional[str] = None,
+    status: Optional[str] = None,
+    start_term: Optional[str] = None,
+    specialization: Optional[str] = None,
+    program_format: Optional[str] = None
+):
+    """Stream applications as CSV, NDJSON or Parquet; columns is a comma-separated list of headers"""
+    if export_format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(EXPORT_FORMATS)}")
+    if export_format == 'parquet' and not PYARROW_AVAILABLE:
+        raise HTTPException(status_code=501, detail="Parquet export requires pyarrow")
+    
     try:
-        csv_file = sheets_integration.export_to_csv()
-        
-        if csv_file:
-            return {
-                "success": True,
-                "message": "Applications exported successfully",
-                "filename": csv_file
-            }
-        else:
-            raise HTTPException(status_code=500, detail="Failed to export applications")
-            
-    except Exception as e:
-        print(f"❌ Error exporting applications: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+        chunks = sheets_integration.export_applications(
+            export_format,
+            [column.strip() for column in columns.split(',')] if columns else None,
+            status=status,
+            start_term=start_term,
+            specialization=specialization,
+            program_format=program_format
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    media_type, extension = EXPORT_FORMATS[export_format]
+    filename = f"msai_applications_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{extension}"
+    # The replica is read in pages as the client consumes the response; nothing is written to disk
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
 
 @app.get("/api/health")
 async def health_check():
@@ -293,7 +349,9 @@ async def health_check():
         "status": "healthy",
         "timestamp": datetime.now().isoformat(),
         "service": "MSAI Application API",
-        "version": "1.0.0"
+        "version": "1.0.0",
+        "sheets_queue": sheets_integration.write_queue.get_stats(),
+        "document_sync": document_sync.get_stats()
     }
 
 @app.get("/api/specializations")
@@ -8,8 +8,11 @@ from typing import List, Dict, Optional, Any
 from enum import Enum
 from datetime import datetime, timedelta
 import json
+import random
 import uuid
 
+from storage_backend import MemoryBackend, StorageBackend, transactional
+
 class LearningStatus(Enum):
     NOT_STARTED = "not_started"
     IN_PROGRESS = "in_progress"
@@ -105,19 +108,20 @@ class StudentPortal:
     """Comprehensive student portal with learning dashboard"""
     
     def __init__(self, user_manager=None, tutor_system=None, assistant_system=None, 
-                 content_system=None, professor_system=None):
+                 content_system=None, professor_system=None, storage: Optional[StorageBackend] = None):
         self.user_manager = user_manager
         self.tutor_system = tutor_system
         self.assistant_system = assistant_system
         self.content_system = content_system
         self.professor_system = professor_system
         
-        # Student data
-        self.enrollments: Dict[str, List[CourseEnrollment]] = {}
-        self.assignments: Dict[str, List[Assignment]] = {}
-        self.learning_goals: Dict[str, List[LearningGoal]] = {}
-        self.notifications: Dict[str, List[Notification]] = {}
-        self.achievements: Dict[str, List[Achievement]] = {}
+        # Student data, keyed by student_id, in the storage backend
+        self.storage = storage or MemoryBackend()
+        self.enrollments = self.storage.collection("portal.enrollments", List[CourseEnrollment])
+        self.assignments = self.storage.collection("portal.assignments", List[Assignment])
+        self.learning_goals = self.storage.collection("portal.learning_goals", List[LearningGoal])
+        self.notifications = self.storage.collection("portal.notifications", List[Notification])
+        self.achievements = self.storage.collection("portal.achievements", List[Achievement])
         
     def get_student_dashboard(self, student_id: str) -> Dict[str, Any]:
         """Get comprehensive student dashboard data"""
@@ -225,6 +229,7 @@ class StudentPortal:
             }
         }
     
+    @transactional
     def enroll_in_course(self, student_id: str, course_id: str, course_data: Dict[str, Any]) -> Dict[str, Any]:
         """Enroll student in a course"""
         enrollment_id = f"ENROLL_{uuid.uuid4().hex[:8]}"
@@ -297,6 +302,7 @@ class StudentPortal:
         
         self.assignments[student_id].extend(assignments)
     
+    @transactional
     def submit_assignment(self, student_id: str, assignment_id: str, submission_data: Dict[str, Any]) -> Dict[str, Any]:
         """Submit assignment"""
         student_assignments = self.assignments.get(student_id, [])
@@ -405,6 +411,7 @@ class StudentPortal:
                                     "Achievement Unlocked!",
                                     f"You earned the 'High Achiever' badge for {assignment.title}")
     
+    @transactional
     def start_tutoring_session(self, student_id: str, course_id: str, topic: str) -> Dict[str, Any]:
         """Start AI tutoring session"""
         if not self.tutor_system:
@@ -436,6 +443,7 @@ class StudentPortal:
         
         return session_result
     
+    @transactional
     def request_assistant_support(self, student_id: str, request_data: Dict[str, Any]) -> Dict[str, Any]:
         """Request AI assistant support"""
         if not self.assistant_system:
@@ -622,6 +630,7 @@ class StudentPortal:
             self.notifications[student_id] = []
         self.notifications[student_id].append(notification)
     
+    @transactional
     def mark_notification_read(self, student_id: str, notification_id: str) -> Dict[str, Any]:
         """Mark notification as read"""
         student_notifications = self.notifications.get(student_id, [])
@@ -638,6 +647,7 @@ class StudentPortal:
             "message": "Notification marked as read"
         }
     
+    @transactional
     def create_learning_goal(self, student_id: str, goal_data: Dict[str, Any]) -> Dict[str, Any]:
         """Create learning goal for student"""
         goal_id = f"GOAL_{uuid.uuid4().hex[:8]}"
@@ -85,7 +85,7 @@ class UserManager:
     
     def authenticate_user(self, email: str, password: str) -> Optional[User]:
         """Authenticate user with email and password"""
-        user = self._find_user_by_email(email)
+        user = self.find_user_by_email(email)
         if not user:
             return None
         
@@ -158,7 +158,7 @@ class UserManager:
         except jwt.InvalidTokenError:
             return None
     
-    def _find_user_by_email(self, email: str) -> Optional[User]:
+    def find_user_by_email(self, email: str) -> Optional[User]:
         """Find user by email address"""
         for user in self.users.values():
             if user.email.lower() == email.lower():
@@ -6,12 +6,14 @@ FastAPI backend for RAG-powered chat agent
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, StreamingResponse
 from pydantic import BaseModel
 import os
+from typing import Any, Dict, Optional
 import json
 from pathlib import Path
 from rag_system import MSRAGSystem
+from rag_scheduler import OverloadedError, QueryScheduler
 
 app = FastAPI(title="MS AI Program RAG API", version="1.0.0")
 
@@ -27,6 +29,23 @@ app.add_middleware(
 # Initialize RAG system
 rag_system = MSRAGSystem()
 
+# Batch concurrent retrievals, cap upstream LLM calls and shed load past the queue limit
+scheduler = QueryScheduler(
+    rag_system,
+    max_batch_size=int(os.getenv('RAG_MAX_BATCH', '32')),
+    batch_window=float(os.getenv('RAG_BATCH_WINDOW_MS', '2')) / 1000,
+    max_inflight=int(os.getenv('RAG_LLM_MAX_CONCURRENCY', '10')),
+    max_queue_depth=int(os.getenv('RAG_MAX_QUEUE', '100'))
+)
+
+def overloaded_response(error: OverloadedError) -> HTTPException:
+    """429 telling the client when to retry"""
+    return HTTPException(
+        status_code=429,
+        detail=str(error),
+        headers={"Retry-After": str(error.retry_after)}
+    )
+
 # Load or create index on startup
 @app.on_event("startup")
 async def startup_event():
@@ -38,14 +57,27 @@ async def startup_event():
         print("⚠️  Warning: OPENROUTER_API_KEY not found in environment variables")
         print("   RAG system will work but AI responses will be limited")
     
-    # Try to load existing index
+    # Try to load existing index, then pick up any sources edited since it was saved
     if not rag_system.load_index():
         print("🔄 Creating new index...")
         rag_system.index_site_content()
         rag_system.save_index()
+    elif rag_system.sources_changed():
+        rag_system.index_site_content()
+        rag_system.save_index()
+    
+    # Reindex edited sources in the background without a restart
+    if os.getenv('RAG_WATCH_SOURCES', 'true').lower() not in ('0', 'false', 'no'):
+        rag_system.watch_sources(interval=float(os.getenv('RAG_WATCH_INTERVAL', '2.0')))
     
     print("✅ RAG system initialized successfully")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background workers and close pooled connections"""
+    rag_system.stop_watching()
+    await rag_system.aclose()
+
 class ChatRequest(BaseModel):
     question: str
 
@@ -54,23 +86,52 @@ class ChatResponse(BaseModel):
     sources: list
     chunks_used: int
     relevance_scores: list
+    usage: Optional[dict] = None
+    cached: bool = False
 
 @app.post("/api/chat", response_model=ChatResponse)
 async def chat_endpoint(request: ChatRequest):
     """Main chat endpoint that processes questions using RAG"""
     try:
-        result = rag_system.query(request.question)
+        result = await scheduler.query(request.question)
         return ChatResponse(**result)
+    except OverloadedError as e:
+        raise overloaded_response(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing question: {str(e)}")
 
+@app.post("/api/chat/stream")
+async def chat_stream_endpoint(request: ChatRequest):
+    """Stream the answer as server-sent events: sources, token..., done (or error)"""
+    events = scheduler.stream(request.question)
+    try:
+        # Admission happens on the first event; take it here so an overload is still a 429, not a stream
+        first_event = await anext(events)
+    except OverloadedError as e:
+        raise overloaded_response(e)
+    
+    def format_event(event: Dict[str, Any]) -> str:
+        event_type = event.pop('type')
+        return f"event: {event_type}\ndata: {json.dumps(event)}\n\n"
+    
+    async def event_stream():
+        yield format_event(first_event)
+        async for event in events:
+            yield format_event(event)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.get("/api/health")
 async def health_check():
     """Health check endpoint"""
     return {
         "status": "healthy",
         "chunks_indexed": len(rag_system.content_chunks),
-        "sources": list(rag_system.indexed_content.keys())
+        "sources": list(rag_system.source_manifest.keys())
     }
 
 @app.get("/api/stats")
@@ -78,26 +139,33 @@ async def get_stats():
     """Get RAG system statistics"""
     return {
         "total_chunks": len(rag_system.content_chunks),
-        "indexed_sources": list(rag_system.indexed_content.keys()),
+        "indexed_sources": list(rag_system.source_manifest.keys()),
         "source_details": {
             source: {
                 "filename": data["filename"],
                 "chunk_count": data["chunk_count"]
             }
-            for source, data in rag_system.indexed_content.items()
-        }
+            for source, data in rag_system.source_manifest.items()
+        },
+        "answer_cache": rag_system.answer_cache.get_stats(),
+        "scheduler": scheduler.get_stats()
     }
 
 @app.post("/api/reindex")
-async def reindex_content():
-    """Reindex all content"""
+async def reindex_content(full: bool = False):
+    """Reindex changed content (or everything with ?full=true)"""
     try:
-        rag_system.index_site_content()
-        rag_system.save_index()
+        version = rag_system.index_version
+        rag_system.index_site_content(force=full)
+        changed = rag_system.index_version != version
+        if changed:
+            rag_system.save_index()
+        rag_system.answer_cache.invalidate()
         return {
             "status": "success",
-            "message": "Content reindexed successfully",
-            "total_chunks": len(rag_system.content_chunks)
+            "message": "Content reindexed successfully" if changed else "Content already up to date",
+            "total_chunks": len(rag_system.content_chunks),
+            "index_version": rag_system.index_version
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error reindexing content: {str(e)}")
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Answer Cache for the MS AI RAG System
+LRU + TTL cache of chat answers keyed on the normalized question, the
+retrieved chunk IDs and the index version, with optional near-duplicate
+question matching
+"""
+
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from rag_vectors import NUMPY_AVAILABLE, HashingEncoder
+
+CONTRACTION_PATTERN = re.compile(r"['’][a-z]+\b")
+NORMALIZE_PATTERN = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_question(question: str) -> str:
+    """Lowercase, drop contraction suffixes and punctuation, collapse whitespace"""
+    question = CONTRACTION_PATTERN.sub('', question.lower())
+    return NORMALIZE_PATTERN.sub(' ', question).strip()
+
+
+class AnswerCache:
+    """Thread-safe answer cache with LRU eviction and per-entry TTL"""
+
+    def __init__(self, max_entries: int = 512, ttl_seconds: float = 3600.0,
+                 similarity_threshold: float = 0.9, encoder: Any = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        # Near-duplicate matching needs vectors; 0 disables it
+        self.similarity_threshold = similarity_threshold if NUMPY_AVAILABLE else 0.0
+        self.encoder = encoder or (HashingEncoder() if self.similarity_threshold else None)
+
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        # context signature (chunk IDs + index version) -> keys answered from that context
+        self._by_context: Dict[Tuple, set] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _context(self, chunk_ids: List[str], index_version: int) -> Tuple:
+        return (index_version, tuple(sorted(chunk_ids)))
+
+    def _key(self, normalized: str, context: Tuple) -> str:
+        return hashlib.sha256(repr((normalized, context)).encode('utf-8')).hexdigest()
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key)
+        keys = self._by_context.get(entry['context'])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_context[entry['context']]
+
+    def _expired(self, entry: Dict[str, Any], now: float) -> bool:
+        return now - entry['created_at'] > self.ttl_seconds
+
+    def get(self, question: str, chunk_ids: List[str], index_version: int) -> Optional[Dict[str, Any]]:
+        """Return a cached answer for this question and context, or None"""
+        normalized = normalize_question(question)
+        context = self._context(chunk_ids, index_version)
+        key = self._key(normalized, context)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._expired(entry, now):
+                self._remove(key)
+                self.expirations += 1
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry['result']
+            candidates = list(self._by_context.get(context, ()))
+
+        if candidates and self.similarity_threshold:
+            query_vector = self.encoder.encode([normalized])[0]
+            with self._lock:
+                best_key, best_score = None, self.similarity_threshold
+                for candidate in candidates:
+                    entry = self._entries.get(candidate)
+                    if entry is None or self._expired(entry, now):
+                        continue
+                    score = float(entry['vector'] @ query_vector)
+                    if score >= best_score:
+                        best_key, best_score = candidate, score
+                if best_key is not None:
+                    self._entries.move_to_end(best_key)
+                    self.near_hits += 1
+                    return self._entries[best_key]['result']
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, question: str, chunk_ids: List[str], index_version: int, result: Dict[str, Any]):
+        """Store an answer, evicting least recently used entries beyond capacity"""
+        normalized = normalize_question(question)
+        context = self._context(chunk_ids, index_version)
+        key = self._key(normalized, context)
+        vector = self.encoder.encode([normalized])[0] if self.similarity_threshold else None
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = {
+                'result': result,
+                'context': context,
+                'vector': vector,
+                'created_at': time.monotonic()
+            }
+            self._by_context.setdefault(context, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self):
+        """Drop every cached answer (e.g. after a reindex)"""
+        with self._lock:
+            self._entries.clear()
+            self._by_context.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.near_hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'near_duplicate_hits': self.near_hits,
+                'misses': self.misses,
+                'hit_rate': (self.hits + self.near_hits) / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations
+            }
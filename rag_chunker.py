@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Structure-Aware Chunker for the MS AI RAG System
+Streams HTML through a single parser pass, splits on headings and sections
+and sizes chunks by token count, tagging each with its page, heading path
+and anchor
+"""
+
+import re
+from html.parser import HTMLParser
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("cl100k_base")
+    TIKTOKEN_AVAILABLE = True
+except Exception:
+    _ENCODING = None
+    TIKTOKEN_AVAILABLE = False
+
+# Without tiktoken, words and punctuation marks approximate BPE tokens; long
+# words are charged one extra token per six characters
+TOKEN_PIECE_PATTERN = re.compile(r"\w+|[^\w\s]")
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+")
+WHITESPACE = re.compile(r"\s+")
+
+HEADING_TAGS = {'h1': 1, 'h2': 2, 'h3': 3, 'h4': 4, 'h5': 5, 'h6': 6}
+SKIP_TAGS = frozenset({'script', 'style', 'noscript', 'template', 'svg', 'head'})
+BOILERPLATE_TAGS = frozenset({'nav', 'header', 'footer'})
+BOILERPLATE_ROLES = frozenset({'navigation', 'banner', 'contentinfo'})
+VOID_TAGS = frozenset({'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+                       'link', 'meta', 'source', 'track', 'wbr'})
+BLOCK_TAGS = frozenset({
+    'address', 'article', 'aside', 'blockquote', 'br', 'button', 'dd', 'details', 'div',
+    'dl', 'dt', 'fieldset', 'figcaption', 'figure', 'footer', 'form', 'header', 'hr',
+    'label', 'legend', 'li', 'main', 'nav', 'ol', 'option', 'p', 'pre', 'section',
+    'select', 'summary', 'table', 'td', 'textarea', 'th', 'tr', 'ul'
+}) | frozenset(HEADING_TAGS)
+# Inline elements whose text should not run into a neighbour's (adjacent links)
+SPACED_TAGS = frozenset({'a'})
+
+
+def count_tokens(text: str) -> int:
+    """Number of LLM tokens in text (exact with tiktoken, estimated otherwise)"""
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text))
+    return sum(1 + len(piece) // 6 for piece in TOKEN_PIECE_PATTERN.findall(text))
+
+
+class _BlockParser(HTMLParser):
+    """Single-pass HTML walker that emits text blocks with their structural context"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.blocks: List[Dict[str, Any]] = []
+        self.title = ''
+        # open elements as (tag, id, is_boilerplate)
+        self._stack: List[Tuple[str, Optional[str], bool]] = []
+        self._skip_depth = 0
+        self._boilerplate_depth = 0
+        self._in_title = False
+        self._text: List[str] = []
+        # (level, text, anchor) of the headings enclosing the current position
+        self._headings: List[Tuple[int, str, Optional[str]]] = []
+        self._heading_level = 0
+
+    def _anchor(self) -> Optional[str]:
+        for _, element_id, _ in reversed(self._stack):
+            if element_id:
+                return element_id
+        return self._headings[-1][2] if self._headings else None
+
+    def _flush(self):
+        text = WHITESPACE.sub(' ', ''.join(self._text)).strip()
+        self._text = []
+        if not text:
+            return
+
+        # Headings inside nav/header/footer do not open content sections
+        if self._heading_level and not self._boilerplate_depth:
+            level = self._heading_level
+            self._headings = [h for h in self._headings if h[0] < level]
+            self._headings.append((level, text, self._anchor()))
+
+        self.blocks.append({
+            'text': text,
+            'heading_path': [h[1] for h in self._headings],
+            'anchor': self._anchor(),
+            'heading': bool(self._heading_level) and not self._boilerplate_depth,
+            'boilerplate': self._boilerplate_depth > 0
+        })
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'title':
+            self._in_title = True
+            return
+        if tag in SKIP_TAGS:
+            self._skip_depth += 1
+            return
+        if self._skip_depth:
+            return
+        if tag in BLOCK_TAGS:
+            self._flush()
+        elif tag in SPACED_TAGS:
+            self._text.append(' ')
+        if tag in VOID_TAGS:
+            return
+
+        attributes = dict(attrs)
+        boilerplate = tag in BOILERPLATE_TAGS or attributes.get('role') in BOILERPLATE_ROLES
+        self._stack.append((tag, attributes.get('id'), boilerplate))
+        self._boilerplate_depth += boilerplate
+        if tag in HEADING_TAGS:
+            self._heading_level = HEADING_TAGS[tag]
+
+    def handle_startendtag(self, tag, attrs):
+        if not self._skip_depth and tag in BLOCK_TAGS:
+            self._flush()
+
+    def handle_endtag(self, tag):
+        if tag == 'title':
+            self._in_title = False
+            return
+        if tag in SKIP_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+            return
+        if self._skip_depth or not any(open_tag == tag for open_tag, _, _ in self._stack):
+            return
+        if tag in BLOCK_TAGS:
+            self._flush()
+        elif tag in SPACED_TAGS:
+            self._text.append(' ')
+
+        # Close the element, implicitly closing anything left open inside it
+        while self._stack:
+            open_tag, _, boilerplate = self._stack.pop()
+            self._boilerplate_depth -= boilerplate
+            if open_tag in HEADING_TAGS:
+                self._heading_level = 0
+            if open_tag == tag:
+                break
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title += data
+        elif not self._skip_depth:
+            self._text.append(data)
+
+    def close(self):
+        super().close()
+        self._flush()
+
+
+class HTMLChunker:
+    """Splits pages on headings and packs each section into chunks of at most max_tokens"""
+
+    def __init__(self, max_tokens: int = 256, min_tokens: int = 64):
+        self.max_tokens = max_tokens
+        # Sections smaller than this are merged with the next one under the same parent
+        self.min_tokens = min_tokens
+
+    def parse(self, html: str) -> Tuple[str, List[Dict[str, Any]]]:
+        """Return the page title and its text blocks in document order"""
+        parser = _BlockParser()
+        parser.feed(html)
+        parser.close()
+        return WHITESPACE.sub(' ', parser.title).strip(), parser.blocks
+
+    def chunk(self, html: str, page: str = '') -> List[Dict[str, Any]]:
+        """Chunk a page into dicts with content, page, title, heading_path, anchor,
+        token_count and boilerplate (True for nav/header/footer text)"""
+        title, blocks = self.parse(html)
+        chunks: List[Dict[str, Any]] = []
+        current: Optional[Dict[str, Any]] = None
+
+        def close_current():
+            nonlocal current
+            if current is not None and current['parts']:
+                chunks.append({
+                    'content': '\n'.join(current['parts']),
+                    'page': page,
+                    'title': title,
+                    'heading_path': current['heading_path'],
+                    'anchor': current['anchor'],
+                    'token_count': current['token_count'],
+                    'boilerplate': current['boilerplate']
+                })
+            current = None
+
+        def open_chunk(block):
+            nonlocal current
+            current = {'parts': [], 'token_count': 0, 'heading_path': block['heading_path'],
+                       'anchor': block['anchor'], 'boilerplate': block['boilerplate']}
+
+        for block in blocks:
+            for text, tokens in self._split_block(block['text']):
+                starts_section = block['heading']
+                if current is not None:
+                    fits = current['token_count'] + tokens <= self.max_tokens
+                    same_kind = current['boilerplate'] == block['boilerplate']
+                    small = current['token_count'] < self.min_tokens
+                    if not fits or not same_kind or (starts_section and not small):
+                        close_current()
+                    elif starts_section:
+                        # Merging a short section into the next: keep the shared heading prefix
+                        current['heading_path'] = _common_prefix(current['heading_path'],
+                                                                  block['heading_path'][:-1])
+                if current is None:
+                    open_chunk(block)
+                current['parts'].append(text)
+                current['token_count'] += tokens
+        close_current()
+        return chunks
+
+    def _split_block(self, text: str) -> List[Tuple[str, int]]:
+        """Yield (text, tokens) pieces no larger than max_tokens, breaking at sentences, then words"""
+        tokens = count_tokens(text)
+        if tokens <= self.max_tokens:
+            return [(text, tokens)]
+
+        pieces = []
+        parts: List[str] = []
+        size = 0
+        for sentence in self._sentences(text):
+            sentence_tokens = count_tokens(sentence)
+            if parts and size + sentence_tokens > self.max_tokens:
+                pieces.append((' '.join(parts), size))
+                parts, size = [], 0
+            parts.append(sentence)
+            size += sentence_tokens
+        if parts:
+            pieces.append((' '.join(parts), size))
+        return pieces
+
+    def _sentences(self, text: str) -> List[str]:
+        sentences = []
+        for sentence in SENTENCE_BOUNDARY.split(text):
+            if count_tokens(sentence) <= self.max_tokens:
+                sentences.append(sentence)
+                continue
+            # A single run-on sentence: fall back to word windows
+            window: List[str] = []
+            size = 0
+            for word in sentence.split():
+                word_tokens = count_tokens(word)
+                if window and size + word_tokens > self.max_tokens:
+                    sentences.append(' '.join(window))
+                    window, size = [], 0
+                window.append(word)
+                size += word_tokens
+            if window:
+                sentences.append(' '.join(window))
+        return sentences
+
+
+def _common_prefix(left: List[str], right: List[str]) -> List[str]:
+    prefix = []
+    for a, b in zip(left, right):
+        if a != b:
+            break
+        prefix.append(a)
+    return prefix
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Context Packing for the MS AI RAG System
+Fits retrieved chunks into a prompt-token budget: highest scores first,
+near-duplicates dropped and long chunks trimmed to the sentences that
+match the question
+"""
+
+import re
+from typing import Any, Dict, List, Tuple
+
+from rag_chunker import count_tokens
+from rag_index import tokenize
+
+# Sentence ends followed by whitespace (so "3.0" stays whole), or block breaks
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+|\n+")
+
+# Chat formats add a few tokens of framing per message
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def count_message_tokens(messages: List[Dict[str, str]]) -> int:
+    """Prompt tokens for a list of chat messages"""
+    return sum(count_tokens(message['content']) + MESSAGE_OVERHEAD_TOKENS for message in messages)
+
+
+def usage_summary(messages: List[Dict[str, str]], answer: str, reported: Any = None) -> Dict[str, int]:
+    """Token usage for one answer, preferring the counts reported by the API"""
+    reported = reported or {}
+    prompt_tokens = reported.get('prompt_tokens') or count_message_tokens(messages)
+    completion_tokens = reported.get('completion_tokens') or count_tokens(answer)
+    return {
+        'prompt_tokens': prompt_tokens,
+        'completion_tokens': completion_tokens,
+        'total_tokens': prompt_tokens + completion_tokens
+    }
+
+
+class ContextPacker:
+    """Selects and trims chunks so the prompt context stays within max_tokens"""
+
+    def __init__(self, max_tokens: int = 1200, duplicate_threshold: float = 0.8,
+                 trim_above_tokens: int = 120):
+        self.max_tokens = max_tokens
+        # Share of a chunk's terms already covered by a better chunk that makes it redundant
+        self.duplicate_threshold = duplicate_threshold
+        # Chunks longer than this are cut down to their matching sentences
+        self.trim_above_tokens = trim_above_tokens
+
+    def pack(self, query: str, chunks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Return the chunks to send, best first, each with content and token_count fitted to the budget"""
+        query_terms = set(tokenize(query))
+        ranked = sorted(chunks, key=lambda chunk: chunk.get('relevance_score', 0.0), reverse=True)
+
+        packed = []
+        kept_terms: List[set] = []
+        remaining = self.max_tokens
+        for chunk in ranked:
+            if remaining <= 0:
+                break
+            terms = set(tokenize(chunk['content']))
+            if self._is_redundant(terms, kept_terms):
+                continue
+
+            content, tokens = self._fit(chunk['content'], query_terms, remaining)
+            if not content:
+                continue
+            packed.append({**chunk, 'content': content, 'token_count': tokens})
+            kept_terms.append(terms)
+            remaining -= tokens
+        return packed
+
+    def _is_redundant(self, terms: set, kept_terms: List[set]) -> bool:
+        if not terms:
+            return True
+        return any(len(terms & kept) / len(terms) >= self.duplicate_threshold for kept in kept_terms)
+
+    def _fit(self, content: str, query_terms: set, budget: int) -> Tuple[str, int]:
+        """Trim content to its matching sentences (in original order) within budget tokens"""
+        tokens = count_tokens(content)
+        if tokens <= min(budget, self.trim_above_tokens):
+            return content, tokens
+
+        sentences = [s.strip() for s in SENTENCE_BOUNDARY.split(content) if s.strip()]
+        scored = [
+            (len(query_terms.intersection(tokenize(sentence))), position, sentence)
+            for position, sentence in enumerate(sentences)
+        ]
+        # Best-matching sentences first; dense hits with no term overlap keep their opening
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        if scored and scored[0][0] > 0:
+            scored = [item for item in scored if item[0] > 0]
+
+        chosen = []
+        used = 0
+        for _, position, sentence in scored:
+            sentence_tokens = count_tokens(sentence)
+            if used + sentence_tokens > budget:
+                continue
+            chosen.append((position, sentence))
+            used += sentence_tokens
+        if not chosen:
+            return '', 0
+
+        chosen.sort()
+        text = '\n'.join(sentence for _, sentence in chosen)
+        return text, count_tokens(text)
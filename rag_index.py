@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Inverted Index for the MS AI RAG System
+BM25-scored postings lists used by MSRAGSystem for keyword retrieval
+"""
+
+import heapq
+import math
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Tuple
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:['\-][a-z0-9]+)*")
+
+STOPWORDS = frozenset("""
+a an and are as at be but by can do does for from has have how i if in into is it
+its me my of on or our so that the their them then there these they this to us was
+we what when where which who why will with you your
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase and split text into index terms, dropping stopwords"""
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+
+class BM25Index:
+    """Postings-list inverted index with Okapi BM25 scoring"""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        # term -> parallel lists of document ids and term frequencies
+        self.postings: Dict[str, Tuple[List[int], List[int]]] = {}
+        self.doc_lengths: List[int] = []
+        self.total_length = 0
+        self._length_norms: List[float] = []
+        self._norms_dirty = False
+
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+
+    def clear(self):
+        """Drop every document from the index"""
+        self.postings = {}
+        self.doc_lengths = []
+        self.total_length = 0
+        self._length_norms = []
+        self._norms_dirty = False
+
+    def add_document(self, text: str) -> int:
+        """Tokenize and index a document, returning its document id"""
+        return self.add_tokens(tokenize(text))
+
+    def add_tokens(self, tokens: List[str]) -> int:
+        """Index an already tokenized document, returning its document id"""
+        doc_id = len(self.doc_lengths)
+        for term, frequency in Counter(tokens).items():
+            doc_ids, frequencies = self.postings.setdefault(term, ([], []))
+            doc_ids.append(doc_id)
+            frequencies.append(frequency)
+
+        self.doc_lengths.append(len(tokens))
+        self.total_length += len(tokens)
+        self._norms_dirty = True
+        return doc_id
+
+    def build(self, texts: Iterable[str]):
+        """Rebuild the index from scratch over the given documents"""
+        self.clear()
+        for text in texts:
+            self.add_document(text)
+
+    def _refresh_norms(self):
+        """Precompute the per-document length normalisation of the BM25 denominator"""
+        average_length = self.total_length / len(self.doc_lengths) if self.doc_lengths else 0.0
+        if average_length == 0:
+            self._length_norms = [self.k1] * len(self.doc_lengths)
+        else:
+            self._length_norms = [
+                self.k1 * (1 - self.b + self.b * length / average_length)
+                for length in self.doc_lengths
+            ]
+        self._norms_dirty = False
+
+    def idf(self, term: str) -> float:
+        """BM25 inverse document frequency (non-negative variant)"""
+        postings = self.postings.get(term)
+        if not postings:
+            return 0.0
+        document_frequency = len(postings[0])
+        total_docs = len(self.doc_lengths)
+        return math.log(1 + (total_docs - document_frequency + 0.5) / (document_frequency + 0.5))
+
+    def score(self, query: str) -> Dict[int, float]:
+        """Accumulate BM25 scores for every document sharing a term with the query"""
+        if self._norms_dirty:
+            self._refresh_norms()
+
+        scores: Dict[int, float] = {}
+        length_norms = self._length_norms
+        k1_plus_one = self.k1 + 1
+
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = self.idf(term)
+            for doc_id, frequency in zip(*postings):
+                contribution = idf * frequency * k1_plus_one / (frequency + length_norms[doc_id])
+                scores[doc_id] = scores.get(doc_id, 0.0) + contribution
+
+        return scores
+
+    def search(self, query: str, top_k: int = 5) -> List[Tuple[int, float]]:
+        """Return the top_k (document id, score) pairs, best first"""
+        scores = self.score(query)
+        return heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Async LLM Client for the MS AI RAG System
+Pooled, rate-bounded OpenAI-compatible chat completions with retries,
+circuit breaking and token streaming
+"""
+
+import asyncio
+import json
+import random
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import httpx
+
+RETRYABLE_STATUS_CODES = frozenset({408, 409, 425, 429, 500, 502, 503, 504})
+
+
+class LLMClientError(Exception):
+    """Completion request failed after exhausting retries"""
+
+
+class CircuitOpenError(LLMClientError):
+    """Upstream is failing; requests are rejected until the breaker cools down"""
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a single half-open probe"""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return 'half_open'
+        return 'open'
+
+    def allow_request(self) -> bool:
+        """Check whether a request may go upstream right now"""
+        state = self.state
+        if state == 'closed':
+            return True
+        if state == 'half_open' and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._probe_in_flight = False
+
+    def release_probe(self):
+        """End an abandoned probe (cancelled, or its stream closed early) without judging the upstream"""
+        self._probe_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._probe_in_flight = False
+        if self.failures >= self.failure_threshold or self.opened_at is not None:
+            self.opened_at = time.monotonic()
+
+
+class AsyncLLMClient:
+    """Shared async client for an OpenAI-compatible chat completions endpoint"""
+
+    def __init__(self, api_url: str, api_key: Optional[str] = None,
+                 model: str = "openai/gpt-4o-mini",
+                 max_connections: int = 20, max_concurrency: int = 10,
+                 timeout: float = 30.0, connect_timeout: float = 5.0,
+                 max_retries: int = 3, backoff_base: float = 0.5, backoff_max: float = 8.0,
+                 circuit_breaker: Optional[CircuitBreaker] = None,
+                 transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.api_url = api_url
+        self.api_key = api_key
+        self.model = model
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        self.max_concurrency = max_concurrency
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._client = httpx.AsyncClient(
+            timeout=httpx.Timeout(timeout, connect=connect_timeout),
+            limits=httpx.Limits(max_connections=max_connections,
+                                max_keepalive_connections=max_connections),
+            transport=transport,
+        )
+        self.stats = {'requests': 0, 'retries': 0, 'failures': 0, 'circuit_rejections': 0}
+
+    async def aclose(self):
+        """Close pooled connections"""
+        await self._client.aclose()
+
+    def _headers(self) -> Dict[str, str]:
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        return headers
+
+    def _payload(self, messages: List[Dict[str, str]], stream: bool, **params) -> Dict[str, Any]:
+        payload = {"model": self.model, "messages": messages, "max_tokens": 1000, "temperature": 0.7}
+        payload.update(params)
+        if stream:
+            payload["stream"] = True
+        return payload
+
+    def _backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """Full-jitter exponential backoff, honouring a numeric Retry-After"""
+        if retry_after:
+            try:
+                return min(float(retry_after), self.backoff_max)
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def _check_circuit(self) -> bool:
+        """Admit a request through the breaker; True when it is the half-open probe"""
+        probe = self.circuit_breaker.state == 'half_open'
+        if not self.circuit_breaker.allow_request():
+            self.stats['circuit_rejections'] += 1
+            raise CircuitOpenError("LLM upstream circuit is open; try again shortly")
+        return probe
+
+    async def complete(self, messages: List[Dict[str, str]], **params) -> Dict[str, Any]:
+        """Send a chat completion and return the decoded JSON response"""
+        payload = self._payload(messages, stream=False, **params)
+        last_error = None
+
+        for attempt in range(self.max_retries + 1):
+            probe = self._check_circuit()
+            retry_after = None
+            try:
+                async with self._semaphore:
+                    self.stats['requests'] += 1
+                    try:
+                        response = await self._client.post(self.api_url, json=payload, headers=self._headers())
+                        if response.status_code in RETRYABLE_STATUS_CODES:
+                            retry_after = response.headers.get('Retry-After')
+                            last_error = LLMClientError(f"Upstream returned HTTP {response.status_code}")
+                        else:
+                            response.raise_for_status()
+                            result = response.json()
+                            self.circuit_breaker.record_success()
+                            return result
+                    except httpx.HTTPStatusError as e:
+                        # Non-retryable client error: the request itself is wrong
+                        self.circuit_breaker.record_success()
+                        self.stats['failures'] += 1
+                        raise LLMClientError(f"Upstream returned HTTP {e.response.status_code}") from e
+                    except (httpx.TransportError, ValueError) as e:
+                        last_error = LLMClientError(f"Error calling LLM API: {e}")
+            finally:
+                # Only record_success/record_failure judge the upstream; a cancelled or
+                # abandoned probe must still make way for the next one
+                if probe:
+                    self.circuit_breaker.release_probe()
+
+            self.circuit_breaker.record_failure()
+            if attempt < self.max_retries:
+                self.stats['retries'] += 1
+                await asyncio.sleep(self._backoff(attempt, retry_after))
+
+        self.stats['failures'] += 1
+        raise last_error
+
+    async def stream(self, messages: List[Dict[str, str]], **params) -> AsyncIterator[str]:
+        """Yield completion text deltas as they arrive over server-sent events
+
+        Retries happen only before the first token; once text has been relayed
+        to the caller a failure is raised instead of silently restarting.
+        """
+        payload = self._payload(messages, stream=True, **params)
+        last_error = None
+
+        for attempt in range(self.max_retries + 1):
+            probe = self._check_circuit()
+            retry_after = None
+            yielded = False
+            try:
+                async with self._semaphore:
+                    self.stats['requests'] += 1
+                    try:
+                        async with self._client.stream('POST', self.api_url, json=payload,
+                                                       headers=self._headers()) as response:
+                            if response.status_code in RETRYABLE_STATUS_CODES:
+                                retry_after = response.headers.get('Retry-After')
+                                last_error = LLMClientError(f"Upstream returned HTTP {response.status_code}")
+                            else:
+                                response.raise_for_status()
+                                async for line in response.aiter_lines():
+                                    if not line.startswith('data:'):
+                                        continue
+                                    data = line[len('data:'):].strip()
+                                    if data == '[DONE]':
+                                        break
+                                    choices = json.loads(data).get('choices') or [{}]
+                                    delta = choices[0].get('delta', {}).get('content')
+                                    if delta:
+                                        yielded = True
+                                        yield delta
+                                self.circuit_breaker.record_success()
+                                return
+                    except httpx.HTTPStatusError as e:
+                        self.circuit_breaker.record_success()
+                        self.stats['failures'] += 1
+                        raise LLMClientError(f"Upstream returned HTTP {e.response.status_code}") from e
+                    except (httpx.TransportError, ValueError) as e:
+                        last_error = LLMClientError(f"Error streaming from LLM API: {e}")
+                        if yielded:
+                            self.circuit_breaker.record_failure()
+                            self.stats['failures'] += 1
+                            raise last_error from e
+            finally:
+                # Also reached when the caller closes the stream early (GeneratorExit at yield)
+                if probe:
+                    self.circuit_breaker.release_probe()
+
+            self.circuit_breaker.record_failure()
+            if attempt < self.max_retries:
+                self.stats['retries'] += 1
+                await asyncio.sleep(self._backoff(attempt, retry_after))
+
+        self.stats['failures'] += 1
+        raise last_error
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Load Test Harness for the MS AI RAG Chat API
+Measures p50/p99 latency and throughput at several concurrency levels,
+either in-process against a stub LLM or over HTTP against a running rag_api
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import Any, Dict, List
+
+import httpx
+
+from rag_cache import AnswerCache
+from rag_llm_client import AsyncLLMClient
+from rag_scheduler import OverloadedError, QueryScheduler
+from rag_system import MSRAGSystem
+
+SAMPLE_QUESTIONS = [
+    "What are the admission requirements?",
+    "How much does the program cost?",
+    "Do I need a computer science background?",
+    "Tell me about the AI tutoring system",
+    "What courses are required?",
+    "How long is the program?",
+    "What are the career outcomes?",
+    "Who are the faculty?",
+    "Is there a thesis?",
+    "What electives are offered?"
+]
+
+
+class StubLLMTransport(httpx.AsyncBaseTransport):
+    """In-process chat completions endpoint with a fixed response latency"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        return httpx.Response(200, json={"choices": [{"message": {"content": "Stub answer."}}]})
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an unsorted list"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+async def run_clients(clients: int, requests_per_client: int, send) -> Dict[str, Any]:
+    """Run closed-loop clients and summarise latency, throughput and rejections"""
+    latencies: List[float] = []
+    rejected = 0
+    failed = 0
+    counter = 0
+
+    async def client():
+        nonlocal rejected, failed, counter
+        for _ in range(requests_per_client):
+            counter += 1
+            # A unique suffix keeps the answer cache out of the measurement
+            question = f"{random.choice(SAMPLE_QUESTIONS)} #{counter}"
+            started = time.perf_counter()
+            outcome = await send(question)
+            if outcome == 'ok':
+                latencies.append(time.perf_counter() - started)
+            elif outcome == 'rejected':
+                rejected += 1
+            else:
+                failed += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(clients)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        'clients': clients,
+        'completed': len(latencies),
+        'rejected': rejected,
+        'failed': failed,
+        'p50_ms': percentile(latencies, 0.50) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+        'throughput_rps': len(latencies) / elapsed if elapsed else 0.0
+    }
+
+
+def build_in_process_system(args) -> MSRAGSystem:
+    """RAG system over the local site pages, wired to a stub LLM"""
+    rag = MSRAGSystem(retrieval_mode=args.mode)
+    if not rag.load_index():
+        rag.index_site_content()
+    rag.openrouter_api_key = "stub"
+    rag.answer_cache = AnswerCache(max_entries=0, similarity_threshold=0)
+    return rag
+
+
+async def run_in_process(args) -> List[Dict[str, Any]]:
+    results = []
+    for clients in args.clients:
+        rag = build_in_process_system(args)
+        transport = StubLLMTransport(args.llm_latency)
+        rag._llm_client = AsyncLLMClient(rag.openrouter_url, "stub", transport=transport,
+                                         max_connections=args.max_inflight,
+                                         max_concurrency=args.max_inflight)
+
+        if args.direct:
+            async def send(question):
+                await rag.aquery(question)
+                return 'ok'
+        else:
+            scheduler = QueryScheduler(rag, max_inflight=args.max_inflight,
+                                       max_queue_depth=args.max_queue)
+
+            async def send(question):
+                try:
+                    await scheduler.query(question)
+                    return 'ok'
+                except OverloadedError as e:
+                    await asyncio.sleep(min(e.retry_after, args.max_backoff))
+                    return 'rejected'
+
+        summary = await run_clients(clients, args.requests, send)
+        if not args.direct:
+            summary['average_batch_size'] = scheduler.get_stats()['average_batch_size']
+        summary['llm_calls'] = transport.calls
+        results.append(summary)
+        await rag.aclose()
+    return results
+
+
+async def run_over_http(args) -> List[Dict[str, Any]]:
+    results = []
+    limits = httpx.Limits(max_connections=max(args.clients))
+    async with httpx.AsyncClient(base_url=args.url, timeout=120, limits=limits) as http:
+        for clients in args.clients:
+            async def send(question):
+                try:
+                    response = await http.post("/api/chat", json={"question": question})
+                except httpx.HTTPError:
+                    return 'failed'
+                if response.status_code == 429:
+                    await asyncio.sleep(min(float(response.headers.get('Retry-After', 1)), args.max_backoff))
+                    return 'rejected'
+                return 'ok' if response.status_code == 200 else 'failed'
+
+            results.append(await run_clients(clients, args.requests, send))
+    return results
+
+
+def print_report(results: List[Dict[str, Any]]):
+    print(f"{'clients':>8} {'done':>6} {'429s':>6} {'fail':>5} {'p50 ms':>9} {'p99 ms':>9} {'req/s':>9}")
+    for row in results:
+        print(f"{row['clients']:>8} {row['completed']:>6} {row['rejected']:>6} {row['failed']:>5} "
+              f"{row['p50_ms']:>9.1f} {row['p99_ms']:>9.1f} {row['throughput_rps']:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the MS AI RAG chat path")
+    parser.add_argument('--clients', type=int, nargs='+', default=[10, 100, 500],
+                        help="concurrency levels to test")
+    parser.add_argument('--requests', type=int, default=5, help="requests per client")
+    parser.add_argument('--url', help="base URL of a running rag_api (omit for in-process mode)")
+    parser.add_argument('--llm-latency', type=float, default=0.2, help="stub LLM latency in seconds")
+    parser.add_argument('--mode', default='keyword', choices=['keyword', 'dense', 'hybrid'])
+    parser.add_argument('--max-inflight', type=int, default=10)
+    parser.add_argument('--max-queue', type=int, default=100)
+    parser.add_argument('--max-backoff', type=float, default=1.0,
+                        help="cap on how long a rejected client waits before its next request")
+    parser.add_argument('--direct', action='store_true',
+                        help="bypass the scheduler (baseline without batching or load shedding)")
+    parser.add_argument('--json', action='store_true', help="print results as JSON")
+    args = parser.parse_args()
+
+    print("🚦 MS AI RAG load test")
+    print(f"   Target: {args.url or 'in-process with stub LLM'}")
+    results = asyncio.run(run_over_http(args) if args.url else run_in_process(args))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_report(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Query Scheduler for the MS AI RAG System
+Micro-batches concurrent retrievals, bounds in-flight LLM calls and sheds
+load once the queue gets too deep
+"""
+
+import asyncio
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+
+class OverloadedError(Exception):
+    """Raised when the scheduler queue is full; retry_after is in seconds"""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class QueryScheduler:
+    """Front door for MSRAGSystem queries under concurrent load"""
+
+    def __init__(self, rag_system: Any, max_batch_size: int = 32, batch_window: float = 0.002,
+                 max_inflight: int = 10, max_queue_depth: int = 100, top_k: int = 5):
+        self.rag_system = rag_system
+        self.max_batch_size = max_batch_size
+        self.batch_window = batch_window
+        self.max_inflight = max_inflight
+        self.max_queue_depth = max_queue_depth
+        self.top_k = top_k
+
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._llm_slots = asyncio.Semaphore(max_inflight)
+
+        self.active = 0
+        self.queued = 0
+        self.inflight = 0
+        self.llm_latency = 1.0
+        self.stats = {'admitted': 0, 'rejected': 0, 'batches': 0, 'batched_queries': 0, 'largest_batch': 0}
+
+    # Admission control
+
+    def retry_after(self) -> int:
+        """Seconds until the current backlog should have drained"""
+        backlog = max(self.queued, self.active - self.max_inflight, 0) + 1
+        return max(1, math.ceil(backlog / self.max_inflight * self.llm_latency))
+
+    def _admit(self):
+        if self.active >= self.max_inflight + self.max_queue_depth:
+            self.stats['rejected'] += 1
+            raise OverloadedError("Chat service is busy, please retry shortly", self.retry_after())
+        self.active += 1
+        self.stats['admitted'] += 1
+
+    # Retrieval micro-batching
+
+    async def retrieve(self, question: str) -> Tuple[List[Dict], int]:
+        """Retrieve chunks for a question, coalesced with concurrent callers into one batch"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((question, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.batch_window, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        self.stats['batches'] += 1
+        self.stats['batched_queries'] += len(batch)
+        self.stats['largest_batch'] = max(self.stats['largest_batch'], len(batch))
+
+        index_version = self.rag_system.index_version
+        try:
+            results = self.rag_system.search_relevant_chunks_batch([q for q, _ in batch], self.top_k)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), chunks in zip(batch, results):
+            if not future.done():
+                future.set_result((chunks, index_version))
+
+    # Upstream concurrency limit
+
+    @asynccontextmanager
+    async def _llm_gate(self):
+        self.queued += 1
+        try:
+            await self._llm_slots.acquire()
+        finally:
+            self.queued -= 1
+
+        self.inflight += 1
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.inflight -= 1
+            self._llm_slots.release()
+            # Exponentially weighted latency feeds the Retry-After estimate
+            self.llm_latency = 0.8 * self.llm_latency + 0.2 * (time.monotonic() - started)
+
+    # Entry points
+
+    async def query(self, question: str) -> Dict[str, Any]:
+        """Answer a question; raises OverloadedError when the queue is full"""
+        self._admit()
+        try:
+            relevant_chunks, index_version = await self.retrieve(question)
+            return await self.rag_system.aanswer(question, relevant_chunks, index_version,
+                                                 llm_gate=self._llm_gate())
+        finally:
+            self.active -= 1
+
+    async def stream(self, question: str) -> AsyncIterator[Dict[str, Any]]:
+        """Answer a question as events; admitted on the first iteration, which raises OverloadedError
+        when the queue is full, so a stream that is never iterated holds no slot"""
+        self._admit()
+        try:
+            relevant_chunks, index_version = await self.retrieve(question)
+            async for event in self.rag_system.astream_answer(question, relevant_chunks, index_version,
+                                                              llm_gate=self._llm_gate()):
+                yield event
+        finally:
+            self.active -= 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue depth, concurrency and batching counters"""
+        batches = self.stats['batches']
+        return {
+            **self.stats,
+            'average_batch_size': self.stats['batched_queries'] / batches if batches else 0.0,
+            'active': self.active,
+            'queued_for_llm': self.queued,
+            'llm_inflight': self.inflight,
+            'max_inflight': self.max_inflight,
+            'max_queue_depth': self.max_queue_depth,
+            'llm_latency_ewma': self.llm_latency
+        }
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Binary Index Store for the MS AI RAG System
+Versioned, memory-mapped on-disk format for chunks, postings and vectors
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections.abc import Mapping, Sequence
+from typing import Any, Dict, List, Optional
+
+from rag_index import BM25Index
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+# File layout (little-endian):
+#   header     magic, format version, flags, counts
+#   sections   (offset, length) for each section below, in this order
+#   metadata   UTF-8 JSON: manifest, sources, BM25 parameters, per-chunk fields except content
+#   offsets    u64[n_chunks + 1] byte offsets into the string pool
+#   strings    UTF-8 chunk texts back to back
+#   terms      newline-separated UTF-8 vocabulary, sorted
+#   term_offs  u64[n_terms + 1] entry offsets into the postings arrays
+#   doc_lens   u32[n_chunks] token count per chunk
+#   post_docs  u32[n_postings] document ids
+#   post_freqs u32[n_postings] term frequencies
+#   vectors    f32[n_chunks, vector_dim], 64-byte aligned (optional)
+# Every other section starts on an 8-byte boundary so integer arrays map without copying.
+MAGIC = b'MSRAGIX\x00'
+FORMAT_VERSION = 1
+FLAG_HAS_VECTORS = 0x1
+HEADER = struct.Struct('<8sHHIIIQ')
+SECTIONS = ('metadata', 'offsets', 'strings', 'terms', 'term_offsets',
+            'doc_lengths', 'posting_docs', 'posting_freqs', 'vectors')
+SECTION_ENTRY = struct.Struct('<QQ')
+SECTION_ALIGNMENT = 8
+VECTOR_ALIGNMENT = 64
+
+
+def is_binary_index(path: str) -> bool:
+    """Check whether a file starts with the binary index magic"""
+    try:
+        with open(path, 'rb') as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def _u32_bytes(values) -> bytes:
+    packed = array('I', values)
+    if sys.byteorder != 'little':
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def _u64_bytes(values) -> bytes:
+    packed = array('Q', values)
+    if sys.byteorder != 'little':
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def write_index(path: str, chunks: Sequence, keyword_index: BM25Index,
+                vectors: Any = None, metadata: Optional[Dict[str, Any]] = None):
+    """Serialize chunks, postings and optional vectors; replaces the file atomically"""
+    strings = bytearray()
+    offsets = [0]
+    chunk_fields = []
+    for chunk in chunks:
+        strings += chunk['content'].encode('utf-8')
+        offsets.append(len(strings))
+        chunk_fields.append({key: value for key, value in chunk.items() if key != 'content'})
+
+    terms = sorted(keyword_index.postings)
+    term_offsets = [0]
+    posting_docs = array('I')
+    posting_freqs = array('I')
+    for term in terms:
+        doc_ids, frequencies = keyword_index.postings[term]
+        posting_docs.extend(doc_ids)
+        posting_freqs.extend(frequencies)
+        term_offsets.append(len(posting_docs))
+
+    meta = dict(metadata or {})
+    meta['chunks'] = chunk_fields
+    meta['bm25'] = {'k1': keyword_index.k1, 'b': keyword_index.b}
+
+    vector_bytes = b''
+    vector_dim = 0
+    flags = 0
+    if vectors is not None and len(chunks):
+        matrix = np.ascontiguousarray(vectors, dtype='<f4')
+        vector_dim = matrix.shape[1]
+        vector_bytes = matrix.tobytes()
+        flags |= FLAG_HAS_VECTORS
+
+    payloads = {
+        'metadata': json.dumps(meta, separators=(',', ':')).encode('utf-8'),
+        'offsets': _u64_bytes(offsets),
+        'strings': bytes(strings),
+        'terms': '\n'.join(terms).encode('utf-8'),
+        'term_offsets': _u64_bytes(term_offsets),
+        'doc_lengths': _u32_bytes(keyword_index.doc_lengths),
+        'posting_docs': _u32_bytes(posting_docs),
+        'posting_freqs': _u32_bytes(posting_freqs),
+        'vectors': vector_bytes,
+    }
+
+    position = HEADER.size + SECTION_ENTRY.size * len(SECTIONS)
+    layout = []
+    for name in SECTIONS:
+        alignment = VECTOR_ALIGNMENT if name == 'vectors' else SECTION_ALIGNMENT
+        position += -position % alignment
+        layout.append((position, len(payloads[name])))
+        position += len(payloads[name])
+
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, flags, len(chunks), len(terms),
+                            vector_dim, len(posting_docs)))
+        for offset, length in layout:
+            f.write(SECTION_ENTRY.pack(offset, length))
+        for name, (offset, _) in zip(SECTIONS, layout):
+            f.write(b'\x00' * (offset - f.tell()))
+            f.write(payloads[name])
+        f.flush()
+        os.fsync(f.fileno())
+
+    # Readers that already mapped the old file keep their inode; new readers see the new one
+    os.replace(temp_path, path)
+
+
+class LazyChunkList(Sequence):
+    """Chunk dicts whose text is decoded from the mapped string pool on access"""
+
+    def __init__(self, fields: List[Dict[str, Any]], offsets: memoryview, strings: memoryview):
+        self._fields = fields
+        self._offsets = offsets
+        self._strings = strings
+
+    def __len__(self) -> int:
+        return len(self._fields)
+
+    def content(self, index: int) -> str:
+        """Decode the text of a single chunk"""
+        return str(self._strings[self._offsets[index]:self._offsets[index + 1]], 'utf-8')
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        return {**self._fields[index], 'content': self.content(index)}
+
+
+class MappedPostings(Mapping):
+    """Read-only term -> (doc ids, frequencies) view over the mapped postings arrays"""
+
+    def __init__(self, terms: List[str], term_offsets: memoryview,
+                 posting_docs: memoryview, posting_freqs: memoryview):
+        self._term_ids = {term: i for i, term in enumerate(terms)}
+        self._term_offsets = term_offsets
+        self._docs = posting_docs
+        self._freqs = posting_freqs
+
+    def __getitem__(self, term: str):
+        term_id = self._term_ids[term]
+        start, end = self._term_offsets[term_id], self._term_offsets[term_id + 1]
+        return self._docs[start:end], self._freqs[start:end]
+
+    def __iter__(self):
+        return iter(self._term_ids)
+
+    def __len__(self) -> int:
+        return len(self._term_ids)
+
+
+class MappedBM25Index(BM25Index):
+    """BM25 index whose postings live in a memory-mapped file"""
+
+    def __init__(self, postings: MappedPostings, doc_lengths: memoryview,
+                 k1: float = 1.5, b: float = 0.75):
+        super().__init__(k1, b)
+        self.postings = postings
+        self.doc_lengths = doc_lengths
+        self.total_length = sum(doc_lengths)
+        self._norms_dirty = True
+
+    def add_tokens(self, tokens: List[str]) -> int:
+        raise TypeError("Memory-mapped index is read-only; rebuild it with BM25Index")
+
+    def clear(self):
+        raise TypeError("Memory-mapped index is read-only; rebuild it with BM25Index")
+
+
+class MappedIndexStore:
+    """Open binary index; chunk text and postings are paged in from a shared mapping"""
+
+    def __init__(self, path: str):
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, flags, n_chunks, n_terms, vector_dim, n_postings = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not an MS AI RAG binary index")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported index format version {version} (expected {FORMAT_VERSION})")
+
+        sections = {
+            name: SECTION_ENTRY.unpack_from(self._mmap, HEADER.size + i * SECTION_ENTRY.size)
+            for i, name in enumerate(SECTIONS)
+        }
+        view = memoryview(self._mmap)
+
+        def section(name: str) -> memoryview:
+            offset, length = sections[name]
+            return view[offset:offset + length]
+
+        def integers(name: str, fmt: str) -> memoryview:
+            raw = section(name)
+            if sys.byteorder != 'little':
+                swapped = array(fmt, raw.tobytes())
+                swapped.byteswap()
+                return memoryview(swapped)
+            return raw.cast(fmt)
+
+        self.path = path
+        self.metadata = json.loads(str(section('metadata'), 'utf-8'))
+        chunk_fields = self.metadata.pop('chunks')
+        self.chunks = LazyChunkList(chunk_fields, integers('offsets', 'Q'), section('strings'))
+
+        terms = str(section('terms'), 'utf-8').split('\n') if n_terms else []
+        postings = MappedPostings(terms, integers('term_offsets', 'Q'),
+                                  integers('posting_docs', 'I'), integers('posting_freqs', 'I'))
+        bm25 = self.metadata.get('bm25', {})
+        self.keyword_index = MappedBM25Index(postings, integers('doc_lengths', 'I'),
+                                             bm25.get('k1', 1.5), bm25.get('b', 0.75))
+
+        self.vectors = None
+        if flags & FLAG_HAS_VECTORS and NUMPY_AVAILABLE:
+            offset, _ = sections['vectors']
+            self.vectors = np.frombuffer(
+                self._mmap, dtype='<f4', count=n_chunks * vector_dim, offset=offset
+            ).reshape(n_chunks, vector_dim)
@@ -8,154 +8,374 @@ import os
 import json
 import requests
 from pathlib import Path
-from bs4 import BeautifulSoup
 import hashlib
-from typing import List, Dict, Any
+from typing import List, Dict, Any, AsyncIterator, Optional, Tuple
 import re
+import threading
+from contextlib import nullcontext
 from datetime import datetime
+from rag_index import BM25Index, tokenize
+from rag_llm_client import AsyncLLMClient, LLMClientError
+from rag_cache import AnswerCache
+from rag_chunker import HTMLChunker
+from rag_context import ContextPacker, usage_summary
+from rag_store import MappedIndexStore, is_binary_index, write_index
+from rag_vectors import NUMPY_AVAILABLE, VectorIndex, load_encoder, top_k_indices
+
+if NUMPY_AVAILABLE:
+    import numpy as np
+
+RETRIEVAL_MODES = ('keyword', 'dense', 'hybrid')
+INDEX_FILE = "rag_index.bin"
+
+SYSTEM_PROMPT = """You are AurAI, the AI assistant for the MS AI Program at AURNOVA University. You help prospective students, current students, and faculty with questions about the program.
+
+Use the provided context to answer questions accurately. If the context doesn't contain enough information, say so and suggest contacting the admissions office.
+
+Be helpful, professional, and encouraging. Emphasize the program's unique features like:
+- AI tutoring for non-CS backgrounds
+- Co-evolutionary learning with personal AI companions
+- 24/7 AI teaching assistants
+- Comprehensive curriculum
+- Industry partnerships
+
+Always maintain a positive, supportive tone."""
+
+MISSING_KEY_MESSAGE = "Error: OpenRouter API key not found. Please set OPENROUTER_API_KEY environment variable."
+NO_RESULTS_MESSAGE = "I couldn't find relevant information in our knowledge base. Please try rephrasing your question or contact our admissions office directly."
 
 class MSRAGSystem:
-    def __init__(self):
+    # Site pages indexed for RAG, keyed by source name
+    CONTENT_SOURCES = {
+        'index': 'index.html',
+        'white_paper': 'white-paper.html',
+        'course_catalog': 'course-catalog.html',
+        'faculty': 'faculty.html',
+        'application_form': 'msai_application_form.html'
+    }
+    
+    def __init__(self, retrieval_mode: Optional[str] = None, encoder_name: Optional[str] = None):
         self.openrouter_api_key = os.getenv('OPENROUTER_API_KEY')
-        self.openrouter_url = "https://openrouter.ai/api/v1/chat/completions"
+        self.openrouter_url = os.getenv('OPENROUTER_API_URL', "https://openrouter.ai/api/v1/chat/completions")
+        self.llm_model = os.getenv('OPENROUTER_MODEL', "openai/gpt-4o-mini")
+        self._llm_client = None
+        
+        # Answers keyed on normalized question + retrieved chunk IDs + index version
+        self.answer_cache = AnswerCache(
+            max_entries=int(os.getenv('RAG_CACHE_SIZE', '512')),
+            ttl_seconds=float(os.getenv('RAG_CACHE_TTL', '3600')),
+            similarity_threshold=float(os.getenv('RAG_CACHE_SIMILARITY', '0.9'))
+        )
         self.indexed_content = {}
         self.content_chunks = []
+        # Heading-aware chunks sized by LLM tokens rather than words
+        self.chunker = HTMLChunker(
+            max_tokens=int(os.getenv('RAG_CHUNK_TOKENS', '256')),
+            min_tokens=int(os.getenv('RAG_CHUNK_MIN_TOKENS', '64'))
+        )
+        # Prompt context budget: retrieved chunks are deduplicated and trimmed to fit
+        self.context_packer = ContextPacker(max_tokens=int(os.getenv('RAG_CONTEXT_TOKENS', '1200')))
+        self.search_index = BM25Index()
         
-    def extract_text_from_html(self, html_content: str) -> str:
-        """Extract clean text from HTML content"""
-        soup = BeautifulSoup(html_content, 'html.parser')
-        
-        # Remove script and style elements
-        for script in soup(["script", "style"]):
-            script.decompose()
-        
-        # Get text and clean it
-        text = soup.get_text()
-        lines = (line.strip() for line in text.splitlines())
-        chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-        text = ' '.join(chunk for chunk in chunks if chunk)
+        # Incremental indexing: per-source manifest (mtime + SHA-256) and per-source
+        # segments of chunks, tokens and vectors that are swapped in atomically
+        self.content_sources = dict(self.CONTENT_SOURCES)
+        self.source_manifest = {}
+        self.index_version = 0
+        self._segments = {}
+        self._mapped_store = None
+        self._index_lock = threading.Lock()
+        self._reindex_lock = threading.Lock()
+        self._watch_thread = None
+        self._watch_stop = threading.Event()
         
-        return text
-    
-    def chunk_text(self, text: str, chunk_size: int = 1000, overlap: int = 200) -> List[str]:
-        """Split text into overlapping chunks"""
-        words = text.split()
-        chunks = []
-        
-        for i in range(0, len(words), chunk_size - overlap):
-            chunk = ' '.join(words[i:i + chunk_size])
-            if chunk.strip():
-                chunks.append(chunk.strip())
-        
-        return chunks
-    
-    def index_site_content(self):
-        """Index all site content for RAG"""
-        print("🔍 Indexing site content...")
-        
-        # Define content sources
-        content_sources = {
-            'index': 'index.html',
-            'white_paper': 'white-paper.html',
-            'course_catalog': 'course-catalog.html',
-            'faculty': 'faculty.html',
-            'application_form': 'msai_application_form.html'
-        }
+        # Retrieval mode: 'keyword' (BM25), 'dense' (embeddings) or 'hybrid' (both fused)
+        self.retrieval_mode = retrieval_mode or os.getenv('RAG_RETRIEVAL_MODE', 'keyword')
+        if self.retrieval_mode not in RETRIEVAL_MODES:
+            raise ValueError(f"Unknown retrieval mode '{self.retrieval_mode}', expected one of {RETRIEVAL_MODES}")
+        self.hybrid_alpha = float(os.getenv('RAG_HYBRID_ALPHA', '0.5'))
+        self.vector_index = None
+        if self.retrieval_mode != 'keyword':
+            if NUMPY_AVAILABLE:
+                self.vector_index = VectorIndex(load_encoder(encoder_name or os.getenv('RAG_ENCODER')))
+            else:
+                print("⚠️  numpy not available, falling back to keyword retrieval")
+                self.retrieval_mode = 'keyword'
         
-        for source_name, filename in content_sources.items():
-            file_path = Path(filename)
-            if file_path.exists():
-                print(f"   📄 Indexing {filename}...")
+    def index_site_content(self, force: bool = False):
+        """Index site content for RAG, re-parsing only sources that changed on disk"""
+        with self._reindex_lock:
+            print("🔍 Indexing site content...")
+            changed = False
+            
+            for source_name, filename in self.content_sources.items():
+                file_path = Path(filename)
+                if not file_path.exists():
+                    if source_name in self.source_manifest:
+                        self._ensure_segments().pop(source_name, None)
+                        self.source_manifest.pop(source_name, None)
+                        self.indexed_content.pop(source_name, None)
+                        changed = True
+                        print(f"   🗑️  Removed chunks of deleted file: {filename}")
+                    else:
+                        print(f"   ⚠️  File not found: {filename}")
+                    continue
+                
+                entry = self.source_manifest.get(source_name)
+                is_indexed = entry is not None
+                stat = file_path.stat()
+                mtime, size = stat.st_mtime, stat.st_size
+                if not force and is_indexed and entry['mtime'] == mtime and entry.get('size') == size:
+                    continue
                 
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    html_content = f.read()
+                raw_content = file_path.read_bytes()
+                content_hash = hashlib.sha256(raw_content).hexdigest()
+                if not force and is_indexed and entry['sha256'] == content_hash:
+                    # Touched but not edited; remember the new stat and skip parsing
+                    entry['mtime'] = mtime
+                    entry['size'] = size
+                    continue
                 
-                # Extract text
-                text_content = self.extract_text_from_html(html_content)
+                print(f"   📄 Indexing {filename}...")
                 
-                # Create chunks
-                chunks = self.chunk_text(text_content)
+                # Split on headings/sections in one pass over the DOM
+                chunks = self.chunker.chunk(raw_content.decode('utf-8'), page=filename)
                 
                 # Store content
                 self.indexed_content[source_name] = {
                     'filename': filename,
-                    'full_text': text_content,
                     'chunks': chunks,
                     'chunk_count': len(chunks)
                 }
-                
-                # Add chunks to global list
-                for i, chunk in enumerate(chunks):
-                    chunk_id = f"{source_name}_{i}"
-                    self.content_chunks.append({
-                        'id': chunk_id,
-                        'source': source_name,
-                        'content': chunk,
-                        'chunk_index': i
-                    })
+                self._ensure_segments()[source_name] = self._build_segment(source_name, chunks)
+                self.source_manifest[source_name] = {
+                    'filename': filename,
+                    'mtime': mtime,
+                    'size': size,
+                    'sha256': content_hash,
+                    'chunk_count': len(chunks)
+                }
+                changed = True
                 
                 print(f"   ✅ Indexed {len(chunks)} chunks from {filename}")
-            else:
-                print(f"   ⚠️  File not found: {filename}")
-        
-        print(f"📊 Total chunks indexed: {len(self.content_chunks)}")
-        return self.content_chunks
+            
+            if changed or len(self.search_index) != len(self.content_chunks):
+                self._publish_segments()
+            
+            print(f"📊 Total chunks indexed: {len(self.content_chunks)}")
+            return self.content_chunks
     
-    def search_relevant_chunks(self, query: str, top_k: int = 5) -> List[Dict]:
-        """Search for relevant content chunks using simple keyword matching"""
-        query_lower = query.lower()
-        query_words = set(query_lower.split())
+    def _build_segment(self, source_name: str, chunks: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Tokenize (and embed) one source's chunks"""
+        texts = [chunk['content'] for chunk in chunks]
+        return {
+            'chunks': [
+                {
+                    'id': f"{source_name}_{i}",
+                    'source': source_name,
+                    'chunk_index': i,
+                    **chunk
+                }
+                for i, chunk in enumerate(chunks)
+            ],
+            'tokens': [tokenize(text) for text in texts],
+            'vectors': self.vector_index.encoder.encode(texts) if self.vector_index is not None and texts else None
+        }
+    
+    def _segments_from_chunks(self, chunks: List[Dict], token_lists: List[List[str]],
+                              vectors: Any = None) -> Dict[str, Dict[str, Any]]:
+        """Regroup a flat chunk list (with its tokens and vector rows) into per-source segments"""
+        segments = {}
+        for row, (chunk, tokens) in enumerate(zip(chunks, token_lists)):
+            segment = segments.setdefault(chunk['source'], {'chunks': [], 'tokens': [], 'rows': []})
+            segment['chunks'].append(chunk)
+            segment['tokens'].append(tokens)
+            segment['rows'].append(row)
         
-        scored_chunks = []
+        for segment in segments.values():
+            rows = segment.pop('rows')
+            if vectors is None:
+                segment['vectors'] = None
+            elif rows[-1] - rows[0] + 1 == len(rows):
+                segment['vectors'] = vectors[rows[0]:rows[-1] + 1]
+            else:
+                segment['vectors'] = vectors[rows]
+        return segments
+    
+    def _ensure_segments(self) -> Dict[str, Dict[str, Any]]:
+        """Materialize per-source segments, deferred after loading a mapped index until a reindex needs them"""
+        if self._segments is None:
+            chunks = list(self.content_chunks)
+            token_lists = [tokenize(chunk['content']) for chunk in chunks]
+            vectors = None
+            if self.vector_index is not None and len(self.vector_index) == len(chunks):
+                vectors = self.vector_index.matrix
+            self._segments = self._segments_from_chunks(chunks, token_lists, vectors)
+        return self._segments
+    
+    def _publish_segments(self):
+        """Assemble segments into fresh indexes and swap them in under the index lock"""
+        self._ensure_segments()
+        order = [name for name in self.content_sources if name in self._segments]
+        order += [name for name in self._segments if name not in self.content_sources]
         
-        for chunk in self.content_chunks:
-            content_lower = chunk['content'].lower()
-            content_words = set(content_lower.split())
-            
-            # Calculate simple relevance score
-            word_matches = len(query_words.intersection(content_words))
-            total_words = len(query_words)
-            relevance_score = word_matches / total_words if total_words > 0 else 0
+        chunks = []
+        keyword_index = BM25Index(self.search_index.k1, self.search_index.b)
+        vector_blocks = []
+        # Text repeated across pages (nav bars, footers, widgets) is indexed once, from
+        # the first source that has it; later copies stay in their segment unpublished
+        seen = set()
+        for source_name in order:
+            segment = self._segments[source_name]
+            if self.vector_index is not None and segment['chunks'] and segment['vectors'] is None:
+                segment['vectors'] = self.vector_index.encoder.encode(
+                    [chunk['content'] for chunk in segment['chunks']]
+                )
             
-            # Boost score for exact phrase matches
-            if query_lower in content_lower:
-                relevance_score += 0.5
+            keep = []
+            for row, chunk in enumerate(segment['chunks']):
+                digest = hashlib.sha1(chunk['content'].encode('utf-8')).digest()
+                if digest not in seen:
+                    seen.add(digest)
+                    keep.append(row)
             
-            if relevance_score > 0:
-                scored_chunks.append({
-                    **chunk,
-                    'relevance_score': relevance_score
-                })
+            for row in keep:
+                chunks.append(segment['chunks'][row])
+                keyword_index.add_tokens(segment['tokens'][row])
+            if self.vector_index is not None and keep:
+                vectors = segment['vectors']
+                vector_blocks.append(vectors if len(keep) == len(vectors) else vectors[keep])
         
-        # Sort by relevance and return top_k
-        scored_chunks.sort(key=lambda x: x['relevance_score'], reverse=True)
-        return scored_chunks[:top_k]
+        vector_index = None
+        if self.vector_index is not None:
+            vector_index = VectorIndex(self.vector_index.encoder)
+            if vector_blocks:
+                vector_index.matrix = np.ascontiguousarray(np.concatenate(vector_blocks), dtype=np.float32)
+        
+        with self._index_lock:
+            self.content_chunks = chunks
+            self.search_index = keyword_index
+            self.vector_index = vector_index
+        self._bump_index_version()
     
-    def get_openrouter_response(self, query: str, context_chunks: List[Dict]) -> str:
-        """Get AI response from OpenRouter with context"""
-        if not self.openrouter_api_key:
-            return "Error: OpenRouter API key not found. Please set OPENROUTER_API_KEY environment variable."
+    def _bump_index_version(self):
+        """Mark the index as changed; cached answers were built from the old one"""
+        self.index_version += 1
+        self.answer_cache.invalidate()
+    
+    def build_search_index(self, include_vectors: bool = True):
+        """Tokenize every chunk once and rebuild the BM25 inverted index (and embeddings)"""
+        token_lists = [tokenize(chunk['content']) for chunk in self.content_chunks]
+        keyword_index = BM25Index(self.search_index.k1, self.search_index.b)
+        for tokens in token_lists:
+            keyword_index.add_tokens(tokens)
+        self.search_index = keyword_index
         
+        vectors = None
+        if self.vector_index is not None:
+            if include_vectors:
+                self.vector_index.build([chunk['content'] for chunk in self.content_chunks])
+            if len(self.vector_index) == len(self.content_chunks):
+                vectors = self.vector_index.matrix
+        self._segments = self._segments_from_chunks(self.content_chunks, token_lists, vectors)
+    
+    def sources_changed(self) -> bool:
+        """Cheap stat-only check for edited, added or deleted source files"""
+        for source_name, filename in self.content_sources.items():
+            file_path = Path(filename)
+            entry = self.source_manifest.get(source_name)
+            if not file_path.exists():
+                if entry is not None:
+                    return True
+            else:
+                stat = file_path.stat()
+                if entry is None or entry['mtime'] != stat.st_mtime or entry.get('size') != stat.st_size:
+                    return True
+        return False
+    
+    def watch_sources(self, interval: float = 2.0, index_file: Optional[str] = INDEX_FILE) -> threading.Thread:
+        """Start a background thread that reindexes sources as they change on disk"""
+        if self._watch_thread is not None and self._watch_thread.is_alive():
+            return self._watch_thread
+        
+        def watch():
+            while not self._watch_stop.wait(interval):
+                if not self.sources_changed():
+                    continue
+                try:
+                    version = self.index_version
+                    self.index_site_content()
+                    if index_file and self.index_version != version:
+                        self.save_index(index_file)
+                except Exception as e:
+                    print(f"❌ Error reindexing changed sources: {e}")
+        
+        self._watch_stop.clear()
+        self._watch_thread = threading.Thread(target=watch, name="rag-source-watcher", daemon=True)
+        self._watch_thread.start()
+        print(f"👀 Watching {len(self.content_sources)} content sources for changes")
+        return self._watch_thread
+    
+    def stop_watching(self):
+        """Stop the source watcher thread"""
+        self._watch_stop.set()
+        if self._watch_thread is not None:
+            self._watch_thread.join()
+            self._watch_thread = None
+    
+    def search_relevant_chunks(self, query: str, top_k: int = 5) -> List[Dict]:
+        """Search for relevant content chunks using the configured retrieval mode"""
+        return self.search_relevant_chunks_batch([query], top_k)[0]
+    
+    def search_relevant_chunks_batch(self, queries: List[str], top_k: int = 5) -> List[List[Dict]]:
+        """Search several queries against one index snapshot; dense scoring is one matrix product"""
+        # Snapshot the indexes so a concurrent reindex cannot mix old and new doc ids. Chunks may have
+        # been assigned directly; the rebuild that keeps the indexes in step runs under the same lock
+        with self._index_lock:
+            if len(self.search_index) != len(self.content_chunks):
+                self.build_search_index(include_vectors=False)
+            if self.vector_index is not None and len(self.vector_index) != len(self.content_chunks):
+                self.build_search_index()
+            chunks, keyword_index, vector_index = self.content_chunks, self.search_index, self.vector_index
+        
+        if self.retrieval_mode == 'keyword' or not queries:
+            batch_hits = [keyword_index.search(query, top_k) for query in queries]
+        else:
+            dense_scores = vector_index.batch_scores(queries)
+            if self.retrieval_mode == 'dense':
+                batch_hits = [top_k_indices(dense_scores[:, i], top_k) for i in range(len(queries))]
+            else:
+                batch_hits = [
+                    self._hybrid_search(query, top_k, keyword_index, dense_scores[:, i])
+                    for i, query in enumerate(queries)
+                ]
+        
+        return [
+            [{**chunks[doc_id], 'relevance_score': score} for doc_id, score in hits]
+            for hits in batch_hits
+        ]
+    
+    def _hybrid_search(self, query: str, top_k: int, keyword_index: BM25Index,
+                       dense_scores: Any) -> List[Tuple[int, float]]:
+        """Fuse cosine similarity with max-normalised BM25 scores"""
+        fused = self.hybrid_alpha * np.maximum(dense_scores, 0)
+        
+        keyword_scores = keyword_index.score(query)
+        if keyword_scores:
+            doc_ids = np.fromiter(keyword_scores.keys(), dtype=np.int64, count=len(keyword_scores))
+            values = np.fromiter(keyword_scores.values(), dtype=np.float32, count=len(keyword_scores))
+            fused[doc_ids] += (1 - self.hybrid_alpha) * values / values.max()
+        
+        return top_k_indices(fused, top_k)
+    
+    def build_messages(self, query: str, context_chunks: List[Dict]) -> List[Dict[str, str]]:
+        """Build the chat messages sent to the LLM for a question and its context"""
         # Prepare context
         context_text = "\n\n".join([
-            f"Source: {chunk['source']}\nContent: {chunk['content']}"
+            f"Source: {self._source_label(chunk)}\nContent: {chunk['content']}"
             for chunk in context_chunks
         ])
         
-        # Create prompt
-        system_prompt = """You are AurAI, the AI assistant for the MS AI Program at AURNOVA University. You help prospective students, current students, and faculty with questions about the program.
-
-Use the provided context to answer questions accurately. If the context doesn't contain enough information, say so and suggest contacting the admissions office.
-
-Be helpful, professional, and encouraging. Emphasize the program's unique features like:
-- AI tutoring for non-CS backgrounds
-- Co-evolutionary learning with personal AI companions
-- 24/7 AI teaching assistants
-- Comprehensive curriculum
-- Industry partnerships
-
-Always maintain a positive, supportive tone."""
-
         user_prompt = f"""Context about the MS AI Program:
 
 {context_text}
@@ -163,84 +383,309 @@ Always maintain a positive, supportive tone."""
 Question: {query}
 
 Please provide a helpful, accurate response based on the context above."""
-
+        
+        return [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": user_prompt}
+        ]
+    
+    def _source_label(self, chunk: Dict) -> str:
+        """Source name plus the chunk's heading path (chunks from older indexes have none)"""
+        heading_path = chunk.get('heading_path')
+        return f"{chunk['source']} > {' > '.join(heading_path)}" if heading_path else chunk['source']
+    
+    def get_openrouter_response(self, query: str, context_chunks: List[Dict]) -> str:
+        """Get AI response from OpenRouter with context"""
+        answer, _, _ = self._complete(query, context_chunks)
+        return answer
+    
+    def _complete(self, query: str, context_chunks: List[Dict]) -> Tuple[str, bool, Dict[str, int]]:
+        """Return (answer, succeeded, usage); failures come back as user-facing error text"""
+        messages = self.build_messages(query, context_chunks)
+        if not self.openrouter_api_key:
+            return MISSING_KEY_MESSAGE, False, usage_summary(messages, '')
+        
         headers = {
             "Authorization": f"Bearer {self.openrouter_api_key}",
             "Content-Type": "application/json"
         }
         
         data = {
-            "model": "openai/gpt-4o-mini",
-            "messages": [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
+            "model": self.llm_model,
+            "messages": messages,
             "max_tokens": 1000,
             "temperature": 0.7
         }
         
         try:
-            response = requests.post(self.openrouter_api_key, json=data, headers=headers, timeout=30)
+            response = requests.post(self.openrouter_url, json=data, headers=headers, timeout=30)
             response.raise_for_status()
             
             result = response.json()
-            return result['choices'][0]['message']['content']
+            answer = result['choices'][0]['message']['content']
+            return answer, True, usage_summary(messages, answer, result.get('usage'))
             
         except requests.exceptions.RequestException as e:
-            return f"Error calling OpenRouter API: {str(e)}"
+            return f"Error calling OpenRouter API: {str(e)}", False, usage_summary(messages, '')
         except KeyError as e:
-            return f"Error parsing OpenRouter response: {str(e)}"
+            return f"Error parsing OpenRouter response: {str(e)}", False, usage_summary(messages, '')
+    
+    @property
+    def llm_client(self) -> AsyncLLMClient:
+        """Shared pooled async client, created on first use"""
+        if self._llm_client is None:
+            self._llm_client = AsyncLLMClient(
+                self.openrouter_url,
+                self.openrouter_api_key,
+                model=self.llm_model,
+                max_connections=int(os.getenv('RAG_LLM_MAX_CONNECTIONS', '20')),
+                max_concurrency=int(os.getenv('RAG_LLM_MAX_CONCURRENCY', '10')),
+                timeout=float(os.getenv('RAG_LLM_TIMEOUT', '30')),
+                max_retries=int(os.getenv('RAG_LLM_MAX_RETRIES', '3'))
+            )
+        return self._llm_client
+    
+    async def aclose(self):
+        """Release pooled LLM connections"""
+        if self._llm_client is not None:
+            await self._llm_client.aclose()
+            self._llm_client = None
+    
+    async def aget_openrouter_response(self, query: str, context_chunks: List[Dict]) -> str:
+        """Get AI response from OpenRouter without blocking the event loop"""
+        answer, _, _ = await self._acomplete(query, context_chunks)
+        return answer
+    
+    async def _acomplete(self, query: str, context_chunks: List[Dict]) -> Tuple[str, bool, Dict[str, int]]:
+        """Async counterpart of _complete()"""
+        messages = self.build_messages(query, context_chunks)
+        if not self.openrouter_api_key:
+            return MISSING_KEY_MESSAGE, False, usage_summary(messages, '')
+        
+        try:
+            result = await self.llm_client.complete(messages)
+            answer = result['choices'][0]['message']['content']
+            return answer, True, usage_summary(messages, answer, result.get('usage'))
+        except LLMClientError as e:
+            return f"Error calling OpenRouter API: {str(e)}", False, usage_summary(messages, '')
+        except (KeyError, IndexError) as e:
+            return f"Error parsing OpenRouter response: {str(e)}", False, usage_summary(messages, '')
+    
+    def pack_context(self, question: str, relevant_chunks: List[Dict]) -> List[Dict]:
+        """Fit retrieved chunks into the prompt budget (best first, deduplicated, trimmed)"""
+        return self.context_packer.pack(question, relevant_chunks)
+    
+    def _no_results_response(self) -> Dict[str, Any]:
+        return {
+            'answer': NO_RESULTS_MESSAGE,
+            'sources': [],
+            'chunks_used': 0,
+            'relevance_scores': [],
+            'usage': {'prompt_tokens': 0, 'completion_tokens': 0, 'total_tokens': 0}
+        }
+    
+    def _build_result(self, answer: str, relevant_chunks: List[Dict],
+                      usage: Optional[Dict[str, int]] = None) -> Dict[str, Any]:
+        return {
+            'answer': answer,
+            'sources': list(dict.fromkeys(chunk['source'] for chunk in relevant_chunks)),
+            'chunks_used': len(relevant_chunks),
+            'relevance_scores': [chunk['relevance_score'] for chunk in relevant_chunks],
+            'usage': usage
+        }
     
     def query(self, question: str) -> Dict[str, Any]:
         """Main query function that combines RAG with OpenRouter"""
         print(f"🤖 Processing query: {question}")
         
-        # Search for relevant chunks
-        relevant_chunks = self.search_relevant_chunks(question, top_k=5)
+        # Search for relevant chunks and fit them into the prompt budget
+        index_version = self.index_version
+        relevant_chunks = self.pack_context(question, self.search_relevant_chunks(question, top_k=5))
         
         if not relevant_chunks:
-            return {
-                'answer': "I couldn't find relevant information in our knowledge base. Please try rephrasing your question or contact our admissions office directly.",
-                'sources': [],
-                'chunks_used': 0
-            }
+            return self._no_results_response()
+        
+        # Shares the answer cache with aanswer(), keyed on the chunks the answer was grounded in
+        chunk_ids = [chunk['id'] for chunk in relevant_chunks]
+        cached = self.answer_cache.get(question, chunk_ids, index_version)
+        if cached is not None:
+            return {**cached, 'cached': True}
         
         # Get AI response
-        ai_response = self.get_openrouter_response(question, relevant_chunks)
+        ai_response, succeeded, usage = self._complete(question, relevant_chunks)
+        
+        result = self._build_result(ai_response, relevant_chunks, usage)
+        if succeeded:
+            self.answer_cache.put(question, chunk_ids, index_version, result)
+        return result
+    
+    async def aquery(self, question: str) -> Dict[str, Any]:
+        """Async variant of query() for use inside the API event loop"""
+        index_version = self.index_version
+        relevant_chunks = self.search_relevant_chunks(question, top_k=5)
+        return await self.aanswer(question, relevant_chunks, index_version)
+    
+    async def aanswer(self, question: str, relevant_chunks: List[Dict], index_version: int,
+                      llm_gate: Any = None) -> Dict[str, Any]:
+        """Answer from already retrieved chunks; llm_gate (an async context manager) wraps only the LLM call"""
+        relevant_chunks = self.pack_context(question, relevant_chunks)
+        if not relevant_chunks:
+            return self._no_results_response()
         
-        # Prepare sources
-        sources = list(set([chunk['source'] for chunk in relevant_chunks]))
+        chunk_ids = [chunk['id'] for chunk in relevant_chunks]
+        cached = self.answer_cache.get(question, chunk_ids, index_version)
+        if cached is not None:
+            return {**cached, 'cached': True}
         
-        return {
-            'answer': ai_response,
-            'sources': sources,
-            'chunks_used': len(relevant_chunks),
-            'relevance_scores': [chunk['relevance_score'] for chunk in relevant_chunks]
-        }
+        async with llm_gate or nullcontext():
+            ai_response, succeeded, usage = await self._acomplete(question, relevant_chunks)
+        result = self._build_result(ai_response, relevant_chunks, usage)
+        if succeeded:
+            self.answer_cache.put(question, chunk_ids, index_version, result)
+        return result
     
-    def save_index(self, filename: str = "rag_index.json"):
-        """Save the indexed content for future use"""
+    async def astream_query(self, question: str) -> AsyncIterator[Dict[str, Any]]:
+        """Stream an answer as events: sources first, then tokens, then done (or error)"""
+        index_version = self.index_version
+        relevant_chunks = self.search_relevant_chunks(question, top_k=5)
+        async for event in self.astream_answer(question, relevant_chunks, index_version):
+            yield event
+    
+    async def astream_answer(self, question: str, relevant_chunks: List[Dict], index_version: int,
+                             llm_gate: Any = None) -> AsyncIterator[Dict[str, Any]]:
+        """Streaming counterpart of aanswer(); token usage arrives with the done event"""
+        relevant_chunks = self.pack_context(question, relevant_chunks)
+        if not relevant_chunks:
+            result = self._no_results_response()
+            yield {'type': 'sources', **self._sources_event(result)}
+            yield {'type': 'token', 'text': result['answer']}
+            yield {'type': 'done', 'usage': result['usage']}
+            return
+        
+        result = self._build_result('', relevant_chunks)
+        yield {'type': 'sources', **self._sources_event(result)}
+        
+        chunk_ids = [chunk['id'] for chunk in relevant_chunks]
+        cached = self.answer_cache.get(question, chunk_ids, index_version)
+        if cached is not None:
+            yield {'type': 'token', 'text': cached['answer']}
+            yield {'type': 'done', 'cached': True, 'usage': cached.get('usage')}
+            return
+        
+        if not self.openrouter_api_key:
+            yield {'type': 'error', 'message': MISSING_KEY_MESSAGE}
+            return
+        
+        messages = self.build_messages(question, relevant_chunks)
+        tokens = []
+        try:
+            async with llm_gate or nullcontext():
+                async for text in self.llm_client.stream(messages):
+                    tokens.append(text)
+                    yield {'type': 'token', 'text': text}
+        except LLMClientError as e:
+            yield {'type': 'error', 'message': f"Error calling OpenRouter API: {str(e)}"}
+            return
+        
+        result['answer'] = ''.join(tokens)
+        result['usage'] = usage_summary(messages, result['answer'])
+        self.answer_cache.put(question, chunk_ids, index_version, result)
+        yield {'type': 'done', 'usage': result['usage']}
+    
+    def _sources_event(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        return {key: value for key, value in result.items() if key not in ('answer', 'usage')}
+    
+    def save_index(self, filename: str = INDEX_FILE):
+        """Save the indexed content for future use (binary format unless filename ends in .json)"""
+        with self._index_lock:
+            chunks, keyword_index, vector_index = self.content_chunks, self.search_index, self.vector_index
+        
         index_data = {
             'timestamp': datetime.now().isoformat(),
-            'content_chunks': self.content_chunks,
-            'indexed_sources': list(self.indexed_content.keys())
+            'indexed_sources': list(self.source_manifest.keys()),
+            'source_manifest': self.source_manifest
         }
         
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(index_data, f, indent=2)
+        if vector_index is not None:
+            index_data['embedding'] = {
+                'encoder': vector_index.encoder.name,
+                'dim': vector_index.encoder.dim
+            }
+        
+        if filename.endswith('.json'):
+            # Legacy human-readable export, with embeddings in a .npy sidecar
+            index_data['content_chunks'] = list(chunks)
+            if vector_index is not None:
+                vector_index.save(self._vector_path(filename))
+            with open(filename, 'w', encoding='utf-8') as f:
+                json.dump(index_data, f, indent=2)
+        else:
+            vectors = vector_index.matrix if vector_index is not None else None
+            write_index(filename, chunks, keyword_index, vectors, index_data)
         
         print(f"💾 Index saved to {filename}")
     
-    def load_index(self, filename: str = "rag_index.json"):
-        """Load previously saved index"""
-        if Path(filename).exists():
-            with open(filename, 'r', encoding='utf-8') as f:
-                index_data = json.load(f)
-            
-            self.content_chunks = index_data['content_chunks']
-            print(f"📂 Loaded index with {len(self.content_chunks)} chunks")
-            return True
-        return False
+    def _vector_path(self, filename: str) -> str:
+        """Embedding matrix file stored alongside a JSON index file"""
+        return str(Path(filename).with_suffix('.npy'))
+    
+    def load_index(self, filename: str = INDEX_FILE):
+        """Load previously saved index (binary or legacy JSON)"""
+        if not Path(filename).exists():
+            return False
+        
+        if is_binary_index(filename):
+            self._load_binary_index(filename)
+        else:
+            self._load_json_index(filename)
+        
+        self._bump_index_version()
+        print(f"📂 Loaded index with {len(self.content_chunks)} chunks")
+        return True
+    
+    def _load_binary_index(self, filename: str):
+        """Memory-map a binary index; chunk text is decoded only for retrieved hits"""
+        store = MappedIndexStore(filename)
+        self.source_manifest = store.metadata.get('source_manifest', {})
+        
+        vector_index = self.vector_index
+        if vector_index is not None:
+            embedding = store.metadata.get('embedding', {})
+            if (store.vectors is not None and embedding.get('encoder') == vector_index.encoder.name
+                    and store.vectors.shape[1] == vector_index.encoder.dim):
+                vector_index = VectorIndex(vector_index.encoder)
+                vector_index.matrix = store.vectors
+            else:
+                print("🔄 Embeddings missing or stale, re-encoding chunks...")
+                vector_index = VectorIndex(vector_index.encoder)
+                vector_index.build([store.chunks.content(i) for i in range(len(store.chunks))])
+        
+        with self._index_lock:
+            self._mapped_store = store
+            self.content_chunks = store.chunks
+            self.search_index = store.keyword_index
+            self.vector_index = vector_index
+            self._segments = None
+    
+    def _load_json_index(self, filename: str):
+        """Load a legacy JSON index, re-tokenizing every chunk"""
+        with open(filename, 'r', encoding='utf-8') as f:
+            index_data = json.load(f)
+        
+        self.content_chunks = index_data['content_chunks']
+        self.source_manifest = index_data.get('source_manifest', {})
+        
+        vectors_loaded = False
+        if self.vector_index is not None:
+            embedding = index_data.get('embedding', {})
+            same_encoder = embedding.get('encoder') == self.vector_index.encoder.name
+            vectors_loaded = same_encoder and self.vector_index.load(
+                self._vector_path(filename), len(self.content_chunks)
+            )
+            if not vectors_loaded:
+                print("🔄 Embeddings missing or stale, re-encoding chunks...")
+        
+        self.build_search_index(include_vectors=not vectors_loaded)
 
 def main():
     """Test the RAG system"""
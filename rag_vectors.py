@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Dense Vector Retrieval for the MS AI RAG System
+Local (offline) text encoders and a memory-mapped embedding matrix
+"""
+
+import zlib
+from pathlib import Path
+from typing import Any, List, Optional, Tuple
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+from rag_index import tokenize
+
+
+class HashingEncoder:
+    """Feature-hashing encoder over unigrams and bigrams; needs no model download"""
+
+    name = "hashing"
+
+    def __init__(self, dim: int = 1024):
+        self.dim = dim
+
+    def _features(self, text: str) -> List[str]:
+        tokens = tokenize(text)
+        return tokens + [f"{left} {right}" for left, right in zip(tokens, tokens[1:])]
+
+    def encode(self, texts: List[str]) -> "np.ndarray":
+        """Encode texts as L2-normalised float32 rows"""
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                # crc32 is stable across processes, unlike the salted built-in hash()
+                digest = zlib.crc32(feature.encode('utf-8'))
+                sign = 1.0 if digest & 0x80000000 else -1.0
+                matrix[row, digest % self.dim] += sign
+        return normalize_rows(matrix)
+
+
+class SentenceTransformerEncoder:
+    """Encoder backed by a locally cached sentence-transformers model"""
+
+    def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
+        from sentence_transformers import SentenceTransformer
+
+        self.name = f"sentence-transformers/{model_name}"
+        self.model = SentenceTransformer(model_name)
+        self.dim = self.model.get_sentence_embedding_dimension()
+
+    def encode(self, texts: List[str]) -> "np.ndarray":
+        """Encode texts as L2-normalised float32 rows"""
+        vectors = self.model.encode(list(texts), convert_to_numpy=True, show_progress_bar=False)
+        return normalize_rows(vectors.astype(np.float32))
+
+
+def load_encoder(name: Optional[str] = None) -> Any:
+    """Create an encoder by name, falling back to the hashing encoder"""
+    if name and name != HashingEncoder.name:
+        model_name = name.split('/', 1)[1] if name.startswith('sentence-transformers/') else name
+        try:
+            return SentenceTransformerEncoder(model_name)
+        except Exception as e:
+            print(f"⚠️  Could not load encoder '{name}' ({e}); using hashing encoder")
+    return HashingEncoder()
+
+
+def normalize_rows(matrix: "np.ndarray") -> "np.ndarray":
+    """Scale each row to unit length, leaving all-zero rows untouched"""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class VectorIndex:
+    """Contiguous float32 embedding matrix with brute-force cosine search"""
+
+    def __init__(self, encoder: Any = None):
+        if not NUMPY_AVAILABLE:
+            raise RuntimeError("numpy is required for dense retrieval")
+        self.encoder = encoder or HashingEncoder()
+        self.matrix = np.zeros((0, self.encoder.dim), dtype=np.float32)
+
+    def __len__(self) -> int:
+        return self.matrix.shape[0]
+
+    def build(self, texts: List[str]):
+        """Encode every text into a fresh embedding matrix"""
+        if texts:
+            self.matrix = np.ascontiguousarray(self.encoder.encode(list(texts)), dtype=np.float32)
+        else:
+            self.matrix = np.zeros((0, self.encoder.dim), dtype=np.float32)
+
+    def save(self, path: str):
+        """Write the matrix as a .npy file"""
+        np.save(path, np.ascontiguousarray(self.matrix, dtype=np.float32))
+
+    def load(self, path: str, expected_rows: Optional[int] = None) -> bool:
+        """Memory-map a saved matrix; reject it if its shape does not fit"""
+        if not Path(path).exists():
+            return False
+        matrix = np.load(path, mmap_mode='r')
+        if matrix.ndim != 2 or matrix.shape[1] != self.encoder.dim:
+            return False
+        if expected_rows is not None and matrix.shape[0] != expected_rows:
+            return False
+        self.matrix = matrix
+        return True
+
+    def scores(self, query: str) -> "np.ndarray":
+        """Cosine similarity of the query against every row"""
+        query_vector = self.encoder.encode([query])[0]
+        return self.matrix @ query_vector
+
+    def batch_scores(self, queries: List[str]) -> "np.ndarray":
+        """Cosine similarity of several queries at once, shaped (rows, queries)"""
+        return self.matrix @ self.encoder.encode(list(queries)).T
+
+    def search(self, query: str, top_k: int = 5) -> List[Tuple[int, float]]:
+        """Return the top_k (row, similarity) pairs, best first"""
+        return top_k_indices(self.scores(query), top_k)
+
+
+def top_k_indices(scores: "np.ndarray", top_k: int) -> List[Tuple[int, float]]:
+    """Select the top_k positive scores with argpartition, then order just those"""
+    if top_k <= 0 or scores.size == 0:
+        return []
+    if top_k < scores.size:
+        candidates = np.argpartition(-scores, top_k - 1)[:top_k]
+    else:
+        candidates = np.arange(scores.size)
+    ordered = candidates[np.argsort(-scores[candidates], kind='stable')]
+    return [(int(row), float(scores[row])) for row in ordered if scores[row] > 0]
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Write-Behind Queue for MSAI Application Submissions
+Persists each submission to a local append-only log before acknowledging it,
+then flushes rows to Google Sheets in rate-limited, retried append_rows batches
+"""
+
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+
+class WriteBehindQueue:
+    """Durable queue of worksheet rows; delivery to the sheet is at-least-once.
+
+    Every row is appended (and fsynced) to an NDJSON log with a sequence
+    number; a checkpoint file records the last sequence number that reached
+    the sheet. On start-up, entries past the checkpoint are replayed. A crash
+    between a successful append_rows call and the checkpoint write can
+    therefore repeat that one batch.
+
+    on_flush, if given, is called after each delivered batch with the batch's
+    keys (in row order) and the append_rows API response.
+    """
+
+    def __init__(self, log_path: str, worksheet: Any = None, batch_size: int = 100,
+                 flush_interval: float = 1.0, max_calls_per_minute: float = 50,
+                 backoff_base: float = 1.0, backoff_max: float = 60.0,
+                 compact_bytes: int = 1 << 20,
+                 on_flush: Optional[Callable[[List[Optional[str]], Any], None]] = None):
+        self.log_path = Path(log_path)
+        self.checkpoint_path = self.log_path.with_name(self.log_path.name + '.checkpoint')
+        self.worksheet = worksheet
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        # Sheets quotas are per minute; space append calls evenly within it
+        self.min_call_interval = 60.0 / max_calls_per_minute if max_calls_per_minute else 0.0
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.compact_bytes = compact_bytes
+        self.on_flush = on_flush
+
+        # (seq, key, row) in log order
+        self._pending: Deque[Tuple[int, Optional[str], List[Any]]] = deque()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._next_call_at = 0.0
+
+        self.stats = {'enqueued': 0, 'flushed': 0, 'batches': 0, 'failures': 0,
+                      'replayed': 0, 'last_error': None, 'last_flush_at': None}
+
+        self._flushed_seq = self._read_checkpoint()
+        self._next_seq = self._flushed_seq + 1
+        self._recover()
+        self._log = open(self.log_path, 'a', encoding='utf-8')
+
+    # Durable log
+
+    def _read_checkpoint(self) -> int:
+        if not self.checkpoint_path.exists():
+            return 0
+        with open(self.checkpoint_path, 'r', encoding='utf-8') as f:
+            return json.load(f).get('flushed_seq', 0)
+
+    def _write_checkpoint(self, seq: int):
+        tmp_path = self.checkpoint_path.with_name(self.checkpoint_path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'flushed_seq': seq, 'updated_at': datetime.now().isoformat()}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def _recover(self):
+        """Queue every logged entry that never reached the sheet"""
+        if not self.log_path.exists():
+            return
+
+        with open(self.log_path, 'rb') as f:
+            data = f.read()
+
+        # A crash mid-write can leave a torn last line; cut the log back to the last full entry
+        complete = data.rfind(b'\n') + 1
+        if complete < len(data):
+            with open(self.log_path, 'r+b') as f:
+                f.truncate(complete)
+
+        for line in data[:complete].splitlines():
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            self._next_seq = max(self._next_seq, entry['seq'] + 1)
+            if entry['seq'] > self._flushed_seq:
+                self._pending.append((entry['seq'], entry.get('key'), entry['row']))
+
+        self.stats['replayed'] = len(self._pending)
+        if self._pending:
+            print(f"🔁 Replaying {len(self._pending)} unflushed submissions from {self.log_path}")
+
+    def enqueue(self, row: List[Any], key: Optional[str] = None) -> int:
+        """Persist a row locally and queue it for the sheet; returns its sequence number"""
+        with self._lock:
+            seq = self._next_seq
+            self._next_seq += 1
+            entry = {'seq': seq, 'key': key, 'row': row}
+            self._log.write(json.dumps(entry, separators=(',', ':')) + '\n')
+            self._log.flush()
+            os.fsync(self._log.fileno())
+            self._pending.append((seq, key, row))
+            self.stats['enqueued'] += 1
+            if len(self._pending) >= self.batch_size:
+                self._wakeup.set()
+        return seq
+
+    def _compact(self):
+        """Empty the log once everything in it has been flushed"""
+        with self._lock:
+            if self._pending or self._log.tell() < self.compact_bytes:
+                return
+            self._log.truncate(0)
+            self._log.flush()
+            os.fsync(self._log.fileno())
+
+    # Flushing
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    def _throttle(self):
+        delay = self._next_call_at - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        self._next_call_at = time.monotonic() + self.min_call_interval
+
+    def flush_batch(self) -> int:
+        """Send up to batch_size queued rows in one append_rows call; returns rows sent"""
+        with self._flush_lock:
+            if self.worksheet is None:
+                return 0
+            with self._lock:
+                batch = [self._pending[i] for i in range(min(self.batch_size, len(self._pending)))]
+            if not batch:
+                return 0
+
+            self._throttle()
+            response = self.worksheet.append_rows([row for _, _, row in batch])
+
+            with self._lock:
+                for _ in batch:
+                    self._pending.popleft()
+                self._flushed_seq = batch[-1][0]
+                self._write_checkpoint(self._flushed_seq)
+                self.stats['flushed'] += len(batch)
+                self.stats['batches'] += 1
+                self.stats['last_flush_at'] = datetime.now().isoformat()
+            self._compact()
+
+            if self.on_flush is not None:
+                try:
+                    self.on_flush([key for _, key, _ in batch], response)
+                except Exception as e:
+                    print(f"⚠️  Post-flush hook failed: {e}")
+            return len(batch)
+
+    def flush(self) -> int:
+        """Synchronously send everything queued; errors propagate to the caller"""
+        sent = 0
+        while True:
+            count = self.flush_batch()
+            if not count:
+                return sent
+            sent += count
+
+    def _drain(self) -> bool:
+        """Flush until empty; on failure back off and report False"""
+        failures = 0
+        while self._pending and self.worksheet is not None:
+            try:
+                self.flush_batch()
+                failures = 0
+            except Exception as e:
+                failures += 1
+                self.stats['failures'] += 1
+                self.stats['last_error'] = str(e)
+                delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (failures - 1)))
+                print(f"⚠️  Sheets flush failed ({e}); retrying in {delay:.1f}s")
+                if self._stop.wait(delay):
+                    return False
+        return True
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self._drain()
+        # Last attempt on shutdown; anything left stays in the log for the next start
+        if self._pending and self.worksheet is not None:
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"⚠️  {len(self._pending)} submissions left in {self.log_path}: {e}")
+
+    def start(self) -> threading.Thread:
+        """Start the background flusher"""
+        if self._thread is not None and self._thread.is_alive():
+            return self._thread
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sheets-write-behind", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self):
+        """Stop the flusher after a final flush and close the log"""
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._log.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue depth and delivery counters"""
+        with self._lock:
+            return {**self.stats, 'pending': len(self._pending), 'flushed_seq': self._flushed_seq}
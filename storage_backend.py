@@ -0,0 +1,456 @@
+#!/usr/bin/env python3
+"""
+Storage Backend for the MS AI Curriculum System
+Pluggable persistence for the dataclass collections of the admissions,
+portal and thesis systems: an in-memory backend for a single process and a
+SQLite (WAL) backend that worker processes on one host can share
+"""
+
+import functools
+import json
+import queue
+import re
+import sqlite3
+import threading
+from collections.abc import MutableMapping
+from contextlib import contextmanager, nullcontext
+from dataclasses import fields, is_dataclass
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union, get_args, get_origin, get_type_hints
+
+from admissions.indexed_store import IndexedStore
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    collection TEXT NOT NULL,
+    key TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (collection, key)
+) WITHOUT ROWID;
+"""
+
+UPSERT = ("INSERT INTO records (collection, key, data) VALUES (?, ?, ?) "
+          "ON CONFLICT(collection, key) DO UPDATE SET data = excluded.data")
+
+FIELD_NAME = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+_MISSING = object()
+
+
+# Row serialization
+
+def _json_default(value: Any) -> Any:
+    # Datetimes nested in untyped (Any) values are stored as ISO strings and read back as strings
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"Cannot store {type(value).__name__} values")
+
+
+def _encode(value: Any) -> Any:
+    if is_dataclass(value):
+        # Optional fields left at their None default are omitted; from_row restores the default
+        return {f.name: _encode(getattr(value, f.name)) for f in fields(value)
+                if not (f.default is None and getattr(value, f.name) is None)}
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (list, tuple)):
+        return [_encode(item) for item in value]
+    if isinstance(value, dict):
+        return {key.value if isinstance(key, Enum) else key: _encode(item) for key, item in value.items()}
+    return value
+
+
+def _decode(hint: Any, value: Any) -> Any:
+    if value is None:
+        return None
+    if get_origin(hint) is Union:
+        hint = next(arg for arg in get_args(hint) if arg is not type(None))
+    if hint is datetime:
+        return datetime.fromisoformat(value)
+    if isinstance(hint, type) and issubclass(hint, Enum):
+        return hint(value)
+    if is_dataclass(hint):
+        return from_row(hint, value)
+    if get_origin(hint) is list:
+        item_hint = get_args(hint)[0]
+        return [_decode(item_hint, item) for item in value]
+    if get_origin(hint) is dict:
+        key_hint, item_hint = get_args(hint)
+        return {_decode(key_hint, key): _decode(item_hint, item) for key, item in value.items()}
+    if hint in (int, float) and isinstance(value, str):
+        # JSON object keys are always strings
+        return hint(value)
+    return value
+
+
+def to_row(obj: Any) -> str:
+    """Compact JSON for a dataclass (or a list of them); enums become values and datetimes ISO strings"""
+    return json.dumps(_encode(obj), separators=(',', ':'), default=_json_default)
+
+
+def from_row(cls: type, data: Union[str, Dict[str, Any]]) -> Any:
+    """Rebuild a dataclass from to_row() output using its type hints"""
+    if isinstance(data, str):
+        data = json.loads(data)
+    hints = get_type_hints(cls)
+    return cls(**{f.name: _decode(hints[f.name], data[f.name]) for f in fields(cls) if f.name in data})
+
+
+def load_row(hint: Any, row: str) -> Any:
+    """Rebuild a value of type hint (a dataclass, List[...] of them, ...) from to_row() output"""
+    return _decode(hint, json.loads(row))
+
+
+def _field_path(field: str) -> str:
+    if not FIELD_NAME.match(field):
+        raise ValueError(f"Invalid indexed field name '{field}'")
+    return f"json_extract(data, '$.{field}')"
+
+
+# Backends
+
+class StorageBackend:
+    """Where a system keeps its collections.
+
+    collection() returns a MutableMapping of key -> record that also answers
+    lookup/first/count on hash_fields and range on sorted_fields, like
+    IndexedStore. Methods that change records run inside unit_of_work(), so
+    their writes are applied together and records changed in place are saved.
+    shared is True when other processes may change the collections, so
+    aggregates kept in this process can go stale.
+    """
+
+    shared = False
+
+    def collection(self, name: str, value_type: Any, hash_fields: Iterable[str] = (),
+                   sorted_fields: Iterable[str] = ()) -> MutableMapping:
+        raise NotImplementedError
+
+    def unit_of_work(self):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class MemoryBackend(StorageBackend):
+    """Collections held as live objects in this process; units of work are serialized by a lock"""
+
+    def __init__(self):
+        self._collections: Dict[str, IndexedStore] = {}
+        self._lock = threading.RLock()
+
+    def collection(self, name: str, value_type: Any, hash_fields: Iterable[str] = (),
+                   sorted_fields: Iterable[str] = ()) -> IndexedStore:
+        with self._lock:
+            if name not in self._collections:
+                self._collections[name] = IndexedStore(hash_fields=hash_fields, sorted_fields=sorted_fields)
+            return self._collections[name]
+
+    @contextmanager
+    def unit_of_work(self):
+        # Records are live objects, so there is nothing to write back and nothing to roll back
+        with self._lock:
+            yield
+
+
+class ConnectionPool:
+    """Fixed-size pool of autocommit SQLite connections to one database file"""
+
+    def __init__(self, db_path: str, size: int = 4, timeout: float = 30.0):
+        self.db_path = db_path
+        self.size = size
+        self.timeout = timeout
+        self._idle: queue.LifoQueue = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.db_path, timeout=self.timeout, isolation_level=None,
+                                     check_same_thread=False)
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('PRAGMA synchronous=NORMAL')
+        return connection
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        try:
+            connection = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                create = self._created < self.size
+                if create:
+                    self._created += 1
+            if create:
+                try:
+                    connection = self._connect()
+                except sqlite3.Error:
+                    with self._lock:
+                        self._created -= 1
+                    raise
+            else:
+                connection = self._idle.get(timeout=self.timeout)
+        try:
+            yield connection
+        finally:
+            self._idle.put(connection)
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class UnitOfWork:
+    """Identity map of one SQLite transaction; records that changed are written back on commit"""
+
+    def __init__(self, connection: sqlite3.Connection):
+        self.connection = connection
+        self.depth = 0
+        # (collection, key) -> [record, row it was read as]; the row is None for records put in this unit
+        self.records: Dict[Tuple[str, str], List[Any]] = {}
+        self.deleted: Set[Tuple[str, str]] = set()
+
+    def track(self, name: str, key: str, record: Any, row: Optional[str]) -> Any:
+        self.deleted.discard((name, key))
+        self.records[name, key] = [record, row]
+        return record
+
+    def forget(self, name: str, key: str):
+        self.records.pop((name, key), None)
+        self.deleted.add((name, key))
+
+    def flush(self):
+        """Write deletions and changed records inside the open transaction"""
+        if self.deleted:
+            self.connection.executemany("DELETE FROM records WHERE collection = ? AND key = ?", list(self.deleted))
+            self.deleted.clear()
+        changed = []
+        for (name, key), entry in self.records.items():
+            row = to_row(entry[0])
+            if row != entry[1]:
+                entry[1] = row
+                changed.append((name, key, row))
+        if changed:
+            self.connection.executemany(UPSERT, changed)
+
+
+class SQLiteBackend(StorageBackend):
+    """Collections stored as JSON rows in one SQLite database in WAL mode.
+
+    Processes sharing the file see each other's committed writes. A unit of
+    work holds the write lock (BEGIN IMMEDIATE) for its duration, so
+    read-modify-write methods of different workers never interleave; records
+    read outside a unit of work are detached copies. Indexed fields are
+    looked up through expression indexes on the JSON rows.
+    """
+
+    shared = True
+
+    def __init__(self, db_path: str = 'msai_state.db', pool_size: int = 4, timeout: float = 30.0):
+        self.db_path = db_path
+        self.pool = ConnectionPool(db_path, pool_size, timeout)
+        self._local = threading.local()
+        with self.pool.connection() as connection:
+            connection.executescript(SCHEMA)
+
+    def collection(self, name: str, value_type: Any, hash_fields: Iterable[str] = (),
+                   sorted_fields: Iterable[str] = ()) -> 'SQLiteCollection':
+        hash_fields, sorted_fields = tuple(hash_fields), tuple(sorted_fields)
+        with self.pool.connection() as connection:
+            for field in hash_fields + sorted_fields:
+                connection.execute(f"CREATE INDEX IF NOT EXISTS idx_records_{field} "
+                                   f"ON records(collection, {_field_path(field)})")
+        return SQLiteCollection(self, name, value_type, hash_fields, sorted_fields)
+
+    def current(self) -> Optional[UnitOfWork]:
+        """The unit of work open on this thread, if any"""
+        return getattr(self._local, 'unit', None)
+
+    def connection(self):
+        """The open unit of work's connection, or a pooled one for a single autocommitted statement"""
+        unit = self.current()
+        return nullcontext(unit.connection) if unit else self.pool.connection()
+
+    @contextmanager
+    def unit_of_work(self) -> Iterator[UnitOfWork]:
+        unit = self.current()
+        if unit is not None:
+            # Nested units join the outer one and commit with it
+            unit.depth += 1
+            try:
+                yield unit
+            finally:
+                unit.depth -= 1
+            return
+
+        with self.pool.connection() as connection:
+            unit = UnitOfWork(connection)
+            connection.execute('BEGIN IMMEDIATE')
+            self._local.unit = unit
+            try:
+                yield unit
+                unit.flush()
+            except BaseException:
+                connection.execute('ROLLBACK')
+                raise
+            else:
+                connection.execute('COMMIT')
+            finally:
+                self._local.unit = None
+
+    def close(self):
+        self.pool.close()
+
+
+class SQLiteCollection(MutableMapping):
+    """One named collection of a SQLiteBackend, with the query methods of IndexedStore"""
+
+    def __init__(self, backend: SQLiteBackend, name: str, value_type: Any,
+                 hash_fields: Tuple[str, ...], sorted_fields: Tuple[str, ...]):
+        self.backend = backend
+        self.name = name
+        self.value_type = value_type
+        self.hash_fields = hash_fields
+        self.sorted_fields = sorted_fields
+
+    def _load(self, key: str) -> Any:
+        unit = self.backend.current()
+        if unit is not None:
+            entry = unit.records.get((self.name, key))
+            if entry is not None:
+                return entry[0]
+            if (self.name, key) in unit.deleted:
+                return _MISSING
+        with self.backend.connection() as connection:
+            row = connection.execute("SELECT data FROM records WHERE collection = ? AND key = ?",
+                                     (self.name, key)).fetchone()
+        if row is None:
+            return _MISSING
+        record = load_row(self.value_type, row[0])
+        return unit.track(self.name, key, record, row[0]) if unit else record
+
+    def _select(self, where: str = "", params: tuple = (), order: str = "key", limit: Optional[int] = None,
+                columns: str = "key, data") -> List[tuple]:
+        unit = self.backend.current()
+        if unit is not None:
+            # Queries must see this unit's pending changes
+            unit.flush()
+        sql = f"SELECT {columns} FROM records WHERE collection = ?{where} ORDER BY {order}"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        with self.backend.connection() as connection:
+            return connection.execute(sql, (self.name, *params)).fetchall()
+
+    def _records(self, rows: List[Tuple[str, str]]) -> List[Tuple[str, Any]]:
+        unit = self.backend.current()
+        records = []
+        for key, row in rows:
+            entry = unit.records.get((self.name, key)) if unit else None
+            if entry is not None:
+                records.append((key, entry[0]))
+            else:
+                record = load_row(self.value_type, row)
+                records.append((key, unit.track(self.name, key, record, row) if unit else record))
+        return records
+
+    # Mapping interface
+
+    def __getitem__(self, key: str) -> Any:
+        record = self._load(key)
+        if record is _MISSING:
+            raise KeyError(key)
+        return record
+
+    def get(self, key: str, default: Any = None) -> Any:
+        record = self._load(key)
+        return default if record is _MISSING else record
+
+    def __contains__(self, key: object) -> bool:
+        return self._load(key) is not _MISSING
+
+    def __setitem__(self, key: str, record: Any):
+        unit = self.backend.current()
+        if unit is None:
+            with self.backend.connection() as connection:
+                connection.execute(UPSERT, (self.name, key, to_row(record)))
+            return
+        entry = unit.records.get((self.name, key))
+        unit.track(self.name, key, record, entry[1] if entry else None)
+
+    def __delitem__(self, key: str):
+        if self._load(key) is _MISSING:
+            raise KeyError(key)
+        unit = self.backend.current()
+        if unit is None:
+            with self.backend.connection() as connection:
+                connection.execute("DELETE FROM records WHERE collection = ? AND key = ?", (self.name, key))
+        else:
+            unit.forget(self.name, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter([key for key, in self._select(columns="key")])
+
+    def __len__(self) -> int:
+        return self._select(order="1", columns="COUNT(*)")[0][0]
+
+    def items(self) -> List[Tuple[str, Any]]:
+        return self._records(self._select())
+
+    def values(self) -> List[Any]:
+        return [record for _, record in self.items()]
+
+    def reindex(self, key: str):
+        """Nothing to do: SQLite maintains the indexes when the unit of work writes the record"""
+
+    # Queries
+
+    def lookup(self, field: str, value: Any) -> List[Any]:
+        """Records whose field equals value, ordered by key"""
+        if field not in self.hash_fields:
+            raise KeyError(field)
+        rows = self._select(f" AND {_field_path(field)} IS ?", (_encode(value),))
+        return [record for _, record in self._records(rows)]
+
+    def first(self, field: str, value: Any) -> Optional[Any]:
+        records = self.lookup(field, value)
+        return records[0] if records else None
+
+    def count(self, field: str, value: Any) -> int:
+        if field not in self.hash_fields:
+            raise KeyError(field)
+        return self._select(f" AND {_field_path(field)} IS ?", (_encode(value),), order="1",
+                            columns="COUNT(*)")[0][0]
+
+    def range(self, field: str, start: Any = None, end: Any = None, reverse: bool = False,
+              limit: Optional[int] = None) -> List[Any]:
+        """Records with start <= field < end (either bound optional), ordered by field"""
+        if field not in self.sorted_fields:
+            raise KeyError(field)
+        path = _field_path(field)
+        where, params = f" AND {path} IS NOT NULL", []
+        if start is not None:
+            where += f" AND {path} >= ?"
+            params.append(_encode(start))
+        if end is not None:
+            where += f" AND {path} < ?"
+            params.append(_encode(end))
+        direction = "DESC" if reverse else "ASC"
+        rows = self._select(where, tuple(params), order=f"{path} {direction}, key {direction}", limit=limit)
+        return [record for _, record in self._records(rows)]
+
+
+def transactional(method):
+    """Run a method of a system with a storage attribute in one unit of work"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.storage.unit_of_work():
+            return method(self, *args, **kwargs)
+    return wrapper
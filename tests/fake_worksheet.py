@@ -0,0 +1,70 @@
+"""
+In-memory stand-in for a gspread Worksheet
+Implements the subset of the API used by the MSAI application integration
+"""
+
+import re
+
+A1_PATTERN = re.compile(r"([A-Z]+)(\d+)")
+
+
+def a1_to_rowcol(label):
+    letters, row = A1_PATTERN.fullmatch(label).groups()
+    col = 0
+    for letter in letters:
+        col = col * 26 + ord(letter) - ord('A') + 1
+    return int(row), col
+
+
+class FakeWorksheet:
+    """Rows held in a list of lists; row 1 is the header. fail_next makes calls raise."""
+
+    def __init__(self, headers=None, title="Applications"):
+        self.title = title
+        self.rows = [list(headers)] if headers else []
+        self.calls = []
+        self.fail_next = 0
+
+    def _call(self, name):
+        self.calls.append(name)
+        if self.fail_next:
+            self.fail_next -= 1
+            raise RuntimeError("APIError: [429] Quota exceeded")
+
+    def append_row(self, values, **kwargs):
+        self._call('append_row')
+        self.rows.append(list(values))
+
+    def append_rows(self, values, **kwargs):
+        self._call('append_rows')
+        first_row = len(self.rows) + 1
+        self.rows.extend(list(row) for row in values)
+        return {'updates': {'updatedRange': f"{self.title}!A{first_row}:Z{len(self.rows)}",
+                            'updatedRows': len(values)}}
+
+    def get_all_values(self):
+        self._call('get_all_values')
+        return [list(row) for row in self.rows]
+
+    def batch_update(self, data, **kwargs):
+        self._call('batch_update')
+        for update in data:
+            row, col = a1_to_rowcol(update['range'])
+            cells = self.rows[row - 1]
+            cells.extend([''] * (col - len(cells)))
+            cells[col - 1] = update['values'][0][0]
+
+    def batch_get(self, ranges, **kwargs):
+        """One value range per A1 range (single-row ranges only), trailing empties trimmed like the API"""
+        self._call('batch_get')
+        results = []
+        for a1_range in ranges:
+            (row, first_col), (_, last_col) = (a1_to_rowcol(label) for label in a1_range.split(':'))
+            cells = self.rows[row - 1][first_col - 1:last_col] if row <= len(self.rows) else []
+            while cells and cells[-1] == '':
+                cells = cells[:-1]
+            results.append([cells] if cells else [])
+        return results
+
+    def cell(self, row, col):
+        return self.rows[row - 1][col - 1]
@@ -0,0 +1,159 @@
+"""
+MSAI Application System - Agent Dispatcher Tests
+Unit tests for concurrent, background evaluation of submitted applications
+"""
+
+import asyncio
+import random
+import threading
+import time
+from functools import partial
+
+import pytest
+
+from admissions.admissions_system import AdmissionsSystem, ApplicationStatus
+from admissions.agent_dispatcher import AgentDispatcher
+from test_dashboard_metrics import complete_application
+
+
+@pytest.fixture
+def system():
+    system = AdmissionsSystem(user_manager=None, dispatcher=AgentDispatcher(agent_timeout=5.0))
+    yield system
+    system.dispatcher.close()
+
+
+def submitted(system):
+    """Create and submit an application that passes validation"""
+    application_data = complete_application(random.Random(1))
+    application_data.update(personal_statement="x" * 600, letters_of_recommendation=[{}] * 3)
+    application_id = system.create_application("applicant@example.com", application_data)["application_id"]
+    return application_id, system.submit_application(application_id)
+
+
+class TestBackgroundEvaluation:
+    """Test that submission returns before the agents finish and tracks their progress"""
+
+    def test_submit_returns_before_agents_finish(self, system):
+        """Test that a slow agent does not block submission and the run completes once it returns"""
+        release = threading.Event()
+        evaluate = system._evaluate_experience
+        system._evaluate_experience = lambda application: release.wait(5) and evaluate(application)
+
+        application_id, result = submitted(system)
+        assert result["success"] and result["evaluation_status"] == "in_progress"
+        assert system.applications[application_id].status == ApplicationStatus.UNDER_REVIEW
+        assert system.make_admission_decision(application_id, {})["error"] == "Not all evaluations completed"
+
+        release.set()
+        status = system.wait_for_evaluation(application_id, timeout=5)
+        assert status["status"] == "completed"
+        assert set(status["agents"].values()) == {"completed"}
+        assert system.get_application_status(application_id)["evaluations_completed"] == 4
+        assert system.applications[application_id].status == ApplicationStatus.EVALUATION_COMPLETE
+        assert system.make_admission_decision(application_id, {})["success"]
+
+    def test_agents_run_concurrently(self, system):
+        """Test that all four agents are in flight at the same time"""
+        barrier = threading.Barrier(len(system.admissions_agents), timeout=5)
+        for name in ("_evaluate_application_screening", "_evaluate_academic_record",
+                     "_evaluate_experience", "_evaluate_diversity_factors"):
+            evaluate = getattr(system, name)
+            setattr(system, name, lambda application, evaluate=evaluate: barrier.wait() is not None
+                    and evaluate(application))
+
+        application_id, _ = submitted(system)
+        assert system.wait_for_evaluation(application_id, timeout=5)["status"] == "completed"
+
+    def test_timed_out_agent_is_dispatched_again(self, system):
+        """Test that a timed out agent leaves the run incomplete and resubmission only reruns it"""
+        release = threading.Event()
+        evaluate = system._evaluate_academic_record
+        system._evaluate_academic_record = lambda application: release.wait(5) and evaluate(application)
+        system.admissions_agents[1].timeout_seconds = 0.05
+
+        application_id, _ = submitted(system)
+        status = system.wait_for_evaluation(application_id, timeout=5)
+        assert status["status"] == "incomplete"
+        assert status["agents"]["ADMISSIONS_AGENT_002"] == "timed_out"
+        assert status["errors"] == {"ADMISSIONS_AGENT_002": "Evaluation timed out"}
+        assert system.applications[application_id].status == ApplicationStatus.UNDER_REVIEW
+        release.set()
+        time.sleep(0.05)
+        assert system.get_application_status(application_id)["evaluations_completed"] == 3
+
+        system.submit_application(application_id)
+        status = system.wait_for_evaluation(application_id, timeout=5)
+        assert status["status"] == "completed" and list(status["agents"]) == ["ADMISSIONS_AGENT_002"]
+        assert system.get_application_status(application_id)["evaluations_completed"] == 4
+
+    def test_failing_agent_is_reported(self, system):
+        """Test that an agent that raises is recorded as failed with its error"""
+        def fail(application):
+            raise RuntimeError("model unavailable")
+        system._evaluate_diversity_factors = fail
+
+        application_id, _ = submitted(system)
+        status = system.wait_for_evaluation(application_id, timeout=5)
+        assert status["agents"]["ADMISSIONS_AGENT_004"] == "failed"
+        assert status["errors"] == {"ADMISSIONS_AGENT_004": "RuntimeError: model unavailable"}
+
+
+class TestAgentDispatcher:
+    """Test the dispatcher with coroutine evaluators"""
+
+    def test_coroutine_evaluators_overlap(self):
+        """Test that async evaluators are awaited concurrently, each under its own timeout"""
+        dispatcher = AgentDispatcher(agent_timeout=1.0)
+        results = {}
+
+        async def answer(value):
+            await asyncio.sleep(0.2)
+            return value
+
+        async def slow():
+            await asyncio.sleep(5)
+
+        evaluators = {f"agent_{i}": partial(answer, i) for i in range(5)}
+        evaluators["slow"] = slow
+        started = time.monotonic()
+        future = dispatcher.dispatch(evaluators, lambda name, result, error: results.update({name: error or result}),
+                                     timeouts={"slow": 0.3})
+        future.result(timeout=5)
+        dispatcher.close()
+
+        assert time.monotonic() - started < 1.0
+        assert {name: results[name] for name in evaluators if name != "slow"} == {f"agent_{i}": i for i in range(5)}
+        assert isinstance(results["slow"], TimeoutError)
+
+    def test_timeout_starts_when_a_thread_picks_the_evaluator_up(self):
+        """Test that evaluators queued behind a full pool are not timed out while they wait"""
+        dispatcher = AgentDispatcher(max_workers=2, agent_timeout=0.5)
+        results = {}
+        evaluators = {f"agent_{i}": partial(lambda i: time.sleep(0.2) or i, i) for i in range(6)}
+        future = dispatcher.dispatch(evaluators, lambda name, result, error: results.update({name: error or result}))
+        future.result(timeout=5)
+        dispatcher.close()
+        assert results == {f"agent_{i}": i for i in range(6)}
+
+    def test_callbacks_do_not_block_the_loop(self):
+        """Test that slow result callbacks run off the loop, so a coroutine evaluator keeps its own timer"""
+        dispatcher = AgentDispatcher(agent_timeout=0.5)
+        threads, results = set(), {}
+
+        def on_result(name, result, error):
+            threads.add(threading.current_thread().name)
+            if name == "fast":
+                time.sleep(0.6)
+            results[name] = error or result
+
+        async def answer(value, delay):
+            await asyncio.sleep(delay)
+            return value
+
+        future = dispatcher.dispatch({"fast": partial(answer, 1, 0), "slow": partial(answer, 2, 0.2)}, on_result,
+                                     on_done=lambda error: threads.add(threading.current_thread().name))
+        future.result(timeout=5)
+        dispatcher.close()
+        assert results == {"fast": 1, "slow": 2}
+        assert "admissions-dispatcher" not in threads
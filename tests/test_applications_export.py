@@ -0,0 +1,105 @@
+"""
+MSAI Application System - Streaming Export Tests
+Unit tests for chunked CSV, NDJSON and Parquet exports
+"""
+
+import csv
+import io
+import json
+
+import pytest
+
+from applications_export import export_stream, iter_csv, iter_parquet
+
+COLUMNS = ['Application ID', 'Email', 'Status']
+
+
+def make_records(count):
+    return [{'Application ID': f"app-{i}", 'Email': f"applicant{i}@example.com",
+             'Status': 'Submitted' if i % 2 else 'Accepted', 'Phone': '555-0100'}
+            for i in range(count)]
+
+
+class TestExportFormats:
+    """Test that each format round-trips the selected columns"""
+
+    def test_csv_round_trip_with_projection(self):
+        """Test that CSV holds a header and only the requested columns"""
+        data = b''.join(export_stream(make_records(3), ['Email', 'Status'], 'csv'))
+        rows = list(csv.reader(io.StringIO(data.decode('utf-8'))))
+        assert rows[0] == ['Email', 'Status']
+        assert rows[1] == ['applicant0@example.com', 'Accepted']
+        assert len(rows) == 4
+
+    def test_ndjson_round_trip(self):
+        """Test that NDJSON yields one object per record"""
+        data = b''.join(export_stream(make_records(3), COLUMNS, 'ndjson'))
+        records = [json.loads(line) for line in data.decode('utf-8').splitlines()]
+        assert records[2] == {'Application ID': 'app-2', 'Email': 'applicant2@example.com',
+                              'Status': 'Accepted'}
+
+    def test_parquet_round_trip(self):
+        """Test that Parquet output is readable and keeps row order"""
+        pq = pytest.importorskip("pyarrow.parquet")
+        data = b''.join(export_stream(make_records(5), COLUMNS, 'parquet'))
+        table = pq.read_table(io.BytesIO(data))
+        assert table.column_names == COLUMNS
+        assert table.column('Application ID').to_pylist() == [f"app-{i}" for i in range(5)]
+
+    def test_unknown_format_is_rejected(self):
+        """Test that an unsupported format raises ValueError"""
+        with pytest.raises(ValueError):
+            export_stream(make_records(1), COLUMNS, 'xlsx')
+
+
+class TestChunking:
+    """Test that exports are produced incrementally"""
+
+    def test_csv_is_yielded_in_chunks(self):
+        """Test that CSV output arrives every rows_per_chunk records"""
+        chunks = list(iter_csv(make_records(25), COLUMNS, rows_per_chunk=10))
+        assert len(chunks) == 3
+        assert b''.join(chunks).count(b'\n') == 26
+
+    def test_parquet_writes_a_row_group_per_chunk(self):
+        """Test that each Parquet chunk is flushed as its own row group"""
+        pq = pytest.importorskip("pyarrow.parquet")
+        chunks = list(iter_parquet(make_records(25), COLUMNS, rows_per_chunk=10))
+        assert len(chunks) == 3
+        parquet_file = pq.ParquetFile(io.BytesIO(b''.join(chunks)))
+        assert parquet_file.metadata.num_row_groups == 3
+        assert parquet_file.metadata.num_rows == 25
+
+    def test_records_are_consumed_lazily(self):
+        """Test that the source is read only as chunks are requested"""
+        consumed = []
+
+        def records():
+            for record in make_records(30):
+                consumed.append(record)
+                yield record
+
+        chunks = iter_csv(records(), COLUMNS, rows_per_chunk=10)
+        next(chunks)
+        assert len(consumed) == 10
+
+
+class TestReplicaExport:
+    """Test exports driven by MSAIApplicationSheets"""
+
+    def test_export_filters_and_validates_columns(self, tmp_path):
+        """Test that filters narrow the export and unknown columns are rejected"""
+        pytest.importorskip("gspread")
+        from google_sheets_integration import MSAIApplicationSheets
+
+        sheets = MSAIApplicationSheets(queue_log=str(tmp_path / "submissions.log"),
+                                       replica_db=str(tmp_path / "applications.db"))
+        sheets.replica.upsert_many(make_records(4))
+
+        data = b''.join(sheets.export_applications('csv', ['Application ID'], status='Accepted'))
+        assert data.decode('utf-8').split() == ['Application', 'ID', 'app-0', 'app-2']
+        with pytest.raises(ValueError):
+            sheets.export_applications('csv', ['Password'])
+        with pytest.raises(ValueError):
+            sheets.export_applications('csv', status='Accepted', password='x')
+        sheets.write_queue.stop()
@@ -0,0 +1,183 @@
+"""
+MSAI Application System - Replica Tests
+Unit tests for the indexed SQLite replica of the Applications sheet
+"""
+
+import pytest
+
+from applications_replica import ApplicationReplica
+from fake_worksheet import FakeWorksheet
+
+
+def make_record(application_id, email, status='New', specialization='General AI',
+                term='Fall 2025', program_format='Online'):
+    return {
+        'Application ID': application_id,
+        'Email': email,
+        'Status': status,
+        'Specialization': specialization,
+        'Start Term': term,
+        'Program Format': program_format,
+        'Timestamp': '2025-01-01 12:00:00'
+    }
+
+
+@pytest.fixture
+def replica(tmp_path):
+    store = ApplicationReplica(str(tmp_path / "applications.db"))
+    store.upsert_many([
+        make_record('a1', 'Ada@Example.com', specialization='Natural Language Processing'),
+        make_record('a2', 'bob@example.com', status='Admitted'),
+        make_record('a3', 'cy@example.com', status='Admitted', term='Spring 2026')
+    ])
+    yield store
+    store.close()
+
+
+class TestApplicationReplica:
+    """Test indexed filtering, upserts and grouped stats"""
+
+    def test_filters_on_indexed_fields(self, replica):
+        """Test status/term filters and case-insensitive email lookup"""
+        assert [r['Application ID'] for r in replica.query(status='Admitted')] == ['a2', 'a3']
+        assert [r['Application ID'] for r in replica.query(status='Admitted', start_term='Fall 2025')] == ['a2']
+        assert replica.get(email='ada@EXAMPLE.com')['Application ID'] == 'a1'
+        with pytest.raises(ValueError):
+            replica.query(notes='x')
+
+    def test_upsert_replaces_in_place(self, replica):
+        """Test that re-upserting an application updates it without reordering"""
+        replica.upsert(make_record('a1', 'ada@example.com', status='Rejected'))
+        assert replica.count() == 3
+        assert [r['Status'] for r in replica.query()] == ['Rejected', 'Admitted', 'Admitted']
+
+    def test_stats_group_by_indexed_columns(self, replica):
+        """Test that stats match the shape of get_application_stats"""
+        stats = replica.get_stats()
+        assert stats['total_applications'] == 3
+        assert stats['by_status'] == {'New': 1, 'Admitted': 2}
+        assert stats['by_term'] == {'Fall 2025': 2, 'Spring 2026': 1}
+
+    def test_iter_records_pages_in_submission_order(self, replica):
+        """Test keyset pagination across small batches"""
+        assert [r['Application ID'] for r in replica.iter_records(batch_size=1)] == ['a1', 'a2', 'a3']
+
+    def test_rows_without_ids_are_keyed_by_sheet_row(self, tmp_path):
+        """Test that legacy rows sharing an email stay apart and an upsert at a known row replaces in place"""
+        store = ApplicationReplica(str(tmp_path / "legacy.db"))
+        store.upsert_many([make_record('', 'dup@example.com', status='Rejected'),
+                           make_record('', 'dup@example.com', term='Fall 2026')], first_sheet_row=2)
+        assert store.count(email='dup@example.com') == 2
+        assert store.locate(email='DUP@example.com') == (make_record('', 'dup@example.com', term='Fall 2026'), 3)
+
+        store.upsert_many([make_record('', 'dup@example.com', status='Admitted', term='Fall 2026')], sheet_rows=[3])
+        assert [r['Status'] for r in store.query(email='dup@example.com')] == ['Rejected', 'Admitted']
+        with pytest.raises(ValueError):
+            store.upsert(make_record('', 'dup@example.com'))
+        store.close()
+
+
+@pytest.fixture
+def sheets(tmp_path):
+    """Sheets integration over a fake worksheet holding one synced application"""
+    pytest.importorskip("gspread")
+    from google_sheets_integration import SHEET_HEADERS, MSAIApplicationSheets
+
+    integration = MSAIApplicationSheets(queue_log=str(tmp_path / "queue.log"),
+                                        replica_db=str(tmp_path / "applications.db"))
+    integration.write_queue.min_call_interval = 0
+    worksheet = FakeWorksheet(SHEET_HEADERS)
+    existing = dict.fromkeys(SHEET_HEADERS, '')
+    existing.update(make_record('old', 'old@example.com', status='Admitted'))
+    worksheet.rows.append([existing[header] for header in SHEET_HEADERS])
+    integration.worksheet = integration.write_queue.worksheet = worksheet
+    assert integration.sync_replica() == 1
+    yield integration
+    integration.write_queue.stop()
+
+
+class TestSheetsReads:
+    """Test that MSAIApplicationSheets reads come from the replica"""
+
+    def test_reads_do_not_touch_the_sheet(self, sheets, tmp_path):
+        """Test that after one sync, queries, stats and exports make no Sheets calls"""
+        from google_sheets_integration import SHEET_HEADERS
+
+        worksheet = sheets.worksheet
+        sheets.submit_application({'application_id': 'new', 'email': 'new@example.com',
+                                   'specialization': 'General AI', 'interests': ['NLP', 'Vision']})
+        calls = list(worksheet.calls)
+
+        assert len(sheets.build_row({})) == len(SHEET_HEADERS)
+        assert [r['Application ID'] for r in sheets.get_applications()] == ['old', 'new']
+        assert sheets.get_applications(status='New')[0]['Areas of Interest'] == 'NLP, Vision'
+        assert sheets.get_application_stats()['by_status'] == {'Admitted': 1, 'New': 1}
+        assert sheets.export_to_csv(str(tmp_path / "export.csv"))
+        assert worksheet.calls == calls
+
+
+    def test_replica_failure_does_not_fail_a_queued_submission(self, sheets, monkeypatch):
+        """Test that a submission is acknowledged, and appended once, when only the replica upsert fails"""
+        def fail(record):
+            raise RuntimeError("database is locked")
+
+        monkeypatch.setattr(sheets.replica, 'upsert', fail)
+        assert sheets.submit_application({'application_id': 'new', 'email': 'new@example.com'})
+        sheets.write_queue.flush()
+        assert [row[sheets.columns['Application ID'] - 1] for row in sheets.worksheet.rows[1:]] == ['old', 'new']
+
+
+class TestStatusUpdates:
+    """Test row-indexed, batched status updates"""
+
+    def test_bulk_update_is_one_batch_call(self, sheets):
+        """Test that many decisions are checked in one batch_get and go out in one batch_update"""
+        sheets.submit_application({'application_id': 'new', 'email': 'new@example.com'})
+        sheets.write_queue.flush()
+        worksheet = sheets.worksheet
+        worksheet.calls.clear()
+
+        result = sheets.update_application_statuses([
+            {'email': 'OLD@example.com', 'status': 'Enrolled'},
+            {'application_id': 'new', 'status': 'Admitted', 'notes': 'Scholarship'},
+            {'email': 'missing@example.com', 'status': 'Rejected'}
+        ])
+
+        assert result == {'success': True, 'updated': 2, 'not_found': ['missing@example.com']}
+        assert worksheet.calls == ['batch_get', 'batch_update']
+        status_col, notes_col = sheets.columns['Status'], sheets.columns['Notes']
+        assert worksheet.cell(2, status_col) == 'Enrolled'
+        assert (worksheet.cell(3, status_col), worksheet.cell(3, notes_col)) == ('Admitted', 'Scholarship')
+        assert sheets.replica.get(application_id='new')['Status'] == 'Admitted'
+
+    def test_update_before_flush_is_applied_when_row_lands(self, sheets):
+        """Test that a decision on a still-queued application reaches the sheet after its append"""
+        sheets.submit_application({'application_id': 'queued', 'email': 'q@example.com'})
+        assert sheets.update_application_status('q@example.com', 'Waitlisted')
+        assert 'batch_update' not in sheets.worksheet.calls
+
+        sheets.write_queue.flush()
+        assert sheets.worksheet.calls[-3:] == ['append_rows', 'batch_get', 'batch_update']
+        assert sheets.worksheet.cell(3, sheets.columns['Status']) == 'Waitlisted'
+        assert sheets.replica.locate(application_id='queued')[1] == 3
+
+    def test_rows_moved_since_sync_are_located_again(self, sheets):
+        """Test that a sheet sorted or edited since the last sync is re-read before any cell is written"""
+        from google_sheets_integration import SHEET_HEADERS
+
+        sheets.submit_application({'application_id': 'new', 'email': 'new@example.com'})
+        sheets.write_queue.flush()
+        worksheet = sheets.worksheet
+        inserted = dict.fromkeys(SHEET_HEADERS, '')
+        inserted.update(make_record('manual', 'manual@example.com'))
+        worksheet.rows.insert(1, [inserted[header] for header in SHEET_HEADERS])
+        worksheet.calls.clear()
+
+        result = sheets.update_application_statuses([{'email': 'old@example.com', 'status': 'Enrolled'},
+                                                     {'application_id': 'new', 'status': 'Admitted'}])
+
+        assert result['updated'] == 2
+        assert worksheet.calls == ['batch_get', 'get_all_values', 'batch_get', 'batch_update']
+        status_col = sheets.columns['Status']
+        assert [worksheet.cell(row, status_col) for row in (2, 3, 4)] == ['New', 'Enrolled', 'Admitted']
+        assert sheets.replica.locate(application_id='new')[1] == 4
@@ -0,0 +1,256 @@
+"""
+MSAI Application System - Dashboard Metrics Tests
+Unit tests comparing the event-maintained dashboards with full rescans
+"""
+
+import random
+
+import pytest
+
+from admissions.admission_workflow import AdmissionWorkflowManager, DecisionType, WorkflowStage
+from admissions.admissions_system import AdmissionsSystem, ApplicationStatus
+from admissions.application_portal import ApplicationPortal, ApplicationStatus as PortalStatus, ApplicationStep, DocumentType
+from admissions.dashboard_metrics import DashboardMetrics, Distribution, RecentItems
+from test_workflow_engine import Clock, ScriptedEvaluation, make_manager
+
+
+def admissions_reference(system):
+    """get_admissions_dashboard() figures computed by scanning, as before metrics"""
+    applications = list(system.applications.values())
+    decided = [app for app in applications if app.decision]
+    recent = sorted([app for app in applications if app.submitted_at], key=lambda x: x.submitted_at, reverse=True)[:10]
+    return {
+        "total_applications": len(applications),
+        "submitted_applications": len([app for app in applications if app.status != ApplicationStatus.DRAFT]),
+        "status_distribution": {status.value: len([app for app in applications if app.status == status])
+                                for status in ApplicationStatus},
+        "recent_applications": [app.application_id for app in recent],
+        "acceptance_rate": (len([app for app in decided if app.decision["decision"] == "accept"]) / len(decided) * 100
+                            if decided else 0.0),
+        "pending_decisions": len([app for app in applications if app.status == ApplicationStatus.EVALUATION_COMPLETE])
+    }
+
+
+def admissions_actual(system):
+    dashboard = system.get_admissions_dashboard()
+    return {
+        "total_applications": dashboard["total_applications"],
+        "submitted_applications": dashboard["submitted_applications"],
+        "status_distribution": dashboard["status_distribution"],
+        "recent_applications": [app["application_id"] for app in dashboard["recent_applications"]],
+        "acceptance_rate": dashboard["admission_statistics"]["acceptance_rate"],
+        "pending_decisions": dashboard["admission_statistics"]["pending_decisions"]
+    }
+
+
+def portal_reference(portal):
+    forms = list(portal.application_forms.values())
+    total = len(forms)
+    document_types = {}
+    for documents in portal.application_documents.values():
+        for document in documents:
+            document_types[document.document_type.value] = document_types.get(document.document_type.value, 0) + 1
+    return {
+        "total_applications": total,
+        "status_distribution": {status.value: len([form for form in forms if form.status == status])
+                                for status in PortalStatus},
+        "step_completion": {step.value: {
+            "completed": len([form for form in forms if step in form.completed_steps]),
+            "completion_rate": len([form for form in forms if step in form.completed_steps]) / total * 100 if total else 0
+        } for step in ApplicationStep},
+        "document_statistics": {"total_documents": sum(document_types.values()), "document_types": document_types},
+        "average_completion_time": sum(p.estimated_completion_time for p in portal.application_progress.values())
+        / len(portal.application_progress) if portal.application_progress else 0,
+        "help_requests": sum(p.help_requests for p in portal.application_progress.values())
+    }
+
+
+def workflow_reference(manager):
+    workflows = list(manager.admission_workflows.values())
+    total = len(workflows)
+    decided = [wf for wf in workflows if wf.decision is not None]
+    times = [(wf.decision_date - wf.created_at).total_seconds() / 3600 for wf in decided if wf.decision_date]
+    successful = len([e for e in manager.enrollment_data.values() if e.status == "enrolled"])
+    return {
+        "total_workflows": total,
+        "stage_distribution": {stage.value: len([wf for wf in workflows if wf.current_stage == stage])
+                               for stage in WorkflowStage},
+        "decision_distribution": {decision.value: len([wf for wf in workflows if wf.decision == decision])
+                                  for decision in DecisionType},
+        "completion_statistics": {
+            "completed_workflows": len(decided),
+            "average_completion_time_hours": sum(times) / len(times) if times else 0,
+            "fastest_completion_hours": min(times) if times else 0,
+            "slowest_completion_hours": max(times) if times else 0
+        },
+        "enrollment_statistics": {
+            "total_enrollments": len(manager.enrollment_data),
+            "successful_enrollments": successful,
+            "enrollment_rate": successful / total * 100 if total else 0
+        },
+        "workflow_efficiency": {
+            "average_steps_completed": sum(len([s for s in wf.workflow_steps if s.status == "completed"])
+                                           for wf in workflows) / total,
+            "auto_triggered_steps": sum(len([s for s in wf.workflow_steps if s.auto_triggered]) for wf in workflows),
+            "manual_steps": sum(len([s for s in wf.workflow_steps if not s.auto_triggered]) for wf in workflows)
+        }
+    }
+
+
+def rounded(value):
+    """Nested figures with floats rounded, since pytest.approx does not recurse into dicts"""
+    if isinstance(value, dict):
+        return {key: rounded(item) for key, item in value.items()}
+    return round(value, 9) if isinstance(value, float) else value
+
+
+def complete_application(rng):
+    return {
+        "personal_info": {"first_name": "Ada", "last_name": "Lovelace", "phone": "555-0100", "address": "1 Main St",
+                          "first_generation": rng.random() < 0.5},
+        "academic_background": {"degree": "BS", "gpa": rng.choice([2.8, 3.2, 3.6, 3.9]), "institution": "State",
+                                "prerequisites_completed": rng.random() < 0.7},
+        "work_experience": [{"years": rng.randint(0, 5), "ai_ml_relevant": rng.random() < 0.5}],
+        "technical_skills": {"programming_languages": ["Python", "C++"][:rng.randint(1, 2)],
+                             "ai_ml_experience": rng.random() < 0.5},
+        "personal_statement": "x" * rng.choice([300, 600]),
+        "research_interests": ["nlp"] * rng.randint(0, 3),
+        "letters_of_recommendation": [{}] * rng.choice([2, 3])
+    }
+
+
+def step_data(portal, step):
+    values = {"email": "ref@example.com", "number": "3", "url": "https://example.com"}
+    return {field["name"]: "x" * field.get("min_length", 1) if field["type"] == "textarea"
+            else values.get(field["type"], "value")
+            for field in portal.form_templates[step.value]["fields"]}
+
+
+class TestPrimitives:
+    """Test the distribution and recent-items structures against brute force"""
+
+    def test_distribution_with_removals(self):
+        """Test count, mean, min and max while values are added and removed"""
+        rng = random.Random(3)
+        distribution, values = Distribution(), []
+        for _ in range(2000):
+            if values and rng.random() < 0.45:
+                value = values.pop(rng.randrange(len(values)))
+                distribution.remove(value)
+            else:
+                value = rng.randint(0, 50)
+                values.append(value)
+                distribution.add(value)
+            assert distribution.count == len(values)
+            assert distribution.min() == (min(values) if values else None)
+            assert distribution.max() == (max(values) if values else None)
+            assert distribution.mean() == pytest.approx(sum(values) / len(values) if values else 0.0)
+        with pytest.raises(ValueError):
+            distribution.remove(999)
+
+    def test_recent_items_keep_newest(self):
+        """Test that the bounded heap holds the newest keys, moving keys pushed again"""
+        rng = random.Random(5)
+        recent, latest = RecentItems(limit=10), {}
+        for timestamp in range(500):
+            key = f"K{rng.randrange(40)}"
+            latest[key] = timestamp
+            recent.push(key, timestamp)
+            assert recent.keys() == sorted(latest, key=latest.get, reverse=True)[:10]
+
+    def test_unknown_event_is_rejected(self):
+        """Test that a misspelt event fails instead of being ignored"""
+        with pytest.raises(ValueError):
+            DashboardMetrics().publish("status_chnaged", scope="admissions", key="A", old=None, new="draft")
+
+
+class TestDashboards:
+    """Test that each dashboard matches a rescan of its system after random activity"""
+
+    def test_admissions_dashboard(self):
+        """Test status counts, recent submissions and acceptance rate"""
+        rng = random.Random(11)
+        system = AdmissionsSystem(user_manager=None)
+        for _ in range(120):
+            action = rng.random()
+            ids = list(system.applications)
+            if action < 0.4 or not ids:
+                system.create_application(f"a{len(ids)}@example.com", complete_application(rng))
+            elif action < 0.8:
+                application_id = rng.choice(ids)
+                system.submit_application(application_id)
+                system.wait_for_evaluation(application_id)
+            else:
+                system.make_admission_decision(rng.choice(ids), {})
+            assert admissions_actual(system) == admissions_reference(system)
+        assert admissions_reference(system)["acceptance_rate"] or admissions_reference(system)["recent_applications"]
+
+        expected = system.get_admissions_dashboard()
+        system.rebuild_metrics()
+        assert system.get_admissions_dashboard() == expected
+
+    def test_portal_statistics(self):
+        """Test status, step completion, document and help request counts"""
+        rng = random.Random(13)
+        portal = ApplicationPortal()
+        for _ in range(200):
+            action = rng.random()
+            ids = list(portal.application_forms)
+            if action < 0.2 or not ids:
+                portal.start_application(f"p{len(ids)}@example.com")
+                continue
+            application_id = rng.choice(ids)
+            if action < 0.6:
+                step = rng.choice(list(ApplicationStep)[:6])
+                portal.save_application_step(application_id, step, step_data(portal, step))
+            elif action < 0.8:
+                portal.upload_document(application_id, rng.choice([DocumentType.TRANSCRIPT, DocumentType.PERSONAL_STATEMENT,
+                                                                   DocumentType.RESUME]),
+                                       {"file_name": "f.pdf", "file_size": 10})
+            elif action < 0.9:
+                portal.request_help(application_id, "technical", "help")
+            else:
+                portal.submit_application(application_id)
+            assert portal.get_application_statistics() == portal_reference(portal)
+        assert portal.get_application_statistics()["status_distribution"]["submitted"] > 0
+
+        expected = portal.get_application_statistics()
+        portal.rebuild_metrics()
+        assert portal.get_application_statistics() == expected
+
+    @pytest.mark.parametrize("queued", [False, True], ids=["inline", "engine"])
+    def test_workflow_analytics(self, queued, tmp_path):
+        """Test stage, decision, completion time and enrollment figures"""
+        rng = random.Random(17)
+        evaluation = ScriptedEvaluation()
+        if queued:
+            manager, engine = make_manager(str(tmp_path / "workflows.db"), Clock(), evaluation)
+        else:
+            manager, engine = AdmissionWorkflowManager(evaluation_system=evaluation), None
+        for i in range(40):
+            evaluation.recommendation = rng.choice(["accept", "waitlist", "reject"])
+            workflow_id = manager.initiate_admission_workflow(f"APP_{i}", f"w{i}@example.com",
+                                                              rng.choice(["standard", "fast_track"]))["workflow_id"]
+            for _ in range(rng.randint(0, 4)):
+                if engine:
+                    engine.run_until_idle()
+                manager.advance_workflow(workflow_id)
+            if engine:
+                engine.run_until_idle()
+            assert rounded(manager.get_workflow_analytics()) == rounded(workflow_reference(manager))
+        assert manager.get_workflow_analytics()["enrollment_statistics"]["total_enrollments"] > 0
+
+        expected = manager.get_workflow_analytics()
+        manager.rebuild_metrics()
+        assert rounded(manager.get_workflow_analytics()) == rounded(expected)
+
+    def test_shared_metrics_keep_scopes_apart(self):
+        """Test that systems sharing one metrics instance do not mix their counts"""
+        metrics = DashboardMetrics()
+        system = AdmissionsSystem(user_manager=None, metrics=metrics)
+        portal = ApplicationPortal(metrics=metrics)
+        system.create_application("a@example.com", {})
+        portal.start_application("b@example.com")
+        portal.start_application("c@example.com")
+        assert system.get_admissions_dashboard()["status_distribution"]["draft"] == 1
+        assert portal.get_application_statistics()["status_distribution"]["draft"] == 2
@@ -0,0 +1,204 @@
+"""
+MSAI Application System - Document Upload Tests
+Unit tests for streamed, capped and deduplicated document storage
+"""
+
+import asyncio
+import hashlib
+import io
+import threading
+import time
+
+import pytest
+
+from document_uploads import DocumentStore, DocumentSyncWorker, SyncUnavailable, UploadTooLarge, safe_filename
+
+
+class FakeUpload:
+    """UploadFile stand-in that records the largest read requested"""
+
+    def __init__(self, data, filename="transcript.pdf", size=None):
+        self.file = io.BytesIO(data)
+        self.filename = filename
+        self.size = size
+        self.largest_read = 0
+
+    async def read(self, size=-1):
+        self.largest_read = max(self.largest_read, size)
+        return self.file.read(size)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return DocumentStore(str(tmp_path / "uploads"), max_file_bytes=1000, max_application_bytes=1500,
+                         chunk_size=64)
+
+
+def save(store, data, application_id="app-1", kind="transcript", **kwargs):
+    return asyncio.run(store.save(application_id, kind, FakeUpload(data, **kwargs)))
+
+
+def wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+class TestDocumentStore:
+    """Test streaming, hashing, caps and dedupe"""
+
+    def test_upload_is_streamed_and_hashed(self, store):
+        """Test that files are copied in chunk_size reads and recorded with their SHA-256"""
+        data = bytes(range(256)) * 3
+        upload = FakeUpload(data)
+        document = asyncio.run(store.save("app-1", "transcript", upload))
+
+        assert upload.largest_read == 64
+        assert document['sha256'] == hashlib.sha256(data).hexdigest()
+        assert document['size'] == len(data) and not document['duplicate']
+        with open(document['path'], 'rb') as f:
+            assert f.read() == data
+        assert store.load_manifest("app-1")['documents'][0]['sha256'] == document['sha256']
+
+    def test_identical_reupload_is_deduplicated(self, store):
+        """Test that the same content is stored once per application"""
+        first = save(store, b"resume contents", kind="resume")
+        second = save(store, b"resume contents", kind="resume", filename="resume-final.pdf")
+
+        assert second['duplicate'] and second['path'] == first['path']
+        assert len(store.load_manifest("app-1")['documents']) == 1
+        assert not list(store.incoming.iterdir())
+
+    def test_oversized_file_is_rejected_while_streaming(self, store):
+        """Test that the per-file cap aborts the copy and leaves nothing behind"""
+        upload = FakeUpload(b"x" * 5000)
+        with pytest.raises(UploadTooLarge):
+            asyncio.run(store.save("app-1", "transcript", upload))
+
+        assert upload.file.tell() < 5000
+        assert not list(store.incoming.iterdir())
+        assert store.load_manifest("app-1")['documents'] == []
+
+    def test_declared_size_is_rejected_before_reading(self, store):
+        """Test that a known Content-Length over the cap is refused up front"""
+        upload = FakeUpload(b"x" * 10, size=5000)
+        with pytest.raises(UploadTooLarge):
+            asyncio.run(store.save("app-1", "transcript", upload))
+        assert upload.largest_read == 0
+
+    def test_application_cap_counts_stored_documents(self, store):
+        """Test that the per-application total includes earlier uploads"""
+        save(store, b"a" * 900, kind="transcript")
+        with pytest.raises(UploadTooLarge):
+            save(store, b"b" * 900, kind="resume")
+        save(store, b"c" * 500, application_id="app-2")
+
+    def test_same_content_as_another_kind_is_stored(self, store):
+        """Test that a resume identical to the transcript is kept as its own document"""
+        transcript = save(store, b"same bytes", kind="transcript")
+        resume = save(store, b"same bytes", kind="resume")
+
+        assert not resume['duplicate'] and resume['kind'] == "resume"
+        assert resume['path'] != transcript['path']
+        assert [doc['kind'] for doc in store.load_manifest("app-1")['documents']] == ["transcript", "resume"]
+
+    def test_rejected_file_rolls_back_the_whole_request(self, store):
+        """Test that a file over the cap leaves none of the files uploaded with it"""
+        uploads = [("transcript", FakeUpload(b"a" * 600)), ("resume", FakeUpload(b"b" * 600)),
+                   ("additional_0", FakeUpload(b"c" * 600))]
+        with pytest.raises(UploadTooLarge):
+            asyncio.run(store.save_all("app-1", uploads))
+
+        assert store.load_manifest("app-1")['documents'] == []
+        assert not list(store.incoming.iterdir())
+        documents = asyncio.run(store.save_all("app-1", [("transcript", FakeUpload(b"a" * 600)),
+                                                         ("resume", FakeUpload(b"b" * 600))]))
+        assert [doc['duplicate'] for doc in documents] == [False, False]
+        assert store.used_bytes("app-1") == 1200
+
+    def test_unsafe_names_are_rejected_or_cleaned(self, store):
+        """Test that IDs and filenames cannot escape the upload directory"""
+        with pytest.raises(ValueError):
+            save(store, b"data", application_id="../etc")
+        assert safe_filename("../../passwd") == "passwd"
+        assert safe_filename("") == "document"
+
+
+class TestDocumentSyncWorker:
+    """Test background Drive sync"""
+
+    def test_pending_documents_are_synced_and_recorded(self, store):
+        """Test that unsynced documents are retried and marked with their Drive IDs"""
+        save(store, b"transcript", kind="transcript")
+        save(store, b"resume", kind="resume")
+        attempts = []
+
+        def sync(path, application_id, document):
+            attempts.append(document['kind'])
+            if len(attempts) == 1:
+                raise RuntimeError("Drive unavailable")
+            return f"drive-{document['kind']}"
+
+        worker = DocumentSyncWorker(store, sync, backoff_base=0.01)
+        worker.start()
+        wait_until(lambda: not list(store.pending_sync()))
+        worker.stop()
+
+        # The failed document goes to the back of the queue
+        assert attempts == ['transcript', 'resume', 'transcript']
+        drive_ids = [doc['drive_file_id'] for doc in store.load_manifest("app-1")['documents']]
+        assert drive_ids == ['drive-transcript', 'drive-resume']
+
+    def test_failing_document_does_not_block_the_queue(self, store):
+        """Test that a document that keeps failing is given up after max_attempts while later ones sync"""
+        save(store, b"broken", kind="transcript")
+        save(store, b"resume", kind="resume")
+        attempts = []
+
+        def sync(path, application_id, document):
+            attempts.append(document['kind'])
+            if document['kind'] == 'transcript':
+                raise RuntimeError("file rejected")
+            return "drive-resume"
+
+        worker = DocumentSyncWorker(store, sync, backoff_base=0.01, max_attempts=3)
+        worker.start()
+        wait_until(lambda: worker.get_stats()['given_up'] == 1)
+        worker.stop()
+
+        assert attempts == ['transcript', 'resume', 'transcript', 'transcript']
+        assert [doc['kind'] for _, doc in store.pending_sync()] == ['transcript']
+        assert worker.get_stats()['failures'] == 3
+
+    def test_unavailable_target_pauses_without_failing_documents(self, store):
+        """Test that an unauthenticated target holds every document until it is back"""
+        save(store, b"transcript", kind="transcript")
+        available = threading.Event()
+        attempts = []
+
+        def sync(path, application_id, document):
+            attempts.append(document['kind'])
+            if not available.is_set():
+                raise SyncUnavailable("Google Drive is not authenticated")
+            return f"drive-{document['kind']}"
+
+        worker = DocumentSyncWorker(store, sync, backoff_base=0.01, backoff_max=0.02, max_attempts=2)
+        worker.start()
+        wait_until(lambda: len(attempts) >= 5)
+        worker.submit("app-1", save(store, b"resume", kind="resume"))
+        assert worker.get_stats()['paused'] and worker.get_stats()['failures'] == 0
+        available.set()
+        wait_until(lambda: not list(store.pending_sync()))
+        worker.stop()
+        assert worker.get_stats()['synced'] == 2 and worker.get_stats()['given_up'] == 0
+
+    def test_documents_wait_in_manifests_until_started(self, store):
+        """Test that submitting to a worker that is not running leaves the document for start()"""
+        worker = DocumentSyncWorker(store, lambda path, application_id, document: "drive-id")
+        worker.submit("app-1", save(store, b"transcript"))
+        assert worker.get_stats()['pending'] == 0
+        worker.start()
+        wait_until(lambda: not list(store.pending_sync()))
+        worker.stop()
+        assert worker.get_stats()['synced'] == 1
@@ -0,0 +1,151 @@
+"""
+MSAI Application System - Batch Evaluation Tests
+Unit tests comparing AutomatedEvaluationSystem.evaluate_batch with evaluate_application
+"""
+
+import random
+
+import pytest
+
+from admissions import evaluation_system
+from admissions.evaluation_system import (
+    DIVERSITY_SETS, KEYWORD_SETS, AutomatedEvaluationSystem, EvaluationCriteria, EvaluationWeight, KeywordMatcher
+)
+
+PHRASES = [
+    "Machine Learning", "deep learning", "PyTorch", "data science", "analytics", "AI", "Artificial Intelligence",
+    "algorithm", "SQL", "publication", "Journal", "research", "thesis", "capstone", "engineer", "passion",
+    "career", "future", "industry", "explore", "contribute", "bring", "international", "First Generation",
+    "multilingual", "cultural", "diverse experience", "Python", "JavaScript", "C++", "c#", "R", "said",
+    "maintain", "İstanbul", "the", "team", "projects"
+]
+
+
+def make_applications(count, seed=7):
+    rng = random.Random(seed)
+
+    def text(low, high):
+        return " ".join(rng.choice(PHRASES) for _ in range(rng.randint(low, high)))
+
+    applications = {}
+    for i in range(count):
+        application = {
+            "personal_info": {"name": f"Applicant {i}", "background": text(0, 3)} if rng.random() > 0.1 else {},
+            "academic_background": {
+                "gpa": rng.choice([4.0, 3.8, 3.79, 3.5, 3.0, 2.5, 2.49, 4, 0, round(rng.uniform(2, 4), 2)]),
+                "undergraduate_institution": rng.choice(["MIT Institute", "Stanford University", "Acme", ""]),
+                "major": rng.choice(["Computer Science", "Physics", "Art History", ""]),
+                "research_experience": text(0, 6),
+                "academic_honors": rng.choice(["", "Dean's list"])
+            },
+            "work_experience": {
+                "years_experience": rng.choice([0, 1, 2, 3, 4.5, 5, 10]),
+                "current_position": rng.choice(["Data Scientist", "Manager", "", "Software Engineer"]),
+                "programming_languages": rng.choice(["Python, Java", "C++", "R", "", "Go", "javascript, c#"]),
+                "technical_skills": text(0, 4),
+                "ai_ml_experience": text(0, 8),
+                "projects": rng.choice(["", "Recommender system"])
+            },
+            "technical_skills": rng.choice([{}, {"cloud": "AWS"}]),
+            "personal_statement": {
+                "motivation": text(0, 60),
+                "career_goals": text(0, 40),
+                "research_interests": text(0, 30),
+                "contribution": text(0, 40)
+            }
+        }
+        for section in list(application):
+            if rng.random() < 0.05:
+                del application[section]
+        applications[f"APP_{i:04d}"] = application
+    return applications
+
+
+def comparable(result):
+    """Result without the fields that differ between any two runs (id and timing)"""
+    summary = {key: value for key, value in result["evaluation_summary"].items() if key != "evaluation_time"}
+    return repr({**{key: value for key, value in result.items()
+                    if key not in ("evaluation_id", "evaluation_time_minutes", "evaluation_summary")},
+                 "evaluation_summary": summary})
+
+
+@pytest.fixture(params=[True, False], ids=["pyarrow", "fallback"])
+def matcher_backend(request, monkeypatch):
+    if request.param and not evaluation_system.PYARROW_AVAILABLE:
+        pytest.skip("pyarrow is not installed")
+    monkeypatch.setattr(evaluation_system, "PYARROW_AVAILABLE", request.param)
+    return request.param
+
+
+class TestKeywordMatcher:
+    """Test that compiled keyword sets match like any(keyword in text)"""
+
+    def test_matches_substring_checks(self, matcher_backend):
+        """Test every keyword set against the per-keyword checks, including repeated texts"""
+        texts = [phrase.lower() for phrase in PHRASES] + ["", "c++ and c#", "said the maintainer", "c++ and c#"]
+        matcher = KeywordMatcher({**KEYWORD_SETS, **DIVERSITY_SETS, "empty": []})
+        names = list(matcher.keyword_sets)
+        matches = matcher.match(texts, names)
+        for name in names:
+            expected = [any(keyword in text for keyword in matcher.keyword_sets[name]) for text in texts]
+            assert matches[name].tolist() == expected, name
+
+
+class TestEvaluateBatch:
+    """Test that batch evaluation is identical to evaluating one application at a time"""
+
+    def test_results_match_evaluate_application(self, matcher_backend):
+        """Test scores, recommendation, confidence, feedback and summary for every application"""
+        applications = make_applications(400)
+        system = AutomatedEvaluationSystem()
+        expected = [system.evaluate_application(application_id, data) for application_id, data in applications.items()]
+        results = system.evaluate_batch(applications)
+        assert [comparable(result) for result in results] == [comparable(result) for result in expected]
+
+    def test_stored_reports_match(self):
+        """Test that batch results are stored and reported like single evaluations"""
+        applications = make_applications(30, seed=11)
+        system = AutomatedEvaluationSystem()
+        single = [system.evaluate_application(application_id, data) for application_id, data in applications.items()]
+        batch = system.evaluate_batch(list(applications.items()))
+        assert len(system.evaluation_results) == 60
+
+        ignored = ("evaluation_id", "evaluated_at", "evaluation_time_minutes")
+        for one, other in zip(single, batch):
+            report = system.get_evaluation_report(one["evaluation_id"])
+            batch_report = system.get_evaluation_report(other["evaluation_id"])
+            assert {key: value for key, value in report.items() if key not in ignored} == \
+                {key: value for key, value in batch_report.items() if key not in ignored}
+        assert system.get_evaluation_statistics()["total_evaluations"] == 60
+
+    def test_custom_criteria_match(self):
+        """Test a reordered criteria list with a criteria the system cannot score"""
+        system = AutomatedEvaluationSystem()
+        system.evaluation_criteria = system.evaluation_criteria[::-1] + [EvaluationCriteria(
+            criteria_id="CRIT_099", name="Interview", description="Interview performance",
+            weight=EvaluationWeight.LOW, max_score=5.0, evaluation_method="interview", ai_model_used="none"
+        )]
+        applications = make_applications(50, seed=5)
+        expected = [system.evaluate_application(application_id, data) for application_id, data in applications.items()]
+        assert [comparable(result) for result in system.evaluate_batch(applications)] == \
+            [comparable(result) for result in expected]
+
+    @pytest.mark.parametrize("field, value", [("gpa", "3.9"), ("gpa", None), ("years_experience", "2")])
+    def test_non_numeric_values_raise_like_evaluate_application(self, field, value):
+        """Test that a batch holding a string or missing number fails with the TypeError of the single path"""
+        applications = make_applications(5, seed=3)
+        application_id = "APP_0002"
+        section = "academic_background" if field == "gpa" else "work_experience"
+        applications[application_id][section][field] = value
+        system = AutomatedEvaluationSystem()
+        with pytest.raises(TypeError):
+            system.evaluate_application(application_id, applications[application_id])
+        with pytest.raises(TypeError, match=field):
+            system.evaluate_batch(applications)
+        assert system.evaluation_results == {}
+
+    def test_empty_batch(self):
+        """Test that an empty batch evaluates nothing"""
+        system = AutomatedEvaluationSystem()
+        assert system.evaluate_batch({}) == []
+        assert system.evaluation_results == {}
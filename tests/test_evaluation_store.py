@@ -0,0 +1,215 @@
+"""
+MSAI Application System - Evaluation Store Tests
+Unit tests for the persistent evaluation store and the evaluation job runner
+"""
+
+import pytest
+
+from admissions.evaluation_store import EvaluationJobRunner, EvaluationStore
+from admissions.evaluation_system import AutomatedEvaluationSystem
+from test_evaluation_batch import make_applications
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = EvaluationStore(str(tmp_path / "evaluations.db"))
+    yield store
+    store.close()
+
+
+def stored_reports(store, version, applications):
+    return {application_id: store.get(application_id, version) for application_id in applications}
+
+
+class TestEvaluationStore:
+    """Test stored reports and the aggregates kept alongside them"""
+
+    def test_statistics_match_in_memory_results(self, store):
+        """Test that aggregates give the same statistics as iterating every result"""
+        system = AutomatedEvaluationSystem(evaluation_store=store)
+        system.evaluate_batch(make_applications(200))
+        in_memory = AutomatedEvaluationSystem()
+        in_memory.evaluation_results = system.evaluation_results
+        in_memory.evaluation_models = system.evaluation_models
+        expected = in_memory.get_evaluation_statistics()
+        statistics = system.get_evaluation_statistics()
+
+        assert statistics["total_evaluations"] == expected["total_evaluations"] == 200
+        assert statistics["recommendation_distribution"] == expected["recommendation_distribution"]
+        for section in ("score_statistics", "confidence_statistics", "performance_metrics"):
+            assert statistics[section] == pytest.approx(expected[section])
+        assert statistics["model_performance"] == expected["model_performance"]
+
+    def test_replacing_a_result_updates_aggregates(self, store):
+        """Test that re-storing an application replaces its contribution"""
+        system = AutomatedEvaluationSystem()
+        applications = make_applications(3)
+        reports = [system.get_evaluation_report(result["evaluation_id"])
+                   for result in system.evaluate_batch(applications)]
+        store.save_many("v1", reports)
+        store.save("v1", {**reports[0], "overall_score": 24.0, "recommendation": "accept"})
+
+        statistics = store.get_statistics("v1")
+        assert statistics["total_evaluations"] == 3
+        assert statistics["score_statistics"]["max_score"] == 24.0
+        assert sum(statistics["recommendation_distribution"].values()) == 3
+        assert statistics["score_statistics"]["average_score"] == pytest.approx(
+            (24.0 + reports[1]["overall_score"] + reports[2]["overall_score"]) / 3
+        )
+        assert store.get_statistics("v2") == {"total_evaluations": 0}
+
+    def test_statistics_do_not_scan(self, store):
+        """Test that statistics cost the same number of SQLite instructions for 20 and 5000 stored results"""
+        def instructions(version, count):
+            store.save_many(version, [
+                {"application_id": f"APP_{i:05d}", "evaluation_id": f"EVAL_{i}", "overall_score": i % 25,
+                 "recommendation": "accept", "confidence_score": (i % 100) / 100, "evaluation_time_minutes": 1.0,
+                 "evaluated_at": "2024-01-01T00:00:00"}
+                for i in range(count)
+            ])
+            steps = []
+            store._conn.set_progress_handler(lambda: steps.append(1), 10)
+            statistics = store.get_statistics(version)
+            store._conn.set_progress_handler(None, 10)
+            assert statistics["score_statistics"]["max_score"] == min(count, 25) - 1
+            return len(steps)
+
+        assert instructions("large", 5000) <= instructions("small", 20) + 2
+
+    def test_results_survive_restart(self, tmp_path):
+        """Test reports and statistics from a new system on the same database"""
+        path = str(tmp_path / "evaluations.db")
+        first_store = EvaluationStore(path)
+        first = AutomatedEvaluationSystem(evaluation_store=first_store)
+        result = first.evaluate_application("APP_0001", make_applications(1)["APP_0000"])
+        first_store.close()
+
+        store = EvaluationStore(path)
+        restarted = AutomatedEvaluationSystem(evaluation_store=store)
+        report = restarted.get_evaluation_report(result["evaluation_id"])
+        assert report["application_id"] == "APP_0001"
+        assert report["overall_score"] == result["overall_score"]
+        assert report["strengths"] == result["strengths"]
+        assert restarted.get_evaluation_statistics()["total_evaluations"] == 1
+        store.close()
+
+    def test_weight_changes_start_a_new_model_version(self, store):
+        """Test that results are kept per model version"""
+        system = AutomatedEvaluationSystem(evaluation_store=store)
+        version = system.get_model_version()
+        assert AutomatedEvaluationSystem().get_model_version() == version
+
+        system.evaluate_batch(make_applications(5))
+        system.criteria_weights["CRIT_006"] = 0.2
+        assert system.get_model_version() != version
+        assert system.get_evaluation_statistics() == {"message": "No evaluations completed yet"}
+        assert store.count(version) == 5
+
+
+class TestEvaluationJobRunner:
+    """Test sharded re-evaluation, progress and resuming"""
+
+    def test_run_stores_every_application(self, store):
+        """Test that a job evaluates each application once and reports progress per shard"""
+        applications = make_applications(50)
+        updates = []
+        runner = EvaluationJobRunner(store, max_workers=1, shard_size=20, progress=updates.append)
+        job = runner.run(applications, job_id="JOB_A")
+
+        assert job["status"] == "completed"
+        assert (job["total"], job["completed"], job["failed"]) == (50, 50, 0)
+        assert [update["completed"] for update in updates] == [0, 20, 40, 50]
+
+        expected = AutomatedEvaluationSystem().evaluate_batch(applications)
+        version = runner.system.get_model_version()
+        for result in expected:
+            report = store.get(result["application_id"], version)
+            assert report["overall_score"] == result["overall_score"]
+            assert report["confidence_score"] == result["confidence_score"]
+
+    def test_rerun_skips_stored_applications(self, store):
+        """Test that running again evaluates nothing new unless forced"""
+        applications = make_applications(30)
+        runner = EvaluationJobRunner(store, max_workers=1, shard_size=10)
+        runner.run(applications)
+        version = runner.system.get_model_version()
+        before = stored_reports(store, version, applications)
+
+        job = runner.run(applications)
+        assert job["completed"] == 30
+        assert stored_reports(store, version, applications) == before
+
+        runner.run(applications, force=True)
+        after = stored_reports(store, version, applications)
+        assert all(after[key]["evaluation_id"] != before[key]["evaluation_id"] for key in applications)
+
+    def test_resume_after_crash(self, store):
+        """Test that an interrupted job keeps committed shards and finishes the rest"""
+        applications = make_applications(40)
+
+        def crash_after_first_shard(job):
+            if job["completed"] >= 10:
+                raise KeyboardInterrupt
+
+        runner = EvaluationJobRunner(store, max_workers=1, shard_size=10, progress=crash_after_first_shard)
+        with pytest.raises(KeyboardInterrupt):
+            runner.run(applications, job_id="JOB_CRASH")
+        version = runner.system.get_model_version()
+        assert store.get_job("JOB_CRASH")["status"] == "running"
+        committed = {key: report for key, report in stored_reports(store, version, applications).items() if report}
+        assert len(committed) == 10
+
+        job = EvaluationJobRunner(store, max_workers=1, shard_size=10).run(applications, job_id="JOB_CRASH")
+        assert job["status"] == "completed" and job["completed"] == 40
+        reports = stored_reports(store, version, applications)
+        assert all(reports[key] == report for key, report in committed.items())
+        assert store.count(version) == 40
+
+    def test_failed_applications_are_retried(self, store):
+        """Test that only the application that fails is counted and it is evaluated on the next run"""
+        applications = make_applications(20)
+        applications["APP_0003"]["academic_background"]["gpa"] = "not a number"
+        runner = EvaluationJobRunner(store, max_workers=1, shard_size=5)
+        job = runner.run(applications, job_id="JOB_FAIL")
+        assert job["status"] == "failed"
+        assert (job["completed"], job["failed"]) == (19, 1)
+        assert list(store.get_job_failures("JOB_FAIL")) == ["APP_0003"]
+        assert job["error"] == store.get_job_failures("JOB_FAIL")["APP_0003"]
+
+        applications["APP_0003"]["academic_background"]["gpa"] = 3.2
+        job = runner.run(applications, job_id="JOB_FAIL")
+        assert job["status"] == "completed"
+        assert (job["completed"], job["failed"], job["error"]) == (20, 0, None)
+        assert store.get_job_failures("JOB_FAIL") == {}
+
+    def test_bad_application_does_not_fail_its_shard(self, store):
+        """Test that the rest of a shard whose batch raises is stored, in process and in worker processes"""
+        applications = make_applications(50)
+        applications["APP_0004"]["personal_statement"]["motivation"] = None
+        for max_workers in (1, 2):
+            job = EvaluationJobRunner(store, max_workers=max_workers, shard_size=25).run(
+                applications, job_id=f"JOB_{max_workers}", force=True)
+            assert (job["completed"], job["failed"]) == (49, 1)
+            failures = store.get_job_failures(f"JOB_{max_workers}")
+            assert list(failures) == ["APP_0004"] and failures["APP_0004"].startswith("TypeError")
+        version = AutomatedEvaluationSystem().get_model_version()
+        assert store.get("APP_0004", version) is None and store.count(version) == 49
+
+    def test_process_pool_matches_in_process(self, tmp_path):
+        """Test that sharding across worker processes stores the same scores"""
+        applications = make_applications(60)
+        serial_store = EvaluationStore(str(tmp_path / "serial.db"))
+        pool_store = EvaluationStore(str(tmp_path / "pool.db"))
+        EvaluationJobRunner(serial_store, max_workers=1, shard_size=15).run(applications)
+        job = EvaluationJobRunner(pool_store, max_workers=2, shard_size=15).run(applications)
+        assert job["completed"] == 60
+
+        version = AutomatedEvaluationSystem().get_model_version()
+        ignored = ("evaluation_id", "evaluated_at", "evaluation_time_minutes")
+        for application_id in applications:
+            serial = serial_store.get(application_id, version)
+            pooled = pool_store.get(application_id, version)
+            assert {key: value for key, value in serial.items() if key not in ignored} == \
+                {key: value for key, value in pooled.items() if key not in ignored}
+        serial_store.close()
+        pool_store.close()
@@ -0,0 +1,64 @@
+"""
+MSAI Application System - Batch Form Analytics Tests
+Unit tests comparing the typed, vectorized reports with FormAnalytics
+"""
+
+import json
+
+import pytest
+
+from form_analytics import FormAnalytics
+from form_analytics_batch import BatchFormAnalytics, word_counts
+from test_form_analytics_incremental import assert_close, make_responses
+
+SECTIONS = ["get_summary_stats", "analyze_essays", "analyze_academic_qualifications",
+            "analyze_test_scores", "analyze_prerequisites", "generate_insights"]
+
+
+@pytest.fixture
+def responses_files(tmp_path):
+    responses = make_responses(150, seed=11)
+    json_file = tmp_path / "form_responses.json"
+    json_file.write_text(json.dumps(responses))
+    ndjson_file = tmp_path / "form_responses.ndjson"
+    ndjson_file.write_text("".join(json.dumps(response) + "\n" for response in responses))
+    return str(json_file), str(ndjson_file)
+
+
+class TestBatchFormAnalytics:
+    """Test that batch mode reproduces every FormAnalytics section"""
+
+    @pytest.mark.parametrize("source", [0, 1], ids=["json", "ndjson"])
+    def test_sections_match_form_analytics(self, responses_files, source):
+        """Test each report section from both input formats"""
+        baseline = FormAnalytics(responses_files[0])
+        batch = BatchFormAnalytics(responses_files[source])
+        for section in SECTIONS:
+            assert_close(getattr(batch, section)(), getattr(baseline, section)())
+
+    def test_numeric_fields_are_coerced_once(self, responses_files):
+        """Test that loading produces typed columns"""
+        df = BatchFormAnalytics(responses_files[1]).df
+        assert df["GPA"].dtype == "float64"
+        assert df["Gender"].dtype == "category"
+        assert str(df["Timestamp"].dtype).startswith("datetime64")
+
+    def test_full_report_has_every_section(self, responses_files):
+        """Test the single-call report"""
+        report = BatchFormAnalytics(responses_files[1]).full_report()
+        assert set(report) == {"summary", "essays", "academics", "test_scores", "prerequisites", "insights"}
+        assert report["summary"]["total_responses"] == 150
+
+    def test_missing_file_is_an_empty_dataset(self, tmp_path):
+        """Test the no-responses summary"""
+        analytics = BatchFormAnalytics(str(tmp_path / "missing.ndjson"))
+        assert analytics.get_summary_stats()["total_responses"] == 0
+
+
+def test_word_counts_match_str_split():
+    """Test the vectorized word count against Python's str.split"""
+    pd = pytest.importorskip("pandas")
+    texts = ["", "  two  words ", "tab\tand\nnewline here", None, "one", "hello\u00a0world\u2003foo bar",
+             "\u3000İstanbul\u2028naïve\x85end\u202f"]
+    counts = word_counts(pd.Series(texts, dtype="string"))
+    assert counts.tolist() == [len(text.split()) for text in texts if text is not None]
@@ -0,0 +1,86 @@
+"""
+MSAI Application System - Form Analytics Chart Tests
+Unit tests for chart specs and the render cache
+"""
+
+import json
+import os
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("matplotlib")
+
+from form_analytics_charts import SPECS_FILE, ChartRenderer, chart_specs, spec_key
+
+
+def make_chart_data(gpas=(3.1, 3.5, 3.9), genders=None):
+    return {
+        "gpa_values": pd.Series(gpas, dtype=float),
+        "gender_counts": pd.Series(genders or {"Female": 2, "Male": 1}),
+        "employment_counts": pd.Series({"Student": 2, "Full-time employed": 1})
+    }
+
+
+class TestChartSpecs:
+    """Test that specs carry aggregates only"""
+
+    def test_specs_hold_aggregates(self):
+        """Test the histogram, bar and pie specs"""
+        specs = {spec["name"]: spec for spec in chart_specs(make_chart_data())}
+        assert set(specs) == {"gpa_distribution", "gender_distribution", "employment_status"}
+        assert sum(specs["gpa_distribution"]["counts"]) == 3
+        assert specs["gpa_distribution"]["mean"] == pytest.approx(3.5)
+        assert specs["gender_distribution"]["values"] == {"Female": 2, "Male": 1}
+        json.dumps(specs)
+
+    def test_missing_inputs_produce_no_specs(self):
+        """Test that unanswered fields and empty datasets are skipped"""
+        assert chart_specs(None) == []
+        assert [spec["name"] for spec in chart_specs({"gpa_values": None, "gender_counts": None,
+                                                      "employment_counts": pd.Series({"Student": 1})})] \
+            == ["employment_status"]
+
+    def test_key_changes_with_the_data(self):
+        """Test that the cache key follows the spec contents"""
+        first, = [s for s in chart_specs(make_chart_data()) if s["name"] == "gender_distribution"]
+        second, = [s for s in chart_specs(make_chart_data(genders={"Female": 3, "Male": 1}))
+                   if s["name"] == "gender_distribution"]
+        assert spec_key(first) == spec_key(dict(first)) != spec_key(second)
+
+
+class TestChartRenderer:
+    """Test parallel rendering and the render cache"""
+
+    def test_unchanged_charts_are_not_rerendered(self, tmp_path):
+        """Test that only charts whose inputs changed are drawn again"""
+        renderer = ChartRenderer(str(tmp_path), max_workers=2)
+        first = renderer.render(chart_specs(make_chart_data()))
+        assert all(result["rendered"] for result in first.values())
+        assert all(os.path.exists(result["path"]) for result in first.values())
+
+        second = renderer.render(chart_specs(make_chart_data()))
+        assert not any(result["rendered"] for result in second.values())
+
+        third = renderer.render(chart_specs(make_chart_data(genders={"Female": 5})))
+        assert [name for name, result in third.items() if result["rendered"]] == ["gender_distribution"]
+
+    def test_single_chart_leaves_matplotlib_settings_alone(self, tmp_path):
+        """Test that a chart drawn in the caller's process keeps its backend and rcParams"""
+        import matplotlib
+        specs = [spec for spec in chart_specs(make_chart_data()) if spec["type"] == "bar"]
+        with matplotlib.rc_context({"axes.facecolor": "white", "axes.grid": False}):
+            backend = matplotlib.get_backend()
+            params = dict(matplotlib.rcParams)
+
+            (result,) = ChartRenderer(str(tmp_path)).render(specs).values()
+            assert result["rendered"] and os.path.exists(result["path"])
+            assert matplotlib.get_backend() == backend
+            assert dict(matplotlib.rcParams) == params
+
+    def test_specs_only_mode_writes_no_images(self, tmp_path):
+        """Test that png=False emits the dashboard JSON alone"""
+        ChartRenderer(str(tmp_path)).render(chart_specs(make_chart_data()), png=False)
+        assert os.listdir(tmp_path) == [SPECS_FILE]
+        specs = json.loads((tmp_path / SPECS_FILE).read_text())
+        assert all("key" in spec for spec in specs)
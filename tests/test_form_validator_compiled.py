@@ -0,0 +1,95 @@
+"""
+MSAI Application System - Compiled Form Validator Tests
+Unit tests comparing the compiled rule plan with FormValidator
+"""
+
+import json
+import random
+
+import pytest
+
+from form_validator import ESSAY_FIELDS, OPTIONAL_FIELDS, REQUIRED_FIELDS, FormValidator
+from form_validator_compiled import CompiledValidator
+
+CONFIG = {
+    "validation_rules": {
+        "email": {"pattern": r"^[^@\s]+@[^@\s]+\.[a-z]{2,}$", "message": "Use a valid email"},
+        "gpa": {"min": 0.0, "max": 4.0},
+        "gre_verbal": {"min": 130, "max": 170},
+        "toefl": {"min": 0, "max": 120, "message": "TOEFL is scored 0-120"}
+    },
+    "essay_requirements": {
+        "statement_of_purpose": {"min_words": 20, "max_words": 60},
+        "personal_statement": {"min_words": 10, "max_words": 40},
+        "diversity_statement": {"min_words": 5, "max_words": 30}
+    }
+}
+
+
+def make_responses(count, seed=3):
+    rng = random.Random(seed)
+    fields = REQUIRED_FIELDS + OPTIONAL_FIELDS
+    responses = []
+    for _ in range(count):
+        response = {name: "filled" for name in fields if rng.random() < 0.8}
+        response.update({
+            "Email Address": rng.choice(["ada@example.com", "not-an-email", ""]),
+            "Phone Number": rng.choice(["+15551234567", "555-0100", ""]),
+            "GPA": rng.choice(["3.7", "2.1", "4.5", "abc", ""]),
+            "Graduation Year": rng.choice(["2020", "1900", "twenty", 2012]),
+            "GRE Verbal Score": rng.choice(["160", "200", "x", ""]),
+            "TOEFL Total Score": rng.choice(["110", "130"]),
+            "Reference 1 - Email": rng.choice(["ref@uni.edu", "bad"]),
+            "Reference 2 - Email": rng.choice(["ref2@uni.edu", "bad"])
+        })
+        for essay in ESSAY_FIELDS[:2]:
+            response[essay] = " ".join(["word"] * rng.choice([0, 5, 15, 30, 80]))
+        if rng.random() < 0.5:
+            response["Diversity and Inclusion Statement (Optional, 200-400 words)"] = "word " * rng.randint(0, 40)
+        responses.append(response)
+    return responses
+
+
+@pytest.fixture
+def validator(tmp_path):
+    config_file = tmp_path / "form_config.json"
+    config_file.write_text(json.dumps(CONFIG))
+    return FormValidator(str(config_file))
+
+
+class TestCompiledValidator:
+    """Test that compiled validation is identical to validate_response"""
+
+    def test_single_responses_match(self, validator):
+        """Test errors, warnings and scores response by response"""
+        compiled = validator.compile()
+        for response in make_responses(300):
+            assert compiled.validate(response) == validator.validate_response(response)
+
+    def test_default_rules_match(self):
+        """Test the built-in patterns when no config file exists"""
+        validator = FormValidator("missing_config.json")
+        compiled = CompiledValidator()
+        for response in make_responses(50, seed=9):
+            assert compiled.validate(response) == validator.validate_response(response)
+
+    def test_batch_report_is_columnar(self, validator):
+        """Test per-response columns and one issue row per message"""
+        responses = make_responses(40)
+        report = validator.validate_batch(responses)
+        assert len(report) == 40
+        for index, response in enumerate(responses):
+            expected = validator.validate_response(response)
+            assert report.result(index) == expected
+            assert report.error_count[index] == len(expected.errors)
+        columns = report.columns()
+        assert set(columns["issues"]["severity"]) <= {"error", "warning"}
+        assert len(columns["issues"]["rule"]) == sum(report.error_count) + sum(report.warning_count)
+
+    def test_process_pool_matches_in_process(self, validator):
+        """Test that chunked, parallel validation produces the same report"""
+        responses = make_responses(120)
+        compiled = validator.compile()
+        serial = compiled.validate_batch(responses)
+        parallel = compiled.validate_batch(responses, max_workers=2, chunk_size=25)
+        assert parallel == serial
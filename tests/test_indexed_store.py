@@ -0,0 +1,128 @@
+"""
+MSAI Application System - Indexed Store Tests
+Unit tests for the secondary indexes behind the admissions stores
+"""
+
+import random
+from dataclasses import dataclass
+from typing import Optional
+
+from admissions.admission_workflow import AdmissionWorkflowManager, WorkflowStage
+from admissions.admissions_system import AdmissionsSystem, ApplicationStatus
+from admissions.application_portal import ApplicationPortal
+from admissions.indexed_store import IndexedStore
+from test_dashboard_metrics import complete_application
+from test_workflow_engine import ScriptedEvaluation
+
+
+@dataclass
+class Record:
+    email: str
+    status: str
+    submitted_at: Optional[int] = None
+
+
+def key_set(records, store):
+    return {key for key, record in store.items() if any(record is other for other in records)}
+
+
+class TestIndexedStore:
+    """Test that index queries agree with scanning the records"""
+
+    def test_indexes_follow_random_changes(self):
+        """Test hash lookups and sorted ranges after inserts, replacements, in-place edits and deletes"""
+        rng = random.Random(7)
+        store = IndexedStore(hash_fields=("email", "status"), sorted_fields=("submitted_at",))
+        for _ in range(3000):
+            action = rng.random()
+            keys = list(store)
+            if action < 0.4 or not keys:
+                store[f"K{rng.randrange(300)}"] = Record(f"e{rng.randrange(50)}", rng.choice("abc"))
+            elif action < 0.8:
+                key = rng.choice(keys)
+                store[key].status = rng.choice("abc")
+                store[key].submitted_at = rng.choice([None, rng.randrange(100)])
+                store.reindex(key)
+            else:
+                del store[rng.choice(keys)]
+
+            for field, value in (("email", f"e{rng.randrange(50)}"), ("status", rng.choice("abc"))):
+                expected = {key for key, record in store.items() if getattr(record, field) == value}
+                assert key_set(store.lookup(field, value), store) == expected
+                assert store.count(field, value) == len(expected)
+            start, end = sorted(rng.sample(range(100), 2))
+            expected = sorted((record.submitted_at, key) for key, record in store.items()
+                              if record.submitted_at is not None and start <= record.submitted_at < end)
+            assert [r.submitted_at for r in store.range("submitted_at", start, end)] == [v for v, _ in expected]
+            newest = store.range("submitted_at", start, end, reverse=True, limit=5)
+            assert [r.submitted_at for r in newest] == [v for v, _ in reversed(expected)][:5]
+
+    def test_behaves_as_a_dict(self):
+        """Test the mapping interface the systems rely on"""
+        store = IndexedStore(hash_fields=("email",))
+        store["A"] = Record("x@example.com", "draft")
+        store["B"] = Record("y@example.com", "draft")
+        assert list(store) == ["A", "B"] and len(store) == 2 and "A" in store
+        assert store.get("C") is None and store.first("email", "z@example.com") is None
+        store.clear()
+        assert not store and store.lookup("email", "x@example.com") == []
+
+
+class TestSystemLookups:
+    """Test the indexed lookups of the admissions, portal and workflow systems"""
+
+    def test_admissions_lookups(self):
+        """Test applications by email, status and submission time, and evaluations by application"""
+        rng = random.Random(19)
+        system = AdmissionsSystem(user_manager=None)
+        for i in range(60):
+            system.create_application(f"a{i % 20}@example.com", complete_application(rng))
+        for application_id in rng.sample(list(system.applications), 40):
+            system.submit_application(application_id)
+            system.wait_for_evaluation(application_id)
+        for application_id in rng.sample(list(system.applications), 20):
+            system.make_admission_decision(application_id, {})
+
+        applications = list(system.applications.values())
+        assert system.get_applications_by_email("a3@example.com") == \
+            [app for app in applications if app.applicant_email == "a3@example.com"]
+        for status in ApplicationStatus:
+            assert {app.application_id for app in system.get_applications_by_status(status)} == \
+                {app.application_id for app in applications if app.status == status}
+        submitted = sorted([app for app in applications if app.submitted_at], key=lambda app: app.submitted_at,
+                           reverse=True)
+        assert system.get_submitted_applications(limit=10) == submitted[:10]
+        since = submitted[len(submitted) // 2].submitted_at
+        assert system.get_submitted_applications(since=since) == [app for app in submitted if app.submitted_at >= since]
+        for application_id in system.applications:
+            assert system.get_application_status(application_id)["evaluations_completed"] == \
+                len([e for e in system.evaluations.values() if e.application_id == application_id])
+
+    def test_portal_lookups_by_email(self):
+        """Test duplicate detection and the applicant dashboard"""
+        portal = ApplicationPortal()
+        application_id = portal.start_application("applicant@example.com")["application_id"]
+        portal.start_application("other@example.com")
+
+        assert portal.start_application("applicant@example.com")["existing_application_id"] == application_id
+        dashboard = portal.get_application_dashboard("applicant@example.com")
+        assert [app["application_id"] for app in dashboard["applications"]] == [application_id]
+        assert portal.get_application_dashboard("missing@example.com")["applications"] == []
+
+    def test_workflow_lookups(self):
+        """Test duplicate workflows, enrollments and workflows by stage"""
+        manager = AdmissionWorkflowManager(evaluation_system=ScriptedEvaluation())
+        workflow_ids = [manager.initiate_admission_workflow(f"APP_{i}", f"w{i}@example.com", "fast_track")["workflow_id"]
+                        for i in range(6)]
+        for workflow_id in workflow_ids[:3]:
+            manager.advance_workflow(workflow_id)
+        for workflow_id in workflow_ids[:2]:
+            manager.advance_workflow(workflow_id)
+
+        assert manager.initiate_admission_workflow("APP_4", "w4@example.com")["workflow_id"] == workflow_ids[4]
+        for stage in WorkflowStage:
+            assert {wf.workflow_id for wf in manager.get_workflows_at_stage(stage)} == \
+                {wf.workflow_id for wf in manager.admission_workflows.values() if wf.current_stage == stage}
+        assert len(manager.get_workflows_at_stage(WorkflowStage.ENROLLMENT_COMPLETED)) == 2
+        assert manager._find_enrollment("APP_0").application_id == "APP_0"
+        assert manager._find_enrollment("APP_5") is None
@@ -0,0 +1,70 @@
+"""
+MS AI RAG System - Answer Cache Tests
+Unit tests for LRU/TTL eviction and near-duplicate matching
+"""
+
+import pytest
+
+from rag_cache import AnswerCache, normalize_question
+
+RESULT = {'answer': "Applications close on June 1.", 'sources': ['index'], 'chunks_used': 1}
+CHUNKS = ['index_0']
+
+
+class TestAnswerCache:
+    """Test answer cache lookups, eviction and invalidation"""
+
+    def test_normalized_question_hits(self):
+        """Test that case and punctuation differences still hit"""
+        cache = AnswerCache(similarity_threshold=0)
+        cache.put("When is the deadline?", CHUNKS, 1, RESULT)
+        assert cache.get("when is the DEADLINE", CHUNKS, 1) == RESULT
+        assert cache.get_stats()['hits'] == 1
+
+    def test_context_is_part_of_the_key(self):
+        """Test that other chunk IDs or a new index version miss"""
+        cache = AnswerCache(similarity_threshold=0)
+        cache.put("When is the deadline?", CHUNKS, 1, RESULT)
+        assert cache.get("When is the deadline?", ['faculty_0'], 1) is None
+        assert cache.get("When is the deadline?", CHUNKS, 2) is None
+        assert cache.get_stats()['misses'] == 2
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted first"""
+        cache = AnswerCache(max_entries=2, similarity_threshold=0)
+        cache.put("first question", CHUNKS, 1, RESULT)
+        cache.put("second question", CHUNKS, 1, RESULT)
+        cache.get("first question", CHUNKS, 1)
+        cache.put("third question", CHUNKS, 1, RESULT)
+
+        assert cache.get("second question", CHUNKS, 1) is None
+        assert cache.get("first question", CHUNKS, 1) == RESULT
+        assert cache.get_stats()['evictions'] == 1
+
+    def test_ttl_expiry(self):
+        """Test that expired entries are not served"""
+        cache = AnswerCache(ttl_seconds=-1, similarity_threshold=0)
+        cache.put("When is the deadline?", CHUNKS, 1, RESULT)
+        assert cache.get("When is the deadline?", CHUNKS, 1) is None
+        assert cache.get_stats()['expirations'] == 1
+
+    def test_near_duplicate_question_hits(self):
+        """Test that a reworded question with the same context reuses the answer"""
+        pytest.importorskip("numpy")
+        cache = AnswerCache(similarity_threshold=0.9)
+        cache.put("What is the application deadline?", CHUNKS, 1, RESULT)
+        assert cache.get("what's the application deadline", CHUNKS, 1) == RESULT
+        assert cache.get_stats()['near_duplicate_hits'] == 1
+
+    def test_invalidate_clears_entries(self):
+        """Test that invalidation empties the cache"""
+        cache = AnswerCache(similarity_threshold=0)
+        cache.put("When is the deadline?", CHUNKS, 1, RESULT)
+        cache.invalidate()
+        assert cache.get("When is the deadline?", CHUNKS, 1) is None
+        assert cache.get_stats()['size'] == 0
+
+
+def test_normalize_question():
+    """Test question normalization"""
+    assert normalize_question("  What's the COST?! ") == "what the cost"
@@ -0,0 +1,60 @@
+"""
+MS AI RAG System - Chunker Tests
+Unit tests for the structure-aware HTML chunker
+"""
+
+from rag_chunker import HTMLChunker, count_tokens
+
+PAGE = """<html><head><title>Admissions</title><style>.x {}</style></head>
+<body>
+<nav><a href="/">Home</a><a href="/apply">Apply Now</a></nav>
+<section id="requirements">
+<h2>Requirements</h2><p>A bachelor's degree is required.</p>
+<h3 id="gpa">Minimum GPA</h3><p>Applicants need a GPA of 3.0.</p>
+</section>
+<h2>Tuition</h2><p>Tuition is charged per credit.</p>
+<footer>Contact admissions</footer>
+</body></html>"""
+
+
+class TestHTMLChunker:
+    """Test section splitting, metadata, token sizing and boilerplate tagging"""
+
+    def test_splits_on_headings_with_metadata(self):
+        """Test that each section becomes a chunk carrying its heading path and anchor"""
+        chunks = HTMLChunker(max_tokens=256, min_tokens=0).chunk(PAGE, page="admissions.html")
+        content = [chunk for chunk in chunks if not chunk['boilerplate']]
+
+        assert [chunk['heading_path'] for chunk in content] == [
+            ['Requirements'], ['Requirements', 'Minimum GPA'], ['Tuition']
+        ]
+        assert [chunk['anchor'] for chunk in content] == ['requirements', 'gpa', None]
+        assert content[1]['content'] == "Minimum GPA\nApplicants need a GPA of 3.0."
+        assert all(chunk['page'] == "admissions.html" and chunk['title'] == "Admissions" for chunk in chunks)
+
+    def test_nav_and_footer_are_tagged_boilerplate(self):
+        """Test that landmark text is kept apart from content and flagged"""
+        chunks = HTMLChunker(min_tokens=0).chunk(PAGE)
+        boilerplate = [chunk['content'] for chunk in chunks if chunk['boilerplate']]
+        assert boilerplate == ["Home Apply Now", "Contact admissions"]
+        assert not any('.x' in chunk['content'] for chunk in chunks)
+
+    def test_small_sections_merge_under_common_heading(self):
+        """Test that sections below min_tokens share a chunk labelled with their parent heading"""
+        chunks = HTMLChunker(max_tokens=256, min_tokens=64).chunk(PAGE)
+        content = [chunk for chunk in chunks if not chunk['boilerplate']]
+        assert len(content) == 1
+        assert content[0]['heading_path'] == []
+        assert "Tuition is charged per credit." in content[0]['content']
+
+    def test_chunks_respect_token_budget(self):
+        """Test that a long section is split at sentence boundaries within max_tokens"""
+        sentence = "The program offers flexible online courses for working professionals. "
+        html = f"<h2>Overview</h2><p>{sentence * 40}</p>"
+        chunks = HTMLChunker(max_tokens=50, min_tokens=0).chunk(html)
+
+        assert len(chunks) > 1
+        assert all(chunk['token_count'] <= 50 for chunk in chunks)
+        assert all(chunk['heading_path'] == ['Overview'] for chunk in chunks)
+        assert all(chunk['content'].endswith('.') for chunk in chunks)
+        assert sum(chunk['token_count'] for chunk in chunks) >= count_tokens(sentence * 40)
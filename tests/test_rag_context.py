@@ -0,0 +1,57 @@
+"""
+MS AI RAG System - Context Packing Tests
+Unit tests for the prompt-token budgeter
+"""
+
+from rag_chunker import count_tokens
+from rag_context import ContextPacker, count_message_tokens, usage_summary
+
+
+def make_chunk(chunk_id, content, score):
+    return {'id': chunk_id, 'source': 'index', 'content': content, 'relevance_score': score}
+
+
+FILLER = "The campus library offers quiet study rooms and late opening hours. " * 6
+
+
+class TestContextPacker:
+    """Test ordering, deduplication, trimming and the token budget"""
+
+    def test_orders_by_score_and_drops_near_duplicates(self):
+        """Test that an overlapping lower-scored chunk is left out"""
+        chunks = [
+            make_chunk('a', "Tuition is charged per credit hour.", 0.4),
+            make_chunk('b', "Applicants need a bachelor's degree and a GPA of 3.0.", 0.9),
+            make_chunk('c', "Applicants need a bachelor's degree and a GPA of 3.0 or higher.", 0.8)
+        ]
+        packed = ContextPacker().pack("admission GPA", chunks)
+        assert [chunk['id'] for chunk in packed] == ['b', 'a']
+
+    def test_long_chunks_are_trimmed_to_matching_sentences(self):
+        """Test that only sentences sharing terms with the question survive trimming"""
+        content = FILLER + "Applicants need a GPA of 3.0. " + FILLER
+        packed = ContextPacker(trim_above_tokens=20).pack("minimum GPA", [make_chunk('a', content, 1.0)])
+        assert packed[0]['content'] == "Applicants need a GPA of 3.0."
+        assert packed[0]['token_count'] == count_tokens("Applicants need a GPA of 3.0.")
+
+    def test_budget_caps_total_context_tokens(self):
+        """Test that the packed context never exceeds max_tokens"""
+        chunks = [make_chunk(str(i), f"Course {i} covers topic{i} in depth. " * 5, 1.0 - i / 10)
+                  for i in range(8)]
+        packed = ContextPacker(max_tokens=60, trim_above_tokens=1000).pack("course", chunks)
+        assert packed
+        assert sum(chunk['token_count'] for chunk in packed) <= 60
+
+
+class TestUsage:
+    """Test token accounting"""
+
+    def test_reported_usage_wins_over_estimate(self):
+        """Test that API-reported counts are used when present"""
+        messages = [{'role': 'user', 'content': "Is the program online?"}]
+        assert usage_summary(messages, "Yes.", {'prompt_tokens': 50, 'completion_tokens': 2}) == {
+            'prompt_tokens': 50, 'completion_tokens': 2, 'total_tokens': 52
+        }
+        estimated = usage_summary(messages, "Yes.")
+        assert estimated['prompt_tokens'] == count_message_tokens(messages)
+        assert estimated['completion_tokens'] == count_tokens("Yes.")
@@ -0,0 +1,93 @@
+"""
+MS AI RAG System - Retrieval Index Tests
+Unit tests for the BM25 inverted index behind MSRAGSystem
+"""
+
+import pytest
+
+from rag_index import BM25Index, tokenize
+
+
+@pytest.fixture
+def index():
+    """Small BM25 index over three program snippets"""
+    bm25 = BM25Index()
+    bm25.build([
+        "Admission requirements include a bachelor's degree and a personal statement.",
+        "AI tutoring supports students from non-CS backgrounds around the clock.",
+        "Tuition is charged per credit hour; the program totals 36 credits.",
+    ])
+    return bm25
+
+
+class TestTokenize:
+    """Test query and document tokenization"""
+
+    def test_lowercases_and_drops_stopwords(self):
+        """Test that tokens are lowercased and stopwords are removed"""
+        assert tokenize("What are the Admission Requirements?") == ["admission", "requirements"]
+
+    def test_keeps_hyphenated_terms(self):
+        """Test that hyphenated terms survive as single tokens"""
+        assert "non-cs" in tokenize("non-CS backgrounds")
+
+
+class TestBM25Index:
+    """Test BM25 scoring and top-k retrieval"""
+
+    def test_best_match_ranks_first(self, index):
+        """Test that the most relevant document is returned first"""
+        results = index.search("admission requirements", top_k=3)
+        assert results[0][0] == 0
+        assert results[0][1] > 0
+
+    def test_only_matching_documents_are_scored(self, index):
+        """Test that documents without query terms are not returned"""
+        results = index.search("tuition", top_k=5)
+        assert [doc_id for doc_id, _ in results] == [2]
+
+    def test_top_k_limits_results(self, index):
+        """Test that no more than top_k results are returned"""
+        assert len(index.search("program students admission tuition", top_k=2)) == 2
+
+    def test_unknown_terms_return_nothing(self, index):
+        """Test that a query with no indexed terms returns no results"""
+        assert index.search("quantum basketweaving") == []
+
+    def test_rare_terms_outweigh_common_terms(self):
+        """Test that IDF favours documents matching rarer terms"""
+        bm25 = BM25Index()
+        bm25.build(["ai ai ai", "ai thesis", "ai", "ai"])
+        results = bm25.search("ai thesis", top_k=1)
+        assert results[0][0] == 1
+
+
+class TestVectorIndex:
+    """Test the dense embedding index and its memory-mapped storage"""
+
+    def test_search_orders_by_similarity(self):
+        """Test that the closest document by cosine similarity ranks first"""
+        pytest.importorskip("numpy")
+        from rag_vectors import VectorIndex
+
+        vectors = VectorIndex()
+        vectors.build(["thesis defense committee", "tuition and fees", "thesis proposal"])
+        results = vectors.search("thesis committee", top_k=2)
+        assert results[0][0] == 0
+        assert len(results) == 2
+
+    def test_save_and_memory_map(self, tmp_path):
+        """Test that a saved matrix is memory-mapped back with identical contents"""
+        np = pytest.importorskip("numpy")
+        from rag_vectors import VectorIndex
+
+        vectors = VectorIndex()
+        vectors.build(["admissions", "curriculum"])
+        path = str(tmp_path / "vectors.npy")
+        vectors.save(path)
+
+        loaded = VectorIndex()
+        assert loaded.load(path, expected_rows=2)
+        assert isinstance(loaded.matrix, np.memmap)
+        assert np.array_equal(loaded.matrix, vectors.matrix)
+        assert not VectorIndex().load(path, expected_rows=3)
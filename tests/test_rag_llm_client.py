@@ -0,0 +1,140 @@
+"""
+MS AI RAG System - LLM Client Tests
+Exercises the async LLM client against a local mock completion server
+"""
+
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("httpx")
+
+from rag_llm_client import AsyncLLMClient, CircuitBreaker, CircuitOpenError, LLMClientError
+
+
+class MockCompletionHandler(BaseHTTPRequestHandler):
+    """OpenAI-compatible /chat/completions stub; replies follow server.script"""
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        self.server.requests.append(body)
+        status = self.server.script.pop(0) if self.server.script else 200
+
+        if status != 200:
+            self.send_response(status)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        if body.get('stream'):
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.end_headers()
+            for token in ["The ", "program ", "is ", "online."]:
+                chunk = {"choices": [{"delta": {"content": token}}]}
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.write(b"data: [DONE]\n\n")
+            return
+
+        payload = json.dumps({"choices": [{"message": {"content": "The program is online."}}]}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+@pytest.fixture
+def mock_server():
+    """Local completion server running on an ephemeral port"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), MockCompletionHandler)
+    server.script = []
+    server.requests = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    server.url = f"http://127.0.0.1:{server.server_address[1]}/v1/chat/completions"
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def run_with_client(server, coroutine_factory, **kwargs):
+    """Run a coroutine against a fresh client bound to the mock server"""
+    async def runner():
+        client = AsyncLLMClient(server.url, "test-key", backoff_base=0.001, **kwargs)
+        try:
+            return await coroutine_factory(client)
+        finally:
+            await client.aclose()
+    return asyncio.run(runner())
+
+
+MESSAGES = [{"role": "user", "content": "Is the program online?"}]
+
+
+class TestAsyncLLMClient:
+    """Test completions, retries, circuit breaking and streaming"""
+
+    def test_complete_returns_message(self, mock_server):
+        """Test that a completion round-trips through the pooled client"""
+        result = run_with_client(mock_server, lambda client: client.complete(MESSAGES))
+        assert result['choices'][0]['message']['content'] == "The program is online."
+        assert mock_server.requests[0]['messages'] == MESSAGES
+
+    def test_retries_transient_errors(self, mock_server):
+        """Test that 503/429 responses are retried until one succeeds"""
+        mock_server.script = [503, 429]
+        result = run_with_client(mock_server, lambda client: client.complete(MESSAGES))
+        assert result['choices'][0]['message']['content'] == "The program is online."
+        assert len(mock_server.requests) == 3
+
+    def test_client_errors_are_not_retried(self, mock_server):
+        """Test that a 400 fails immediately"""
+        mock_server.script = [400]
+        with pytest.raises(LLMClientError):
+            run_with_client(mock_server, lambda client: client.complete(MESSAGES))
+        assert len(mock_server.requests) == 1
+
+    def test_circuit_opens_after_repeated_failures(self, mock_server):
+        """Test that the breaker rejects requests once the upstream keeps failing"""
+        mock_server.script = [500] * 10
+
+        async def scenario(client):
+            with pytest.raises(LLMClientError):
+                await client.complete(MESSAGES)
+            with pytest.raises(CircuitOpenError):
+                await client.complete(MESSAGES)
+
+        run_with_client(mock_server, scenario, max_retries=1,
+                        circuit_breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60))
+        assert len(mock_server.requests) == 2
+
+    def test_stream_yields_tokens(self, mock_server):
+        """Test that streamed deltas arrive in order"""
+        async def collect(client):
+            return [token async for token in client.stream(MESSAGES)]
+
+        assert run_with_client(mock_server, collect) == ["The ", "program ", "is ", "online."]
+        assert mock_server.requests[0]['stream'] is True
+
+    def test_abandoned_probe_does_not_block_the_circuit(self, mock_server):
+        """Test that a half-open probe stream closed after one token lets the next request probe again"""
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+        breaker.record_failure()
+
+        async def scenario(client):
+            tokens = client.stream(MESSAGES)
+            assert await anext(tokens) == "The "
+            await tokens.aclose()
+            assert breaker.state == 'half_open' and not breaker._probe_in_flight
+            return await client.complete(MESSAGES)
+
+        result = run_with_client(mock_server, scenario, circuit_breaker=breaker)
+        assert result['choices'][0]['message']['content'] == "The program is online."
+        assert breaker.state == 'closed'
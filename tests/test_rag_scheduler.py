@@ -0,0 +1,116 @@
+"""
+MS AI RAG System - Scheduler Tests
+Unit tests for retrieval micro-batching and load shedding
+"""
+
+import asyncio
+
+import pytest
+
+from rag_scheduler import OverloadedError, QueryScheduler
+
+
+class FakeRAGSystem:
+    """Records retrieval batches and answers after a short simulated LLM call"""
+
+    def __init__(self, llm_latency: float = 0.0):
+        self.index_version = 1
+        self.batches = []
+        self.llm_latency = llm_latency
+
+    def search_relevant_chunks_batch(self, queries, top_k=5):
+        self.batches.append(list(queries))
+        return [[{'id': f"chunk_{i}", 'source': 'index'}] for i, _ in enumerate(queries)]
+
+    async def aanswer(self, question, relevant_chunks, index_version, llm_gate=None):
+        async with llm_gate:
+            await asyncio.sleep(self.llm_latency)
+        return {'answer': question, 'chunks': relevant_chunks, 'version': index_version}
+
+    async def astream_answer(self, question, relevant_chunks, index_version, llm_gate=None):
+        yield {'type': 'sources', 'chunks': relevant_chunks}
+        async with llm_gate:
+            await asyncio.sleep(self.llm_latency)
+        yield {'type': 'done'}
+
+
+class TestQueryScheduler:
+    """Test batching, concurrency limits and overload handling"""
+
+    def test_concurrent_retrievals_share_one_batch(self):
+        """Test that simultaneous questions are retrieved in a single batch"""
+        rag = FakeRAGSystem()
+
+        async def scenario():
+            scheduler = QueryScheduler(rag, batch_window=0.01)
+            return await asyncio.gather(*(scheduler.query(f"q{i}") for i in range(5)))
+
+        results = asyncio.run(scenario())
+        assert rag.batches == [["q0", "q1", "q2", "q3", "q4"]]
+        assert [result['answer'] for result in results] == ["q0", "q1", "q2", "q3", "q4"]
+
+    def test_full_batch_flushes_immediately(self):
+        """Test that reaching max_batch_size does not wait for the window"""
+        rag = FakeRAGSystem()
+
+        async def scenario():
+            scheduler = QueryScheduler(rag, max_batch_size=2, batch_window=10)
+            await asyncio.wait_for(asyncio.gather(scheduler.query("a"), scheduler.query("b")), 1)
+
+        asyncio.run(scenario())
+        assert rag.batches == [["a", "b"]]
+
+    def test_llm_calls_are_capped(self):
+        """Test that no more than max_inflight LLM calls run at once"""
+        rag = FakeRAGSystem(llm_latency=0.02)
+        peak = 0
+
+        async def scenario():
+            nonlocal peak
+            scheduler = QueryScheduler(rag, max_inflight=2, max_queue_depth=50)
+
+            async def watch():
+                nonlocal peak
+                while scheduler.active or not rag.batches:
+                    peak = max(peak, scheduler.inflight)
+                    await asyncio.sleep(0.001)
+
+            await asyncio.gather(watch(), *(scheduler.query(f"q{i}") for i in range(8)))
+
+        asyncio.run(scenario())
+        assert peak == 2
+
+    def test_deep_queue_is_rejected_with_retry_after(self):
+        """Test that requests beyond the queue limit are shed"""
+        rag = FakeRAGSystem(llm_latency=0.05)
+
+        async def scenario():
+            scheduler = QueryScheduler(rag, max_inflight=1, max_queue_depth=1)
+            outcomes = await asyncio.gather(*(scheduler.query(f"q{i}") for i in range(4)),
+                                            return_exceptions=True)
+            return scheduler, outcomes
+
+        scheduler, outcomes = asyncio.run(scenario())
+        rejected = [outcome for outcome in outcomes if isinstance(outcome, OverloadedError)]
+        assert len(rejected) == 2
+        assert all(error.retry_after >= 1 for error in rejected)
+        assert scheduler.get_stats()['rejected'] == 2
+
+    def test_unconsumed_stream_holds_no_slot(self):
+        """Test that a stream is admitted when iterated and released when it finishes or is abandoned"""
+        rag = FakeRAGSystem()
+
+        async def scenario():
+            scheduler = QueryScheduler(rag, max_inflight=1, max_queue_depth=0)
+            scheduler.stream("never iterated")
+            assert scheduler.active == 0
+            assert [event['type'] async for event in scheduler.stream("q")] == ['sources', 'done']
+
+            abandoned = scheduler.stream("closed early")
+            await anext(abandoned)
+            with pytest.raises(OverloadedError):
+                await anext(scheduler.stream("over the limit"))
+            await abandoned.aclose()
+            return scheduler.active, (await scheduler.query("after"))['answer']
+
+        assert asyncio.run(scenario()) == (0, "after")
@@ -0,0 +1,161 @@
+"""
+MS AI RAG System - Indexing and Query Tests
+Unit tests for MSRAGSystem indexing and queries against temporary site pages
+"""
+
+import os
+
+import pytest
+
+pytest.importorskip("requests")
+
+from rag_system import MSRAGSystem
+
+
+@pytest.fixture
+def site(tmp_path, monkeypatch):
+    """Temporary site with two indexed pages"""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "index.html").write_text("<h1>MS AI Program</h1>\n<p>Online graduate degree.</p>")
+    (tmp_path / "faculty.html").write_text("<h1>Faculty</h1>\n<p>AI professors and mentors.</p>")
+    return tmp_path
+
+
+@pytest.fixture
+def rag(site):
+    """RAG system restricted to the temporary pages"""
+    system = MSRAGSystem(retrieval_mode='keyword')
+    system.content_sources = {'index': 'index.html', 'faculty': 'faculty.html'}
+    system.index_site_content()
+    return system
+
+
+class TestIncrementalIndexing:
+    """Test manifest-driven incremental reindexing"""
+
+    def test_reindex_does_not_duplicate_chunks(self, rag):
+        """Test that reindexing unchanged sources leaves the index untouched"""
+        version = rag.index_version
+        rag.index_site_content()
+        assert len(rag.content_chunks) == 2
+        assert rag.index_version == version
+
+    def test_touched_file_with_same_hash_is_skipped(self, rag, site):
+        """Test that an mtime change without a content change is not re-parsed"""
+        version = rag.index_version
+        os.utime(site / "faculty.html", (1, 1))
+        assert rag.sources_changed()
+        rag.index_site_content()
+        assert rag.index_version == version
+        assert not rag.sources_changed()
+
+    def test_edited_source_replaces_only_its_chunks(self, rag, site):
+        """Test that editing a page swaps in that page's chunks and postings"""
+        (site / "faculty.html").write_text("<h1>Faculty</h1>\n<p>Robotics lab directors.</p>")
+        rag.index_site_content()
+
+        assert [chunk['id'] for chunk in rag.content_chunks] == ['index_0', 'faculty_0']
+        assert rag.search_relevant_chunks("robotics")[0]['id'] == 'faculty_0'
+        assert rag.search_relevant_chunks("mentors") == []
+
+    def test_deleted_source_is_dropped(self, rag, site):
+        """Test that removing a page removes its chunks"""
+        (site / "faculty.html").unlink()
+        rag.index_site_content()
+        assert [chunk['source'] for chunk in rag.content_chunks] == ['index']
+
+    def test_repeated_footer_is_indexed_once(self, rag, site):
+        """Test that boilerplate shared by pages is published from one source only"""
+        footer = "\n<footer>Contact the admissions office</footer>"
+        for name in ("index.html", "faculty.html"):
+            (site / name).write_text((site / name).read_text() + footer)
+        rag.index_site_content()
+
+        hits = [chunk for chunk in rag.content_chunks if chunk['boilerplate']]
+        assert [chunk['id'] for chunk in hits] == ['index_1']
+
+        (site / "index.html").unlink()
+        rag.index_site_content()
+        assert [chunk['id'] for chunk in rag.content_chunks if chunk['boilerplate']] == ['faculty_1']
+
+    def test_manifest_survives_save_and_load(self, rag, site):
+        """Test that a reloaded index knows its sources are already current"""
+        rag.save_index("rag_index.json")
+
+        reloaded = MSRAGSystem(retrieval_mode='keyword')
+        reloaded.content_sources = rag.content_sources
+        assert reloaded.load_index("rag_index.json")
+        assert not reloaded.sources_changed()
+        assert reloaded.search_relevant_chunks("professors")[0]['id'] == 'faculty_0'
+
+
+    def test_directly_assigned_chunks_are_indexed_under_the_lock(self, rag, monkeypatch):
+        """Test that the implicit rebuild for assigned chunks cannot interleave with a reindex"""
+        build = rag.build_search_index
+        held = []
+
+        def watched_build(*args, **kwargs):
+            held.append(rag._index_lock.locked())
+            build(*args, **kwargs)
+
+        monkeypatch.setattr(rag, 'build_search_index', watched_build)
+        rag.content_chunks = rag.content_chunks + [{**rag.content_chunks[0], 'id': 'extra_0',
+                                                    'content': 'Quantum computing seminar.'}]
+        assert rag.search_relevant_chunks("quantum")[0]['id'] == 'extra_0'
+        assert held == [True]
+
+
+class TestQuery:
+    """Test the synchronous query path"""
+
+    def test_repeated_query_is_answered_from_the_cache(self, rag, monkeypatch):
+        """Test that query() shares the answer cache and a reindex invalidates it"""
+        calls = []
+
+        def complete(question, chunks):
+            calls.append(question)
+            return f"answer {len(calls)}", True, {'prompt_tokens': 1, 'completion_tokens': 1, 'total_tokens': 2}
+
+        monkeypatch.setattr(rag, '_complete', complete)
+        first = rag.query("AI professors")
+        second = rag.query("AI professors")
+        assert second == {**first, 'cached': True}
+        assert len(calls) == 1
+        assert (rag.answer_cache.hits, rag.answer_cache.misses) == (1, 1)
+
+        rag._bump_index_version()
+        assert rag.query("AI professors")['answer'] == "answer 2"
+
+    def test_failed_answer_is_not_cached(self, rag, monkeypatch):
+        """Test that an error answer is retried on the next query"""
+        monkeypatch.setattr(rag, '_complete', lambda question, chunks: ("Error calling OpenRouter API", False, None))
+        rag.query("graduate degree")
+        assert not rag.query("graduate degree").get('cached')
+
+
+class TestBinaryIndex:
+    """Test the memory-mapped binary index format"""
+
+    def test_binary_round_trip_matches_in_memory_search(self, rag):
+        """Test that a mapped index returns the same hits as the in-memory one"""
+        rag.save_index("rag_index.bin")
+
+        mapped = MSRAGSystem(retrieval_mode='keyword')
+        mapped.content_sources = rag.content_sources
+        assert mapped.load_index("rag_index.bin")
+        assert not isinstance(mapped.content_chunks, list)
+
+        for question in ("graduate degree", "AI professors"):
+            assert mapped.search_relevant_chunks(question) == rag.search_relevant_chunks(question)
+
+    def test_mapped_index_accepts_incremental_updates(self, rag, site):
+        """Test that editing a source after loading a mapped index reindexes it"""
+        rag.save_index("rag_index.bin")
+        mapped = MSRAGSystem(retrieval_mode='keyword')
+        mapped.content_sources = rag.content_sources
+        mapped.load_index("rag_index.bin")
+
+        (site / "index.html").write_text("<h1>MS AI Program</h1>\n<p>Hybrid residency weekends.</p>")
+        mapped.index_site_content()
+        assert mapped.search_relevant_chunks("residency")[0]['id'] == 'index_0'
+        assert mapped.search_relevant_chunks("professors")[0]['id'] == 'faculty_0'
@@ -0,0 +1,108 @@
+"""
+MSAI Application System - Write-Behind Queue Tests
+Unit tests for durable, batched Google Sheets submissions
+"""
+
+import time
+
+import pytest
+
+from fake_worksheet import FakeWorksheet
+from sheets_write_queue import WriteBehindQueue
+
+
+@pytest.fixture
+def log_path(tmp_path):
+    return tmp_path / "submissions.log"
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+class TestWriteBehindQueue:
+    """Test batching, durability, replay and retry"""
+
+    def test_rows_are_flushed_in_batched_appends(self, log_path):
+        """Test that queued rows reach the sheet in batch_size append_rows calls"""
+        worksheet = FakeWorksheet()
+        queue = WriteBehindQueue(log_path, worksheet, batch_size=2, max_calls_per_minute=0)
+        for i in range(5):
+            queue.enqueue([f"applicant{i}@example.com"])
+
+        assert worksheet.rows == []
+        assert queue.flush() == 5
+        assert worksheet.calls == ['append_rows'] * 3
+        assert worksheet.rows == [[f"applicant{i}@example.com"] for i in range(5)]
+        assert queue.get_stats()['pending'] == 0
+        queue.stop()
+
+    def test_unflushed_entries_are_replayed_after_a_crash(self, log_path):
+        """Test that a restarted queue sends only what never reached the sheet"""
+        worksheet = FakeWorksheet()
+        queue = WriteBehindQueue(log_path, worksheet, max_calls_per_minute=0)
+        queue.enqueue(["first"])
+        queue.flush()
+        queue.enqueue(["second"])
+        queue.enqueue(["third"])
+        queue._log.close()  # crash: no final flush
+
+        restarted = WriteBehindQueue(log_path, worksheet, max_calls_per_minute=0)
+        assert restarted.pending_count == 2
+        restarted.flush()
+        assert worksheet.rows == [["first"], ["second"], ["third"]]
+        assert restarted.enqueue(["fourth"]) == 4
+        restarted.stop()
+
+    def test_torn_last_line_is_discarded(self, log_path):
+        """Test that a partially written entry does not break recovery"""
+        queue = WriteBehindQueue(log_path)
+        queue.enqueue(["complete"])
+        queue.stop()
+        with open(log_path, 'a', encoding='utf-8') as f:
+            f.write('{"seq": 2, "row": ["tor')
+
+        restarted = WriteBehindQueue(log_path, FakeWorksheet(), max_calls_per_minute=0)
+        assert restarted.pending_count == 1
+        restarted.enqueue(["after"])
+        restarted.flush()
+        assert restarted.worksheet.rows == [["complete"], ["after"]]
+        restarted.stop()
+
+    def test_background_flusher_retries_failed_appends(self, log_path):
+        """Test that rate-limit errors are retried until the batch is delivered"""
+        worksheet = FakeWorksheet()
+        worksheet.fail_next = 2
+        queue = WriteBehindQueue(log_path, worksheet, flush_interval=0.01, max_calls_per_minute=0,
+                                 backoff_base=0.01)
+        queue.start()
+        queue.enqueue(["retried"])
+
+        wait_for(lambda: worksheet.rows == [["retried"]])
+        queue.stop()
+        assert queue.get_stats()['failures'] == 2
+        assert worksheet.calls == ['append_rows'] * 3
+
+
+class TestApplicationSubmission:
+    """Test that MSAIApplicationSheets submits through the queue"""
+
+    def test_submission_is_acknowledged_before_the_sheet_is_ready(self, log_path):
+        """Test that applications are accepted while Sheets is unavailable and sent later"""
+        pytest.importorskip("gspread")
+        from google_sheets_integration import MSAIApplicationSheets
+
+        sheets = MSAIApplicationSheets(queue_log=str(log_path),
+                                       replica_db=str(log_path.with_name('applications.db')))
+        sheets.write_queue.min_call_interval = 0
+        assert sheets.submit_application({'firstName': 'Ada', 'email': 'ada@example.com',
+                                          'application_id': 'app-1'})
+        assert sheets.write_queue.flush() == 0
+
+        sheets.worksheet = sheets.write_queue.worksheet = FakeWorksheet()
+        sheets.write_queue.flush()
+        assert sheets.worksheet.rows[0][1:4] == ['Ada', '', 'ada@example.com']
+        sheets.write_queue.stop()
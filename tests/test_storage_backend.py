@@ -0,0 +1,234 @@
+"""
+MSAI Application System - Storage Backend Tests
+Unit tests for the memory and SQLite storage backends and the systems built on them
+"""
+
+import random
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from types import SimpleNamespace
+from typing import List, Optional
+
+import pytest
+
+from admissions.admissions_system import (AdmissionsSystem, ApplicationStatus, DecisionType, Evaluation,
+                                          EvaluationCriteria)
+from admissions.agent_dispatcher import AgentDispatcher
+from admissions.application_portal import ApplicationPortal, ApplicationStep
+from portals.student_portal import StudentPortal
+from storage_backend import MemoryBackend, SQLiteBackend, load_row, to_row
+from test_agent_dispatcher import submitted
+from test_dashboard_metrics import step_data
+from thesis.thesis_committee_system import CommitteeMeeting, CommitteeStatus, EvaluationPhase, ThesisCommitteeSystem
+
+
+@dataclass
+class Record:
+    email: str
+    status: str
+    submitted_at: Optional[int] = None
+    count: int = 0
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "msai_state.db")
+
+
+@pytest.fixture
+def backend(db_path):
+    backend = SQLiteBackend(db_path)
+    yield backend
+    backend.close()
+
+
+def professor(professor_id, specialization, interests):
+    return SimpleNamespace(professor_id=professor_id, name=professor_id, expertise_level="expert",
+                           specialization=SimpleNamespace(value=specialization), research_interests=interests,
+                           publications=[])
+
+
+class TestRowSerialization:
+    """Test that records survive the round trip through a row"""
+
+    def test_round_trip(self):
+        """Test enum-keyed dicts, lists of dataclasses and omitted None fields"""
+        evaluation = Evaluation("EVAL_1", "APP_1", "ADMISSIONS_AGENT_001",
+                                {EvaluationCriteria.ACADEMIC_RECORD: 8.5, EvaluationCriteria.DIVERSITY_FACTORS: 7.0},
+                                7.75, DecisionType.ACCEPT, "Strong record", datetime(2024, 3, 1, 9, 30))
+        assert load_row(Evaluation, to_row(evaluation)) == evaluation
+
+        meetings = [CommitteeMeeting("M1", "C1", "initial_meeting", datetime(2024, 3, 8), 90, ["Roles"], ["P1"]),
+                    CommitteeMeeting("M2", "C1", "thesis_defense", datetime(2024, 9, 1), 120, [], [],
+                                     next_meeting_date=datetime(2024, 9, 15))]
+        row = to_row(meetings)
+        assert '"next_meeting_date"' in row and row.count('"next_meeting_date"') == 1
+        assert load_row(List[CommitteeMeeting], row) == meetings
+
+
+class TestSQLiteBackend:
+    """Test units of work and indexed queries on SQLite"""
+
+    def test_unit_of_work_saves_changes_or_rolls_back(self, backend, db_path):
+        """Test that in-place changes are committed together and an exception discards all of them"""
+        store = backend.collection("records", Record, hash_fields=("status",))
+        with backend.unit_of_work():
+            store["A"] = Record("a@example.com", "draft")
+            store["B"] = Record("b@example.com", "draft")
+        with backend.unit_of_work():
+            store["A"].status = "submitted"
+            assert store.lookup("status", "submitted") == [store["A"]]
+
+        with pytest.raises(RuntimeError):
+            with backend.unit_of_work():
+                store["B"].status = "submitted"
+                store["C"] = Record("c@example.com", "draft")
+                del store["A"]
+                raise RuntimeError("decision failed")
+
+        other = SQLiteBackend(db_path).collection("records", Record, hash_fields=("status",))
+        assert dict(other.items()) == {"A": Record("a@example.com", "submitted"),
+                                       "B": Record("b@example.com", "draft")}
+
+    def test_only_changed_records_are_written(self, backend):
+        """Test that records read in a unit of work are written back only if they changed"""
+        store = backend.collection("records", Record)
+        with backend.unit_of_work():
+            for i in range(20):
+                store[f"K{i}"] = Record(f"e{i}@example.com", "draft")
+
+        with backend.unit_of_work() as unit:
+            before = unit.connection.total_changes
+            assert len(store.values()) == 20
+            store["K3"].status = store["K7"].status = "submitted"
+        assert unit.connection.total_changes - before == 2
+        assert len(store) == 20 and store["K7"].status == "submitted"
+
+    def test_queries_match_memory_backend(self, backend):
+        """Test hash lookups and sorted ranges against the memory backend after random changes"""
+        rng = random.Random(11)
+        backends = (MemoryBackend(), backend)
+        stores = [b.collection("records", Record, hash_fields=("email", "status"), sorted_fields=("submitted_at",))
+                  for b in backends]
+        for _ in range(300):
+            action, key, keys = rng.random(), f"K{rng.randrange(60)}", sorted(stores[0])
+            status, submitted_at = rng.choice("abc"), rng.choice([None, rng.randrange(100)])
+            for store, storage in zip(stores, backends):
+                with storage.unit_of_work():
+                    if action < 0.4 or not keys:
+                        store[key] = Record(f"e{len(key) % 5}", status)
+                    elif action < 0.8:
+                        record = store[keys[len(keys) // 2]]
+                        record.status, record.submitted_at = status, submitted_at
+                        store.reindex(keys[len(keys) // 2])
+                    else:
+                        del store[keys[0]]
+
+        memory, sqlite = stores
+        assert dict(memory.items()) == dict(sqlite.items())
+        for field, value in [("email", "e2"), ("email", "e3")] + [("status", s) for s in "abc"]:
+            assert sorted(map(to_row, memory.lookup(field, value))) == sorted(map(to_row, sqlite.lookup(field, value)))
+            assert memory.count(field, value) == sqlite.count(field, value)
+        assert [r.submitted_at for r in memory.range("submitted_at", 20, 80)] == \
+            [r.submitted_at for r in sqlite.range("submitted_at", 20, 80)]
+        assert [r.submitted_at for r in memory.range("submitted_at", reverse=True, limit=5)] == \
+            [r.submitted_at for r in sqlite.range("submitted_at", reverse=True, limit=5)]
+
+    def test_workers_sharing_a_file_do_not_lose_updates(self, db_path):
+        """Test that read-modify-write units of work from two backends on one file serialize"""
+        backends = [SQLiteBackend(db_path), SQLiteBackend(db_path)]
+        stores = [b.collection("records", Record) for b in backends]
+        stores[0]["counter"] = Record("x@example.com", "draft")
+
+        def increment(backend, store):
+            for _ in range(25):
+                with backend.unit_of_work():
+                    store["counter"].count += 1
+
+        threads = [threading.Thread(target=increment, args=pair) for pair in zip(backends, stores) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert stores[1]["counter"].count == 100
+        for backend in backends:
+            backend.close()
+
+
+class TestSystemPersistence:
+    """Test that system state outlives the instance that created it"""
+
+    def test_admissions_reloaded_from_sqlite(self, db_path):
+        """Test applications, evaluations and dashboard counts in a new system on the same file"""
+        system = AdmissionsSystem(user_manager=None, dispatcher=AgentDispatcher(agent_timeout=5.0),
+                                  storage=SQLiteBackend(db_path))
+        application_id, _ = submitted(system)
+        assert system.wait_for_evaluation(application_id, timeout=5)["status"] == "completed"
+        system.create_application("draft@example.com", {})
+        decision = system.make_admission_decision(application_id, {})["decision"]
+        system.dispatcher.close()
+
+        reloaded = AdmissionsSystem(user_manager=None, storage=SQLiteBackend(db_path))
+        application = reloaded.applications[application_id]
+        assert application.status.value == {"accept": "accepted", "reject": "rejected"}.get(decision, "waitlisted")
+        assert application.decision == system.applications[application_id].decision
+        assert reloaded.get_application_status(application_id)["evaluations_completed"] == 4
+        assert reloaded.get_submitted_applications() == [application]
+        assert reloaded.get_admissions_dashboard()["status_distribution"] == \
+            system.get_admissions_dashboard()["status_distribution"]
+        assert [app.application_id for app in reloaded.get_applications_by_status(ApplicationStatus.DRAFT)] == \
+            [app.application_id for app in system.get_applications_by_status(ApplicationStatus.DRAFT)]
+
+    def test_portal_and_committees_reloaded_from_sqlite(self, db_path):
+        """Test enrollments, graded assignments and committee progress in new systems on the same file"""
+        portal = StudentPortal(storage=SQLiteBackend(db_path))
+        portal.enroll_in_course("S1", "AI-501", {"title": "Foundations of AI", "professor_id": "P1"})
+        assignment_id = portal.assignments["S1"][0].assignment_id
+        grade = portal.submit_assignment("S1", assignment_id, {"content": "analysis"})["grade"]
+
+        professors = SimpleNamespace(professors=[professor("P1", "machine_learning", ["deep learning"]),
+                                                 professor("P2", "ai_ethics", ["research methods"]),
+                                                 professor("P3", "computer_vision", ["machine learning"])])
+        committees = ThesisCommitteeSystem(professor_system=professors, storage=SQLiteBackend(db_path))
+        formed = committees.form_thesis_committee("PROP_1", "S1", "machine_learning", {})
+        committees.conduct_committee_meeting(formed["initial_meeting"]["meeting_id"], {"meeting_notes": "Kickoff"})
+
+        portal = StudentPortal(storage=SQLiteBackend(db_path))
+        assert [e.course_id for e in portal.enrollments["S1"]] == ["AI-501"]
+        assert portal.enrollments["S1"][0].progress_percentage == pytest.approx(100 / 3)
+        assert portal.get_student_dashboard("S1")["dashboard_data"]["recent_grades"][0]["grade"] == grade
+
+        committees = ThesisCommitteeSystem(professor_system=professors, storage=SQLiteBackend(db_path))
+        assert committees.form_thesis_committee("PROP_1", "S1", "machine_learning", {})["committee_id"] == \
+            formed["committee_id"]
+        committee = committees.thesis_committees[formed["committee_id"]]
+        assert committee.status == CommitteeStatus.ACTIVE and committee.current_phase == EvaluationPhase.PROGRESS_REVIEW
+        assert committees.committee_meetings[formed["committee_id"]][0].meeting_notes == "Kickoff"
+
+    def test_workers_sharing_a_file_see_each_others_counts(self, db_path):
+        """Test that dashboards and statistics count what another worker on the same file changed"""
+        system = AdmissionsSystem(user_manager=None, dispatcher=AgentDispatcher(agent_timeout=5.0),
+                                  storage=SQLiteBackend(db_path))
+        other = AdmissionsSystem(user_manager=None, storage=SQLiteBackend(db_path))
+        application_id, _ = submitted(system)
+        assert system.wait_for_evaluation(application_id, timeout=5)["status"] == "completed"
+        other.create_application("draft@example.com", {})
+        decision = system.make_admission_decision(application_id, {})["decision"]
+        system.dispatcher.close()
+
+        dashboard = other.get_admissions_dashboard()
+        assert dashboard["status_distribution"] == system.get_admissions_dashboard()["status_distribution"]
+        assert dashboard["status_distribution"]["draft"] == 1 and dashboard["submitted_applications"] == 1
+        assert [app["application_id"] for app in dashboard["recent_applications"]] == [application_id]
+        assert dashboard["admission_statistics"]["acceptance_rate"] == (100.0 if decision == "accept" else 0.0)
+
+        portals = [ApplicationPortal(storage=SQLiteBackend(db_path)) for _ in range(2)]
+        form_id = portals[0].start_application("applicant@example.com")["application_id"]
+        assert portals[1].start_application("applicant@example.com")["existing_application_id"] == form_id
+        step = ApplicationStep.PERSONAL_INFO
+        assert portals[1].save_application_step(form_id, step, step_data(portals[1], step))["success"]
+        statistics = portals[0].get_application_statistics()
+        assert statistics["status_distribution"]["draft"] == 1
+        assert statistics["step_completion"][step.value]["completed"] == 1
+        assert portals[0].application_progress[form_id].completed_steps == [step]
@@ -0,0 +1,297 @@
+"""
+MSAI Application System - Workflow Engine Tests
+Unit tests for durable, queued execution of admission workflows
+"""
+
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from admissions.admission_workflow import AdmissionWorkflow, AdmissionWorkflowManager, WorkflowStage
+from admissions.workflow_engine import WorkflowEngine, WorkflowStore, from_row, to_row
+
+
+class Clock:
+    """Settable clock shared by the engine under test"""
+
+    def __init__(self):
+        self.now = datetime.now()
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, **delta):
+        self.now += timedelta(**delta)
+
+
+class ScriptedEvaluation:
+    """Evaluation system that recommends a fixed outcome and raises for its first `failures` calls"""
+
+    def __init__(self, recommendation="accept", failures=0):
+        self.recommendation = recommendation
+        self.failures = failures
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def evaluate_application(self, application_id, application_data):
+        with self._lock:
+            self.calls += 1
+            if self.calls <= self.failures:
+                raise RuntimeError("evaluation service unavailable")
+        return {"success": True, "evaluation_id": f"EVAL_{application_id}", "overall_score": 21.5,
+                "recommendation": self.recommendation}
+
+
+class AccountService:
+    """User manager that records the accounts it creates"""
+
+    def __init__(self):
+        self.created = []
+
+    def create_user(self, email, password, first_name, last_name, role):
+        self.created.append(email)
+
+    def find_user_by_email(self, email):
+        return email if email in self.created else None
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "workflows.db")
+
+
+def make_manager(db_path, clock, evaluation_system=None, **options):
+    engine = WorkflowEngine(WorkflowStore(db_path), clock=clock, **options)
+    manager = AdmissionWorkflowManager(evaluation_system=evaluation_system or ScriptedEvaluation(),
+                                       workflow_engine=engine)
+    return manager, engine
+
+
+def step_statuses(workflow):
+    return [(step.stage, step.status) for step in workflow.workflow_steps]
+
+
+def task(engine, workflow_id, stage, kind="execute"):
+    return next(t for t in engine.store.get_tasks(workflow_id) if t["stage"] == stage.value and t["kind"] == kind)
+
+
+class TestWorkflowEngine:
+    """Test queued step execution, persistence and the worker pool"""
+
+    def test_initiate_returns_before_steps_run(self, db_path, clock):
+        """Test that initiating only queues the first step and workers run the auto-triggered ones"""
+        manager, engine = make_manager(db_path, clock)
+        result = manager.initiate_admission_workflow("APP_1", "applicant@example.com")
+        workflow_id = result["workflow_id"]
+
+        assert result["success"]
+        assert manager.get_workflow_status(workflow_id)["completed_steps"] == 0
+        assert task(engine, workflow_id, WorkflowStage.APPLICATION_SUBMITTED)["status"] == "queued"
+
+        assert engine.run_until_idle() == 4
+        workflow = manager.admission_workflows[workflow_id]
+        assert workflow.current_stage == WorkflowStage.AI_EVALUATION
+        assert workflow.workflow_steps[4].status == "pending"
+        assert manager.initiate_admission_workflow("APP_1", "applicant@example.com") == {
+            "success": False, "error": "Workflow already exists for this application", "workflow_id": workflow_id
+        }
+
+    def test_matches_inline_execution(self, db_path, clock):
+        """Test that queued execution reaches the same step outcomes as running steps inline"""
+        inline = AdmissionWorkflowManager(evaluation_system=ScriptedEvaluation("waitlist"))
+        queued, engine = make_manager(db_path, clock, ScriptedEvaluation("waitlist"))
+        workflows = []
+        for manager in (inline, queued):
+            workflow_id = manager.initiate_admission_workflow("APP_1", "applicant@example.com", "fast_track")["workflow_id"]
+            engine.run_until_idle()
+            for _ in range(2):
+                manager.advance_workflow(workflow_id)
+                engine.run_until_idle()
+            workflows.append(manager.admission_workflows[workflow_id])
+
+        assert step_statuses(workflows[0]) == step_statuses(workflows[1])
+        assert [step.notes for step in workflows[0].workflow_steps] == [step.notes for step in workflows[1].workflow_steps]
+        assert [n["subject"] for n in workflows[0].notifications_sent] == \
+            [n["subject"] for n in workflows[1].notifications_sent]
+        assert workflows[1].workflow_steps[-2].notes == "Only accepted students can be enrolled"
+
+    def test_state_survives_restart(self, db_path, clock):
+        """Test that a new manager resumes workflows and enrollments from the store"""
+        manager, engine = make_manager(db_path, clock)
+        workflow_id = manager.initiate_admission_workflow("APP_1", "applicant@example.com", "fast_track")["workflow_id"]
+        engine.run_until_idle()
+        before = manager.get_workflow_status(workflow_id)
+        engine.store.close()
+
+        manager, engine = make_manager(db_path, clock)
+        assert manager.get_workflow_status(workflow_id) == before
+        manager.advance_workflow(workflow_id)
+        engine.run_until_idle()
+        manager.advance_workflow(workflow_id)
+        engine.run_until_idle()
+        engine.store.close()
+
+        manager, engine = make_manager(db_path, clock)
+        workflow = manager.admission_workflows[workflow_id]
+        assert workflow.current_stage == WorkflowStage.ENROLLMENT_COMPLETED
+        assert [step.status for step in workflow.workflow_steps] == ["completed"] * len(workflow.workflow_steps)
+        (enrollment,) = manager.enrollment_data.values()
+        assert enrollment.application_id == "APP_1"
+        assert workflow.notifications_sent[-1]["message"].endswith(enrollment.student_id)
+
+    def test_engines_share_enrollments(self, db_path, clock):
+        """Test that a step finds the enrollment another manager's engine created on the same database"""
+        first, first_engine = make_manager(db_path, clock)
+        second, second_engine = make_manager(db_path, clock)
+        workflow_id = first.initiate_admission_workflow("APP_1", "applicant@example.com", "fast_track")["workflow_id"]
+        for _ in range(3):
+            # Alternate the engines task by task, so consecutive steps run in different managers
+            while True:
+                if not any([engine.run_once() for engine in (second_engine, first_engine)]):
+                    break
+            first.advance_workflow(workflow_id)
+
+        workflow = second_engine.get_workflow(workflow_id)
+        assert [status for _, status in step_statuses(workflow)] == ["completed"] * len(workflow.workflow_steps)
+        enrollment = second_engine.store.load_enrollment("APP_1")
+        assert workflow.notifications_sent[-1]["message"].endswith(enrollment.student_id)
+        assert first._find_enrollment("APP_1") == second._find_enrollment("APP_1") == enrollment
+
+    def test_workers_run_many_workflows(self, db_path, clock):
+        """Test that a pool of workers drives every workflow to its first manual step"""
+        manager, engine = make_manager(db_path, clock, max_workers=8)
+        workflow_ids = [manager.initiate_admission_workflow(f"APP_{i}", f"a{i}@example.com")["workflow_id"]
+                        for i in range(200)]
+        assert engine.run_until_idle() == 800
+        for workflow_id in workflow_ids:
+            workflow = engine.get_workflow(workflow_id)
+            assert workflow.current_stage == WorkflowStage.AI_EVALUATION
+            assert [status for _, status in step_statuses(workflow)][:5] == ["completed"] * 4 + ["pending"]
+
+    def test_roundtrip_serialization(self, db_path, clock):
+        """Test that stored workflows decode to equal dataclasses"""
+        manager, engine = make_manager(db_path, clock)
+        workflow_id = manager.initiate_admission_workflow("APP_1", "applicant@example.com")["workflow_id"]
+        engine.run_until_idle()
+        workflow = manager.admission_workflows[workflow_id]
+        assert from_row(AdmissionWorkflow, to_row(workflow)) == workflow
+
+
+class TestRetriesAndDeadlines:
+    """Test retries, leases, idempotent steps and due dates"""
+
+    def test_failing_step_is_retried_with_backoff(self, db_path, clock):
+        """Test that a step that raises is queued again and succeeds on a later attempt"""
+        evaluation = ScriptedEvaluation(failures=2)
+        manager, engine = make_manager(db_path, clock, evaluation, backoff_max=30.0)
+        workflow_id = manager.initiate_admission_workflow("APP_1", "applicant@example.com")["workflow_id"]
+        engine.run_until_idle()
+
+        pending = task(engine, workflow_id, WorkflowStage.AI_EVALUATION)
+        assert (pending["status"], pending["attempts"]) == ("queued", 1)
+        assert pending["last_error"] == "RuntimeError: evaluation service unavailable"
+        assert manager.admission_workflows[workflow_id].workflow_steps[3].status == "pending"
+
+        for _ in range(2):
+            clock.advance(seconds=30)
+            engine.run_until_idle()
+        assert evaluation.calls == 3
+        assert task(engine, workflow_id, WorkflowStage.AI_EVALUATION)["status"] == "done"
+        assert manager.admission_workflows[workflow_id].current_stage == WorkflowStage.AI_EVALUATION
+
+    def test_step_fails_after_max_attempts(self, db_path, clock):
+        """Test that a step is marked failed once its attempts are used up"""
+        manager, engine = make_manager(db_path, clock, ScriptedEvaluation(failures=10), max_attempts=2, backoff_max=5.0)
+        workflow_id = manager.initiate_admission_workflow("APP_1", "applicant@example.com")["workflow_id"]
+        engine.run_until_idle()
+        clock.advance(seconds=5)
+        engine.run_until_idle()
+
+        step = manager.admission_workflows[workflow_id].workflow_steps[3]
+        assert (step.status, step.notes) == ("failed", "RuntimeError: evaluation service unavailable")
+        assert task(engine, workflow_id, WorkflowStage.AI_EVALUATION)["status"] == "failed"
+
+    def test_expired_lease_is_reclaimed(self, db_path, clock):
+        """Test that a task held by a crashed worker runs again and the stale worker cannot commit"""
+        manager, engine = make_manager(db_path, clock, lease_seconds=60.0)
+        workflow_id = manager.initiate_admission_workflow("APP_1", "applicant@example.com")["workflow_id"]
+        stale = engine.store.claim(clock().timestamp(), 60.0)
+
+        assert engine.run_until_idle() == 0
+        clock.advance(seconds=61)
+        engine.run_until_idle()
+        workflow = engine.get_workflow(workflow_id)
+        assert workflow.current_stage == WorkflowStage.AI_EVALUATION
+        assert engine.store.complete(stale, workflow, [], None, clock().timestamp()) is False
+        assert [n["subject"] for n in workflow.notifications_sent].count("Application Received - MS AI Program") == 1
+
+    def test_completed_step_is_not_applied_twice(self, db_path, clock):
+        """Test that running an enrollment step again reuses its enrollment and notifications"""
+        manager, engine = make_manager(db_path, clock)
+        workflow_id = manager.initiate_admission_workflow("APP_1", "applicant@example.com", "fast_track")["workflow_id"]
+        for _ in range(3):
+            engine.run_until_idle()
+            manager.advance_workflow(workflow_id)
+        engine.run_until_idle()
+        notifications = len(manager.admission_workflows[workflow_id].notifications_sent)
+
+        engine.enqueue(workflow_id, WorkflowStage.ENROLLMENT_PROCESSING)
+        engine.run_until_idle()
+        assert len(manager.enrollment_data) == 1
+        assert len(manager.admission_workflows[workflow_id].notifications_sent) == notifications
+
+    def test_step_retried_after_a_crash_repeats_no_enrollment(self, db_path, clock):
+        """Test that an enrollment step whose attempt crashed before committing creates one enrollment and account"""
+        accounts = AccountService()
+        first_engine = WorkflowEngine(WorkflowStore(db_path), clock=clock, lease_seconds=60)
+        first = AdmissionWorkflowManager(evaluation_system=ScriptedEvaluation(), user_manager=accounts,
+                                         workflow_engine=first_engine)
+        workflow_id = first.initiate_admission_workflow("APP_1", "applicant@example.com", "fast_track")["workflow_id"]
+        for _ in range(2):
+            first_engine.run_until_idle()
+            first.advance_workflow(workflow_id)
+        claimed = first_engine.store.claim(clock().timestamp(), first_engine.lease_seconds)
+        while claimed[2] != WorkflowStage.ENROLLMENT_PROCESSING.value:
+            first_engine._process(claimed)
+            claimed = first_engine.store.claim(clock().timestamp(), first_engine.lease_seconds)
+
+        # The first worker runs the step, then dies before store.complete
+        crashed = first._run_workflow_step(first_engine.get_workflow(workflow_id),
+                                          WorkflowStage.ENROLLMENT_PROCESSING)
+        assert crashed["success"] and accounts.created == ["applicant@example.com"]
+
+        clock.advance(seconds=61)
+        second_engine = WorkflowEngine(WorkflowStore(db_path), clock=clock)
+        second = AdmissionWorkflowManager(evaluation_system=ScriptedEvaluation(), user_manager=accounts,
+                                          workflow_engine=second_engine)
+        second_engine.run_until_idle()
+
+        enrollment = second_engine.store.load_enrollment("APP_1")
+        assert enrollment.enrollment_id == crashed["enrollment_id"]
+        assert enrollment.student_id == crashed["student_id"]
+        assert accounts.created == ["applicant@example.com"]
+        assert task(second_engine, workflow_id, WorkflowStage.ENROLLMENT_PROCESSING)["status"] == "done"
+
+    def test_overdue_step_is_escalated(self, db_path, clock):
+        """Test that only a step still open at its due date escalates the workflow"""
+        manager, engine = make_manager(db_path, clock)
+        workflow_id = manager.initiate_admission_workflow("APP_1", "applicant@example.com", "fast_track")["workflow_id"]
+        engine.run_until_idle()
+        clock.advance(hours=47)
+        engine.run_until_idle()
+        assert manager.admission_workflows[workflow_id].priority == "normal"
+
+        clock.advance(hours=2)
+        engine.run_until_idle()
+        workflow = manager.admission_workflows[workflow_id]
+        overdue = [n for n in workflow.notifications_sent if n["subject"].startswith("Overdue")]
+        assert workflow.priority == "urgent"
+        assert [(n["recipient"], n["subject"]) for n in overdue] == [
+            ("ADMISSIONS_COMMITTEE", "Overdue: Human review of AI evaluation results")
+        ]
@@ -11,6 +11,8 @@ import json
 import uuid
 import random
 
+from storage_backend import MemoryBackend, StorageBackend, transactional
+
 class CommitteeRole(Enum):
     CHAIR = "chair"
     MEMBER = "member"
@@ -79,13 +81,15 @@ class CommitteeMeeting:
 class ThesisCommitteeSystem:
     """AI instructor committee formation and management system"""
     
-    def __init__(self, professor_system=None, thesis_system=None):
+    def __init__(self, professor_system=None, thesis_system=None, storage: Optional[StorageBackend] = None):
         self.professor_system = professor_system
         self.thesis_system = thesis_system
         
-        # Committee data
-        self.thesis_committees: Dict[str, ThesisCommittee] = {}
-        self.committee_meetings: Dict[str, List[CommitteeMeeting]] = {}
+        # Committee data, in the storage backend
+        self.storage = storage or MemoryBackend()
+        self.thesis_committees = self.storage.collection("thesis.thesis_committees", ThesisCommittee,
+                                                         hash_fields=("thesis_id",))
+        self.committee_meetings = self.storage.collection("thesis.committee_meetings", List[CommitteeMeeting])
         
         # Committee formation rules
         self.committee_rules = self._initialize_committee_rules()
@@ -108,17 +112,18 @@ class ThesisCommitteeSystem:
             }
         }
     
+    @transactional
     def form_thesis_committee(self, thesis_id: str, student_id: str, 
                             research_area: str, thesis_proposal: Dict[str, Any]) -> Dict[str, Any]:
         """Form AI instructor committee for thesis"""
         
         # Check if committee already exists
-        existing_committees = [c for c in self.thesis_committees.values() if c.thesis_id == thesis_id]
-        if existing_committees:
+        existing_committee = self.thesis_committees.first("thesis_id", thesis_id)
+        if existing_committee:
             return {
                 "success": False,
                 "error": "Committee already exists for this thesis",
-                "committee_id": existing_committees[0].committee_id
+                "committee_id": existing_committee.committee_id
             }
         
         # Create committee
@@ -458,6 +463,7 @@ class ThesisCommitteeSystem:
             "attendees": meeting.attendees
         }
     
+    @transactional
     def conduct_committee_meeting(self, meeting_id: str, meeting_data: Dict[str, Any]) -> Dict[str, Any]:
         """Conduct committee meeting"""
         
@@ -514,6 +520,7 @@ class ThesisCommitteeSystem:
             "current_phase": committee.current_phase.value
         }
     
+    @transactional
     def evaluate_thesis_progress(self, committee_id: str, evaluation_data: Dict[str, Any]) -> Dict[str, Any]:
         """Evaluate thesis progress"""
         
@@ -583,6 +590,7 @@ class ThesisCommitteeSystem:
             "current_phase": committee.current_phase.value
         }
     
+    @transactional
     def schedule_thesis_defense(self, committee_id: str, defense_data: Dict[str, Any]) -> Dict[str, Any]:
         """Schedule thesis defense"""
         
@@ -626,6 +634,7 @@ class ThesisCommitteeSystem:
             "committee_phase": committee.current_phase.value
         }
     
+    @transactional
     def conduct_thesis_defense(self, defense_meeting_id: str, defense_data: Dict[str, Any]) -> Dict[str, Any]:
         """Conduct thesis defense"""
         
@@ -10,6 +10,8 @@ from datetime import datetime, timedelta
 import json
 import uuid
 
+from storage_backend import MemoryBackend, StorageBackend, transactional
+
 class ThesisStatus(Enum):
     PROPOSAL_DRAFT = "proposal_draft"
     PROPOSAL_SUBMITTED = "proposal_submitted"
@@ -110,14 +112,18 @@ class ThesisDefense:
 class ThesisSystem:
     """Comprehensive thesis management system"""
     
-    def __init__(self, user_manager, professor_system):
+    def __init__(self, user_manager, professor_system, storage: Optional[StorageBackend] = None):
         self.user_manager = user_manager
         self.professor_system = professor_system
-        self.thesis_proposals: Dict[str, ThesisProposal] = {}
-        self.theses: Dict[str, Thesis] = {}
-        self.committees: Dict[str, ThesisCommittee] = {}
-        self.defenses: Dict[str, ThesisDefense] = {}
-        
+        self.storage = storage or MemoryBackend()
+        self.thesis_proposals = self.storage.collection("thesis.proposals", ThesisProposal,
+                                                        hash_fields=("student_id",))
+        self.theses = self.storage.collection("thesis.theses", Thesis, hash_fields=("student_id",))
+        # A committee's thesis_id is the proposal it was formed for
+        self.committees = self.storage.collection("thesis.committees", ThesisCommittee, hash_fields=("thesis_id",))
+        self.defenses = self.storage.collection("thesis.defenses", ThesisDefense)
+        
+    @transactional
     def create_thesis_proposal(self, student_id: str, proposal_data: Dict[str, Any]) -> Dict[str, Any]:
         """Create new thesis proposal"""
         proposal_id = f"PROP_{uuid.uuid4().hex[:8].upper()}"
@@ -148,6 +154,7 @@ class ThesisSystem:
             "message": "Thesis proposal created successfully"
         }
     
+    @transactional
     def submit_thesis_proposal(self, proposal_id: str) -> Dict[str, Any]:
         """Submit thesis proposal for committee review"""
         proposal = self.thesis_proposals.get(proposal_id)
@@ -520,6 +527,7 @@ class ThesisSystem:
         # Update proposal status
         proposal.status = ThesisStatus.PROPOSAL_APPROVED
     
+    @transactional
     def schedule_thesis_defense(self, thesis_id: str, defense_data: Dict[str, Any]) -> Dict[str, Any]:
         """Schedule thesis defense presentation"""
         thesis = self.theses.get(thesis_id)
@@ -530,10 +538,7 @@ class ThesisSystem:
             return {"success": False, "error": "Thesis must be submitted before scheduling defense"}
         
         # Find committee for this thesis
-        committee = next(
-            (c for c in self.committees.values() if c.thesis_id == thesis.proposal_id),
-            None
-        )
+        committee = self.committees.first("thesis_id", thesis.proposal_id)
         if not committee:
             return {"success": False, "error": "Thesis committee not found"}
         
@@ -572,6 +577,7 @@ class ThesisSystem:
             ]
         }
     
+    @transactional
     def conduct_thesis_defense(self, defense_id: str) -> Dict[str, Any]:
         """Conduct thesis defense with AI instructor committee"""
         defense = self.defenses.get(defense_id)
@@ -815,8 +821,8 @@ class ThesisSystem:
     
     def get_thesis_progress(self, student_id: str) -> Dict[str, Any]:
         """Get thesis progress for student"""
-        student_proposals = [p for p in self.thesis_proposals.values() if p.student_id == student_id]
-        student_theses = [t for t in self.theses.values() if t.student_id == student_id]
+        student_proposals = self.thesis_proposals.lookup("student_id", student_id)
+        student_theses = self.theses.lookup("student_id", student_id)
         
         return {
             "student_id": student_id,
@@ -846,7 +852,7 @@ class ThesisSystem:
     
     def _get_current_thesis_status(self, student_id: str) -> str:
         """Get current thesis status for student"""
-        student_theses = [t for t in self.theses.values() if t.student_id == student_id]
+        student_theses = self.theses.lookup("student_id", student_id)
         
         if not student_theses:
             return "No thesis in progress"